@@ -0,0 +1,341 @@
+"""
+Agenda de vencimentos de SLA
+Mantém em memória um min-heap com o sla_limite dos chamados em aberto e o
+conjunto dos já vencidos. Uma tarefa do lifespan dorme até o próximo prazo,
+publica o evento sla_vencido de cada violação e mantém o total de vencidos,
+que o dashboard e /metrics leem sem varrer a tabela.
+
+A agenda é carregada do banco e depois acompanha os commits das sessões
+(eventos do SQLAlchemy em Chamado): criação, mudança de prazo e de status.
+Escritas que não passam por esses eventos (outros workers, cargas pelo Core,
+Query.delete) são reconciliadas pela tarefa a cada intervalo_reconciliacao_s,
+comparando o marcador de chamados do banco com o esperado: o da última carga,
+avançado a cada commit acompanhado. Enquanto os marcadores diferem, quem
+precisa do total exato conta no banco.
+"""
+
+import heapq
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models import Chamado
+from config_manager import get_config_manager
+from cache_http import STATUS_EM_ABERTO, AlteracoesChamados, marcador_chamados
+from eventos import publicar_evento, EVENTO_SLA_VENCIDO
+from instrumentacao import registro_metricas
+
+logger = logging.getLogger(__name__)
+
+CHAVE_PENDENTES = "agenda_sla_pendentes"  # Alterações da sessão aplicadas no commit
+CHAVE_ALTERACOES = "agenda_sla_alteracoes"  # Efeito da sessão no marcador de chamados
+
+
+def _get_config_sla(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.sla"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('sla', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+def agenda_habilitada() -> bool:
+    return bool(_get_config_sla('habilitado', True))
+
+
+@dataclass
+class PrazoSLA:
+    chamado_id: int
+    sla_limite: datetime
+    criticidade: str
+    numero_wex: str
+
+    def to_dict(self, agora: Optional[datetime] = None) -> Dict[str, Any]:
+        agora = agora or datetime.now()
+        return {
+            "chamado_id": self.chamado_id,
+            "numero_wex": self.numero_wex,
+            "criticidade": self.criticidade,
+            "sla_limite": self.sla_limite.isoformat(),
+            "minutos_restantes": round((self.sla_limite - agora).total_seconds() / 60, 1)
+        }
+
+
+violacoes_sla = registro_metricas.contador(
+    "wex_sla_violacoes_total", "SLAs vencidos detectados pela agenda", ("criticidade",))
+vencidos_sla = registro_metricas.medidor(
+    "wex_sla_vencidos", "Chamados em aberto com SLA vencido")
+
+
+class AgendaSLA:
+    """Min-heap (sla_limite, id) dos prazos em aberto, com remoção preguiçosa das entradas obsoletas"""
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._prazos: Dict[int, PrazoSLA] = {}  # Em aberto, ainda no prazo
+        self._vencidos: Dict[int, PrazoSLA] = {}  # Em aberto, prazo ultrapassado
+        self._lock = threading.Lock()
+        self._despertar: Optional[Callable[[], None]] = None
+        self._processado_ate: Optional[datetime] = None
+        self.marcador: Optional[tuple] = None  # marcador_chamados da última carga, avançado pelos commits
+        self.carregada = False
+
+    # === Estado ===
+
+    def carregar(self, db: Session, agora: Optional[datetime] = None):
+        """
+        (Re)constrói a agenda a partir dos chamados em aberto com SLA
+
+        Na primeira carga, os vencidos até agora não geram evento. Numa recarga,
+        só os prazos até o último processamento entram direto nos vencidos: os
+        ultrapassados desde então ainda geram evento no próximo processamento.
+        """
+        if agora is None:
+            agora = (self._processado_ate if self.carregada else None) or datetime.now()
+        marcador = marcador_chamados(db)
+        linhas = db.query(Chamado.id, Chamado.sla_limite, Chamado.criticidade, Chamado.numero_wex).filter(
+            Chamado.sla_limite.isnot(None), Chamado.status.in_(STATUS_EM_ABERTO)
+        ).all()
+        prazos, vencidos = {}, {}
+        for chamado_id, sla_limite, criticidade, numero_wex in linhas:
+            prazo = PrazoSLA(chamado_id, sla_limite, criticidade, numero_wex)
+            (vencidos if sla_limite <= agora else prazos)[chamado_id] = prazo
+        heap = [(p.sla_limite, p.chamado_id) for p in prazos.values()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap, self._prazos, self._vencidos = heap, prazos, vencidos
+            self._processado_ate = agora
+            self.marcador = marcador
+            self.carregada = True
+        vencidos_sla.definir(len(vencidos))
+        self._acordar()
+
+    def avancar_marcador(self, alteracoes: AlteracoesChamados, conexao):
+        """Marcador esperado após um commit cujas escritas já foram aplicadas à agenda"""
+        with self._lock:
+            self.marcador = alteracoes.avancar(self.marcador, conexao)
+
+    def atualizada(self, db: Session) -> bool:
+        """Carregada e sem escritas no banco desde a última carga além das acompanhadas"""
+        return self.carregada and self.marcador == marcador_chamados(db)
+
+    def garantir_atualizada(self, db: Session) -> bool:
+        """Recarrega se o banco mudou desde a última carga; retorna se recarregou"""
+        if self.atualizada(db):
+            return False
+        self.carregar(db)
+        return True
+
+    def atualizar_chamado(self, chamado_id: int, sla_limite: Optional[datetime], status: Optional[str],
+                          criticidade: Optional[str], numero_wex: Optional[str]):
+        """Reflete o estado atual de um chamado (sem prazo ou fechado: sai da agenda)"""
+        with self._lock:
+            if not self.carregada:
+                return
+            anterior = self._prazos.pop(chamado_id, None)
+            anterior_vencido = self._vencidos.pop(chamado_id, None)
+            antecipou = False
+            if sla_limite is not None and status in STATUS_EM_ABERTO:
+                prazo = PrazoSLA(chamado_id, sla_limite, criticidade or "", numero_wex or "")
+                if anterior_vencido is not None and anterior_vencido.sla_limite == sla_limite:
+                    self._vencidos[chamado_id] = prazo  # Continua vencido (sem novo evento)
+                else:
+                    self._prazos[chamado_id] = prazo
+                    if anterior is None or anterior.sla_limite != sla_limite:
+                        antecipou = not self._heap or sla_limite < self._heap[0][0]
+                        heapq.heappush(self._heap, (sla_limite, chamado_id))
+                        self._compactar()
+            total_vencidos = len(self._vencidos)
+        vencidos_sla.definir(total_vencidos)
+        if antecipou:
+            self._acordar()
+
+    def remover_chamado(self, chamado_id: int):
+        self.atualizar_chamado(chamado_id, None, None, None, None)
+
+    def _valida(self, entrada: Tuple[datetime, int]) -> bool:
+        prazo = self._prazos.get(entrada[1])
+        return prazo is not None and prazo.sla_limite == entrada[0]
+
+    def _compactar(self):
+        """Reconstrói o heap quando as entradas obsoletas passam das válidas"""
+        if len(self._heap) > 2 * len(self._prazos) + 64:
+            self._heap = [entrada for entrada in self._heap if self._valida(entrada)]
+            heapq.heapify(self._heap)
+
+    # === Consultas ===
+
+    def processar_vencimentos(self, agora: Optional[datetime] = None) -> List[PrazoSLA]:
+        """Move para os vencidos os prazos ultrapassados e publica um evento por violação"""
+        agora = agora or datetime.now()
+        novos = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= agora:
+                entrada = heapq.heappop(self._heap)
+                if self._valida(entrada):
+                    prazo = self._prazos.pop(entrada[1])
+                    self._vencidos[prazo.chamado_id] = prazo
+                    novos.append(prazo)
+            self._processado_ate = max(self._processado_ate or agora, agora)
+            total_vencidos = len(self._vencidos)
+        if novos:
+            vencidos_sla.definir(total_vencidos)
+        for prazo in novos:
+            violacoes_sla.inc(criticidade=prazo.criticidade)
+            publicar_evento(EVENTO_SLA_VENCIDO, {**prazo.to_dict(agora), "total_vencidos": total_vencidos})
+        return novos
+
+    @property
+    def total_vencidos(self) -> int:
+        return len(self._vencidos)
+
+    def proximo_vencimento(self) -> Optional[datetime]:
+        """Menor sla_limite ainda no prazo"""
+        with self._lock:
+            while self._heap and not self._valida(self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def proximos_em_risco(self, limite: int) -> List[PrazoSLA]:
+        """Os próximos chamados a vencer, em ordem de prazo (O(limite · log n))"""
+        with self._lock:
+            retirados, resultado = [], []
+            while self._heap and len(resultado) < limite:
+                entrada = heapq.heappop(self._heap)
+                if self._valida(entrada):
+                    retirados.append(entrada)
+                    resultado.append(self._prazos[entrada[1]])
+            for entrada in retirados:
+                heapq.heappush(self._heap, entrada)
+            return resultado
+
+    def vencidos(self, limite: int) -> List[PrazoSLA]:
+        """Vencidos mais antigos primeiro"""
+        with self._lock:
+            return heapq.nsmallest(limite, self._vencidos.values(), key=lambda p: (p.sla_limite, p.chamado_id))
+
+    # === Despertador da tarefa ===
+
+    def definir_despertador(self, despertar: Optional[Callable[[], None]]):
+        self._despertar = despertar
+
+    def _acordar(self):
+        if self._despertar is not None:
+            try:
+                self._despertar()
+            except RuntimeError:
+                pass  # Loop encerrado
+
+
+# Instância global da agenda
+agenda_sla = AgendaSLA()
+
+
+# === Sincronização com os commits ===
+
+def _registrar(alvo: Chamado, estado: Optional[tuple], variacao: int):
+    sessao = object_session(alvo)
+    if sessao is not None and agenda_sla.carregada:
+        sessao.info.setdefault(CHAVE_PENDENTES, {})[alvo.id] = estado
+        sessao.info.setdefault(CHAVE_ALTERACOES, AlteracoesChamados()).registrar(alvo.id, variacao)
+
+
+def _capturar_insercao(mapper, connection, alvo: Chamado):
+    _registrar(alvo, (alvo.sla_limite, alvo.status, alvo.criticidade, alvo.numero_wex), 1)
+
+
+def _capturar_alteracao(mapper, connection, alvo: Chamado):
+    _registrar(alvo, (alvo.sla_limite, alvo.status, alvo.criticidade, alvo.numero_wex), 0)
+
+
+def _capturar_remocao(mapper, connection, alvo: Chamado):
+    _registrar(alvo, None, -1)
+
+
+def _aplicar_pendentes(sessao: Session):
+    pendentes = sessao.info.pop(CHAVE_PENDENTES, None)
+    alteracoes = sessao.info.pop(CHAVE_ALTERACOES, None)
+    if not pendentes or not agenda_sla.carregada:
+        return
+    for chamado_id, estado in pendentes.items():
+        if estado is None:
+            agenda_sla.remover_chamado(chamado_id)
+        else:
+            agenda_sla.atualizar_chamado(chamado_id, *estado)
+    try:
+        with sessao.get_bind().connect() as conexao:
+            agenda_sla.avancar_marcador(alteracoes, conexao)
+    except Exception as e:
+        logger.warning(f"Marcador da agenda de SLA não avançado (reconciliação recarrega): {e}")
+        agenda_sla.marcador = None
+
+
+def _descartar_pendentes(sessao: Session):
+    sessao.info.pop(CHAVE_PENDENTES, None)
+    sessao.info.pop(CHAVE_ALTERACOES, None)
+
+
+event.listen(Chamado, "after_insert", _capturar_insercao)
+event.listen(Chamado, "after_update", _capturar_alteracao)
+event.listen(Chamado, "after_delete", _capturar_remocao)
+event.listen(Session, "after_commit", _aplicar_pendentes)
+event.listen(Session, "after_rollback", _descartar_pendentes)
+
+registro_metricas.adicionar_coletor(lambda: vencidos_sla.definir(agenda_sla.total_vencidos))
+
+
+# === Tarefa do lifespan ===
+
+async def executar_agenda_sla(abrir_sessao: Callable[[], Session], agenda: AgendaSLA = agenda_sla):
+    """
+    Carrega a agenda e dorme até o próximo vencimento (ou até intervalo_maximo_s,
+    ou até um prazo mais cedo ser registrado), publicando as violações. A cada
+    intervalo_reconciliacao_s confere o marcador do banco e recarrega se mudou.
+    """
+    loop = asyncio.get_running_loop()
+    acordar = asyncio.Event()
+    agenda.definir_despertador(lambda: loop.call_soon_threadsafe(acordar.set))
+
+    def reconciliar() -> bool:
+        db = abrir_sessao()
+        try:
+            return agenda.garantir_atualizada(db)
+        finally:
+            db.close()
+
+    try:
+        await run_in_threadpool(reconciliar)
+        logger.info(f"Agenda de SLA carregada: {agenda.total_vencidos} vencidos")
+        ultima_reconciliacao = loop.time()
+        while True:
+            acordar.clear()
+            if loop.time() - ultima_reconciliacao >= float(_get_config_sla('intervalo_reconciliacao_s', 30)):
+                try:
+                    if await run_in_threadpool(reconciliar):
+                        logger.info(f"Agenda de SLA recarregada: {agenda.total_vencidos} vencidos")
+                except Exception as e:
+                    logger.warning(f"Erro ao reconciliar a agenda de SLA: {e}")
+                ultima_reconciliacao = loop.time()
+            try:
+                agenda.processar_vencimentos()
+            except Exception as e:
+                logger.warning(f"Erro ao processar vencimentos de SLA: {e}")
+            espera = min(float(_get_config_sla('intervalo_maximo_s', 60)),
+                         float(_get_config_sla('intervalo_reconciliacao_s', 30)))
+            proximo = agenda.proximo_vencimento()
+            if proximo is not None:
+                espera = min(espera, max((proximo - datetime.now()).total_seconds(), 0.0))
+            try:
+                await asyncio.wait_for(acordar.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        agenda.definir_despertador(None)
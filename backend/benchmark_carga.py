@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga da API do WEX Intelligence
+Gera (ou reutiliza) uma base reproduzível com generate_mock_data, executa
+cenários de uso (listagem, busca, detalhe, triagem, relacionados, relatórios e
+dashboard) contra a aplicação no próprio processo (cliente ASGI, sem rede) e
+reporta latência p50/p95/p99 e requisições por segundo em JSON.
+
+Uso:
+    python benchmark_carga.py --chamados 10000
+    python benchmark_carga.py --chamados 100000 --saida atual.json --base referencia.json
+    python benchmark_carga.py --chamados 10000 --cenarios listagem,busca --requisicoes 500
+
+A chamada ao modelo remoto de IA é desativada por padrão (--ia-remota para manter),
+para que a latência da rede não domine a triagem.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import httpx
+
+DIRETORIO_BACKEND = Path(__file__).resolve().parent
+
+# Termos de busca extraídos dos templates de generate_mock_data
+TERMOS_BUSCA = ["lentidão", "timeout", "integração", "relatórios", "Erro 500", "dados de cliente", "TechSolutions"]
+
+
+@dataclass
+class Cenario:
+    """Requisição de um cenário; gerar_url sorteia os parâmetros (ex.: o chamado)"""
+    nome: str
+    metodo: str
+    gerar_url: Callable[[random.Random, Sequence[int]], str]
+
+
+CENARIOS_PADRAO: List[Cenario] = [
+    Cenario("listagem", "GET", lambda rng, ids: f"/chamados?skip={rng.randint(0, 49) * 20}&limit=20"),
+    Cenario("listagem_resumo", "GET", lambda rng, ids: "/chamados?view=summary&limit=100"),
+    Cenario("busca", "GET", lambda rng, ids: f"/chamados?busca_texto={rng.choice(TERMOS_BUSCA)}&limit=20"),
+    Cenario("filtro", "GET", lambda rng, ids: "/chamados?status=Aberto&criticidade=Alta&criticidade=Crítica"),
+    Cenario("detalhe", "GET", lambda rng, ids: f"/chamados/{rng.choice(ids)}"),
+    Cenario("detalhe_completo", "GET", lambda rng, ids: f"/chamados/{rng.choice(ids)}/completo?include=followups"),
+    Cenario("followups", "GET", lambda rng, ids: f"/chamados/{rng.choice(ids)}/followups"),
+    Cenario("triagem", "POST", lambda rng, ids: f"/api/chamados/{rng.choice(ids)}/triagem"),
+    Cenario("relacionados", "GET", lambda rng, ids: f"/api/chamados/{rng.choice(ids)}/relacionados"),
+    Cenario("relatorio_padroes", "GET", lambda rng, ids: f"/api/relatorios/padroes-ia?dias={rng.choice([7, 30, 90])}"),
+    Cenario("dashboard", "GET", lambda rng, ids: "/dashboard/metricas"),
+]
+
+
+# === Estatísticas ===
+
+def percentil(valores_ordenados: Sequence[float], p: float) -> float:
+    """Percentil p (0-100) com interpolação linear entre as amostras vizinhas"""
+    if not valores_ordenados:
+        return 0.0
+    posicao = (len(valores_ordenados) - 1) * p / 100.0
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] + (valores_ordenados[superior] - valores_ordenados[inferior]) * fracao
+
+
+def resumir_latencias(duracoes_s: List[float], erros: int, tempo_total_s: float) -> Dict[str, Any]:
+    """Latências em ms e vazão de um cenário"""
+    ordenadas = sorted(duracoes_s)
+    total = len(ordenadas)
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 3),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 3),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 3),
+        "media_ms": round(sum(ordenadas) / total * 1000, 3) if total else 0.0,
+        "max_ms": round(ordenadas[-1] * 1000, 3) if total else 0.0,
+        "req_s": round(total / tempo_total_s, 2) if tempo_total_s > 0 else 0.0
+    }
+
+
+def comparar_com_base(atual: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Variação percentual (p50, p95, p99 e req/s) de cada cenário presente nas duas execuções"""
+    comparacao = {}
+    for nome, metricas in atual.get("cenarios", {}).items():
+        referencia = base.get("cenarios", {}).get(nome)
+        if not referencia:
+            continue
+        comparacao[nome] = {
+            chave: round((metricas[chave] - referencia[chave]) / referencia[chave] * 100, 1)
+            for chave in ("p50_ms", "p95_ms", "p99_ms", "req_s") if referencia.get(chave)
+        }
+    return comparacao
+
+
+# === Execução ===
+
+async def executar_cenario(cliente: httpx.AsyncClient, cenario: Cenario, ids: Sequence[int],
+                           requisicoes: int, concorrencia: int, rng: random.Random) -> Dict[str, Any]:
+    """Dispara `requisicoes` requisições do cenário com `concorrencia` clientes simultâneos"""
+    urls = [cenario.gerar_url(rng, ids) for _ in range(requisicoes)]
+    duracoes: List[float] = []
+    erros = 0
+    proxima = 0
+
+    async def cliente_virtual():
+        nonlocal proxima, erros
+        while proxima < len(urls):
+            url = urls[proxima]
+            proxima += 1
+            inicio = time.perf_counter()
+            try:
+                resposta = await cliente.request(cenario.metodo, url)
+                if resposta.status_code >= 400:
+                    erros += 1
+            except Exception:
+                erros += 1
+            duracoes.append(time.perf_counter() - inicio)
+
+    inicio_total = time.perf_counter()
+    await asyncio.gather(*(cliente_virtual() for _ in range(max(1, concorrencia))))
+    return resumir_latencias(duracoes, erros, time.perf_counter() - inicio_total)
+
+
+async def executar_cenarios(app, cenarios: Sequence[Cenario], ids: Sequence[int], requisicoes: int = 200,
+                            concorrencia: int = 4, semente: int = 42, aquecimento: int = 5,
+                            progresso: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Executa os cenários em sequência contra o app ASGI; as requisições de aquecimento não contam"""
+    rng = random.Random(semente)
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as cliente:
+        for cenario in cenarios:
+            if aquecimento:
+                await executar_cenario(cliente, cenario, ids, aquecimento, 1, rng)
+            resultados[cenario.nome] = await executar_cenario(cliente, cenario, ids, requisicoes, concorrencia, rng)
+            if progresso:
+                r = resultados[cenario.nome]
+                print(f"   {cenario.nome:<18} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+                      f"p99 {r['p99_ms']:>9.2f} ms  {r['req_s']:>8.1f} req/s  erros {r['erros']}")
+    return resultados
+
+
+# === Linha de comando ===
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da API do WEX Intelligence")
+    parser.add_argument("--chamados", type=int, default=10000, help="Tamanho da base (ex.: 10000, 100000, 1000000)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--dias", type=int, default=90, help="Período de criação dos chamados gerados")
+    parser.add_argument("--banco", default=None, help="Arquivo SQLite (padrão: benchmark_<chamados>.db)")
+    parser.add_argument("--recriar", action="store_true", help="Apaga e gera a base novamente")
+    parser.add_argument("--workers", type=int, default=None, help="Processos na geração da base (padrão: núcleos)")
+    parser.add_argument("--precalcular", action="store_true",
+                        help="Reconstrói vizinhos e padrões antes de medir (custoso em bases grandes)")
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições medidas por cenário")
+    parser.add_argument("--concorrencia", type=int, default=4, help="Clientes simultâneos")
+    parser.add_argument("--cenarios", default=None,
+                        help=f"Lista separada por vírgula (padrão: todos): {','.join(c.nome for c in CENARIOS_PADRAO)}")
+    parser.add_argument("--ia-remota", action="store_true", help="Mantém as chamadas à API remota de IA")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON do resultado (padrão: stdout)")
+    parser.add_argument("--base", default=None, help="Resultado anterior (JSON) para comparação")
+    return parser.parse_args()
+
+
+def main():
+    args = _argumentos()
+    logging.basicConfig(level=logging.WARNING)
+    # Caminhos do usuário resolvidos antes de mudar para o diretório do backend (triagem_config.json)
+    banco = Path(args.banco or DIRETORIO_BACKEND / f"benchmark_{args.chamados}.db").resolve()
+    saida = Path(args.saida).resolve() if args.saida else None
+    base = Path(args.base).resolve() if args.base else None
+    os.chdir(DIRETORIO_BACKEND)
+
+    cenarios = CENARIOS_PADRAO
+    if args.cenarios:
+        nomes = [nome.strip() for nome in args.cenarios.split(",") if nome.strip()]
+        desconhecidos = set(nomes) - {c.nome for c in CENARIOS_PADRAO}
+        if desconhecidos:
+            print(f"❌ Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+            sys.exit(2)
+        cenarios = [c for c in CENARIOS_PADRAO if c.nome in nomes]
+
+    if args.recriar and banco.exists():
+        banco.unlink()
+    # Antes de importar database/main: a aplicação inteira passa a usar o banco do benchmark
+    os.environ["WEX_DATABASE_URL"] = f"sqlite:///{banco}"
+
+    from database import SessionLocal, create_database, engine
+    from models import Chamado, FollowUp
+    from generate_mock_data import gerar_dados_benchmark
+
+    print("🏁 WEX Intelligence - Benchmark de carga")
+    print("=" * 50)
+    create_database()
+    db = SessionLocal()
+    try:
+        existentes = db.query(Chamado).count()
+        if existentes == 0:
+            print(f"🏗️  Gerando {args.chamados} chamados (semente {args.semente}) em {banco.name}...")
+            inicio = time.perf_counter()
+            gerar_dados_benchmark(engine, args.chamados, semente=args.semente, dias=args.dias,
+                                  tamanho_lote=20000, workers=args.workers)
+            print(f"   Base gerada em {time.perf_counter() - inicio:.1f} s")
+        elif existentes != args.chamados:
+            print(f"❌ {banco.name} tem {existentes} chamados (esperado {args.chamados}); use --recriar")
+            sys.exit(2)
+
+        if args.precalcular:
+            from vizinhos import reconstruir_vizinhos
+            from padroes_incrementais import sincronizar_padroes
+            print("🧮 Reconstruindo vizinhos e padrões...")
+            reconstruir_vizinhos(db)
+            sincronizar_padroes(db)
+
+        ids = [linha[0] for linha in db.query(Chamado.id).all()]
+        total_followups = db.query(FollowUp).count()
+    finally:
+        db.close()
+
+    from main import app
+    from wex_ai_engine import desativar_ia_remota, wex_ai
+    if not args.ia_remota:
+        desativar_ia_remota(wex_ai)
+
+    print(f"📊 {len(ids)} chamados, {total_followups} follow-ups; "
+          f"{args.requisicoes} requisições por cenário, concorrência {args.concorrencia}")
+
+    async def executar():
+        async with app.router.lifespan_context(app):
+            return await executar_cenarios(
+                app, cenarios, ids, args.requisicoes, args.concorrencia, args.semente
+            )
+
+    resultado = {
+        "metadados": {
+            "data_execucao": datetime.now().isoformat(timespec="seconds"),
+            "chamados": len(ids),
+            "followups": total_followups,
+            "semente": args.semente,
+            "requisicoes_por_cenario": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "ia_remota": args.ia_remota,
+            "precalculado": args.precalcular,
+            "python": platform.python_version(),
+            "plataforma": platform.platform()
+        },
+        "cenarios": asyncio.run(executar())
+    }
+
+    if base:
+        with open(base, "r", encoding="utf-8") as f:
+            resultado["comparacao_base"] = comparar_com_base(resultado, json.load(f))
+        print("\n📈 Variação em relação à base (%; latência positiva = mais lento):")
+        for nome, variacao in resultado["comparacao_base"].items():
+            print(f"   {nome:<18} " + "  ".join(f"{chave} {valor:+.1f}%" for chave, valor in variacao.items()))
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if saida:
+        saida.write_text(texto, encoding="utf-8")
+        print(f"\n💾 Resultado salvo em {saida}")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
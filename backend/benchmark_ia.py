@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark dos caminhos críticos do motor de IA
+Mede realizar_triagem, calcular_similaridade_simples, encontrar_chamados_similares,
+gerar_relatorio_padroes e extrair_features_textuais sobre corpora fixos (semente)
+de tamanhos crescentes, com o modelo remoto desativado. Reporta o tempo por operação, o pico de memória alocada e o
+expoente de escala (1 ≈ linear, 2 ≈ quadrático) em JSON, e falha quando uma
+operação fica mais lenta que a execução de referência além do limite.
+
+Uso:
+    python benchmark_ia.py --saida referencia.json
+    python benchmark_ia.py --base referencia.json --limite-regressao 20
+    python benchmark_ia.py --operacoes realizar_triagem,extrair_features_textuais --tamanhos 100,1000,10000
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DIRETORIO_BACKEND = Path(__file__).resolve().parent
+TAMANHOS_PADRAO = (100, 400, 1600)
+LIMITE_REGRESSAO_PADRAO = 25.0  # % de aumento do tempo por operação
+
+
+def gerar_corpus(tamanho: int, semente: int = 42) -> List[Any]:
+    """Chamados transientes (sem sessão) gerados com os templates de generate_mock_data"""
+    from generate_mock_data import gerar_chamado
+    from models import Chamado
+
+    rng = random.Random(semente)
+    referencia = datetime(2025, 1, 1)
+    corpus = []
+    for chamado_id in range(1, tamanho + 1):
+        data_criacao = referencia - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+        chamado = Chamado(id=chamado_id, **gerar_chamado(rng, f"WEX-B{chamado_id:07d}", data_criacao, max_detalhes=3))
+        corpus.append(chamado)
+    return corpus
+
+
+def _chamado_dict(chamado) -> Dict[str, Any]:
+    """Formato de entrada de realizar_triagem"""
+    return {
+        'id': chamado.id,
+        'numero_wex': chamado.numero_wex,
+        'titulo': f"Chamado {chamado.numero_wex}",
+        'descricao': chamado.descricao,
+        'cliente_solicitante': chamado.cliente_solicitante,
+        'criticidade': chamado.criticidade,
+        'status': chamado.status,
+        'data_criacao': chamado.data_criacao.isoformat(),
+        'anexos_count': 1 if chamado.possui_anexos else 0
+    }
+
+
+@dataclass
+class Operacao:
+    """
+    Operação medida
+
+    preparar recebe o motor e o corpus e devolve a função cronometrada (fora da
+    medição ficam conversões e aquecimento). por_item: o tempo por operação é o
+    total dividido pelo tamanho do corpus (uma chamada por chamado).
+    """
+    nome: str
+    preparar: Callable[[Any, List[Any]], Callable[[], Any]]
+    por_item: bool = True
+    tamanho_maximo: Optional[int] = None  # Operações quadráticas param antes
+
+
+def _preparar_triagem(motor, corpus):
+    chamados = [_chamado_dict(c) for c in corpus]
+    return lambda: [motor.realizar_triagem(c) for c in chamados]
+
+
+def _preparar_similaridade_simples(motor, corpus):
+    from wex_ai_engine import calcular_similaridade_simples
+    base = corpus[0].descricao
+    textos = [c.descricao for c in corpus]
+    return lambda: [calcular_similaridade_simples(base, texto) for texto in textos]
+
+
+def _preparar_similares(motor, corpus):
+    return lambda: motor.encontrar_chamados_similares(corpus[0], corpus[1:], limite=10, score_minimo=0.3)
+
+
+def _preparar_relatorio(motor, corpus):
+    return lambda: motor.gerar_relatorio_padroes(corpus, 90)
+
+
+def _preparar_features(motor, corpus):
+    from features_textuais import extrair_features_textuais
+    textos = [c.descricao for c in corpus]
+    return lambda: [extrair_features_textuais(texto) for texto in textos]
+
+
+OPERACOES: List[Operacao] = [
+    Operacao("realizar_triagem", _preparar_triagem),
+    Operacao("calcular_similaridade_simples", _preparar_similaridade_simples),
+    Operacao("encontrar_chamados_similares", _preparar_similares, por_item=False),
+    Operacao("gerar_relatorio_padroes", _preparar_relatorio, por_item=False, tamanho_maximo=2000),
+    Operacao("extrair_features_textuais", _preparar_features),
+]
+
+
+def criar_motor():
+    """Instância própria do motor com a API remota desativada (a global não é alterada)"""
+    from wex_ai_engine import WexIntelligenceAI, desativar_ia_remota
+    motor = WexIntelligenceAI()
+    desativar_ia_remota(motor)
+    return motor
+
+
+# === Medição ===
+
+def medir(funcao: Callable[[], Any], repeticoes: int) -> Dict[str, float]:
+    """Mediana e mínimo do tempo (perf_counter) e pico de memória em uma execução separada com tracemalloc"""
+    funcao()  # aquecimento
+    tempos = []
+    for _ in range(max(1, repeticoes)):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    ja_rastreando = tracemalloc.is_tracing()
+    if not ja_rastreando:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    atual_antes, _ = tracemalloc.get_traced_memory()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    if not ja_rastreando:
+        tracemalloc.stop()
+
+    return {
+        "mediana_s": statistics.median(tempos),
+        "minimo_s": min(tempos),
+        "pico_memoria_kb": round(max(pico - atual_antes, 0) / 1024, 1)
+    }
+
+
+def expoente_escala(pontos: Dict[int, float]) -> Optional[float]:
+    """Inclinação log-log do tempo total entre o menor e o maior tamanho medidos"""
+    tamanhos = sorted(t for t, tempo in pontos.items() if tempo > 0)
+    if len(tamanhos) < 2:
+        return None
+    menor, maior = tamanhos[0], tamanhos[-1]
+    return round(math.log(pontos[maior] / pontos[menor]) / math.log(maior / menor), 2)
+
+
+def executar_benchmark(operacoes: Sequence[Operacao], tamanhos: Sequence[int], repeticoes: int = 5,
+                       semente: int = 42, progresso: bool = True) -> Dict[str, Any]:
+    """Mede cada operação em cada tamanho de corpus"""
+    motor = criar_motor()
+    corpora = {tamanho: gerar_corpus(tamanho, semente) for tamanho in tamanhos}
+    resultado = {}
+    for operacao in operacoes:
+        por_tamanho = {}
+        totais = {}
+        for tamanho in tamanhos:
+            if operacao.tamanho_maximo and tamanho > operacao.tamanho_maximo:
+                continue
+            medicao = medir(operacao.preparar(motor, corpora[tamanho]), repeticoes)
+            divisor = tamanho if operacao.por_item else 1
+            por_tamanho[str(tamanho)] = {
+                "total_ms": round(medicao["mediana_s"] * 1000, 3),
+                "por_op_us": round(medicao["mediana_s"] / divisor * 1e6, 3),
+                "minimo_por_op_us": round(medicao["minimo_s"] / divisor * 1e6, 3),
+                "pico_memoria_kb": medicao["pico_memoria_kb"]
+            }
+            totais[tamanho] = medicao["mediana_s"]
+            if progresso:
+                m = por_tamanho[str(tamanho)]
+                print(f"   {operacao.nome:<32} n={tamanho:<7} {m['por_op_us']:>12.2f} µs/op  "
+                      f"{m['total_ms']:>10.2f} ms  pico {m['pico_memoria_kb']:>9.1f} KB")
+        resultado[operacao.nome] = {
+            "por_item": operacao.por_item,
+            "tamanhos": por_tamanho,
+            "expoente_escala": expoente_escala(totais)
+        }
+    return resultado
+
+
+def verificar_regressoes(atual: Dict[str, Any], base: Dict[str, Any], limite_percentual: float) -> List[Dict[str, Any]]:
+    """Pares operação/tamanho cujo tempo por operação subiu mais que limite_percentual em relação à base"""
+    regressoes = []
+    for nome, dados in atual.get("operacoes", {}).items():
+        referencia = base.get("operacoes", {}).get(nome, {}).get("tamanhos", {})
+        for tamanho, medicao in dados["tamanhos"].items():
+            anterior = referencia.get(tamanho, {}).get("por_op_us")
+            if not anterior:
+                continue
+            variacao = (medicao["por_op_us"] - anterior) / anterior * 100
+            if variacao > limite_percentual:
+                regressoes.append({
+                    "operacao": nome, "tamanho": int(tamanho), "base_us": anterior,
+                    "atual_us": medicao["por_op_us"], "variacao_percentual": round(variacao, 1)
+                })
+    return regressoes
+
+
+# === Linha de comando ===
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Micro-benchmark do motor de IA do WEX Intelligence")
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS_PADRAO),
+                        help="Tamanhos dos corpora, separados por vírgula")
+    parser.add_argument("--operacoes", default=None,
+                        help=f"Lista separada por vírgula (padrão: todas): {','.join(o.nome for o in OPERACOES)}")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Execuções cronometradas por medição (mediana)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON do resultado (padrão: stdout)")
+    parser.add_argument("--base", default=None, help="Resultado de referência (JSON) para detectar regressões")
+    parser.add_argument("--limite-regressao", type=float, default=LIMITE_REGRESSAO_PADRAO,
+                        help="Aumento máximo aceito do tempo por operação, em %% (padrão: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _argumentos()
+    logging.basicConfig(level=logging.WARNING)
+    saida = Path(args.saida).resolve() if args.saida else None
+    base = Path(args.base).resolve() if args.base else None
+    os.chdir(DIRETORIO_BACKEND)  # triagem_config.json
+
+    operacoes = OPERACOES
+    if args.operacoes:
+        nomes = [nome.strip() for nome in args.operacoes.split(",") if nome.strip()]
+        desconhecidas = set(nomes) - {o.nome for o in OPERACOES}
+        if desconhecidas:
+            print(f"❌ Operações desconhecidas: {', '.join(sorted(desconhecidas))}")
+            sys.exit(2)
+        operacoes = [o for o in OPERACOES if o.nome in nomes]
+    tamanhos = sorted(int(t) for t in args.tamanhos.split(",") if t.strip())
+
+    print("🔬 WEX Intelligence - Micro-benchmark do motor de IA")
+    print("=" * 50)
+    resultado = {
+        "metadados": {
+            "data_execucao": datetime.now().isoformat(timespec="seconds"),
+            "tamanhos": tamanhos,
+            "repeticoes": args.repeticoes,
+            "semente": args.semente,
+            "python": platform.python_version(),
+            "plataforma": platform.platform()
+        },
+        "operacoes": executar_benchmark(operacoes, tamanhos, args.repeticoes, args.semente)
+    }
+
+    regressoes = []
+    if base:
+        with open(base, "r", encoding="utf-8") as f:
+            regressoes = verificar_regressoes(resultado, json.load(f), args.limite_regressao)
+        resultado["regressoes"] = regressoes
+        resultado["limite_regressao_percentual"] = args.limite_regressao
+
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if saida:
+        saida.write_text(texto, encoding="utf-8")
+        print(f"\n💾 Resultado salvo em {saida}")
+    else:
+        print(texto)
+
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} regressão(ões) acima de {args.limite_regressao}%:")
+        for r in regressoes:
+            print(f"   {r['operacao']} (n={r['tamanho']}): {r['base_us']} → {r['atual_us']} µs/op "
+                  f"({r['variacao_percentual']:+.1f}%)")
+        sys.exit(1)
+    if base:
+        print(f"\n✅ Nenhuma regressão acima de {args.limite_regressao}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Requisições condicionais (ETag / If-None-Match / If-Modified-Since)
+Os validadores saem de agregados indexados e de um contador de alterações
+mantido no banco, de modo que um polling sem mudanças custa uma consulta
+barata e recebe 304, sem carregar objetos ORM nem serializar a resposta
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Set
+
+from fastapi import Request, Response
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Query, Session, object_session
+
+from models import Chamado, FollowUp, VersaoRecurso, StatusChamado
+
+logger = logging.getLogger(__name__)
+
+RECURSO_CHAMADOS = "chamados"
+RECURSO_FOLLOWUPS = "followups"
+
+STATUS_EM_ABERTO = [StatusChamado.ABERTO.value, StatusChamado.EM_ANALISE.value, StatusChamado.PENDENTE.value]
+JANELA_RESOLUCAO = timedelta(days=30)  # Mesma janela do tempo médio de resolução do dashboard
+
+# Contadores de respostas condicionais
+_lock_estatisticas = threading.Lock()
+estatisticas_condicionais: Dict[str, int] = {"respostas_304": 0, "respostas_completas": 0}
+
+
+# === Contador de alterações (atualizado na mesma transação da escrita) ===
+
+_SQL_INCREMENTAR_VERSAO = text(
+    "INSERT INTO versoes_recursos (recurso, versao) VALUES (:recurso, 1) "
+    "ON CONFLICT(recurso) DO UPDATE SET versao = versao + 1"
+)
+
+
+CHAVE_INCREMENTOS = "versoes_recursos_incrementos"  # Incrementos da sessão somados no commit
+
+# Incrementos feitos pelos commits deste processo, para separar as escritas de outros workers
+_lock_versoes_locais = threading.Lock()
+_versoes_locais: Dict[str, int] = {RECURSO_CHAMADOS: 0, RECURSO_FOLLOWUPS: 0}
+
+
+def _registrar_contador(modelo, recurso: str):
+    def incrementar(mapper, connection, alvo):
+        connection.execute(_SQL_INCREMENTAR_VERSAO, {"recurso": recurso})
+        sessao = object_session(alvo)
+        if sessao is not None:
+            incrementos = sessao.info.setdefault(CHAVE_INCREMENTOS, {})
+            incrementos[recurso] = incrementos.get(recurso, 0) + 1
+
+    for evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(modelo, evento, incrementar)
+
+
+def _somar_incrementos(sessao: Session):
+    incrementos = sessao.info.pop(CHAVE_INCREMENTOS, None)
+    if incrementos:
+        with _lock_versoes_locais:
+            for recurso, quantidade in incrementos.items():
+                _versoes_locais[recurso] += quantidade
+
+
+def _descartar_incrementos(sessao: Session):
+    sessao.info.pop(CHAVE_INCREMENTOS, None)
+
+
+_registrar_contador(Chamado, RECURSO_CHAMADOS)
+_registrar_contador(FollowUp, RECURSO_FOLLOWUPS)
+event.listen(Session, "after_commit", _somar_incrementos)
+event.listen(Session, "after_rollback", _descartar_incrementos)
+
+
+def versao_recurso(db: Session, recurso: str) -> int:
+    versao = db.query(VersaoRecurso.versao).filter(VersaoRecurso.recurso == recurso).scalar()
+    return versao or 0
+
+
+def marcador_chamados(db: Session) -> tuple:
+    """
+    Identifica o conteúdo atual de chamados para estados mantidos em memória
+
+    O contador de versão cobre as escritas pelo ORM de qualquer processo;
+    total, maior id e max(data_atualizacao) cobrem cargas pelo Core e
+    remoções em massa (Query.delete), que não passam pelos eventos.
+    """
+    total, maior_id, ultima_atualizacao = db.query(
+        func.count(Chamado.id), func.max(Chamado.id), func.max(Chamado.data_atualizacao)
+    ).one()
+    return (versao_recurso(db, RECURSO_CHAMADOS), total, maior_id, ultima_atualizacao)
+
+
+class MonitorAlteracoesExternas:
+    """
+    Detecta escritas feitas por outros processos (outros workers, scripts)
+
+    A parte de cada contador de versão que não veio dos commits deste processo
+    é externa: se cresceu desde a última verificação, outro processo gravou.
+    Cargas pelo Core não mexem nos contadores; sem escritas locais no
+    intervalo, uma mudança de total, maior id ou max(data_atualizacao) também
+    conta como externa. Os incrementos locais são somados depois do commit,
+    então uma escrita local pode ser vista uma vez como externa (nunca o
+    contrário).
+    """
+
+    def __init__(self):
+        self._anterior: Optional[tuple] = None
+
+    def verificar(self, db: Session) -> List[str]:
+        """Recursos alterados por outros processos desde a última verificação"""
+        with _lock_versoes_locais:
+            locais = dict(_versoes_locais)  # Lidos antes do banco
+        marcador = marcador_chamados(db)
+        externos = {
+            RECURSO_CHAMADOS: marcador[0] - locais[RECURSO_CHAMADOS],
+            RECURSO_FOLLOWUPS: versao_recurso(db, RECURSO_FOLLOWUPS) - locais[RECURSO_FOLLOWUPS],
+        }
+        anterior, self._anterior = self._anterior, (externos, locais, marcador)
+        if anterior is None:
+            return []
+        externos_antes, locais_antes, marcador_antes = anterior
+        alterados = [recurso for recurso, valor in externos.items() if valor > externos_antes[recurso]]
+        if (RECURSO_CHAMADOS not in alterados and locais == locais_antes and marcador[0] == marcador_antes[0]
+                and marcador[1:] != marcador_antes[1:]):
+            alterados.insert(0, RECURSO_CHAMADOS)
+        return alterados
+
+
+MAX_IDS_ALTERACOES = 500  # Acima disso o marcador não é previsto (limite de parâmetros do IN)
+
+
+@dataclass
+class AlteracoesChamados:
+    """
+    Efeito das escritas de uma sessão em marcador_chamados
+
+    Um estado em memória que já aplicou essas escritas avança o marcador guardado
+    em vez de se recarregar. Uma previsão errada (escritas de outro processo no
+    meio, lote grande demais) só deixa o marcador diferente do banco e força a
+    recarga, como qualquer escrita não acompanhada.
+    """
+    eventos: int = 0  # Incrementos do contador de versão (um por linha gravada ou removida)
+    saldo: int = 0  # Inseridos menos removidos
+    ids: Set[int] = field(default_factory=set)  # Inseridos ou alterados
+
+    def registrar(self, chamado_id: int, variacao: int = 0):
+        """Uma linha gravada (variacao 0 ou 1 se inserida) ou removida (-1)"""
+        self.eventos += 1
+        self.saldo += variacao
+        if variacao < 0:
+            self.ids.discard(chamado_id)
+        else:
+            self.ids.add(chamado_id)
+
+    def avancar(self, marcador: Optional[tuple], conexao) -> Optional[tuple]:
+        """Marcador esperado depois do commit destas escritas (None se não dá para prever)"""
+        if marcador is None or len(self.ids) > MAX_IDS_ALTERACOES:
+            return None
+        versao, total, maior_id, ultima_atualizacao = marcador
+        if self.ids:
+            maior_gravado, ultima_gravada = conexao.execute(
+                select(func.max(Chamado.id), func.max(Chamado.data_atualizacao)).where(Chamado.id.in_(self.ids))
+            ).one()
+            maior_id = _mais_recente(maior_id, maior_gravado)  # max ignorando None
+            ultima_atualizacao = _mais_recente(ultima_atualizacao, ultima_gravada)
+        return (versao + self.eventos, total + self.saldo, maior_id, ultima_atualizacao)
+
+
+# === Validadores ===
+
+@dataclass
+class Validador:
+    etag: str
+    ultima_modificacao: Optional[datetime] = None
+    total: Optional[int] = None  # Total do filtro, reaproveitado pela listagem
+
+
+def _criar_validador(partes: tuple, ultima_modificacao: Optional[datetime]) -> Validador:
+    digest = hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()[:20]
+    return Validador(etag=f'W/"{digest}"', ultima_modificacao=ultima_modificacao)
+
+
+def _mais_recente(*datas: Optional[datetime]) -> Optional[datetime]:
+    validas = [d for d in datas if d is not None]
+    return max(validas) if validas else None
+
+
+def _ultimo_followup(db: Session, chamado_id: Optional[int] = None):
+    """
+    (id, data_criacao, total) do último follow-up, global ou de um chamado
+
+    No global o total não é contado (None): max(id) sai direto da chave primária,
+    e remoções já mudam a versão de followups.
+    """
+    if chamado_id is None:
+        ultimo_id, total = db.query(func.max(FollowUp.id)).scalar(), None
+    else:
+        ultimo_id, total = db.query(func.max(FollowUp.id), func.count(FollowUp.id)).filter(
+            FollowUp.chamado_id == chamado_id
+        ).one()
+    data = db.query(FollowUp.data_criacao).filter(FollowUp.id == ultimo_id).scalar() if ultimo_id else None
+    return ultimo_id, data, total
+
+
+def validador_lista_chamados(db: Session, consulta: Query, parametros: tuple) -> Validador:
+    """
+    Validador da listagem: versões dos recursos, max(data_atualizacao) e total do filtro
+
+    Retorna também o total para ser reaproveitado na resposta.
+    """
+    ultima_atualizacao, total = consulta.with_entities(
+        func.max(Chamado.data_atualizacao), func.count(Chamado.id)
+    ).order_by(None).one()
+    ultimo_followup_id, ultimo_followup_em, _ = _ultimo_followup(db)
+    validador = _criar_validador(
+        ("chamados", parametros, versao_recurso(db, RECURSO_CHAMADOS), versao_recurso(db, RECURSO_FOLLOWUPS),
+         ultima_atualizacao, total, ultimo_followup_id),
+        _mais_recente(ultima_atualizacao, ultimo_followup_em)
+    )
+    validador.total = total
+    return validador
+
+
+def validador_chamado(db: Session, chamado_id: int) -> Optional[Validador]:
+    """Validador de um chamado (None se o chamado não existe)"""
+    linha = db.query(Chamado.data_atualizacao).filter(Chamado.id == chamado_id).first()
+    if linha is None:
+        return None
+    ultimo_followup_id, ultimo_followup_em, total_followups = _ultimo_followup(db, chamado_id)
+    return _criar_validador(
+        ("chamado", chamado_id, versao_recurso(db, RECURSO_CHAMADOS), linha[0], ultimo_followup_id, total_followups),
+        _mais_recente(linha[0], ultimo_followup_em)
+    )
+
+
+def validador_followups(db: Session, chamado_id: int) -> Validador:
+    """Validador dos follow-ups de um chamado"""
+    ultimo_followup_id, ultimo_followup_em, total = _ultimo_followup(db, chamado_id)
+    return _criar_validador(
+        ("followups", chamado_id, versao_recurso(db, RECURSO_FOLLOWUPS), ultimo_followup_id, total),
+        ultimo_followup_em
+    )
+
+
+def validador_metricas(db: Session, agora: Optional[datetime] = None) -> Validador:
+    """
+    Validador das métricas do dashboard
+
+    Além dos dados, as métricas mudam com o tempo: inclui o dia (novos hoje),
+    o próximo SLA a vencer (vencidos) e o resolvido mais antigo da janela de 30 dias.
+    """
+    agora = agora or datetime.now()
+    ultima_atualizacao, total = db.query(func.max(Chamado.data_atualizacao), func.count(Chamado.id)).one()
+    proximo_vencimento = db.query(func.min(Chamado.sla_limite)).filter(
+        Chamado.sla_limite >= agora, Chamado.status.in_(STATUS_EM_ABERTO)
+    ).scalar()
+    resolvido_mais_antigo = db.query(func.min(Chamado.data_atualizacao)).filter(
+        Chamado.data_atualizacao >= agora - JANELA_RESOLUCAO, Chamado.status == StatusChamado.RESOLVIDO.value
+    ).scalar()
+    return _criar_validador(
+        ("metricas", versao_recurso(db, RECURSO_CHAMADOS), ultima_atualizacao, total,
+         agora.date(), proximo_vencimento, resolvido_mais_antigo),
+        ultima_atualizacao
+    )
+
+
+# === Pré-condições ===
+
+def _formatar_http_date(data: datetime) -> str:
+    return formatdate(data.timestamp(), usegmt=True)
+
+
+def _etag_confere(cabecalho: str, etag: str) -> bool:
+    """Comparação fraca de ETags (If-None-Match aceita lista e '*')"""
+    if cabecalho.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in cabecalho.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
+
+
+def _nao_modificado_desde(cabecalho: str, ultima_modificacao: Optional[datetime]) -> bool:
+    if ultima_modificacao is None:
+        return False
+    try:
+        desde = parsedate_to_datetime(cabecalho)
+    except (TypeError, ValueError):
+        return False
+    if desde.tzinfo is not None:
+        desde = desde.astimezone().replace(tzinfo=None)
+    return ultima_modificacao.replace(microsecond=0) <= desde
+
+
+def _cabecalhos(validador: Validador) -> Dict[str, str]:
+    cabecalhos = {"ETag": validador.etag, "Cache-Control": "no-cache"}
+    if validador.ultima_modificacao is not None:
+        cabecalhos["Last-Modified"] = _formatar_http_date(validador.ultima_modificacao)
+    return cabecalhos
+
+
+def resposta_condicional(request: Request, response: Response, validador: Validador) -> Optional[Response]:
+    """
+    Avalia If-None-Match / If-Modified-Since
+
+    Retorna uma resposta 304 quando o cliente já tem a versão atual; caso contrário
+    aplica ETag/Last-Modified na resposta normal e retorna None.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Com If-None-Match presente, If-Modified-Since é ignorado (RFC 9110)
+        nao_modificado = _etag_confere(if_none_match, validador.etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        nao_modificado = bool(if_modified_since) and _nao_modificado_desde(if_modified_since, validador.ultima_modificacao)
+
+    with _lock_estatisticas:
+        estatisticas_condicionais["respostas_304" if nao_modificado else "respostas_completas"] += 1
+
+    if nao_modificado:
+        return Response(status_code=304, headers=_cabecalhos(validador))
+    response.headers.update(_cabecalhos(validador))
+    return None
@@ -0,0 +1,267 @@
+"""
+Compressão das respostas HTTP (gzip / brotli)
+Middleware ASGI da API que negocia a codificação pelo Accept-Encoding e só
+comprime respostas acima de um tamanho mínimo, e geração das variantes
+pré-comprimidas (.gz/.br) dos arquivos estáticos do frontend
+"""
+
+import gzip
+import hashlib
+import logging
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_DISPONIVEL = True
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+    BROTLI_DISPONIVEL = False
+    logger.info("brotli não instalado: compressão apenas com gzip")
+
+CODIFICACAO_BROTLI = "br"
+CODIFICACAO_GZIP = "gzip"
+
+# Extensão do arquivo pré-comprimido de cada codificação
+EXTENSOES_VARIANTES = {CODIFICACAO_BROTLI: ".br", CODIFICACAO_GZIP: ".gz"}
+
+# Tipos que não compensa comprimir (já comprimidos) ou que não podem ser
+# bufferizados (SSE: cada evento precisa chegar ao cliente na hora)
+TIPOS_NAO_COMPRIMIVEIS = (
+    "text/event-stream", "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/octet-stream"
+)
+
+# Arquivos estáticos com variantes pré-comprimidas
+EXTENSOES_COMPRIMIVEIS = {".html", ".htm", ".js", ".css", ".json", ".svg", ".txt", ".map"}
+
+
+def _get_config_compressao(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.compressao"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('compressao', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+def codificacoes_disponiveis() -> List[str]:
+    """Codificações suportadas, na ordem de preferência do servidor"""
+    return [CODIFICACAO_BROTLI, CODIFICACAO_GZIP] if BROTLI_DISPONIVEL else [CODIFICACAO_GZIP]
+
+
+def _interpretar_accept_encoding(cabecalho: str) -> Dict[str, float]:
+    """{codificação: q} do cabeçalho Accept-Encoding"""
+    aceitas: Dict[str, float] = {}
+    for parte in cabecalho.split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        nome = nome.strip().lower()
+        if not nome:
+            continue
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        aceitas[nome] = q
+    return aceitas
+
+
+def escolher_codificacao(accept_encoding: Optional[str], disponiveis: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Negocia a codificação da resposta
+
+    Entre as codificações aceitas pelo cliente (q > 0, incluindo '*'), escolhe
+    a de maior q; empates seguem a preferência do servidor (brotli, depois gzip).
+    """
+    if not accept_encoding:
+        return None
+    aceitas = _interpretar_accept_encoding(accept_encoding)
+    melhor, melhor_q = None, 0.0
+    for codificacao in disponiveis if disponiveis is not None else codificacoes_disponiveis():
+        q = aceitas.get(codificacao, aceitas.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = codificacao, q
+    return melhor
+
+
+def comprimir(dados: bytes, codificacao: str, nivel: Optional[int] = None) -> bytes:
+    """Comprime um conteúdo completo"""
+    if codificacao == CODIFICACAO_BROTLI:
+        return brotli.compress(dados, quality=11 if nivel is None else nivel)
+    return gzip.compress(dados, compresslevel=9 if nivel is None else nivel, mtime=0)
+
+
+class _CompressorIncremental:
+    """Compressão de respostas em streaming (flush a cada bloco)"""
+
+    def __init__(self, codificacao: str, nivel: int):
+        self.codificacao = codificacao
+        if codificacao == CODIFICACAO_BROTLI:
+            self._compressor = brotli.Compressor(quality=nivel)
+        else:
+            self._compressor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == CODIFICACAO_BROTLI:
+            return self._compressor.process(dados) + self._compressor.flush()
+        return self._compressor.compress(dados) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self) -> bytes:
+        if self.codificacao == CODIFICACAO_BROTLI:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+# === Middleware da API ===
+
+class MiddlewareCompressao:
+    """
+    Comprime as respostas da API com brotli ou gzip conforme o Accept-Encoding
+
+    Respostas menores que tamanho_minimo, já codificadas, sem corpo (304) ou de
+    tipos não comprimíveis (incluindo text/event-stream) passam inalteradas.
+    """
+
+    def __init__(self, app: ASGIApp, tamanho_minimo: Optional[int] = None,
+                 nivel_gzip: Optional[int] = None, nivel_brotli: Optional[int] = None):
+        self.app = app
+        self.habilitado = bool(_get_config_compressao('habilitado', True))
+        self.tamanho_minimo = int(tamanho_minimo if tamanho_minimo is not None
+                                  else _get_config_compressao('tamanho_minimo_bytes', 1024))
+        self.niveis = {
+            CODIFICACAO_GZIP: int(nivel_gzip if nivel_gzip is not None else _get_config_compressao('nivel_gzip', 6)),
+            CODIFICACAO_BROTLI: int(nivel_brotli if nivel_brotli is not None else _get_config_compressao('nivel_brotli', 4))
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.habilitado:
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+        resposta = _RespostaComprimida(send, codificacao, self.niveis[codificacao], self.tamanho_minimo)
+        await self.app(scope, receive, resposta.enviar)
+
+
+class _RespostaComprimida:
+    """Intercepta as mensagens ASGI de uma resposta e decide se comprime no primeiro bloco do corpo"""
+
+    def __init__(self, send: Send, codificacao: str, nivel: int, tamanho_minimo: int):
+        self.send = send
+        self.codificacao = codificacao
+        self.nivel = nivel
+        self.tamanho_minimo = tamanho_minimo
+        self.mensagem_inicial: Optional[Message] = None
+        self.iniciada = False
+        self.compressor: Optional[_CompressorIncremental] = None
+
+    def _comprimivel(self) -> bool:
+        if self.mensagem_inicial["status"] in (204, 304) or self.mensagem_inicial["status"] < 200:
+            return False
+        cabecalhos = Headers(raw=self.mensagem_inicial["headers"])
+        if "content-encoding" in cabecalhos or "no-transform" in cabecalhos.get("cache-control", ""):
+            return False
+        tipo = cabecalhos.get("content-type", "")
+        return not any(tipo.startswith(excluido) for excluido in TIPOS_NAO_COMPRIMIVEIS)
+
+    async def enviar(self, mensagem: Message):
+        if mensagem["type"] == "http.response.start":
+            # Só envia o início depois de decidir os cabeçalhos
+            self.mensagem_inicial = mensagem
+            return
+        if mensagem["type"] != "http.response.body":
+            await self.send(mensagem)
+            return
+
+        if self.iniciada:
+            if self.compressor is not None:
+                corpo = self.compressor.comprimir(mensagem.get("body", b""))
+                if not mensagem.get("more_body", False):
+                    corpo += self.compressor.finalizar()
+                mensagem["body"] = corpo
+            await self.send(mensagem)
+            return
+
+        self.iniciada = True
+        corpo = mensagem.get("body", b"")
+        mais_corpo = mensagem.get("more_body", False)
+        if not self._comprimivel():
+            await self.send(self.mensagem_inicial)
+            await self.send(mensagem)
+            return
+
+        cabecalhos = MutableHeaders(raw=self.mensagem_inicial["headers"])
+        cabecalhos.add_vary_header("Accept-Encoding")
+
+        if not mais_corpo:
+            comprimido = comprimir(corpo, self.codificacao, self.nivel) if len(corpo) >= self.tamanho_minimo else None
+            if comprimido is not None and len(comprimido) < len(corpo):
+                cabecalhos["Content-Encoding"] = self.codificacao
+                cabecalhos["Content-Length"] = str(len(comprimido))
+                mensagem["body"] = comprimido
+            await self.send(self.mensagem_inicial)
+            await self.send(mensagem)
+            return
+
+        # Streaming (ex.: FileResponse): comprime bloco a bloco
+        self.compressor = _CompressorIncremental(self.codificacao, self.nivel)
+        cabecalhos["Content-Encoding"] = self.codificacao
+        del cabecalhos["Content-Length"]
+        mensagem["body"] = self.compressor.comprimir(corpo)
+        await self.send(self.mensagem_inicial)
+        await self.send(mensagem)
+
+
+# === Variantes pré-comprimidas dos arquivos estáticos ===
+
+def hash_conteudo(dados: bytes) -> str:
+    """Hash curto do conteúdo (ETag e parâmetro de versão das URLs)"""
+    return hashlib.sha256(dados).hexdigest()[:16]
+
+
+def caminho_variante(arquivo: Path, codificacao: str) -> Path:
+    return arquivo.with_name(arquivo.name + EXTENSOES_VARIANTES[codificacao])
+
+
+def gerar_variantes_comprimidas(diretorio: Path) -> Dict[str, int]:
+    """
+    Gera (ou atualiza) arquivo.gz / arquivo.br ao lado de cada arquivo comprimível
+
+    Variantes mais novas que o original são mantidas. Retorna quantas foram
+    geradas e mantidas.
+    """
+    estatisticas = {"geradas": 0, "mantidas": 0}
+    nivel_gzip = int(_get_config_compressao('nivel_gzip_estaticos', 9))
+    nivel_brotli = int(_get_config_compressao('nivel_brotli_estaticos', 11))
+    for arquivo in sorted(Path(diretorio).rglob("*")):
+        if not arquivo.is_file() or arquivo.suffix.lower() not in EXTENSOES_COMPRIMIVEIS:
+            continue
+        mtime = arquivo.stat().st_mtime
+        conteudo = None
+        for codificacao in codificacoes_disponiveis():
+            variante = caminho_variante(arquivo, codificacao)
+            if variante.exists() and variante.stat().st_mtime >= mtime:
+                estatisticas["mantidas"] += 1
+                continue
+            if conteudo is None:
+                conteudo = arquivo.read_bytes()
+            nivel = nivel_brotli if codificacao == CODIFICACAO_BROTLI else nivel_gzip
+            try:
+                variante.write_bytes(comprimir(conteudo, codificacao, nivel))
+                estatisticas["geradas"] += 1
+            except OSError as e:
+                logger.warning(f"Não foi possível gravar {variante}: {e}")
+    return estatisticas
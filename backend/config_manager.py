@@ -5,6 +5,7 @@ Carrega, valida e gerencia as configurações do arquivo triagem_config.json
 
 import json
 import os
+import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -44,6 +45,7 @@ class ConfigManager:
         self.config_path = Path(config_path)
         self._config: Optional[TriagemConfig] = None
         self._last_modified: Optional[float] = None
+        self._versao_config: Optional[str] = None
         
         # Carrega as configurações iniciais
         self.reload_config()
@@ -66,8 +68,8 @@ class ConfigManager:
                 return True  # Não há mudanças
             
             # Carrega o arquivo JSON
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            conteudo = self.config_path.read_bytes()
+            config_data = json.loads(conteudo.decode('utf-8'))
             
             # Valida a estrutura básica
             if not self._validate_config_structure(config_data):
@@ -88,6 +90,7 @@ class ConfigManager:
             )
             
             self._last_modified = current_modified
+            self._versao_config = hashlib.sha1(conteudo).hexdigest()[:12]
             logger.info(f"Configurações carregadas com sucesso de {self.config_path}")
             return True
             
@@ -154,6 +157,16 @@ class ConfigManager:
         
         return self._config
     
+    @property
+    def versao_config(self) -> str:
+        """
+        Identificador do conteúdo atual da configuração (hash do arquivo)
+        
+        Muda sempre que o arquivo é alterado; usado como parte das chaves de cache
+        """
+        self.config  # Garante o hot-reload antes de ler a versão
+        return self._versao_config or ""
+    
     # Métodos de conveniência para acessar configurações específicas
     
     def get_threshold(self, tipo: str) -> int:
@@ -241,6 +254,7 @@ class ConfigManager:
         config = self.config
         return {
             'version': config.version,
+            'versao_config': self._versao_config,
             'arquivo': str(self.config_path),
             'ultima_modificacao': datetime.fromtimestamp(self._last_modified) if self._last_modified else None,
             'thresholds': config.thresholds,
@@ -276,6 +290,10 @@ def get_triagem_config() -> TriagemConfig:
     """
     return get_config_manager().config
 
+def get_versao_config() -> str:
+    """Retorna o identificador do conteúdo atual da configuração"""
+    return get_config_manager().versao_config
+
 # Funções de conveniência para acessar configurações específicas
 def get_threshold(tipo: str) -> int:
     """Retorna um threshold específico"""
@@ -1,9 +1,10 @@
-from sqlalchemy import create_engine, MetaData
+import os
+from sqlalchemy import create_engine, MetaData, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# Configuração do banco SQLite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./wex_intelligence.db"
+# Configuração do banco SQLite (WEX_DATABASE_URL aponta para outro banco, ex.: benchmarks)
+SQLALCHEMY_DATABASE_URL = os.environ.get("WEX_DATABASE_URL", "sqlite:///./wex_intelligence.db")
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
@@ -21,6 +22,43 @@ def get_db():
     finally:
         db.close()
 
+# Preenchimento de colunas adicionadas a bancos existentes ("tabela.coluna" -> função(conexão))
+_preenchimentos = {}
+
+def registrar_preenchimento(coluna: str, preencher):
+    """Registra a função que preenche uma coluna nova nas linhas já existentes"""
+    _preenchimentos[coluna] = preencher
+
 def create_database():
     """Criar todas as tabelas no banco de dados"""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    colunas_adicionadas = criar_colunas_ausentes()
+    criar_indices_ausentes()
+    for coluna in colunas_adicionadas:
+        if coluna in _preenchimentos:
+            with engine.begin() as conexao:
+                _preenchimentos[coluna](conexao)
+
+def criar_colunas_ausentes():
+    """Adiciona as colunas declaradas nos models que faltam em bancos criados por versões anteriores"""
+    inspetor = inspect(engine)
+    adicionadas = []
+    for tabela in Base.metadata.sorted_tables:
+        existentes = {coluna["name"] for coluna in inspetor.get_columns(tabela.name)}
+        for coluna in tabela.columns:
+            if coluna.name in existentes:
+                continue
+            definicao = f"{coluna.name} {coluna.type.compile(dialect=engine.dialect)}"
+            if coluna.server_default is not None:
+                nulo = "" if coluna.nullable else " NOT NULL"
+                definicao += f"{nulo} DEFAULT {coluna.server_default.arg}"
+            with engine.begin() as conexao:
+                conexao.exec_driver_sql(f"ALTER TABLE {tabela.name} ADD COLUMN {definicao}")
+            adicionadas.append(f"{tabela.name}.{coluna.name}")
+    return adicionadas
+
+def criar_indices_ausentes():
+    """Cria os índices declarados nos models que faltam em bancos criados por versões anteriores"""
+    for tabela in Base.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(bind=engine, checkfirst=True)
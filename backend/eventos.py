@@ -0,0 +1,199 @@
+"""
+Canal de eventos do servidor (Server-Sent Events)
+Publica criação/atualização de chamados, follow-ups, triagens e deltas de métricas
+para que a interface só busque novamente o que mudou, em vez de fazer polling
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento publicados
+EVENTO_CHAMADO_CRIADO = "chamado_criado"
+EVENTO_CHAMADO_ATUALIZADO = "chamado_atualizado"
+EVENTO_FOLLOWUP_CRIADO = "followup_criado"
+EVENTO_TRIAGEM_APLICADA = "triagem_aplicada"
+EVENTO_METRICAS = "metricas"
+EVENTO_SLA_VENCIDO = "sla_vencido"
+EVENTO_DADOS_ALTERADOS = "dados_alterados"  # Escritas atendidas por outro processo (recursos alterados)
+
+
+def _get_config_eventos(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.eventos"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('eventos', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+@dataclass
+class Evento:
+    id: int
+    tipo: str
+    dados: Dict[str, Any]
+    data: datetime = field(default_factory=datetime.now)
+
+    def formatar_sse(self) -> str:
+        """Serializa no formato text/event-stream"""
+        dados = json.dumps({**self.dados, "data_evento": self.data.isoformat()}, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.tipo}\ndata: {dados}\n\n"
+
+
+class Assinatura:
+    """Fila de eventos de um cliente conectado"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pendentes: int):
+        self.loop = loop
+        self.fila: "asyncio.Queue[Evento]" = asyncio.Queue(maxsize=max_pendentes)
+        self.perdeu_eventos = False
+
+    def _entregar(self, evento: Evento):
+        # Executado no loop do cliente
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: descarta e sinaliza para que ele recarregue tudo
+            self.perdeu_eventos = True
+
+
+class BarramentoEventos:
+    """Publicação thread-safe de eventos para os clientes SSE conectados"""
+
+    def __init__(self):
+        self._assinaturas: List[Assinatura] = []
+        self._historico: Deque[Evento] = deque(maxlen=int(_get_config_eventos('historico', 200)))
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_assinantes(self) -> int:
+        return len(self._assinaturas)
+
+    def publicar(self, tipo: str, dados: Dict[str, Any]) -> Evento:
+        """Publica um evento (pode ser chamado de qualquer thread)"""
+        with self._lock:
+            self._ultimo_id += 1
+            evento = Evento(id=self._ultimo_id, tipo=tipo, dados=dados)
+            self._historico.append(evento)
+            assinaturas = list(self._assinaturas)
+
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura._entregar, evento)
+            except RuntimeError:
+                # Loop encerrado: a assinatura será removida pelo próprio cliente
+                pass
+        return evento
+
+    def assinar(self, ultimo_evento_id: Optional[int] = None) -> Assinatura:
+        """
+        Registra um cliente no loop atual
+
+        Com ultimo_evento_id (cabeçalho Last-Event-ID) os eventos perdidos
+        durante a reconexão são reenviados, se ainda estiverem no histórico.
+        """
+        assinatura = Assinatura(asyncio.get_running_loop(), int(_get_config_eventos('max_pendentes_cliente', 100)))
+        with self._lock:
+            if ultimo_evento_id is not None:
+                perdidos = [e for e in self._historico if e.id > ultimo_evento_id]
+                if self._historico and self._historico[0].id > ultimo_evento_id + 1:
+                    assinatura.perdeu_eventos = True
+                for evento in perdidos:
+                    assinatura._entregar(evento)
+            self._assinaturas.append(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura):
+        with self._lock:
+            if assinatura in self._assinaturas:
+                self._assinaturas.remove(assinatura)
+
+    async def transmitir(self, assinatura: Assinatura, desconectado: Callable) -> AsyncIterator[str]:
+        """Gera o fluxo text/event-stream de uma assinatura até o cliente desconectar"""
+        intervalo_keepalive = float(_get_config_eventos('intervalo_keepalive_s', 15))
+        try:
+            yield f"retry: {int(_get_config_eventos('retry_ms', 5000))}\n\n"
+            while not await desconectado():
+                if assinatura.perdeu_eventos:
+                    assinatura.perdeu_eventos = False
+                    yield "event: recarregar\ndata: {}\n\n"
+                try:
+                    evento = await asyncio.wait_for(assinatura.fila.get(), timeout=intervalo_keepalive)
+                    yield evento.formatar_sse()
+                except asyncio.TimeoutError:
+                    # Comentário SSE: mantém a conexão viva através de proxies
+                    yield ": keepalive\n\n"
+        finally:
+            self.cancelar(assinatura)
+
+
+# Instância global do barramento
+barramento_eventos = BarramentoEventos()
+
+
+def publicar_evento(tipo: str, dados: Dict[str, Any]):
+    """Publica um evento sem deixar falhas do canal afetarem a requisição"""
+    try:
+        barramento_eventos.publicar(tipo, dados)
+    except Exception as e:
+        logger.warning(f"Falha ao publicar evento {tipo}: {e}")
+
+
+def calcular_delta_metricas(anteriores: Optional[Dict[str, Any]], atuais: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos das métricas que mudaram desde o último envio"""
+    if anteriores is None:
+        return dict(atuais)
+    return {chave: valor for chave, valor in atuais.items() if anteriores.get(chave) != valor}
+
+
+async def publicar_metricas_periodicamente(calcular_metricas: Callable[[], Dict[str, Any]]):
+    """
+    Tarefa do lifespan: recalcula as métricas do dashboard periodicamente
+    e publica apenas os campos alterados (somente se houver clientes conectados)
+    """
+    ultimas: Optional[Dict[str, Any]] = None
+    while True:
+        await asyncio.sleep(float(_get_config_eventos('intervalo_metricas_s', 15)))
+        if barramento_eventos.total_assinantes == 0:
+            continue
+        try:
+            atuais = await run_in_threadpool(calcular_metricas)
+        except Exception as e:
+            logger.warning(f"Erro ao calcular métricas para eventos: {e}")
+            continue
+        delta = calcular_delta_metricas(ultimas, atuais)
+        ultimas = atuais
+        if delta:
+            publicar_evento(EVENTO_METRICAS, delta)
+
+
+async def publicar_alteracoes_externas(verificar: Callable[[], List[str]]):
+    """
+    Tarefa do lifespan: com vários processos, cada um só publica as próprias
+    escritas; a cada intervalo_alteracoes_externas_s confere as dos outros e
+    publica dados_alterados com os recursos que mudaram (somente se houver
+    clientes conectados)
+    """
+    while True:
+        await asyncio.sleep(float(_get_config_eventos('intervalo_alteracoes_externas_s', 5)))
+        if barramento_eventos.total_assinantes == 0:
+            continue
+        try:
+            alterados = await run_in_threadpool(verificar)
+        except Exception as e:
+            logger.warning(f"Erro ao verificar alterações de outros processos: {e}")
+            continue
+        if alterados:
+            publicar_evento(EVENTO_DADOS_ALTERADOS, {"recursos": alterados})
@@ -0,0 +1,53 @@
+"""
+Features textuais dos chamados e hash estável da descrição
+O hash identifica a versão da descrição nas tabelas derivadas (vizinhos, triagens, padrões)
+"""
+
+import re
+import hashlib
+from typing import Dict, Any
+
+# Stopwords básicas removidas das palavras significativas
+STOPWORDS = {
+    'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'de', 'do', 'da', 'dos', 'das',
+    'e', 'ou', 'mas', 'se', 'que', 'com', 'por', 'para', 'em', 'no', 'na', 'nos', 'nas',
+    'é', 'são', 'foi', 'foram', 'ser', 'estar', 'tem', 'ter', 'não', 'sim'
+}
+
+# Expressões compiladas uma única vez
+_RE_PALAVRAS = re.compile(r'\b\w{3,}\b')
+_RE_TERMOS_TECNICOS = re.compile(r'\b[A-Z][a-zA-Z]*\b|\b\w*\d+\w*\b')
+_RE_CODIGOS_ERRO = re.compile(r'erro\s*\d+|error\s*\d+|\d{3,5}')
+_RE_MENSAGENS_ERRO = re.compile(r'"([^"]*)"')
+
+
+def hash_descricao(texto: str) -> str:
+    """Hash estável da descrição, usado para detectar descrições alteradas"""
+    return hashlib.sha1((texto or "").encode('utf-8')).hexdigest()
+
+
+def extrair_features_textuais(texto: str) -> Dict[str, Any]:
+    """Extrai features de um texto para comparação"""
+    texto_lower = texto.lower()
+
+    # Extrair palavras significativas
+    palavras = set(_RE_PALAVRAS.findall(texto_lower))
+    palavras_significativas = palavras - STOPWORDS
+
+    # Extrair termos técnicos (palavras com maiúsculas, números, etc.)
+    termos_tecnicos = set(_RE_TERMOS_TECNICOS.findall(texto))
+
+    # Extrair códigos de erro
+    codigos_erro = set(_RE_CODIGOS_ERRO.findall(texto_lower))
+
+    # Extrair mensagens de erro (texto entre aspas)
+    mensagens_erro = set(_RE_MENSAGENS_ERRO.findall(texto))
+
+    return {
+        'palavras_significativas': frozenset(palavras_significativas),
+        'termos_tecnicos': frozenset(termos_tecnicos),
+        'codigos_erro': frozenset(codigos_erro),
+        'mensagens_erro': frozenset(mensagens_erro),
+        'tamanho_texto': len(texto),
+        'num_palavras': len(palavras)
+    }
@@ -0,0 +1,315 @@
+"""
+Fila de trabalho dos analistas por prioridade
+Mantém em memória um min-heap dos chamados em aberto ordenado pelo prazo
+efetivo: o menor entre o sla_limite e o próximo follow-up devido (último
+contato + intervalo_followup_h), antecipado conforme a criticidade e o
+score de qualidade. Como a chave é um instante absoluto, a ordem não muda
+com o passar do tempo e o heap só é mexido quando um chamado muda.
+
+A fila é carregada do banco no primeiro acesso e depois acompanha os commits
+das sessões (eventos do SQLAlchemy em Chamado e FollowUp), cada atualização
+em O(log n). Uma nova versão da configuração recalcula as chaves em memória.
+Escritas que não passam por esses eventos (outros workers, cargas pelo Core,
+Query.delete) mudam o marcador de chamados e follow-ups do banco; a fila é
+recarregada no próximo acesso em que o marcador difere do esperado. As escritas
+acompanhadas avançam o marcador esperado no commit, sem recarga.
+"""
+
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session, object_session
+
+from models import Chamado, FollowUp
+from config_manager import get_config_manager, get_versao_config
+from cache_http import STATUS_EM_ABERTO, RECURSO_FOLLOWUPS, AlteracoesChamados, marcador_chamados, versao_recurso
+
+logger = logging.getLogger(__name__)
+
+CHAVE_PENDENTES = "fila_prioridade_pendentes"  # Alterações da sessão aplicadas no commit
+
+
+def _get_config_fila(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.fila"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('fila', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+@dataclass
+class ParametrosFila:
+    antecipacao_criticidade_h: Dict[str, float]
+    antecipacao_score_h: float
+    intervalo_followup_h: float
+    sla_padrao_h: float
+
+    @classmethod
+    def da_config(cls) -> "ParametrosFila":
+        return cls(
+            antecipacao_criticidade_h=dict(_get_config_fila(
+                'antecipacao_criticidade_h', {"Crítica": 12, "Alta": 6, "Média": 2, "Baixa": 0})),
+            antecipacao_score_h=float(_get_config_fila('antecipacao_score_h', 4)),
+            intervalo_followup_h=float(_get_config_fila('intervalo_followup_h', 24)),
+            sla_padrao_h=float(_get_config_fila('sla_padrao_h', 72))
+        )
+
+
+@dataclass
+class ItemFila:
+    chamado_id: int
+    numero_wex: str
+    cliente_solicitante: str
+    status: str
+    criticidade: str
+    score_qualidade: int
+    data_criacao: datetime
+    sla_limite: Optional[datetime]
+    ultimo_followup: Optional[datetime]
+    prazo_efetivo: Optional[datetime] = None
+    motivo: str = "sla"  # Prazo dominante: "sla" ou "followup"
+
+    def calcular_prazo(self, parametros: ParametrosFila):
+        """Prazo efetivo (chave do heap): quanto menor, mais prioritário"""
+        prazo_sla = self.sla_limite or self.data_criacao + timedelta(hours=parametros.sla_padrao_h)
+        proximo_followup = (self.ultimo_followup or self.data_criacao) + timedelta(hours=parametros.intervalo_followup_h)
+        self.motivo = "sla" if prazo_sla <= proximo_followup else "followup"
+        antecipacao = (
+            float(parametros.antecipacao_criticidade_h.get(self.criticidade, 0))
+            + parametros.antecipacao_score_h * (self.score_qualidade or 0) / 100
+        )
+        self.prazo_efetivo = min(prazo_sla, proximo_followup) - timedelta(hours=antecipacao)
+
+    def to_dict(self, agora: Optional[datetime] = None) -> Dict[str, Any]:
+        agora = agora or datetime.now()
+        return {
+            "chamado_id": self.chamado_id,
+            "numero_wex": self.numero_wex,
+            "cliente_solicitante": self.cliente_solicitante,
+            "status": self.status,
+            "criticidade": self.criticidade,
+            "score_qualidade": self.score_qualidade,
+            "sla_limite": self.sla_limite.isoformat() if self.sla_limite else None,
+            "ultimo_followup": self.ultimo_followup.isoformat() if self.ultimo_followup else None,
+            "prazo_efetivo": self.prazo_efetivo.isoformat(),
+            "minutos_restantes": round((self.prazo_efetivo - agora).total_seconds() / 60, 1),
+            "motivo": self.motivo
+        }
+
+
+class FilaPrioridade:
+    """Min-heap (prazo_efetivo, id) dos chamados em aberto, com remoção preguiçosa das entradas obsoletas"""
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._itens: Dict[int, ItemFila] = {}
+        self._parametros: Optional[ParametrosFila] = None
+        self._lock = threading.Lock()
+        self.versao_config: Optional[str] = None
+        self.marcador: Optional[tuple] = None  # Marcador do banco na última carga, avançado pelos commits
+        self.carregada = False
+
+    # === Estado ===
+
+    @staticmethod
+    def _marcador(db: Session) -> tuple:
+        """Marcador de chamados mais a versão de follow-ups (que mudam o último contato)"""
+        return marcador_chamados(db) + (versao_recurso(db, RECURSO_FOLLOWUPS),)
+
+    def carregar(self, db: Session):
+        """(Re)constrói a fila a partir dos chamados em aberto (data do último follow-up lida do resumo no chamado)"""
+        marcador = self._marcador(db)
+        linhas = db.query(
+            Chamado.id, Chamado.numero_wex, Chamado.cliente_solicitante, Chamado.status, Chamado.criticidade,
+            Chamado.score_qualidade, Chamado.data_criacao, Chamado.sla_limite, Chamado.ultimo_followup_em
+        ).filter(Chamado.status.in_(STATUS_EM_ABERTO)).all()
+        itens = {linha[0]: ItemFila(*linha) for linha in linhas}
+        with self._lock:
+            self._itens = itens
+            self._reconstruir()
+            self.marcador = marcador
+            self.carregada = True
+
+    def _reconstruir(self):
+        """Recalcula todas as chaves com a configuração atual (O(n))"""
+        self._parametros = ParametrosFila.da_config()
+        self.versao_config = get_versao_config()
+        for item in self._itens.values():
+            item.calcular_prazo(self._parametros)
+        self._heap = [(item.prazo_efetivo, item.chamado_id) for item in self._itens.values()]
+        heapq.heapify(self._heap)
+
+    def avancar_marcador(self, alteracoes: AlteracoesChamados, eventos_followups: int, conexao):
+        """Marcador esperado após um commit cujas escritas já foram aplicadas à fila"""
+        with self._lock:
+            if self.marcador is None:
+                return
+            marcador = alteracoes.avancar(self.marcador[:-1], conexao)
+            self.marcador = None if marcador is None else marcador + (self.marcador[-1] + eventos_followups,)
+
+    def garantir_atualizada(self, db: Session):
+        """Recarrega a fila se o banco mudou desde a última carga e recalcula as chaves se a configuração mudou"""
+        if not self.carregada or self.marcador != self._marcador(db):
+            self.carregar(db)
+        elif self.versao_config != get_versao_config():
+            with self._lock:
+                self._reconstruir()
+
+    def atualizar_chamado(self, chamado_id: int, dados: Optional[Dict[str, Any]]):
+        """Reflete o estado atual de um chamado (None ou fechado: sai da fila)"""
+        with self._lock:
+            if not self.carregada:
+                return
+            anterior = self._itens.pop(chamado_id, None)
+            if dados is None or dados["status"] not in STATUS_EM_ABERTO:
+                return
+            item = ItemFila(
+                chamado_id=chamado_id,
+                numero_wex=dados["numero_wex"],
+                cliente_solicitante=dados["cliente_solicitante"],
+                status=dados["status"],
+                criticidade=dados["criticidade"],
+                score_qualidade=dados["score_qualidade"],
+                data_criacao=dados.get("data_criacao") or (anterior.data_criacao if anterior else datetime.now()),
+                sla_limite=dados["sla_limite"],
+                ultimo_followup=dados.get("ultimo_followup", anterior.ultimo_followup if anterior else None)
+            )
+            self._inserir(item, anterior)
+
+    def registrar_followup(self, chamado_id: int, ultimo_followup: Optional[datetime]):
+        """Atualiza a data do último follow-up de um chamado na fila"""
+        with self._lock:
+            anterior = self._itens.get(chamado_id)
+            if not self.carregada or anterior is None or anterior.ultimo_followup == ultimo_followup:
+                return
+            self._inserir(ItemFila(**{**anterior.__dict__, "ultimo_followup": ultimo_followup}), anterior)
+
+    def _inserir(self, item: ItemFila, anterior: Optional[ItemFila] = None):
+        item.calcular_prazo(self._parametros)
+        self._itens[item.chamado_id] = item
+        if anterior is not None and anterior.prazo_efetivo == item.prazo_efetivo:
+            return  # A entrada do heap continua válida
+        heapq.heappush(self._heap, (item.prazo_efetivo, item.chamado_id))
+        if len(self._heap) > 2 * len(self._itens) + 64:
+            self._heap = [entrada for entrada in self._heap if self._valida(entrada)]
+            heapq.heapify(self._heap)
+
+    def _valida(self, entrada: Tuple[datetime, int]) -> bool:
+        item = self._itens.get(entrada[1])
+        return item is not None and item.prazo_efetivo == entrada[0]
+
+    # === Consultas ===
+
+    @property
+    def total(self) -> int:
+        return len(self._itens)
+
+    def proximos(self, limite: int) -> List[ItemFila]:
+        """Os próximos chamados da fila, do mais prioritário (O(limite · log n))"""
+        with self._lock:
+            retirados, resultado = [], []
+            while self._heap and len(resultado) < limite:
+                entrada = heapq.heappop(self._heap)
+                if self._valida(entrada):
+                    retirados.append(entrada)
+                    resultado.append(self._itens[entrada[1]])
+            for entrada in retirados:
+                heapq.heappush(self._heap, entrada)
+            return resultado
+
+
+# Instância global da fila
+fila_prioridade = FilaPrioridade()
+
+
+# === Sincronização com os commits ===
+
+def _pendentes(alvo) -> Optional[Dict[str, Dict]]:
+    sessao = object_session(alvo)
+    if sessao is None:
+        return None
+    return sessao.info.setdefault(CHAVE_PENDENTES, {
+        "chamados": {}, "followups": {}, "alteracoes": AlteracoesChamados(), "eventos_followups": 0
+    })
+
+
+def _capturar_insercao_chamado(mapper, connection, alvo: Chamado):
+    _capturar_chamado(mapper, connection, alvo, inserido=True)
+
+
+def _capturar_chamado(mapper, connection, alvo: Chamado, inserido: bool = False):
+    if not fila_prioridade.carregada:
+        return
+    pendentes = _pendentes(alvo)
+    if pendentes is not None:
+        pendentes["alteracoes"].registrar(alvo.id, 1 if inserido else 0)
+        pendentes["chamados"][alvo.id] = {
+            "numero_wex": alvo.numero_wex,
+            "cliente_solicitante": alvo.cliente_solicitante,
+            "status": alvo.status,
+            "criticidade": alvo.criticidade,
+            "score_qualidade": alvo.score_qualidade,
+            "data_criacao": alvo.data_criacao,
+            "sla_limite": alvo.sla_limite,
+            # Lido na transação: o resumo é gravado fora do ORM e o atributo pode estar desatualizado
+            "ultimo_followup": connection.execute(
+                select(Chamado.ultimo_followup_em).where(Chamado.id == alvo.id)
+            ).scalar()
+        }
+
+
+def _capturar_remocao_chamado(mapper, connection, alvo: Chamado):
+    if not fila_prioridade.carregada:
+        return
+    pendentes = _pendentes(alvo)
+    if pendentes is not None:
+        pendentes["alteracoes"].registrar(alvo.id, -1)
+        pendentes["chamados"][alvo.id] = None
+
+
+def _capturar_followup(mapper, connection, alvo: FollowUp):
+    """Último follow-up do chamado lido na própria transação (inclui a linha recém-gravada ou removida)"""
+    if not fila_prioridade.carregada:
+        return
+    pendentes = _pendentes(alvo)
+    if pendentes is not None:
+        pendentes["eventos_followups"] += 1
+        pendentes["followups"][alvo.chamado_id] = connection.execute(
+            select(func.max(FollowUp.data_criacao)).where(FollowUp.chamado_id == alvo.chamado_id)
+        ).scalar()
+
+
+def _aplicar_pendentes(sessao: Session):
+    pendentes = sessao.info.pop(CHAVE_PENDENTES, None)
+    if not pendentes or not fila_prioridade.carregada:
+        return
+    for chamado_id, dados in pendentes["chamados"].items():
+        fila_prioridade.atualizar_chamado(chamado_id, dados)
+    for chamado_id, ultimo_followup in pendentes["followups"].items():
+        fila_prioridade.registrar_followup(chamado_id, ultimo_followup)
+    try:
+        with sessao.get_bind().connect() as conexao:
+            fila_prioridade.avancar_marcador(pendentes["alteracoes"], pendentes["eventos_followups"], conexao)
+    except Exception as e:
+        logger.warning(f"Marcador da fila não avançado (recarga no próximo acesso): {e}")
+        fila_prioridade.marcador = None
+
+
+def _descartar_pendentes(sessao: Session):
+    sessao.info.pop(CHAVE_PENDENTES, None)
+
+
+event.listen(Chamado, "after_insert", _capturar_insercao_chamado)
+event.listen(Chamado, "after_update", _capturar_chamado)
+for _evento in ("after_insert", "after_update"):
+    event.listen(FollowUp, _evento, _capturar_followup)
+event.listen(Chamado, "after_delete", _capturar_remocao_chamado)
+event.listen(FollowUp, "after_delete", _capturar_followup)
+event.listen(Session, "after_commit", _aplicar_pendentes)
+event.listen(Session, "after_rollback", _descartar_pendentes)
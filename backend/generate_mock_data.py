@@ -1,288 +1,538 @@
+import argparse
 import random
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from database import SessionLocal
-from models import Chamado, FollowUp, StatusChamado, CriticidadeChamado, TipoFollowUp
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from database import Base, SessionLocal
+from models import (
+    Chamado, FollowUp, StatusChamado, CriticidadeChamado, TipoFollowUp, VersaoRecurso, recalcular_resumo_followups
+)
+from processamento_paralelo import calcular_num_workers
+
+# Lista de clientes realistas
+CLIENTES = [
+    "Empresa ABC Tecnologia Ltda",
+    "XYZ Corporation Brasil",
+    "Inovação Digital S.A.",
+    "TechSolutions Consulting",
+    "DataFlow Systems",
+    "CloudFirst Technologies",
+    "NextGen Software",
+    "DigitalBridge Corp",
+    "SmartSystems Brasil",
+    "FutureTech Solutions",
+    "GlobalData Analytics",
+    "InnovateCorp",
+    "TechVanguard Ltd",
+    "DigitalTransform S.A.",
+    "CyberSolutions Group"
+]
+
+# Tipos de problemas realistas
+PROBLEMAS_TEMPLATES = [
+    {
+        "base": "Sistema apresentando lentidão no módulo de {modulo}",
+        "modulos": ["relatórios", "dashboard", "cadastro", "consultas", "processamento"],
+        "tags": ["performance", "lentidão"],
+        "criticidade_peso": {"Baixa": 0.2, "Média": 0.4, "Alta": 0.3, "Crítica": 0.1}
+    },
+    {
+        "base": "Erro {erro} ao tentar acessar {funcionalidade}",
+        "erros": ["500", "404", "403", "timeout"],
+        "funcionalidades": ["dashboard", "relatórios", "configurações", "usuários", "sistema"],
+        "tags": ["erro", "acesso"],
+        "criticidade_peso": {"Baixa": 0.1, "Média": 0.2, "Alta": 0.4, "Crítica": 0.3}
+    },
+    {
+        "base": "Problema de integração com {sistema} - {detalhe}",
+        "sistemas": ["API externa", "banco de dados", "sistema legado", "serviço terceirizado"],
+        "detalhes": ["dados não sincronizando", "falha na comunicação", "timeout nas requisições"],
+        "tags": ["integração", "api"],
+        "criticidade_peso": {"Baixa": 0.15, "Média": 0.35, "Alta": 0.35, "Crítica": 0.15}
+    },
+    {
+        "base": "Solicitação de {tipo_solicitacao} para {objeto}",
+        "tipo_solicitacoes": ["nova funcionalidade", "melhoria", "customização", "relatório personalizado"],
+        "objetos": ["módulo de vendas", "dashboard gerencial", "processo de aprovação", "interface do usuário"],
+        "tags": ["solicitação", "melhoria"],
+        "criticidade_peso": {"Baixa": 0.4, "Média": 0.4, "Alta": 0.15, "Crítica": 0.05}
+    },
+    {
+        "base": "Falha na {operacao} de {objeto} - {sintoma}",
+        "operacoes": ["gravação", "consulta", "exclusão", "atualização"],
+        "objetos": ["dados de cliente", "pedidos", "relatórios", "configurações"],
+        "sintomas": ["dados não salvos", "informações incorretas", "processo interrompido"],
+        "tags": ["falha", "dados"],
+        "criticidade_peso": {"Baixa": 0.2, "Média": 0.3, "Alta": 0.3, "Crítica": 0.2}
+    }
+]
+
+# Detalhes extras acrescentados à descrição
+DETALHES_EXTRAS = [
+    " Usuários relatam impacto na produtividade.",
+    " Problema intermitente observado nas últimas horas.",
+    " Solicitação urgente da direção.",
+    " Afetando múltiplos usuários simultaneamente.",
+    " Erro reproduzível em ambiente de produção.",
+    " Necessário análise técnica detalhada.",
+    " Problema relatado pelo cliente prioritário.",
+    " Impacto em processos críticos do negócio."
+]
+
+# Probabilidade de cada status
+STATUS_PESOS = {
+    StatusChamado.ABERTO.value: 0.3,
+    StatusChamado.EM_ANALISE.value: 0.25,
+    StatusChamado.PENDENTE.value: 0.15,
+    StatusChamado.RESOLVIDO.value: 0.2,
+    StatusChamado.FECHADO.value: 0.1
+}
+
+# SLA baseado na criticidade
+SLA_HORAS = {
+    "Crítica": 4,
+    "Alta": 24,
+    "Média": 72,
+    "Baixa": 120
+}
+
+TIPOS_FOLLOWUP = [
+    (TipoFollowUp.ANALISE.value, "Iniciada análise do problema reportado."),
+    (TipoFollowUp.ANALISE.value, "Logs do sistema coletados para investigação."),
+    (TipoFollowUp.DESENVOLVIMENTO.value, "Identificada causa raiz do problema."),
+    (TipoFollowUp.DESENVOLVIMENTO.value, "Correção implementada no ambiente de desenvolvimento."),
+    (TipoFollowUp.PUBLICACAO.value, "Deploy da correção realizado em produção."),
+    (TipoFollowUp.PUBLICACAO.value, "Atualização do sistema concluída com sucesso."),
+    (TipoFollowUp.OUTROS.value, "Contato realizado com o cliente para mais informações."),
+    (TipoFollowUp.OUTROS.value, "Documentação atualizada com nova informação."),
+]
+
+AUTORES = [
+    "João Silva - Suporte Técnico",
+    "Maria Santos - Analista de Sistemas",
+    "Pedro Oliveira - Desenvolvedor",
+    "Ana Costa - DBA",
+    "Carlos Ferreira - DevOps",
+    "Lucia Almeida - QA",
+    "Roberto Lima - Arquiteto",
+    "Fernanda Rocha - Product Owner"
+]
+
+ANEXOS_POSSIVEIS = [
+    "log_analise.txt",
+    "screenshot_erro.png",
+    "relatorio_performance.pdf",
+    "documentacao_tecnica.docx",
+    "script_correcao.sql"
+]
+
+
+def gerar_descricao(rng, template: Dict[str, Any], max_detalhes: int = 1) -> str:
+    """
+    Descrição a partir de um template de problema
+
+    rng é o módulo random ou um random.Random com semente. Cada detalhe extra
+    tem 60% de chance de entrar, condicionado ao anterior (até max_detalhes).
+    """
+    if "modulos" in template:
+        descricao = template["base"].format(modulo=rng.choice(template["modulos"]))
+    elif "erros" in template:
+        descricao = template["base"].format(
+            erro=rng.choice(template["erros"]),
+            funcionalidade=rng.choice(template["funcionalidades"])
+        )
+    elif "sistemas" in template:
+        descricao = template["base"].format(
+            sistema=rng.choice(template["sistemas"]),
+            detalhe=rng.choice(template["detalhes"])
+        )
+    elif "tipo_solicitacoes" in template:
+        descricao = template["base"].format(
+            tipo_solicitacao=rng.choice(template["tipo_solicitacoes"]),
+            objeto=rng.choice(template["objetos"])
+        )
+    else:  # falhas
+        descricao = template["base"].format(
+            operacao=rng.choice(template["operacoes"]),
+            objeto=rng.choice(template["objetos"]),
+            sintoma=rng.choice(template["sintomas"])
+        )
+
+    for _ in range(max_detalhes):
+        if rng.random() >= 0.6:  # 60% chance de adicionar detalhe extra
+            break
+        descricao += rng.choice(DETALHES_EXTRAS)
+    return descricao
+
+
+def gerar_chamado(rng, numero_wex: str, data_criacao: datetime, max_detalhes: int = 1,
+                  pesos_status: Optional[Dict[str, float]] = None,
+                  pesos_criticidade: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Colunas de um chamado (template, criticidade, status, SLA e score) como dict
+
+    pesos_status / pesos_criticidade substituem a distribuição padrão (status)
+    e a de cada template (criticidade).
+    """
+    # Selecionar template aleatório
+    template = rng.choice(PROBLEMAS_TEMPLATES)
+    descricao = gerar_descricao(rng, template, max_detalhes)
+
+    # Escolher criticidade baseada nos pesos do template
+    pesos_criticidade = pesos_criticidade or template["criticidade_peso"]
+    criticidade = rng.choices(list(pesos_criticidade), weights=list(pesos_criticidade.values()))[0]
+
+    # Gerar status baseado na probabilidade
+    pesos_status = pesos_status or STATUS_PESOS
+    status = rng.choices(list(pesos_status), weights=list(pesos_status.values()))[0]
+
+    sla_limite = data_criacao + timedelta(hours=SLA_HORAS[criticidade])
+
+    # Score de qualidade baseado em critérios
+    score_base = 50
+    if "timeout" in descricao.lower() or "erro" in descricao.lower():
+        score_base += 20  # Problema técnico bem definido
+    if "usuários relatam" in descricao.lower():
+        score_base += 15  # Informação de impacto
+    if len(descricao) > 100:
+        score_base += 10  # Descrição detalhada
+    if rng.random() < 0.3:  # 30% chance de ambiente informado
+        score_base += 15
+        ambiente_informado = True
+    else:
+        ambiente_informado = False
+
+    # Anexos baseados no tipo de problema
+    possui_anexos = rng.random() < 0.4  # 40% chance
+    if "erro" in descricao.lower():
+        possui_anexos = rng.random() < 0.7  # 70% chance para erros
+
+    # Garantir score entre 0-100
+    score_qualidade = min(100, max(0, score_base + rng.randint(-15, 15)))
+
+    return {
+        "numero_wex": numero_wex,
+        "cliente_solicitante": rng.choice(CLIENTES),
+        "descricao": descricao,
+        "status": status,
+        "criticidade": criticidade,
+        "data_criacao": data_criacao,
+        "data_atualizacao": data_criacao + timedelta(hours=rng.randint(1, 48)),
+        "sla_limite": sla_limite,
+        "tags_automaticas": json.dumps(template["tags"] + [rng.choice(["produção", "desenvolvimento", "teste"])]),
+        "score_qualidade": score_qualidade,
+        "ambiente_informado": ambiente_informado,
+        "possui_anexos": possui_anexos
+    }
+
+
+def gerar_followups(rng, chamado_id: int, chamado: Dict[str, Any], prob_cauda_longa: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    Colunas dos follow-ups de um chamado como dicts
+
+    A quantidade depende do status; com prob_cauda_longa, uma fração dos
+    chamados recebe de 6 a 20 follow-ups (chamados longos e problemáticos).
+    """
+    # Quantidade de follow-ups baseada no status
+    if prob_cauda_longa and rng.random() < prob_cauda_longa:
+        num_followups = rng.randint(6, 20)
+    elif chamado["status"] == StatusChamado.FECHADO.value:
+        num_followups = rng.randint(2, 5)
+    elif chamado["status"] == StatusChamado.RESOLVIDO.value:
+        num_followups = rng.randint(1, 4)
+    elif chamado["status"] in [StatusChamado.EM_ANALISE.value, StatusChamado.PENDENTE.value]:
+        num_followups = rng.randint(1, 3)
+    else:  # Aberto
+        num_followups = rng.randint(0, 2)
+
+    followups = []
+    descricao_chamado = chamado["descricao"].lower()
+    for j in range(num_followups):
+        tipo, descricao_base = rng.choice(TIPOS_FOLLOWUP)
+
+        # Personalizar descrição baseada no contexto
+        if "erro" in descricao_chamado and tipo == TipoFollowUp.ANALISE.value:
+            descricao_base = f"Analisando erro reportado: {descricao_base}"
+        elif "lentidão" in descricao_chamado and tipo == TipoFollowUp.DESENVOLVIMENTO.value:
+            descricao_base = "Otimização de performance implementada."
+
+        data_followup = chamado["data_criacao"] + timedelta(hours=rng.randint(1, 48*(j+1)))
+
+        # Anexos ocasionais
+        anexos = []
+        if rng.random() < 0.3:  # 30% chance
+            anexos = [rng.choice(ANEXOS_POSSIVEIS)]
+
+        followups.append({
+            "chamado_id": chamado_id,
+            "tipo": tipo,
+            "descricao": descricao_base,
+            "data_criacao": data_followup,
+            "autor": rng.choice(AUTORES),
+            "anexos": json.dumps(anexos)
+        })
+    return followups
+
+
+# === Geração rápida de bases grandes ===
+
+# Ordem das colunas nas tuplas geradas pelos workers
+COLUNAS_INSERCAO_CHAMADO = (
+    "id", "numero_wex", "cliente_solicitante", "descricao", "status", "criticidade", "data_criacao",
+    "data_atualizacao", "sla_limite", "tags_automaticas", "score_qualidade", "ambiente_informado", "possui_anexos"
+)
+COLUNAS_INSERCAO_FOLLOWUP = ("chamado_id", "tipo", "descricao", "data_criacao", "autor", "anexos")
+COLUNAS_DATA = {"data_criacao", "data_atualizacao", "sla_limite"}
+
+
+def _formatar_data(valor: datetime) -> str:
+    """Mesmo formato que o tipo DateTime do SQLAlchemy grava no SQLite"""
+    return valor.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _tupla(registro: Dict[str, Any], colunas: Tuple[str, ...]) -> tuple:
+    return tuple(_formatar_data(registro[c]) if c in COLUNAS_DATA else registro[c] for c in colunas)
+
+
+def gerar_linhas_lote(semente: int, id_inicial: int, quantidade: int, data_inicio: datetime, data_fim: datetime,
+                      pesos_status: Optional[Dict[str, float]] = None,
+                      pesos_criticidade: Optional[Dict[str, float]] = None) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Tuplas de chamados e follow-ups de um lote de ids consecutivos
+
+    Cada lote tem a própria semente (semente + id inicial), então o resultado
+    não depende de quantos processos geraram a base. As descrições recebem de
+    0 a 3 detalhes extras e 3% dos chamados têm muitos follow-ups.
+    """
+    rng = random.Random(f"{semente}:{id_inicial}")
+    intervalo_minutos = max(int((data_fim - data_inicio).total_seconds() // 60), 0)
+    chamados, followups = [], []
+    for chamado_id in range(id_inicial, id_inicial + quantidade):
+        data_criacao = data_inicio + timedelta(minutes=rng.randint(0, intervalo_minutos))
+        chamado = gerar_chamado(rng, f"WEX-B{chamado_id:07d}", data_criacao, max_detalhes=3,
+                                pesos_status=pesos_status, pesos_criticidade=pesos_criticidade)
+        chamado["id"] = chamado_id
+        chamados.append(_tupla(chamado, COLUNAS_INSERCAO_CHAMADO))
+        followups.extend(
+            _tupla(followup, COLUNAS_INSERCAO_FOLLOWUP)
+            for followup in gerar_followups(rng, chamado_id, chamado, prob_cauda_longa=0.03)
+        )
+    return chamados, followups
+
+
+def _worker_gerar_lote(parametros: tuple) -> Tuple[List[tuple], List[tuple]]:
+    """Executado nos processos do gerador"""
+    return gerar_linhas_lote(*parametros)
+
+
+def _sql_insercao(tabela: str, colunas: Tuple[str, ...]) -> str:
+    return f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' for _ in colunas)})"
+
+
+def limpar_dados(engine: Engine):
+    """Remove chamados, follow-ups e tabelas derivadas (mantém os contadores de versão dos ETags)"""
+    with engine.begin() as conexao:
+        for tabela in reversed(Base.metadata.sorted_tables):
+            if tabela is not VersaoRecurso.__table__:
+                conexao.execute(tabela.delete())
+
+
+def _lotes_em_ordem(lotes: List[tuple], workers: int):
+    """Resultados dos lotes na ordem, com no máximo 2 lotes por worker em memória"""
+    if workers <= 1 or len(lotes) <= 1:
+        for parametros in lotes:
+            yield _worker_gerar_lote(parametros)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pendentes = []
+        proximo = 0
+        while proximo < len(lotes) or pendentes:
+            while proximo < len(lotes) and len(pendentes) < workers * 2:
+                pendentes.append(pool.submit(_worker_gerar_lote, lotes[proximo]))
+                proximo += 1
+            yield pendentes.pop(0).result()
+
+
+def gerar_dados_rapido(engine: Engine, total_chamados: int, semente: int = 42,
+                       data_inicio: Optional[datetime] = None, data_fim: Optional[datetime] = None,
+                       pesos_status: Optional[Dict[str, float]] = None,
+                       pesos_criticidade: Optional[Dict[str, float]] = None,
+                       workers: Optional[int] = None, tamanho_lote: int = 20000,
+                       limpar: bool = True, progresso: bool = True) -> Dict[str, Any]:
+    """
+    Gera uma base grande em poucos minutos
+
+    Os processos geram as linhas (tuplas) por lotes de ids; o processo principal
+    insere cada lote com executemany (Core, sem ORM) em uma transação. Os
+    índices secundários de chamados e followups são removidos durante a carga
+    e recriados no final, seguidos do resumo de follow-ups dos chamados e de
+    ANALYZE. Sem limpar, os chamados são acrescentados com ids a partir do
+    maior id atual. A mesma semente, datas e tamanho_lote produzem a mesma base.
+    """
+    if data_fim is None:
+        data_fim = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if data_inicio is None:
+        data_inicio = data_fim - timedelta(days=90)
+    if data_inicio > data_fim:
+        raise ValueError("data_inicio posterior a data_fim")
+    workers = workers or calcular_num_workers()
+
+    if limpar:
+        limpar_dados(engine)
+    with engine.connect() as conexao:
+        proximo_id = (conexao.execute(func.max(Chamado.__table__.c.id).select()).scalar() or 0) + 1
+
+    lotes = [
+        (semente, proximo_id + inicio, min(tamanho_lote, total_chamados - inicio), data_inicio, data_fim,
+         pesos_status, pesos_criticidade)
+        for inicio in range(0, total_chamados, tamanho_lote)
+    ]
+    indices = [indice for tabela in (Chamado.__table__, FollowUp.__table__) for indice in tabela.indexes]
+    sql_chamados = _sql_insercao(Chamado.__tablename__, COLUNAS_INSERCAO_CHAMADO)
+    sql_followups = _sql_insercao(FollowUp.__tablename__, COLUNAS_INSERCAO_FOLLOWUP)
+
+    inicio_carga = time.perf_counter()
+    inseridos = total_followups = 0
+    for indice in indices:
+        indice.drop(bind=engine, checkfirst=True)
+    try:
+        with engine.connect() as conexao:
+            sincronizacao = conexao.exec_driver_sql("PRAGMA synchronous").scalar()
+            conexao.exec_driver_sql("PRAGMA synchronous=OFF")
+            try:
+                for chamados, followups in _lotes_em_ordem(lotes, workers):
+                    with conexao.begin():
+                        conexao.exec_driver_sql(sql_chamados, chamados)
+                        if followups:
+                            conexao.exec_driver_sql(sql_followups, followups)
+                    inseridos += len(chamados)
+                    total_followups += len(followups)
+                    if progresso:
+                        taxa = inseridos / max(time.perf_counter() - inicio_carga, 1e-9)
+                        print(f"   {inseridos}/{total_chamados} chamados inseridos ({taxa:,.0f}/s)")
+            finally:
+                conexao.exec_driver_sql(f"PRAGMA synchronous={int(sincronizacao)}")
+    finally:
+        if progresso:
+            print("   Recriando índices...")
+        for indice in indices:
+            indice.create(bind=engine, checkfirst=True)
+        # A carga não passa pelo ORM: resumo de follow-ups dos chamados calculado de uma vez
+        with engine.begin() as conexao:
+            recalcular_resumo_followups(conexao)
+        with engine.connect() as conexao:
+            conexao.exec_driver_sql("ANALYZE")
+
+    return {
+        "chamados": inseridos,
+        "followups": total_followups,
+        "semente": semente,
+        "data_inicio": data_inicio.isoformat(),
+        "data_fim": data_fim.isoformat(),
+        "workers": workers,
+        "tempo_s": round(time.perf_counter() - inicio_carga, 2)
+    }
+
+
+def gerar_dados_benchmark(engine: Engine, total_chamados: int, semente: int = 42, dias: int = 90,
+                          data_referencia: Optional[datetime] = None, tamanho_lote: int = 5000,
+                          progresso: bool = True, workers: Optional[int] = 1) -> Dict[str, Any]:
+    """
+    Gera uma base grande e reproduzível para benchmarks
+
+    Mesma semente e data de referência produzem os mesmos chamados e follow-ups,
+    criados nos últimos `dias` dias e acrescentados aos dados existentes
+    (ver gerar_dados_rapido).
+    """
+    if data_referencia is None:
+        data_referencia = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    estatisticas = gerar_dados_rapido(
+        engine, total_chamados, semente=semente, data_inicio=data_referencia - timedelta(days=dias),
+        data_fim=data_referencia, workers=workers, tamanho_lote=tamanho_lote, limpar=False, progresso=progresso
+    )
+    estatisticas.update({"dias": dias, "data_referencia": data_referencia.isoformat()})
+    return estatisticas
+
+
+def interpretar_pesos(texto: str, validos: List[str]) -> Dict[str, float]:
+    """Converte "Aberto=30,Fechado=10" em pesos; valores fora de `validos` geram ValueError"""
+    pesos = {}
+    for parte in texto.split(","):
+        if not parte.strip():
+            continue
+        nome, separador, valor = parte.partition("=")
+        nome = nome.strip()
+        if not separador or nome not in validos:
+            raise ValueError(f"Peso inválido '{parte.strip()}'. Use NOME=PESO com NOME em: {', '.join(validos)}")
+        pesos[nome] = float(valor)
+    if not pesos or sum(pesos.values()) <= 0:
+        raise ValueError("Informe ao menos um peso positivo")
+    return pesos
+
 
 def generate_mock_data():
     """Gerar dados mockados realistas para o sistema"""
-    
+
     db = SessionLocal()
-    
+
     try:
-        # Limpar dados existentes
-        db.query(FollowUp).delete()
-        db.query(Chamado).delete()
-        db.commit()
-        
+        # Limpar dados existentes (inclusive as tabelas derivadas: vizinhos, triagens, padrões)
+        limpar_dados(db.get_bind())
+
         print("Dados anteriores removidos...")
-        
-        # Lista de clientes realistas
-        clientes = [
-            "Empresa ABC Tecnologia Ltda",
-            "XYZ Corporation Brasil",
-            "Inovação Digital S.A.",
-            "TechSolutions Consulting",
-            "DataFlow Systems",
-            "CloudFirst Technologies",
-            "NextGen Software",
-            "DigitalBridge Corp",
-            "SmartSystems Brasil",
-            "FutureTech Solutions",
-            "GlobalData Analytics",
-            "InnovateCorp",
-            "TechVanguard Ltd",
-            "DigitalTransform S.A.",
-            "CyberSolutions Group"
-        ]
-        
-        # Tipos de problemas realistas
-        problemas_templates = [
-            {
-                "base": "Sistema apresentando lentidão no módulo de {modulo}",
-                "modulos": ["relatórios", "dashboard", "cadastro", "consultas", "processamento"],
-                "tags": ["performance", "lentidão"],
-                "criticidade_peso": {"Baixa": 0.2, "Média": 0.4, "Alta": 0.3, "Crítica": 0.1}
-            },
-            {
-                "base": "Erro {erro} ao tentar acessar {funcionalidade}",
-                "erros": ["500", "404", "403", "timeout"],
-                "funcionalidades": ["dashboard", "relatórios", "configurações", "usuários", "sistema"],
-                "tags": ["erro", "acesso"],
-                "criticidade_peso": {"Baixa": 0.1, "Média": 0.2, "Alta": 0.4, "Crítica": 0.3}
-            },
-            {
-                "base": "Problema de integração com {sistema} - {detalhe}",
-                "sistemas": ["API externa", "banco de dados", "sistema legado", "serviço terceirizado"],
-                "detalhes": ["dados não sincronizando", "falha na comunicação", "timeout nas requisições"],
-                "tags": ["integração", "api"],
-                "criticidade_peso": {"Baixa": 0.15, "Média": 0.35, "Alta": 0.35, "Crítica": 0.15}
-            },
-            {
-                "base": "Solicitação de {tipo_solicitacao} para {objeto}",
-                "tipo_solicitacoes": ["nova funcionalidade", "melhoria", "customização", "relatório personalizado"],
-                "objetos": ["módulo de vendas", "dashboard gerencial", "processo de aprovação", "interface do usuário"],
-                "tags": ["solicitação", "melhoria"],
-                "criticidade_peso": {"Baixa": 0.4, "Média": 0.4, "Alta": 0.15, "Crítica": 0.05}
-            },
-            {
-                "base": "Falha na {operacao} de {objeto} - {sintoma}",
-                "operacoes": ["gravação", "consulta", "exclusão", "atualização"],
-                "objetos": ["dados de cliente", "pedidos", "relatórios", "configurações"],
-                "sintomas": ["dados não salvos", "informações incorretas", "processo interrompido"],
-                "tags": ["falha", "dados"],
-                "criticidade_peso": {"Baixa": 0.2, "Média": 0.3, "Alta": 0.3, "Crítica": 0.2}
-            }
-        ]
-        
+
         # Gerar 50 chamados
         chamados_criados = []
-        
+
         for i in range(1, 51):
-            # Selecionar template aleatório
-            template = random.choice(problemas_templates)
-            
-            # Gerar descrição baseada no template
-            if "modulos" in template:
-                descricao = template["base"].format(modulo=random.choice(template["modulos"]))
-            elif "erros" in template:
-                descricao = template["base"].format(
-                    erro=random.choice(template["erros"]),
-                    funcionalidade=random.choice(template["funcionalidades"])
-                )
-            elif "sistemas" in template:
-                descricao = template["base"].format(
-                    sistema=random.choice(template["sistemas"]),
-                    detalhe=random.choice(template["detalhes"])
-                )
-            elif "tipo_solicitacoes" in template:
-                descricao = template["base"].format(
-                    tipo_solicitacao=random.choice(template["tipo_solicitacoes"]),
-                    objeto=random.choice(template["objetos"])
-                )
-            else:  # falhas
-                descricao = template["base"].format(
-                    operacao=random.choice(template["operacoes"]),
-                    objeto=random.choice(template["objetos"]),
-                    sintoma=random.choice(template["sintomas"])
-                )
-            
-            # Adicionar detalhes extras aleatoriamente
-            detalhes_extras = [
-                " Usuários relatam impacto na produtividade.",
-                " Problema intermitente observado nas últimas horas.",
-                " Solicitação urgente da direção.",
-                " Afetando múltiplos usuários simultaneamente.",
-                " Erro reproduzível em ambiente de produção.",
-                " Necessário análise técnica detalhada.",
-                " Problema relatado pelo cliente prioritário.",
-                " Impacto em processos críticos do negócio."
-            ]
-            
-            if random.random() < 0.6:  # 60% chance de adicionar detalhe extra
-                descricao += random.choice(detalhes_extras)
-            
-            # Escolher criticidade baseada nos pesos do template
-            criticidades = list(template["criticidade_peso"].keys())
-            pesos = list(template["criticidade_peso"].values())
-            criticidade = random.choices(criticidades, weights=pesos)[0]
-            
-            # Gerar status baseado na probabilidade
-            status_opcoes = [
-                (StatusChamado.ABERTO.value, 0.3),
-                (StatusChamado.EM_ANALISE.value, 0.25),
-                (StatusChamado.PENDENTE.value, 0.15),
-                (StatusChamado.RESOLVIDO.value, 0.2),
-                (StatusChamado.FECHADO.value, 0.1)
-            ]
-            status = random.choices([s[0] for s in status_opcoes], weights=[s[1] for s in status_opcoes])[0]
-            
             # Data de criação nos últimos 30 dias
             data_criacao = datetime.now() - timedelta(days=random.randint(0, 30))
-            
-            # SLA baseado na criticidade
-            sla_horas = {
-                "Crítica": 4,
-                "Alta": 24,
-                "Média": 72,
-                "Baixa": 120
-            }
-            sla_limite = data_criacao + timedelta(hours=sla_horas[criticidade])
-            
-            # Score de qualidade baseado em critérios
-            score_base = 50
-            if "timeout" in descricao.lower() or "erro" in descricao.lower():
-                score_base += 20  # Problema técnico bem definido
-            if "usuários relatam" in descricao.lower():
-                score_base += 15  # Informação de impacto
-            if len(descricao) > 100:
-                score_base += 10  # Descrição detalhada
-            if random.random() < 0.3:  # 30% chance de ambiente informado
-                score_base += 15
-                ambiente_informado = True
-            else:
-                ambiente_informado = False
-            
-            # Anexos baseados no tipo de problema
-            possui_anexos = random.random() < 0.4  # 40% chance
-            if "erro" in descricao.lower():
-                possui_anexos = random.random() < 0.7  # 70% chance para erros
-            
-            # Garantir score entre 0-100
-            score_qualidade = min(100, max(0, score_base + random.randint(-15, 15)))
-            
+
             # Criar chamado
-            chamado = Chamado(
-                numero_wex=f"WEX-2025-{i:03d}",
-                cliente_solicitante=random.choice(clientes),
-                descricao=descricao,
-                status=status,
-                criticidade=criticidade,
-                data_criacao=data_criacao,
-                data_atualizacao=data_criacao + timedelta(hours=random.randint(1, 48)),
-                sla_limite=sla_limite,
-                tags_automaticas=json.dumps(template["tags"] + [random.choice(["produção", "desenvolvimento", "teste"])]),
-                score_qualidade=score_qualidade,
-                ambiente_informado=ambiente_informado,
-                possui_anexos=possui_anexos
-            )
-            
+            chamado = Chamado(**gerar_chamado(random, f"WEX-2025-{i:03d}", data_criacao))
+
             db.add(chamado)
             db.flush()  # Para obter o ID
             chamados_criados.append(chamado)
-            
-            print(f"Chamado {i}/50 criado: {chamado.numero_wex} - {criticidade}")
-        
+
+            print(f"Chamado {i}/50 criado: {chamado.numero_wex} - {chamado.criticidade}")
+
         # Gerar follow-ups para os chamados
-        tipos_followup = [
-            (TipoFollowUp.ANALISE.value, "Iniciada análise do problema reportado."),
-            (TipoFollowUp.ANALISE.value, "Logs do sistema coletados para investigação."),
-            (TipoFollowUp.DESENVOLVIMENTO.value, "Identificada causa raiz do problema."),
-            (TipoFollowUp.DESENVOLVIMENTO.value, "Correção implementada no ambiente de desenvolvimento."),
-            (TipoFollowUp.PUBLICACAO.value, "Deploy da correção realizado em produção."),
-            (TipoFollowUp.PUBLICACAO.value, "Atualização do sistema concluída com sucesso."),
-            (TipoFollowUp.OUTROS.value, "Contato realizado com o cliente para mais informações."),
-            (TipoFollowUp.OUTROS.value, "Documentação atualizada com nova informação."),
-        ]
-        
-        autores = [
-            "João Silva - Suporte Técnico",
-            "Maria Santos - Analista de Sistemas", 
-            "Pedro Oliveira - Desenvolvedor",
-            "Ana Costa - DBA",
-            "Carlos Ferreira - DevOps",
-            "Lucia Almeida - QA",
-            "Roberto Lima - Arquiteto",
-            "Fernanda Rocha - Product Owner"
-        ]
-        
         total_followups = 0
-        
+
         for chamado in chamados_criados:
-            # Quantidade de follow-ups baseada no status
-            if chamado.status == StatusChamado.FECHADO.value:
-                num_followups = random.randint(2, 5)
-            elif chamado.status == StatusChamado.RESOLVIDO.value:
-                num_followups = random.randint(1, 4)
-            elif chamado.status in [StatusChamado.EM_ANALISE.value, StatusChamado.PENDENTE.value]:
-                num_followups = random.randint(1, 3)
-            else:  # Aberto
-                num_followups = random.randint(0, 2)
-            
-            for j in range(num_followups):
-                tipo, descricao_base = random.choice(tipos_followup)
-                
-                # Personalizar descrição baseada no contexto
-                if "erro" in chamado.descricao.lower() and tipo == TipoFollowUp.ANALISE.value:
-                    descricao_base = f"Analisando erro reportado: {descricao_base}"
-                elif "lentidão" in chamado.descricao.lower() and tipo == TipoFollowUp.DESENVOLVIMENTO.value:
-                    descricao_base = "Otimização de performance implementada."
-                
-                data_followup = chamado.data_criacao + timedelta(hours=random.randint(1, 48*(j+1)))
-                
-                # Anexos ocasionais
-                anexos = []
-                if random.random() < 0.3:  # 30% chance
-                    anexos_possiveis = [
-                        "log_analise.txt",
-                        "screenshot_erro.png", 
-                        "relatorio_performance.pdf",
-                        "documentacao_tecnica.docx",
-                        "script_correcao.sql"
-                    ]
-                    anexos = [random.choice(anexos_possiveis)]
-                
-                followup = FollowUp(
-                    chamado_id=chamado.id,
-                    tipo=tipo,
-                    descricao=descricao_base,
-                    data_criacao=data_followup,
-                    autor=random.choice(autores),
-                    anexos=json.dumps(anexos)
-                )
-                
-                db.add(followup)
+            dados_chamado = {
+                "status": chamado.status,
+                "descricao": chamado.descricao,
+                "data_criacao": chamado.data_criacao
+            }
+            for dados_followup in gerar_followups(random, chamado.id, dados_chamado):
+                db.add(FollowUp(**dados_followup))
                 total_followups += 1
-        
+
         # Commit todas as mudanças
         db.commit()
-        
+
         print(f"\n✅ Dados mockados gerados com sucesso!")
         print(f"📋 {len(chamados_criados)} chamados criados")
         print(f"💬 {total_followups} follow-ups criados")
-        
+
         # Estatísticas
         stats = {}
         for chamado in chamados_criados:
             status = chamado.status
             stats[status] = stats.get(status, 0) + 1
-        
+
         print(f"\n📊 Distribuição por Status:")
         for status, count in stats.items():
             print(f"   {status}: {count}")
-        
+
         return True
-        
+
     except Exception as e:
         print(f"❌ Erro ao gerar dados: {e}")
         db.rollback()
@@ -290,11 +540,60 @@ def generate_mock_data():
     finally:
         db.close()
 
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Geração de dados mockados do WEX Intelligence")
+    parser.add_argument("--rapido", action="store_true",
+                        help="Base grande: processos paralelos, executemany e índices recriados no final")
+    parser.add_argument("--chamados", type=int, default=100000, help="Chamados gerados no modo rápido")
+    parser.add_argument("--workers", type=int, default=None, help="Processos geradores (padrão: núcleos)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--inicio", default=None, help="Data inicial de criação (AAAA-MM-DD; padrão: 90 dias antes do fim)")
+    parser.add_argument("--fim", default=None, help="Data final de criação (AAAA-MM-DD; padrão: hoje)")
+    parser.add_argument("--status", default=None,
+                        help="Distribuição de status, ex.: \"Aberto=30,Em análise=25,Fechado=45\"")
+    parser.add_argument("--criticidade", default=None,
+                        help="Distribuição de criticidade, ex.: \"Baixa=40,Média=40,Alta=15,Crítica=5\"")
+    parser.add_argument("--manter", action="store_true", help="Acrescenta aos dados existentes em vez de limpar")
+    return parser.parse_args()
+
+
+def gerar_modo_rapido(args) -> bool:
+    """Modo --rapido da linha de comando"""
+    from database import create_database, engine
+    try:
+        data_fim = datetime.strptime(args.fim, "%Y-%m-%d") if args.fim else None
+        data_inicio = datetime.strptime(args.inicio, "%Y-%m-%d") if args.inicio else None
+        if data_inicio and not data_fim:
+            data_fim = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        pesos_status = interpretar_pesos(args.status, [s.value for s in StatusChamado]) if args.status else None
+        pesos_criticidade = (interpretar_pesos(args.criticidade, [c.value for c in CriticidadeChamado])
+                             if args.criticidade else None)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    create_database()
+    print(f"⚡ Gerando {args.chamados} chamados em modo rápido...")
+    estatisticas = gerar_dados_rapido(
+        engine, args.chamados, semente=args.semente, data_inicio=data_inicio, data_fim=data_fim,
+        pesos_status=pesos_status, pesos_criticidade=pesos_criticidade, workers=args.workers, limpar=not args.manter
+    )
+    print(f"\n✅ {estatisticas['chamados']} chamados e {estatisticas['followups']} follow-ups "
+          f"em {estatisticas['tempo_s']} s ({estatisticas['workers']} processos)")
+    print(f"📅 Período: {estatisticas['data_inicio'][:10]} a {estatisticas['data_fim'][:10]}")
+    print("ℹ️  Vizinhos e padrões são recalculados sob demanda (ou via reconstruir_vizinhos/reconstruir_padroes)")
+    return True
+
+
 if __name__ == "__main__":
-    print("🚀 Iniciando geração de dados mockados...")
-    success = generate_mock_data()
-    
+    args = _argumentos()
+    if args.rapido:
+        success = gerar_modo_rapido(args)
+    else:
+        print("🚀 Iniciando geração de dados mockados...")
+        success = generate_mock_data()
+
     if success:
         print("\n🎉 Processo concluído! O sistema está pronto para demonstração.")
     else:
-        print("\n💥 Falha na geração dos dados. Verifique os logs acima.")
\ No newline at end of file
+        print("\n💥 Falha na geração dos dados. Verifique os logs acima.")
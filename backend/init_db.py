@@ -13,8 +13,8 @@ def init_database():
     else:
         print(f"Criando novo banco de dados em: {db_path}")
     
-    # Criar todas as tabelas
-    Base.metadata.create_all(bind=engine)
+    # Criar todas as tabelas (e índices ausentes em bancos existentes)
+    create_database()
     print("Tabelas criadas com sucesso!")
     
     # Verificar tabelas criadas
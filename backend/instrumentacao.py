@@ -0,0 +1,414 @@
+"""
+Instrumentação da API (métricas no formato texto do Prometheus)
+Latência e volume por rota, requisições em andamento, consultas ao banco por
+requisição, chamadas remotas de IA e taxas de acerto dos caches, expostas em
+GET /metrics. Sem dependências externas: o registro e a exposição são locais.
+
+Com vários processos (start_backend_api.py --producao) cada worker mantém suas
+próprias métricas; o Prometheus agrega pelas séries de cada alvo.
+"""
+
+import abc
+import bisect
+import contextvars
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config_manager import get_config_manager, get_versao_config
+
+logger = logging.getLogger(__name__)
+
+TIPO_CONTEUDO_PROMETHEUS = "text/plain; version=0.0.4"  # o charset é acrescentado pela Response
+
+BUCKETS_LATENCIA_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_CONSULTAS_PADRAO = (1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+def _get_config_instrumentacao(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.instrumentacao"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('instrumentacao', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+# === Tipos de métrica ===
+
+def _formatar_valor(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra is not None:
+        pares.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class _Metrica(abc.ABC):
+    """Base das métricas: nome, descrição e rótulos; cada tipo exporta suas próprias linhas"""
+    tipo = ""
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(rotulos.get(nome, "")) for nome in self.rotulos)
+
+    def cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+
+    @abc.abstractmethod
+    def exportar(self) -> List[str]:
+        """Linhas das amostras no formato texto do Prometheus (sem HELP/TYPE)"""
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (ex.: total de requisições)"""
+    tipo = "counter"
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, descricao, rotulos)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, valor: float = 1.0, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0.0) + valor
+
+    def valor(self, **rotulos) -> float:
+        return self._valores.get(self._chave(rotulos), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            itens = sorted(self._valores.items())
+        return [f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_valor(v)}" for chave, v in itens]
+
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: requisições em andamento)"""
+    tipo = "gauge"
+
+    def dec(self, valor: float = 1.0, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def definir(self, valor: float, **rotulos):
+        with self._lock:
+            self._valores[self._chave(rotulos)] = valor
+
+
+class Histograma(_Metrica):
+    """Distribuição em buckets cumulativos (ex.: latência)"""
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                 buckets: Iterable[float] = BUCKETS_LATENCIA_PADRAO):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # chave -> (contagens por bucket, soma, total)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * len(self.buckets), 0.0, 0]
+            if indice < len(self.buckets):
+                serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def total(self, **rotulos) -> int:
+        serie = self._series.get(self._chave(rotulos))
+        return serie[2] if serie else 0
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            itens = sorted((chave, (list(s[0]), s[1], s[2])) for chave, s in self._series.items())
+        linhas = []
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, ("le", _formatar_valor(limite)))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            linhas.append(f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, chave, ('le', '+Inf'))} {total}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, chave)} {_formatar_valor(soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Métricas registradas e coletores avaliados no momento da exposição"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._coletores: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            existente = self._metricas.get(metrica.nome)
+            if existente is not None:
+                return existente
+            self._metricas[metrica.nome] = metrica
+            return metrica
+
+    def contador(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Contador:
+        return self.registrar(Contador(nome, descricao, rotulos))
+
+    def medidor(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Medidor:
+        return self.registrar(Medidor(nome, descricao, rotulos))
+
+    def histograma(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                   buckets: Iterable[float] = BUCKETS_LATENCIA_PADRAO) -> Histograma:
+        return self.registrar(Histograma(nome, descricao, rotulos, buckets))
+
+    def adicionar_coletor(self, coletor: Callable[[], None]):
+        """Função chamada antes de cada exposição (atualiza medidores a partir de outras fontes)"""
+        self._coletores.append(coletor)
+
+    def exportar(self) -> str:
+        for coletor in list(self._coletores):
+            try:
+                coletor()
+            except Exception as e:
+                logger.warning(f"Erro no coletor de métricas: {e}")
+        linhas: List[str] = []
+        with self._lock:
+            metricas = sorted(self._metricas.values(), key=lambda m: m.nome)
+        for metrica in metricas:
+            linhas.extend(metrica.cabecalho())
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+# Registro global
+registro_metricas = RegistroMetricas()
+
+_buckets_latencia = tuple(_get_config_instrumentacao('buckets_latencia_s', BUCKETS_LATENCIA_PADRAO))
+
+requisicoes_total = registro_metricas.contador(
+    "wex_http_requisicoes_total", "Requisições HTTP atendidas", ("metodo", "rota", "status"))
+latencia_requisicoes = registro_metricas.histograma(
+    "wex_http_latencia_segundos", "Latência das requisições HTTP por rota", ("metodo", "rota"), _buckets_latencia)
+requisicoes_em_andamento = registro_metricas.medidor(
+    "wex_http_requisicoes_em_andamento", "Requisições HTTP em processamento")
+consultas_por_requisicao = registro_metricas.histograma(
+    "wex_db_consultas_por_requisicao", "Consultas SQL executadas por requisição", ("rota",), BUCKETS_CONSULTAS_PADRAO)
+tempo_db_por_requisicao = registro_metricas.histograma(
+    "wex_db_tempo_por_requisicao_segundos", "Tempo em consultas SQL por requisição", ("rota",), _buckets_latencia)
+consultas_total = registro_metricas.contador(
+    "wex_db_consultas_total", "Consultas SQL executadas (inclusive fora de requisições)")
+tempo_consultas_total = registro_metricas.contador(
+    "wex_db_tempo_consultas_segundos_total", "Tempo acumulado em consultas SQL")
+latencia_ia_remota = registro_metricas.histograma(
+    "wex_ia_chamada_remota_segundos", "Latência das chamadas à API remota de IA", ("modelo", "resultado"),
+    _buckets_latencia)
+cache_acertos = registro_metricas.medidor(
+    "wex_cache_acertos", "Acertos acumulados por cache", ("cache",))
+cache_falhas = registro_metricas.medidor(
+    "wex_cache_falhas", "Falhas acumuladas por cache", ("cache",))
+cache_taxa_acerto = registro_metricas.medidor(
+    "wex_cache_taxa_acerto", "Acertos / (acertos + falhas) por cache", ("cache",))
+
+
+def registrar_fonte_cache(nome: str, leitura: Callable[[], Tuple[float, float]]):
+    """
+    Publica os contadores (acertos, falhas) de um cache existente
+
+    leitura é chamada a cada exposição; os caches continuam com seus próprios contadores.
+    """
+    def coletar():
+        acertos, falhas = leitura()
+        cache_acertos.definir(acertos, cache=nome)
+        cache_falhas.definir(falhas, cache=nome)
+        total = acertos + falhas
+        cache_taxa_acerto.definir(acertos / total if total else 0.0, cache=nome)
+
+    registro_metricas.adicionar_coletor(coletar)
+
+
+# === Consultas ao banco por requisição ===
+
+# Acumulador da requisição corrente; propagado para o threadpool junto com o contexto
+_consultas_requisicao: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "consultas_requisicao", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("inicio_consultas")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    consultas_total.inc()
+    tempo_consultas_total.inc(duracao)
+    acumulador = _consultas_requisicao.get()
+    if acumulador is not None:
+        acumulador[0] += 1
+        acumulador[1] += duracao
+
+
+# === Middleware ===
+
+def _rota(scope: Scope) -> str:
+    """Modelo da rota (ex.: /chamados/{chamado_id}) para manter a cardinalidade baixa"""
+    rota = scope.get("route")
+    caminho = getattr(rota, "path", None)
+    return caminho or "nao_encontrada"
+
+
+class MiddlewareInstrumentacao:
+    """Mede latência, status e consultas SQL de cada requisição HTTP"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.habilitado = bool(_get_config_instrumentacao('habilitado', True))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.habilitado:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = {"status": 500, "streaming": False}
+        acumulador = [0, 0.0]
+        token = _consultas_requisicao.set(acumulador)
+
+        async def enviar(mensagem: Message):
+            if mensagem["type"] == "http.response.start":
+                estado["status"] = mensagem["status"]
+                for nome, valor in mensagem.get("headers", []):
+                    if nome.lower() == b"content-type" and valor.startswith(b"text/event-stream"):
+                        estado["streaming"] = True
+            await send(mensagem)
+
+        requisicoes_em_andamento.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            requisicoes_em_andamento.dec()
+            _consultas_requisicao.reset(token)
+            rota = _rota(scope)
+            metodo = scope.get("method", "")
+            requisicoes_total.inc(metodo=metodo, rota=rota, status=estado["status"])
+            # Conexões SSE duram até o cliente sair: não entram na latência
+            if not estado["streaming"]:
+                latencia_requisicoes.observar(time.perf_counter() - inicio, metodo=metodo, rota=rota)
+                consultas_por_requisicao.observar(acumulador[0], rota=rota)
+                tempo_db_por_requisicao.observar(acumulador[1], rota=rota)
+
+
+def medir_chamada_remota(modelo: str, inicio: float, sucesso: bool):
+    """Registra a latência de uma chamada à API remota de IA (inicio = time.perf_counter())"""
+    latencia_ia_remota.observar(time.perf_counter() - inicio, modelo=modelo, resultado="ok" if sucesso else "erro")
+
+
+# === Estágios da triagem ===
+
+BUCKETS_ESTAGIOS_PADRAO = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 3.0, 10.0)
+
+latencia_estagios_triagem = registro_metricas.histograma(
+    "wex_triagem_estagio_segundos", "Duração de cada estágio de realizar_triagem (amostrado)", ("estagio",),
+    BUCKETS_ESTAGIOS_PADRAO)
+
+# Fração das triagens com medição por estágio (0 desliga; 1 mede todas): definida explicitamente
+# por definir_amostragem_estagios ou lida de amostragem_estagios_triagem a cada versão da configuração
+_amostragem_estagios: Optional[float] = None
+_amostragem_config: Tuple[Optional[str], float] = (None, 0.0)
+
+
+def _fracao_amostragem() -> float:
+    global _amostragem_config
+    if _amostragem_estagios is not None:
+        return _amostragem_estagios
+    versao = get_versao_config()
+    if _amostragem_config[0] != versao:
+        fracao = (float(_get_config_instrumentacao('amostragem_estagios_triagem', 0.0))
+                  if _get_config_instrumentacao('habilitado', True) else 0.0)
+        _amostragem_config = (versao, min(max(fracao, 0.0), 1.0))
+    return _amostragem_config[1]
+
+
+class CronometroEstagios:
+    """Duração de cada estágio, medida entre marcações consecutivas com perf_counter"""
+
+    ativo = True
+
+    def __init__(self):
+        self.duracoes: Dict[str, float] = {}
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, estagio: str):
+        """Encerra o estágio que terminou agora"""
+        agora = time.perf_counter()
+        self.duracoes[estagio] = self.duracoes.get(estagio, 0.0) + agora - self._ultimo
+        self._ultimo = agora
+
+    def finalizar(self) -> Dict[str, float]:
+        """Publica as durações nos histogramas e as retorna em milissegundos"""
+        for estagio, duracao in self.duracoes.items():
+            latencia_estagios_triagem.observar(duracao, estagio=estagio)
+        return {estagio: round(duracao * 1000, 3) for estagio, duracao in self.duracoes.items()}
+
+
+class _CronometroInativo:
+    """Cronômetro das triagens fora da amostra: não lê o relógio"""
+
+    ativo = False
+
+    def marcar(self, estagio: str):
+        pass
+
+    def finalizar(self) -> None:
+        return None
+
+
+CRONOMETRO_INATIVO = _CronometroInativo()
+
+
+def definir_amostragem_estagios(fracao: Optional[float]):
+    """Fixa a fração de triagens medidas (ex.: depuração ou testes); None volta a seguir a configuração"""
+    global _amostragem_estagios
+    _amostragem_estagios = None if fracao is None else min(max(float(fracao), 0.0), 1.0)
+
+
+def iniciar_cronometro_triagem(medir: Optional[bool] = None):
+    """
+    Cronômetro de estágios para uma triagem
+
+    medir=True/False força a decisão; None segue amostragem_estagios_triagem.
+    """
+    if medir is None:
+        fracao = _fracao_amostragem()
+        medir = fracao >= 1.0 or (fracao > 0.0 and random.random() < fracao)
+    return CronometroEstagios() if medir else CRONOMETRO_INATIVO
@@ -0,0 +1,293 @@
+"""
+Execução assíncrona de relatórios demorados
+Os relatórios rodam em um pool de threads como jobs consultáveis por id,
+com progresso, e os resultados ficam em cache por chave
+(ex.: período, versão da configuração e última atualização dos chamados)
+
+O estado de cada job (status, progresso e resultado) é gravado na tabela
+jobs_relatorios, então com vários workers o id retornado por um processo pode
+ser consultado em qualquer outro. O job executa no worker que o recebeu; o
+cache de resultados e o reaproveitamento de jobs em andamento são por processo.
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import EstadoJobRelatorio
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDENTE = "pendente"
+STATUS_EXECUTANDO = "executando"
+STATUS_CONCLUIDO = "concluido"
+STATUS_ERRO = "erro"
+
+INTERVALO_GRAVACAO_PROGRESSO_S = 1.0  # Gravações de progresso na tabela, no máximo uma por intervalo
+
+
+def _get_config_jobs(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.jobs_relatorios"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('jobs_relatorios', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+@dataclass
+class JobRelatorio:
+    """Estado de um job de relatório"""
+    id: str
+    tipo: str
+    parametros: Dict[str, Any]
+    chave_cache: Hashable
+    status: str = STATUS_PENDENTE
+    progresso: float = 0.0
+    etapa: str = "na fila"
+    criado_em: datetime = field(default_factory=datetime.now)
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None
+    do_cache: bool = False
+
+    @property
+    def finalizado(self) -> bool:
+        return self.status in (STATUS_CONCLUIDO, STATUS_ERRO)
+
+    def atualizar_progresso(self, fracao: float, etapa: str):
+        """Callback de progresso repassado à rotina do relatório"""
+        self.progresso = round(min(max(fracao, 0.0), 1.0), 3)
+        self.etapa = etapa
+
+    def para_estado(self) -> EstadoJobRelatorio:
+        return EstadoJobRelatorio(
+            id=self.id, tipo=self.tipo, parametros=json.dumps(self.parametros), status=self.status,
+            progresso=self.progresso, etapa=self.etapa, criado_em=self.criado_em,
+            iniciado_em=self.iniciado_em, concluido_em=self.concluido_em,
+            resultado=json.dumps(self.resultado, default=str) if self.resultado is not None else None,
+            erro=self.erro, do_cache=self.do_cache
+        )
+
+    @classmethod
+    def do_estado(cls, estado: EstadoJobRelatorio) -> "JobRelatorio":
+        """Job gravado por outro worker (sem chave de cache: não entra no reaproveitamento)"""
+        return cls(
+            id=estado.id, tipo=estado.tipo, parametros=json.loads(estado.parametros or "{}"), chave_cache=None,
+            status=estado.status, progresso=estado.progresso, etapa=estado.etapa, criado_em=estado.criado_em,
+            iniciado_em=estado.iniciado_em, concluido_em=estado.concluido_em,
+            resultado=json.loads(estado.resultado) if estado.resultado is not None else None,
+            erro=estado.erro, do_cache=estado.do_cache
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "tipo": self.tipo,
+            "parametros": self.parametros,
+            "status": self.status,
+            "progresso": self.progresso,
+            "etapa": self.etapa,
+            "criado_em": self.criado_em.isoformat(),
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "concluido_em": self.concluido_em.isoformat() if self.concluido_em else None,
+            "do_cache": self.do_cache,
+            "erro": self.erro
+        }
+
+
+class GerenciadorJobs:
+    """Fila de jobs de relatório com cache LRU de resultados (estado gravado via abrir_sessao, se informado)"""
+
+    def __init__(self, abrir_sessao: Optional[Callable[[], Session]] = None):
+        self._abrir_sessao = abrir_sessao
+        self._jobs: "OrderedDict[str, JobRelatorio]" = OrderedDict()
+        self._em_andamento: Dict[Hashable, str] = {}
+        self._cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.acertos_cache = 0
+        self.falhas_cache = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(_get_config_jobs('max_workers', 2)),
+                thread_name_prefix="job-relatorio"
+            )
+        return self._executor
+
+    # Cache de resultados
+
+    def obter_cache(self, chave: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            resultado = self._cache.get(chave)
+            if resultado is None:
+                self.falhas_cache += 1
+                return None
+            self._cache.move_to_end(chave)
+            self.acertos_cache += 1
+            return resultado
+
+    def guardar_cache(self, chave: Hashable, resultado: Dict[str, Any]):
+        with self._lock:
+            self._guardar_cache(chave, resultado)
+
+    def _guardar_cache(self, chave: Hashable, resultado: Dict[str, Any]):
+        self._cache[chave] = resultado
+        self._cache.move_to_end(chave)
+        while len(self._cache) > int(_get_config_jobs('max_resultados_cache', 32)):
+            self._cache.popitem(last=False)
+
+    def limpar_cache(self):
+        with self._lock:
+            self._cache.clear()
+            self.acertos_cache = 0
+            self.falhas_cache = 0
+
+    # Persistência
+
+    def _gravar(self, job: JobRelatorio, novo: bool = False):
+        """Grava o estado do job; ao criar, descarta da tabela os finalizados além de max_jobs_retidos"""
+        if self._abrir_sessao is None:
+            return
+        db = self._abrir_sessao()
+        try:
+            db.merge(job.para_estado())
+            if novo:
+                retidos = db.query(EstadoJobRelatorio.id).filter(
+                    EstadoJobRelatorio.status.in_([STATUS_CONCLUIDO, STATUS_ERRO])
+                ).order_by(EstadoJobRelatorio.criado_em.desc()).limit(int(_get_config_jobs('max_jobs_retidos', 200)))
+                db.query(EstadoJobRelatorio).filter(
+                    EstadoJobRelatorio.status.in_([STATUS_CONCLUIDO, STATUS_ERRO]),
+                    EstadoJobRelatorio.id.notin_(retidos.subquery().select())
+                ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Erro ao gravar o estado do job {job.id}: {e}")
+        finally:
+            db.close()
+
+    def _carregar(self, job_id: str) -> Optional[JobRelatorio]:
+        if self._abrir_sessao is None:
+            return None
+        db = self._abrir_sessao()
+        try:
+            estado = db.get(EstadoJobRelatorio, job_id)
+            return JobRelatorio.do_estado(estado) if estado is not None else None
+        except Exception as e:
+            logger.warning(f"Erro ao ler o estado do job {job_id}: {e}")
+            return None
+        finally:
+            db.close()
+
+    # Jobs
+
+    def _registrar_job(self, job: JobRelatorio):
+        self._jobs[job.id] = job
+        # Descarta os jobs finalizados mais antigos
+        excedente = len(self._jobs) - int(_get_config_jobs('max_jobs_retidos', 200))
+        for job_id in [j.id for j in self._jobs.values() if j.finalizado][:max(excedente, 0)]:
+            del self._jobs[job_id]
+
+    def submeter(self, tipo: str, parametros: Dict[str, Any], chave_cache: Hashable,
+                 funcao: Callable[[Callable[[float, str], None]], Dict[str, Any]]) -> JobRelatorio:
+        """
+        Cria um job para `funcao(progresso)`
+
+        Se o resultado da chave já estiver em cache o job nasce concluído;
+        se já houver um job em andamento com a mesma chave, ele é reaproveitado.
+        """
+        resultado = self.obter_cache(chave_cache)
+        with self._lock:
+            if resultado is None and chave_cache in self._em_andamento:
+                return self._jobs[self._em_andamento[chave_cache]]
+
+            job = JobRelatorio(id=uuid.uuid4().hex, tipo=tipo, parametros=parametros, chave_cache=chave_cache)
+            self._registrar_job(job)
+
+            if resultado is not None:
+                job.status = STATUS_CONCLUIDO
+                job.progresso = 1.0
+                job.etapa = "concluído"
+                job.resultado = resultado
+                job.do_cache = True
+                job.concluido_em = datetime.now()
+            else:
+                self._em_andamento[chave_cache] = job.id
+
+        self._gravar(job, novo=True)
+        if not job.finalizado:
+            self._get_executor().submit(self._executar, job, funcao)
+        return job
+
+    def _executar(self, job: JobRelatorio, funcao: Callable):
+        job.status = STATUS_EXECUTANDO
+        job.iniciado_em = datetime.now()
+        job.atualizar_progresso(0.0, "iniciando")
+        self._gravar(job)
+        ultima_gravacao = time.monotonic()
+
+        def progresso(fracao: float, etapa: str):
+            nonlocal ultima_gravacao
+            job.atualizar_progresso(fracao, etapa)
+            if time.monotonic() - ultima_gravacao >= INTERVALO_GRAVACAO_PROGRESSO_S:
+                ultima_gravacao = time.monotonic()
+                self._gravar(job)
+
+        try:
+            resultado = funcao(progresso)
+            with self._lock:
+                job.resultado = resultado
+                job.status = STATUS_CONCLUIDO
+                job.atualizar_progresso(1.0, "concluído")
+                # Resultado de fallback (IA indisponível) não vai para o cache: a próxima execução tenta de novo
+                if "erro_ia" not in resultado:
+                    self._guardar_cache(job.chave_cache, resultado)
+        except Exception as e:
+            logger.error(f"Erro no job de relatório {job.id}: {e}")
+            job.erro = str(e)
+            job.status = STATUS_ERRO
+            job.etapa = "erro"
+        finally:
+            job.concluido_em = datetime.now()
+            with self._lock:
+                self._em_andamento.pop(job.chave_cache, None)
+            self._gravar(job)
+
+    def obter(self, job_id: str) -> Optional[JobRelatorio]:
+        """Job deste processo ou, se não houver, o gravado por outro worker"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._carregar(job_id)
+
+    def encerrar(self):
+        """Encerra o pool de threads (chamado no shutdown da aplicação) e marca os jobs interrompidos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            interrompidos = [job for job in self._jobs.values() if not job.finalizado]
+        for job in interrompidos:
+            job.erro = "Job interrompido pelo encerramento do worker"
+            job.status = STATUS_ERRO
+            job.etapa = "erro"
+            job.concluido_em = datetime.now()
+            self._gravar(job)
+
+
+# Instância global dos jobs de relatório
+gerenciador_jobs = GerenciadorJobs(SessionLocal)
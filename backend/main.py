@@ -1,9 +1,11 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, BackgroundTasks, Response, Request, Header
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from database import get_db, create_database
+from typing import List, Optional, Dict, Any, Callable
+from database import get_db, create_database, SessionLocal
 from models import Chamado, FollowUp, StatusChamado, CriticidadeChamado, TipoFollowUp
 from schemas import (
     ChamadoResponse, ChamadoCreate, ChamadoUpdate, ChamadoFiltros,
@@ -21,28 +23,64 @@ from collections import Counter
 import math
 # Importar nossa IA e configurações
 from wex_ai_engine import wex_ai
-from config_manager import get_config_manager
+from config_manager import get_config_manager, get_versao_config
+from processamento_paralelo import encerrar_process_pool
+from vizinhos import (
+    vizinhanca_atualizada, buscar_vizinhos_precomputados, atualizar_vizinhanca_em_background, selecionar_similares
+)
+from padroes_incrementais import montar_relatorio_incremental, registrar_padrao_em_background
+from simulacao_config import simular_config, MatrizEmConstrucao
+from triagens import chamado_para_ia, obter_triagem, estatisticas_triagens
+from jobs_relatorios import gerenciador_jobs, STATUS_CONCLUIDO, STATUS_ERRO
+from cache_http import (
+    resposta_condicional, validador_lista_chamados, validador_chamado, validador_followups, validador_metricas,
+    estatisticas_condicionais, MonitorAlteracoesExternas
+)
+from serializacao import (
+    RespostaJSONRapida, resposta_json, consultar_dicts, colunas_listagem_chamados, interpretar_campos,
+    COLUNAS_CHAMADO, COLUNAS_FOLLOWUP, VISAO_COMPLETA
+)
+from compressao import MiddlewareCompressao
+from instrumentacao import (
+    MiddlewareInstrumentacao, registro_metricas, registrar_fonte_cache, TIPO_CONTEUDO_PROMETHEUS
+)
+from eventos import (
+    barramento_eventos, publicar_evento, publicar_metricas_periodicamente, publicar_alteracoes_externas,
+    EVENTO_CHAMADO_CRIADO, EVENTO_CHAMADO_ATUALIZADO, EVENTO_FOLLOWUP_CRIADO, EVENTO_TRIAGEM_APLICADA
+)
+from agenda_sla import agenda_sla, agenda_habilitada, executar_agenda_sla
+from fila_prioridade import fila_prioridade
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 # Configuração do lifespan
 from contextlib import asynccontextmanager
+import asyncio
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     create_database()
+    tarefa_metricas = asyncio.create_task(publicar_metricas_periodicamente(_metricas_para_eventos))
+    tarefa_alteracoes = asyncio.create_task(publicar_alteracoes_externas(_alteracoes_externas))
+    tarefa_sla = asyncio.create_task(executar_agenda_sla(SessionLocal)) if agenda_habilitada() else None
     yield
     # Shutdown
-    pass
+    tarefa_metricas.cancel()
+    tarefa_alteracoes.cancel()
+    if tarefa_sla:
+        tarefa_sla.cancel()
+    gerenciador_jobs.encerrar()
+    encerrar_process_pool()
 
 # Criar instância do FastAPI
 app = FastAPI(
     title="WEX Intelligence API",
     description="API para Sistema de Triagem Automática de Chamados",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=RespostaJSONRapida
 )
 
 # Configurar CORS para frontend
@@ -54,6 +92,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão gzip/brotli negociada pelo Accept-Encoding (não afeta o canal SSE)
+app.add_middleware(MiddlewareCompressao)
+
+# Latência, volume e consultas SQL por rota (mais externo: mede a requisição inteira)
+app.add_middleware(MiddlewareInstrumentacao)
+
+# Busca de relacionados: tabela de vizinhos pré-calculada (acerto) ou cálculo na hora (falha)
+buscas_relacionados = registro_metricas.contador(
+    "wex_relacionados_buscas_total", "Buscas de chamados relacionados por origem", ("origem",)
+)
+
+# Taxas de acerto dos caches expostas em /metrics
+registrar_fonte_cache("relatorios_padroes", lambda: (gerenciador_jobs.acertos_cache, gerenciador_jobs.falhas_cache))
+registrar_fonte_cache("http_condicional", lambda: (
+    estatisticas_condicionais["respostas_304"], estatisticas_condicionais["respostas_completas"]
+))
+registrar_fonte_cache("triagens", lambda: (
+    estatisticas_triagens["reaproveitadas"], estatisticas_triagens["calculadas"]
+))
+registrar_fonte_cache("vizinhos_precomputados", lambda: (
+    buscas_relacionados.valor(origem="precomputado"), buscas_relacionados.valor(origem="tempo_real")
+))
+
 # Health check
 @app.get("/")
 def read_root():
@@ -63,19 +124,35 @@ def read_root():
 def health_check():
     return {"message": "WEX Intelligence API is running!", "version": "1.0.0"}
 
+@app.get("/metrics", include_in_schema=False)
+def metricas_prometheus():
+    """Métricas da API no formato texto do Prometheus"""
+    return Response(content=registro_metricas.exportar(), media_type=TIPO_CONTEUDO_PROMETHEUS)
+
 # === ENDPOINTS DE CHAMADOS ===
 
 @app.get("/chamados", response_model=dict)
 def listar_chamados(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(20, ge=1, le=100, description="Limite de registros por página"),
     status: Optional[List[str]] = Query(None, description="Filtrar por status"),
     criticidade: Optional[List[str]] = Query(None, description="Filtrar por criticidade"),
     cliente: Optional[str] = Query(None, description="Filtrar por cliente"),
     busca_texto: Optional[str] = Query(None, description="Busca textual"),
+    sem_followup_horas: Optional[int] = Query(None, ge=1, description="Somente chamados sem follow-up há pelo menos N horas"),
+    view: str = Query(VISAO_COMPLETA, pattern="^(full|summary)$", description="full: todas as colunas; summary: colunas da tabela com descrição truncada"),
+    fields: Optional[List[str]] = Query(None, description="Campos retornados (ex.: fields=id,status,criticidade)"),
     db: Session = Depends(get_db)
 ):
-    """Listar todos os chamados com filtros e paginação"""
+    """Listar todos os chamados com filtros e paginação (suporta ETag/If-None-Match)"""
+    
+    campos = interpretar_campos(fields)
+    try:
+        colunas = colunas_listagem_chamados(view, campos)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     query = db.query(Chamado)
     
@@ -98,35 +175,62 @@ def listar_chamados(
             )
         )
     
-    # Contar total de registros (antes da paginação)
-    total = query.count()
+    # Último contato (follow-up ou abertura) anterior ao limite, pelo índice de ultimo_followup_em
+    limite_followup = None
+    if sem_followup_horas:
+        limite_followup = (datetime.now() - timedelta(hours=sem_followup_horas)).replace(second=0, microsecond=0)
+        query = query.filter(
+            or_(
+                Chamado.ultimo_followup_em < limite_followup,
+                and_(Chamado.ultimo_followup_em.is_(None), Chamado.data_criacao < limite_followup)
+            )
+        )
     
-    # Aplicar paginação e ordenação
-    chamados = query.order_by(Chamado.data_criacao.desc()).offset(skip).limit(limit).all()
+    # Validador (max(data_atualizacao) + total do filtro): 304 antes de carregar qualquer objeto
+    validador = validador_lista_chamados(
+        db, query, (skip, limit, tuple(status or ()), tuple(criticidade or ()), cliente, busca_texto, limite_followup,
+                    view, tuple(colunas))
+    )
+    nao_modificado = resposta_condicional(request, response, validador)
+    if nao_modificado:
+        return nao_modificado
     
-    # Converter para dict
-    chamados_dict = [chamado.to_dict() for chamado in chamados]
+    # Total de registros (antes da paginação), já calculado pelo validador
+    total = validador.total
     
-    return {
+    # Aplicar paginação e ordenação
+    # Apenas as colunas da visão/campos pedidos, como tuplas (sem hidratar objetos nem to_dict)
+    chamados_dict = consultar_dicts(
+        query.order_by(Chamado.data_criacao.desc()).offset(skip).limit(limit), colunas
+    )
+    
+    return resposta_json({
         "chamados": chamados_dict,
         "total": total,
         "page": (skip // limit) + 1,
         "size": limit,
         "pages": (total + limit - 1) // limit
-    }
+    }, response)
 
 @app.get("/chamados/{chamado_id}", response_model=dict)
-def obter_chamado(chamado_id: int, db: Session = Depends(get_db)):
-    """Obter detalhes de um chamado específico"""
+def obter_chamado(chamado_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Obter detalhes de um chamado específico (suporta ETag/If-None-Match)"""
     
-    chamado = db.query(Chamado).filter(Chamado.id == chamado_id).first()
-    if not chamado:
+    validador = validador_chamado(db, chamado_id)
+    if not validador:
         raise HTTPException(status_code=404, detail="Chamado não encontrado")
+    nao_modificado = resposta_condicional(request, response, validador)
+    if nao_modificado:
+        return nao_modificado
     
-    return chamado.to_dict()
+    chamados = consultar_dicts(db.query(Chamado).filter(Chamado.id == chamado_id), COLUNAS_CHAMADO)
+    if not chamados:
+        raise HTTPException(status_code=404, detail="Chamado não encontrado")
+    
+    return resposta_json(chamados[0], response)
 
 @app.post("/chamados", response_model=dict)
-def criar_chamado(chamado: ChamadoCreate, db: Session = Depends(get_db)):
+def criar_chamado(chamado: ChamadoCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Criar um novo chamado"""
     
     # Verificar se número WEX já existe
@@ -151,24 +255,42 @@ def criar_chamado(chamado: ChamadoCreate, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(db_chamado)
     
+    # Atualizar vizinhos pré-calculados (apenas as vizinhanças afetadas)
+    background_tasks.add_task(atualizar_vizinhanca_em_background, db_chamado.id)
+    
+    # Atualizar grupos e parciais diários do relatório de padrões
+    background_tasks.add_task(registrar_padrao_em_background, db_chamado.id)
+    
+    publicar_evento(EVENTO_CHAMADO_CRIADO, {
+        "chamado_id": db_chamado.id,
+        "numero_wex": db_chamado.numero_wex,
+        "cliente_solicitante": db_chamado.cliente_solicitante,
+        "status": db_chamado.status,
+        "criticidade": db_chamado.criticidade
+    })
+    
     return db_chamado.to_dict()
 
 # === ENDPOINTS DE FOLLOW-UPS ===
 
 @app.get("/chamados/{chamado_id}/followups", response_model=List[dict])
-def listar_followups(chamado_id: int, db: Session = Depends(get_db)):
-    """Listar follow-ups de um chamado"""
+def listar_followups(chamado_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Listar follow-ups de um chamado (suporta ETag/If-None-Match)"""
     
     # Verificar se chamado existe
-    chamado = db.query(Chamado).filter(Chamado.id == chamado_id).first()
-    if not chamado:
+    if not db.query(Chamado.id).filter(Chamado.id == chamado_id).first():
         raise HTTPException(status_code=404, detail="Chamado não encontrado")
     
-    followups = db.query(FollowUp).filter(
-        FollowUp.chamado_id == chamado_id
-    ).order_by(FollowUp.data_criacao.desc()).all()
+    nao_modificado = resposta_condicional(request, response, validador_followups(db, chamado_id))
+    if nao_modificado:
+        return nao_modificado
+    
+    followups = consultar_dicts(
+        db.query(FollowUp).filter(FollowUp.chamado_id == chamado_id).order_by(FollowUp.data_criacao.desc()),
+        COLUNAS_FOLLOWUP
+    )
     
-    return [followup.to_dict() for followup in followups]
+    return resposta_json(followups, response)
 
 @app.post("/chamados/{chamado_id}/followups", response_model=dict)
 def criar_followup(chamado_id: int, followup: FollowUpCreate, db: Session = Depends(get_db)):
@@ -192,13 +314,44 @@ def criar_followup(chamado_id: int, followup: FollowUpCreate, db: Session = Depe
     db.commit()
     db.refresh(db_followup)
     
+    publicar_evento(EVENTO_FOLLOWUP_CRIADO, {
+        "chamado_id": chamado_id,
+        "followup_id": db_followup.id,
+        "tipo": db_followup.tipo
+    })
+    
     return db_followup.to_dict()
 
+# === FILA DE TRABALHO ===
+
+@app.get("/fila", response_model=dict)
+def obter_fila(
+    limite: int = Query(default=20, ge=1, le=100, description="Próximos chamados da fila"),
+    db: Session = Depends(get_db)
+):
+    """Chamados em aberto por prioridade (criticidade, SLA, score e follow-up), lidos da fila em memória"""
+    fila_prioridade.garantir_atualizada(db)
+    agora = datetime.now()
+    return {
+        "total": fila_prioridade.total,
+        "chamados": [
+            {"posicao": posicao, **item.to_dict(agora)}
+            for posicao, item in enumerate(fila_prioridade.proximos(limite), start=1)
+        ]
+    }
+
 # === ENDPOINTS DE DASHBOARD ===
 
 @app.get("/dashboard/metricas", response_model=dict)
-def obter_metricas_dashboard(db: Session = Depends(get_db)):
-    """Obter métricas para o dashboard"""
+def obter_metricas_dashboard(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Obter métricas para o dashboard (suporta ETag/If-None-Match)"""
+    nao_modificado = resposta_condicional(request, response, validador_metricas(db))
+    if nao_modificado:
+        return nao_modificado
+    return calcular_metricas_dashboard(db)
+
+def calcular_metricas_dashboard(db: Session) -> Dict[str, Any]:
+    """Calcula as métricas do dashboard (usado também pelos deltas do canal de eventos)"""
     
     # Total de chamados por status
     status_counts = db.query(
@@ -232,18 +385,23 @@ def obter_metricas_dashboard(db: Session = Depends(get_db)):
         func.date(Chamado.data_criacao) == hoje
     ).count()
     
-    # Chamados vencidos (SLA ultrapassado)
+    # Chamados vencidos (SLA ultrapassado): total mantido pela agenda de SLA, sem varrer a tabela,
+    # enquanto ela confere com o banco; senão conta pelo índice de sla_limite até a próxima reconciliação
     agora = datetime.now()
-    chamados_vencidos = db.query(Chamado).filter(
-        and_(
-            Chamado.sla_limite < agora,
-            Chamado.status.in_([
-                StatusChamado.ABERTO.value,
-                StatusChamado.EM_ANALISE.value,
-                StatusChamado.PENDENTE.value
-            ])
-        )
-    ).count()
+    if agenda_sla.atualizada(db):
+        agenda_sla.processar_vencimentos(agora)
+        chamados_vencidos = agenda_sla.total_vencidos
+    else:
+        chamados_vencidos = db.query(Chamado).filter(
+            and_(
+                Chamado.sla_limite < agora,
+                Chamado.status.in_([
+                    StatusChamado.ABERTO.value,
+                    StatusChamado.EM_ANALISE.value,
+                    StatusChamado.PENDENTE.value
+                ])
+            )
+        ).count()
     
     # Tempo médio de resolução (chamados resolvidos nos últimos 30 dias)
     trinta_dias_atras = datetime.now() - timedelta(days=30)
@@ -274,6 +432,62 @@ def obter_metricas_dashboard(db: Session = Depends(get_db)):
         "chamados_vencidos": chamados_vencidos
     }
 
+@app.get("/api/sla/em-risco", response_model=dict)
+def obter_sla_em_risco(
+    limite: int = Query(default=10, ge=1, le=500, description="Próximos chamados a vencer"),
+    limite_vencidos: int = Query(default=0, ge=0, le=500, description="Vencidos listados (mais antigos primeiro)"),
+    db: Session = Depends(get_db)
+):
+    """Próximos SLAs a vencer e total de vencidos, lidos da agenda de SLA em memória"""
+    agenda_sla.garantir_atualizada(db)
+    agora = datetime.now()
+    agenda_sla.processar_vencimentos(agora)
+    proximo = agenda_sla.proximo_vencimento()
+    return {
+        "total_vencidos": agenda_sla.total_vencidos,
+        "proximo_vencimento": proximo.isoformat() if proximo else None,
+        "em_risco": [prazo.to_dict(agora) for prazo in agenda_sla.proximos_em_risco(limite)],
+        "vencidos": [prazo.to_dict(agora) for prazo in agenda_sla.vencidos(limite_vencidos)]
+    }
+
+def _metricas_para_eventos() -> Dict[str, Any]:
+    """Métricas do dashboard com sessão própria, para a tarefa periódica de eventos"""
+    db = SessionLocal()
+    try:
+        return calcular_metricas_dashboard(db)
+    finally:
+        db.close()
+
+monitor_alteracoes = MonitorAlteracoesExternas()
+
+def _alteracoes_externas() -> List[str]:
+    """Recursos alterados por outros processos, com sessão própria, para a tarefa de eventos"""
+    db = SessionLocal()
+    try:
+        return monitor_alteracoes.verificar(db)
+    finally:
+        db.close()
+
+# === CANAL DE EVENTOS (SSE) ===
+
+@app.get("/events")
+async def stream_eventos(
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None)
+):
+    """
+    Fluxo Server-Sent Events com as mudanças do sistema
+    
+    Eventos: chamado_criado, chamado_atualizado, followup_criado, triagem_aplicada, sla_vencido,
+    metricas (apenas os campos alterados) e recarregar (eventos perdidos: buscar tudo de novo)
+    """
+    assinatura = barramento_eventos.assinar(last_event_id)
+    return StreamingResponse(
+        barramento_eventos.transmitir(assinatura, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ====== SISTEMA DE IA - TRIAGEM AUTOMÁTICA ======
 
 def extrair_indicadores_criticidade(descricao: str, numero_wex: str, cliente: str) -> Dict[str, Any]:
@@ -439,6 +653,17 @@ def sugerir_tags_automaticas(descricao: str, numero_wex: str, cliente: str) -> L
 
 # ================== TRIAGEM AUTOMÁTICA ==================
 
+def metadados_triagem(resultado_triagem) -> Dict[str, Any]:
+    """metadados_ia de uma triagem; estagios_ms só nas triagens amostradas"""
+    metadados = {
+        "modelo_usado": "wex-ai-engine",
+        "tempo_processamento": resultado_triagem.tempo_processamento_ms / 1000.0,
+        "confianca_analise": resultado_triagem.confianca
+    }
+    if resultado_triagem.estagios_ms is not None:
+        metadados["estagios_ms"] = resultado_triagem.estagios_ms
+    return metadados
+
 @app.post("/api/chamados/triagem-automatica", response_model=dict)
 async def triagem_automatica_nova(request: dict):
     """Executa triagem automática para dados de um novo chamado usando IA real"""
@@ -489,11 +714,7 @@ async def triagem_automatica_nova(request: dict):
             "score_qualidade_sugerido": resultado_triagem.score_total,
             "tempo_processamento_ms": resultado_triagem.tempo_processamento_ms,
             "ia_utilizada": True,
-            "metadados_ia": {
-                "modelo_usado": "wex-ai-engine",
-                "tempo_processamento": resultado_triagem.tempo_processamento_ms / 1000,
-                "confianca_analise": resultado_triagem.confianca
-            }
+            "metadados_ia": metadados_triagem(resultado_triagem)
         }
         
     except Exception as e:
@@ -523,6 +744,32 @@ async def triagem_automatica_nova(request: dict):
             }
         }
 
+def montar_triagem_chamado(db: Session, chamado: Chamado) -> Dict[str, Any]:
+    """Triagem por IA de um chamado já carregado (usada pela triagem e pelo detalhe completo)"""
+    # Reaproveita a última triagem gravada se o chamado e a configuração não mudaram
+    resultado_triagem, registro, reaproveitada = obter_triagem(db, chamado)
+    metadados = metadados_triagem(resultado_triagem)
+    metadados["reaproveitada"] = reaproveitada
+    
+    return {
+        "id_chamado": chamado.id,
+        "triagem_id": registro.id if registro else None,
+        "score_total": resultado_triagem.score_total,
+        "score_breakdown": resultado_triagem.score_breakdown,
+        "decisao": resultado_triagem.decisao,
+        "criticidade_atual": chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
+        "criticidade_sugerida": resultado_triagem.criticidade_sugerida,
+        "confianca": resultado_triagem.confianca,
+        "fatores_identificados": resultado_triagem.motivos,
+        "sugestoes_melhoria": resultado_triagem.sugestoes,
+        "tags_sugeridas": resultado_triagem.tags_sugeridas,
+        "tempo_processamento_ms": resultado_triagem.tempo_processamento_ms,
+        "observacoes": resultado_triagem.observacoes,
+        "score_qualidade_atual": getattr(chamado, 'score_qualidade', 0) or 0,
+        "score_qualidade_sugerido": resultado_triagem.score_total,
+        "metadados_ia": metadados
+    }
+
 @app.post("/api/chamados/{chamado_id}/triagem", response_model=dict)
 async def triagem_automatica(chamado_id: int, db: Session = Depends(get_db)):
     """Executa triagem automática de um chamado específico usando IA real"""
@@ -533,43 +780,7 @@ async def triagem_automatica(chamado_id: int, db: Session = Depends(get_db)):
         if not chamado:
             raise HTTPException(status_code=404, detail="Chamado não encontrado")
         
-        # Converter chamado para dict para a IA
-        chamado_dict = {
-            'id': chamado.id,
-            'numero_wex': chamado.numero_wex,
-            'titulo': f"Chamado {chamado.numero_wex}",  # Usar número WEX como título
-            'descricao': chamado.descricao,
-            'cliente_solicitante': chamado.cliente_solicitante,
-            'criticidade': chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
-            'status': chamado.status.value if hasattr(chamado.status, 'value') else str(chamado.status),
-            'data_criacao': chamado.data_criacao.isoformat() if chamado.data_criacao else None,
-            'anexos_count': 1 if chamado.possui_anexos else 0  # Usar valor real do banco
-        }
-        
-        # Executar triagem com IA real
-        resultado_triagem = wex_ai.realizar_triagem(chamado_dict)
-        
-        return {
-            "id_chamado": chamado_id,
-            "score_total": resultado_triagem.score_total,
-            "score_breakdown": resultado_triagem.score_breakdown,
-            "decisao": resultado_triagem.decisao,
-            "criticidade_atual": chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
-            "criticidade_sugerida": resultado_triagem.criticidade_sugerida,
-            "confianca": resultado_triagem.confianca,
-            "fatores_identificados": resultado_triagem.motivos,
-            "sugestoes_melhoria": resultado_triagem.sugestoes,
-            "tags_sugeridas": resultado_triagem.tags_sugeridas,
-            "tempo_processamento_ms": resultado_triagem.tempo_processamento_ms,
-            "observacoes": resultado_triagem.observacoes,
-            "score_qualidade_atual": getattr(chamado, 'score_qualidade', 0) or 0,
-            "score_qualidade_sugerido": resultado_triagem.score_total,
-            "metadados_ia": {
-                "modelo_usado": "wex-ai-engine",
-                "tempo_processamento": resultado_triagem.tempo_processamento_ms / 1000.0,
-                "confianca_analise": resultado_triagem.confianca
-            }
-        }
+        return montar_triagem_chamado(db, chamado)
         
     except Exception as e:
         logger.error(f"Erro na triagem automática: {str(e)}")
@@ -597,7 +808,7 @@ async def triagem_automatica(chamado_id: int, db: Session = Depends(get_db)):
         }
 
 @app.post("/api/triagem/aplicar/{chamado_id}")
-async def aplicar_triagem(chamado_id: int, db: Session = Depends(get_db)):
+async def aplicar_triagem(chamado_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Aplica as sugestões da triagem automática ao chamado usando IA real"""
     
     # Buscar o chamado
@@ -605,41 +816,26 @@ async def aplicar_triagem(chamado_id: int, db: Session = Depends(get_db)):
     if not chamado:
         raise HTTPException(status_code=404, detail="Chamado não encontrado")
     
-    # Converter chamado para dict
-    chamado_dict = {
-        'id': chamado.id,
-        'numero_wex': chamado.numero_wex,
-        'titulo': f"Chamado {chamado.numero_wex}",
-        'descricao': chamado.descricao,
-        'cliente_solicitante': chamado.cliente_solicitante,
-        'criticidade': chamado.criticidade.value if chamado.criticidade else 'Média',
-        'status': chamado.status.value if chamado.status else 'Aberto',
-        'data_criacao': chamado.data_criacao.isoformat() if chamado.data_criacao else None,
-        'anexos_count': 0
-    }
-    
-    # Executar triagem com IA
-    resultado_triagem = wex_ai.realizar_triagem(chamado_dict)
+    # Reaproveita a triagem feita pelo analista instantes antes (mesmo conteúdo e configuração)
+    resultado_triagem, registro, reaproveitada = obter_triagem(db, chamado)
     
     # Aplicar mudanças apenas se a decisão for "aprovado" ou "revisao"
     if resultado_triagem.decisao in ["aprovado", "revisao"]:
-        criticidade_anterior = chamado.criticidade.value if chamado.criticidade else 'Média'
+        criticidade_anterior = chamado.criticidade or 'Média'
         
-        # Mapear criticidade sugerida para enum
-        criticidade_map = {
-            'Baixa': CriticidadeChamado.BAIXA,
-            'Média': CriticidadeChamado.MEDIA,
-            'Alta': CriticidadeChamado.ALTA,
-            'Crítica': CriticidadeChamado.CRITICA
-        }
-        
-        nova_criticidade = criticidade_map.get(resultado_triagem.criticidade_sugerida, CriticidadeChamado.MEDIA)
+        # Criticidade sugerida validada contra o enum
+        criticidades_validas = {c.value for c in CriticidadeChamado}
+        nova_criticidade = resultado_triagem.criticidade_sugerida
+        if nova_criticidade not in criticidades_validas:
+            nova_criticidade = CriticidadeChamado.MEDIA.value
         
         # Aplicar mudanças
         chamado.criticidade = nova_criticidade
         chamado.score_qualidade = resultado_triagem.score_total
         if resultado_triagem.tags_sugeridas:
-            chamado.tags_automaticas = resultado_triagem.tags_sugeridas
+            chamado.tags_automaticas = json.dumps(resultado_triagem.tags_sugeridas, ensure_ascii=False)
+        if registro is not None:
+            registro.aplicada = True
         
         # Adicionar observação da IA
         observacao_ia = f"Triagem IA: Score {resultado_triagem.score_total}/100, Decisão: {resultado_triagem.decisao}"
@@ -649,6 +845,19 @@ async def aplicar_triagem(chamado_id: int, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(chamado)
         
+        # A criticidade entra nos histogramas diários do relatório de padrões
+        background_tasks.add_task(registrar_padrao_em_background, chamado_id)
+        
+        publicar_evento(EVENTO_TRIAGEM_APLICADA, {
+            "chamado_id": chamado_id,
+            "decisao": resultado_triagem.decisao,
+            "score_total": resultado_triagem.score_total
+        })
+        publicar_evento(EVENTO_CHAMADO_ATUALIZADO, {
+            "chamado_id": chamado_id,
+            "campos": ["criticidade", "score_qualidade", "tags_automaticas"]
+        })
+        
         return {
             "success": True,
             "chamado_id": chamado_id,
@@ -657,13 +866,15 @@ async def aplicar_triagem(chamado_id: int, db: Session = Depends(get_db)):
             "mudancas": {
                 "criticidade": {
                     "anterior": criticidade_anterior,
-                    "nova": nova_criticidade.value
+                    "nova": nova_criticidade
                 },
                 "score_qualidade": resultado_triagem.score_total,
                 "tags_adicionadas": resultado_triagem.tags_sugeridas
             },
             "motivos": resultado_triagem.motivos,
-            "tempo_processamento": resultado_triagem.tempo_processamento_ms
+            "tempo_processamento": resultado_triagem.tempo_processamento_ms,
+            "triagem_id": registro.id if registro else None,
+            "triagem_reaproveitada": reaproveitada
         }
     else:
         return {
@@ -673,37 +884,51 @@ async def aplicar_triagem(chamado_id: int, db: Session = Depends(get_db)):
             "score_final": resultado_triagem.score_total,
             "motivo_recusa": "Chamado não atende aos critérios mínimos de qualidade",
             "sugestoes_melhoria": resultado_triagem.sugestoes,
-            "score_necessario": 50
+            "score_necessario": get_config_manager().get_threshold('revisao_humana'),
+            "triagem_id": registro.id if registro else None,
+            "triagem_reaproveitada": reaproveitada
         }
 
+@app.post("/api/config/simular", response_model=dict)
+def simular_configuracao(
+    candidata: dict,
+    limite_exemplos: int = Query(default=100, ge=0, le=5000, description="Chamados que mudam de decisão listados"),
+    db: Session = Depends(get_db)
+):
+    """
+    Simula thresholds e pesos candidatos sobre todo o histórico sem alterar triagem_config.json
+
+    Usa a matriz de scores por categoria, construída e atualizada em background
+    (só os chamados novos ou alterados são recalculados). Enquanto não há matriz
+    para os critérios atuais, responde 503 com Retry-After.
+    """
+    try:
+        return simular_config(db, candidata, limite_exemplos, aguardar_matriz=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except MatrizEmConstrucao as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
 # ====== SISTEMA DE SUGESTÕES DE FOLLOW-UP ======
 
+LIMITE_SIMILARES_SUGESTOES = 20  # Chamados similares usados como contexto das sugestões
+
 def analisar_contexto_chamado(chamado: Chamado, db: Session) -> Dict[str, Any]:
-    """Analisa o contexto do chamado para sugerir follow-ups apropriados"""
-    
-    # Buscar follow-ups existentes do chamado
-    followups_existentes = db.query(FollowUp).filter(
-        FollowUp.chamado_id == chamado.id
-    ).order_by(FollowUp.data_criacao.desc()).all()
-    
-    # Analisar padrão de follow-ups
-    tipos_existentes = [f.tipo for f in followups_existentes]
+    """Analisa o contexto do chamado para sugerir follow-ups apropriados (resumo de follow-ups do próprio chamado)"""
     
     # Tempo desde último follow-up
     tempo_desde_ultimo = None
-    if followups_existentes:
-        ultimo_followup = followups_existentes[0]
-        tempo_desde_ultimo = (datetime.now() - ultimo_followup.data_criacao).total_seconds() / 3600  # horas
+    if chamado.ultimo_followup_em:
+        tempo_desde_ultimo = (datetime.now() - chamado.ultimo_followup_em).total_seconds() / 3600  # horas
     
     # Tempo desde criação do chamado
     tempo_desde_criacao = (datetime.now() - chamado.data_criacao).total_seconds() / 3600  # horas
     
     return {
-        'followups_existentes': followups_existentes,
-        'tipos_existentes': tipos_existentes,
+        'tipos_existentes': chamado.tipos_followup_list,
         'tempo_desde_ultimo': tempo_desde_ultimo,
         'tempo_desde_criacao': tempo_desde_criacao,
-        'total_followups': len(followups_existentes)
+        'total_followups': chamado.total_followups
     }
 
 def gerar_sugestoes_followup(chamado: Chamado, contexto: Dict[str, Any]) -> Dict[str, Any]:
@@ -807,55 +1032,124 @@ def gerar_sugestoes_followup(chamado: Chamado, contexto: Dict[str, Any]) -> Dict
         'prioridade': prioridade
     }
 
-def buscar_followups_similares(chamado: Chamado, db: Session, limit: int = 5) -> List[Dict[str, Any]]:
-    """Busca follow-ups de chamados similares para sugerir baseado no histórico"""
+def carregar_followups_por_chamado(db: Session, chamado_ids: List[int], por_chamado: int) -> Dict[int, List[Dict[str, str]]]:
+    """
+    Primeiros follow-ups de cada chamado, em uma única consulta
+
+    ROW_NUMBER() por chamado (ordem de criação) limita a quantidade de cada um
+    no próprio SQL; chamados sem follow-ups ficam fora do dict.
+    """
+    if not chamado_ids:
+        return {}
+    numero = func.row_number().over(
+        partition_by=FollowUp.chamado_id, order_by=(FollowUp.data_criacao, FollowUp.id)
+    ).label("numero")
+    janela = db.query(FollowUp.chamado_id, FollowUp.tipo, FollowUp.descricao, numero).filter(
+        FollowUp.chamado_id.in_(chamado_ids)
+    ).subquery()
+    linhas = db.query(janela.c.chamado_id, janela.c.tipo, janela.c.descricao).filter(
+        janela.c.numero <= por_chamado
+    ).order_by(janela.c.chamado_id, janela.c.numero)
+    
+    followups = {}
+    for chamado_id, tipo, descricao in linhas:
+        followups.setdefault(chamado_id, []).append({
+            'tipo': tipo,
+            'descricao': descricao[:100] + "..." if len(descricao) > 100 else descricao
+        })
+    return followups
+
+def montar_sugestoes_followup(db: Session, chamado: Chamado,
+                              background_tasks: Optional[BackgroundTasks] = None) -> Dict[str, Any]:
+    """Sugestões de follow-up para um chamado já carregado (usadas também pelo detalhe completo)"""
+    # Chamados similares para contexto (vizinhos pré-calculados ou pontuação contra o corpus)
+    if background_tasks is not None and not vizinhanca_atualizada(db, chamado):
+        # Vizinhança ausente ou desatualizada: recalcular em background para as próximas leituras
+        background_tasks.add_task(atualizar_vizinhanca_em_background, chamado.id)
+    scores = dict(selecionar_similares(db, chamado, LIMITE_SIMILARES_SUGESTOES))
+    linhas = db.query(
+        Chamado.id, Chamado.numero_wex, Chamado.descricao, Chamado.cliente_solicitante,
+        Chamado.criticidade, Chamado.status, Chamado.total_followups
+    ).filter(Chamado.id.in_(list(scores))).all() if scores else []
+    chamados_similares = sorted(
+        (
+            {
+                'id': c.id,
+                'numero_wex': c.numero_wex,
+                'descricao': c.descricao,
+                'cliente_solicitante': c.cliente_solicitante,
+                'criticidade': c.criticidade,
+                'status': c.status,
+                'score_similaridade': scores[c.id],
+                'total_followups': c.total_followups
+            } for c in linhas
+        ),
+        key=lambda c: c['score_similaridade'], reverse=True
+    )
     
-    # Buscar chamados com descrições similares (palavras-chave)
-    palavras_chave = set(re.findall(r'\b\w{4,}\b', chamado.descricao.lower()))
+    # Gerar sugestões com IA
+    sugestoes_ia = wex_ai.gerar_sugestoes_followup(chamado_para_ia(chamado), chamados_similares)
     
-    chamados_similares = db.query(Chamado).filter(
-        and_(
-            Chamado.id != chamado.id,
-            Chamado.status == StatusChamado.RESOLVIDO  # Apenas chamados resolvidos
-        )
-    ).limit(50).all()  # Buscar mais para filtrar depois
+    # Calcular tempo desde criação e último follow-up
+    agora = datetime.now()
+    tempo_desde_criacao = int((agora - chamado.data_criacao).total_seconds() / 3600) if chamado.data_criacao else 0
+    tempo_desde_ultimo = 0
+    if chamado.ultimo_followup_em:
+        tempo_desde_ultimo = int((agora - chamado.ultimo_followup_em).total_seconds() / 3600)
+    
+    # Exemplos: os 3 similares mais próximos que têm follow-ups, com os 2 primeiros de cada (uma consulta)
+    com_followups = [similar for similar in chamados_similares if similar['total_followups']][:3]
+    followups_exemplos = carregar_followups_por_chamado(db, [similar['id'] for similar in com_followups], por_chamado=2)
+    exemplos_historico = [
+        {
+            'chamado_numero': similar['numero_wex'],
+            'cliente': similar['cliente_solicitante'],
+            'similaridade': round(similar['score_similaridade'], 3),
+            'followups': followups_exemplos[similar['id']]
+        }
+        for similar in com_followups if similar['id'] in followups_exemplos
+    ]
     
-    # Calcular similaridade baseada em palavras-chave
-    candidatos = []
-    for c in chamados_similares:
-        palavras_candidato = set(re.findall(r'\b\w{4,}\b', c.descricao.lower()))
-        intersecao = palavras_chave.intersection(palavras_candidato)
-        
-        if len(intersecao) >= 2:  # Pelo menos 2 palavras em comum
-            score = len(intersecao) / len(palavras_chave.union(palavras_candidato))
-            candidatos.append({
-                'chamado': c,
-                'score': score,
-                'palavras_comuns': list(intersecao)
-            })
-    
-    # Ordenar por score e pegar os melhores
-    candidatos.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Buscar follow-ups dos chamados similares
-    followups_exemplos = []
-    for candidato in candidatos[:limit]:
-        followups = db.query(FollowUp).filter(
-            FollowUp.chamado_id == candidato['chamado'].id
-        ).order_by(FollowUp.data_criacao).all()
-        
-        if followups:
-            followups_exemplos.append({
-                'chamado_similar_id': candidato['chamado'].id,
-                'score_similaridade': candidato['score'],
-                'palavras_comuns': candidato['palavras_comuns'],
-                'followups': [{'tipo': f.tipo.value, 'descricao': f.descricao[:100]} for f in followups]
-            })
+    # Determinar próximo tipo sugerido baseado na IA
+    proximo_tipo = "Análise"  # Default
+    if sugestoes_ia:
+        primeiro_tipo = sugestoes_ia[0].tipo
+        if primeiro_tipo in ["Análise", "Comunicação", "Teste", "Resolução"]:
+            proximo_tipo = primeiro_tipo
     
-    return followups_exemplos
+    return {
+        "id_chamado": chamado.id,
+        "sugestoes": [
+            {
+                "titulo": s.titulo,
+                "descricao": s.descricao,
+                "tipo": s.tipo,
+                "confianca": s.confianca,
+                "motivo": s.motivo
+            } for s in sugestoes_ia
+        ],
+        "proximo_tipo_sugerido": proximo_tipo,
+        "prioridade": "Alta" if str(chamado.criticidade) in ["Alta", "Crítica"] else "Média",
+        "contexto": {
+            "status_atual": chamado.status.value if hasattr(chamado.status, 'value') else str(chamado.status),
+            "criticidade": chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
+            "tempo_desde_criacao_horas": tempo_desde_criacao,
+            "tempo_desde_ultimo_followup_horas": tempo_desde_ultimo,
+            "total_followups_existentes": chamado.total_followups
+        },
+        "exemplos_historico": exemplos_historico,
+        "tipos_followup_existentes": chamado.tipos_followup_list,
+        "metadados_ia": {
+            "sugestoes_geradas": len(sugestoes_ia),
+            "contexto_usado": len(chamados_similares),
+            "modelo_usado": "wex-ai-engine",
+            "tempo_processamento": 0.1,
+            "confianca_analise": sum(s.confianca for s in sugestoes_ia) / len(sugestoes_ia) if sugestoes_ia else 0
+        }
+    }
 
 @app.get("/api/chamados/{chamado_id}/sugestoes-followup", response_model=dict)
-async def sugestoes_followup(chamado_id: int, db: Session = Depends(get_db)):
+async def sugestoes_followup(chamado_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Gera sugestões inteligentes para próximos follow-ups usando IA real"""
     
     try:
@@ -864,103 +1158,7 @@ async def sugestoes_followup(chamado_id: int, db: Session = Depends(get_db)):
         if not chamado:
             raise HTTPException(status_code=404, detail="Chamado não encontrado")
         
-        # Buscar follow-ups existentes do chamado
-        followups_existentes = db.query(FollowUp).filter(
-            FollowUp.chamado_id == chamado.id
-        ).order_by(FollowUp.data_criacao.desc()).all()
-        
-        # Buscar chamados similares para contexto
-        todos_chamados = db.query(Chamado).filter(Chamado.id != chamado_id).all()
-        chamados_similares = []
-        for c in todos_chamados[:20]:  # Limitar para performance
-            chamados_similares.append({
-                'id': c.id,
-                'numero_wex': c.numero_wex,
-                'descricao': c.descricao,
-                'cliente_solicitante': c.cliente_solicitante,
-                'criticidade': c.criticidade.value if hasattr(c.criticidade, 'value') else str(c.criticidade),
-                'status': c.status.value if hasattr(c.status, 'value') else str(c.status)
-            })
-        
-        # Converter chamado para dict
-        chamado_dict = {
-            'id': chamado.id,
-            'numero_wex': chamado.numero_wex,
-            'titulo': f"Chamado {chamado.numero_wex}",
-            'descricao': chamado.descricao,
-            'cliente_solicitante': chamado.cliente_solicitante,
-            'criticidade': chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
-            'status': chamado.status.value if hasattr(chamado.status, 'value') else str(chamado.status),
-            'data_criacao': chamado.data_criacao.isoformat() if chamado.data_criacao else None
-        }
-        
-        # Gerar sugestões com IA
-        sugestoes_ia = wex_ai.gerar_sugestoes_followup(chamado_dict, chamados_similares)
-        
-        # Calcular tempo desde criação e último follow-up
-        agora = datetime.now()
-        tempo_desde_criacao = int((agora - chamado.data_criacao).total_seconds() / 3600) if chamado.data_criacao else 0
-        tempo_desde_ultimo = 0
-        if followups_existentes:
-            tempo_desde_ultimo = int((agora - followups_existentes[0].data_criacao).total_seconds() / 3600)
-        
-        # Buscar exemplos similares
-        exemplos_historico = []
-        if chamados_similares:
-            for similar in chamados_similares[:3]:
-                followups_similares = db.query(FollowUp).filter(
-                    FollowUp.chamado_id == similar['id']
-                ).limit(2).all()
-                if followups_similares:
-                    exemplos_historico.append({
-                        'chamado_numero': similar['numero_wex'],
-                        'cliente': similar['cliente_solicitante'],
-                        'similaridade': 0.75,  # Score simulado
-                        'followups': [
-                            {
-                                'tipo': f.tipo.value if hasattr(f.tipo, 'value') else str(f.tipo),
-                                'descricao': f.descricao[:100] + "..." if len(f.descricao) > 100 else f.descricao
-                            } for f in followups_similares
-                        ]
-                    })
-        
-        # Determinar próximo tipo sugerido baseado na IA
-        proximo_tipo = "Análise"  # Default
-        if sugestoes_ia:
-            primeiro_tipo = sugestoes_ia[0].tipo
-            if primeiro_tipo in ["Análise", "Comunicação", "Teste", "Resolução"]:
-                proximo_tipo = primeiro_tipo
-        
-        return {
-            "id_chamado": chamado_id,
-            "sugestoes": [
-                {
-                    "titulo": s.titulo,
-                    "descricao": s.descricao,
-                    "tipo": s.tipo,
-                    "confianca": s.confianca,
-                    "motivo": s.motivo
-                } for s in sugestoes_ia
-            ],
-            "proximo_tipo_sugerido": proximo_tipo,
-            "prioridade": "Alta" if str(chamado.criticidade) in ["Alta", "Crítica"] else "Média",
-            "contexto": {
-                "status_atual": chamado.status.value if hasattr(chamado.status, 'value') else str(chamado.status),
-                "criticidade": chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
-                "tempo_desde_criacao_horas": tempo_desde_criacao,
-                "tempo_desde_ultimo_followup_horas": tempo_desde_ultimo,
-                "total_followups_existentes": len(followups_existentes)
-            },
-            "exemplos_historico": exemplos_historico,
-            "tipos_followup_existentes": [f.tipo.value if hasattr(f.tipo, 'value') else str(f.tipo) for f in followups_existentes],
-            "metadados_ia": {
-                "sugestoes_geradas": len(sugestoes_ia),
-                "contexto_usado": len(chamados_similares),
-                "modelo_usado": "wex-ai-engine",
-                "tempo_processamento": 0.1,
-                "confianca_analise": sum(s.confianca for s in sugestoes_ia) / len(sugestoes_ia) if sugestoes_ia else 0
-            }
-        }
+        return montar_sugestoes_followup(db, chamado, background_tasks)
         
     except Exception as e:
         logger.error(f"Erro ao gerar sugestões: {str(e)}")
@@ -1025,6 +1223,12 @@ async def criar_followup_sugerido(
     db.commit()
     db.refresh(novo_followup)
     
+    publicar_evento(EVENTO_FOLLOWUP_CRIADO, {
+        "chamado_id": chamado_id,
+        "followup_id": novo_followup.id,
+        "tipo": novo_followup.tipo
+    })
+    
     return {
         "success": True,
         "followup_criado": {
@@ -1038,171 +1242,84 @@ async def criar_followup_sugerido(
 
 # ====== SISTEMA DE RELACIONAMENTO ENTRE CHAMADOS ======
 
-def extrair_features_textuais(texto: str) -> Dict[str, Any]:
-    """Extrai features de um texto para comparação"""
-    texto_lower = texto.lower()
-    
-    # Remover stopwords básicas
-    stopwords = {
-        'o', 'a', 'os', 'as', 'um', 'uma', 'uns', 'umas', 'de', 'do', 'da', 'dos', 'das',
-        'e', 'ou', 'mas', 'se', 'que', 'com', 'por', 'para', 'em', 'no', 'na', 'nos', 'nas',
-        'é', 'são', 'foi', 'foram', 'ser', 'estar', 'tem', 'ter', 'não', 'sim'
-    }
-    
-    # Extrair palavras significativas
-    palavras = set(re.findall(r'\b\w{3,}\b', texto_lower))
-    palavras_significativas = palavras - stopwords
-    
-    # Extrair termos técnicos (palavras com maiúsculas, números, etc.)
-    termos_tecnicos = set(re.findall(r'\b[A-Z][a-zA-Z]*\b|\b\w*\d+\w*\b', texto))
-    
-    # Extrair códigos de erro
-    codigos_erro = set(re.findall(r'erro\s*\d+|error\s*\d+|\d{3,5}', texto_lower))
+def montar_chamados_relacionados(db: Session, chamado_principal: Chamado, limite: int, score_minimo: float,
+                                 tempo_real: bool = False,
+                                 background_tasks: Optional[BackgroundTasks] = None) -> Dict[str, Any]:
+    """
+    Chamados relacionados a um chamado já carregado (síncrono: CPU intensivo sem vizinhos pré-calculados)
+    
+    Usado pelo endpoint de relacionados e pelo detalhe completo, sempre fora do event loop.
+    """
+    chamado_id = chamado_principal.id
+    if not tempo_real and vizinhanca_atualizada(db, chamado_principal):
+        # Vizinhos pré-calculados: uma leitura indexada
+        resultado_ia = buscar_vizinhos_precomputados(db, chamado_id, limite, score_minimo)
+        buscas_relacionados.inc(origem="precomputado")
+    else:
+        # Vizinhança ausente ou desatualizada: recalcular em background para as próximas leituras
+        if not tempo_real and background_tasks is not None:
+            background_tasks.add_task(atualizar_vizinhanca_em_background, chamado_id)
+        
+        # Buscar todos os outros chamados (exceto o atual)
+        outros_chamados = db.query(Chamado).filter(
+            Chamado.id != chamado_id
+        ).all()
+        
+        # Usar IA real para encontrar chamados similares
+        buscas_relacionados.inc(origem="tempo_real")
+        resultado_ia = wex_ai.encontrar_chamados_similares(
+            chamado_principal=chamado_principal,
+            outros_chamados=outros_chamados,
+            limite=limite,
+            score_minimo=score_minimo
+        )
     
-    # Extrair mensagens de erro (texto entre aspas)
-    mensagens_erro = set(re.findall(r'"([^"]*)"', texto))
+    # Formatar resultados para o frontend
+    chamados_similares = []
+    for chamado_similar in resultado_ia.chamados_similares:
+        chamados_similares.append({
+            'id': chamado_similar['id'],
+            'numero_wex': chamado_similar['numero_wex'],
+            'cliente': chamado_similar['cliente'],
+            'descricao': chamado_similar['descricao'][:200] + "..." if len(chamado_similar['descricao']) > 200 else chamado_similar['descricao'],
+            'status': chamado_similar['status'],
+            'criticidade': chamado_similar['criticidade'],
+            'data_criacao': chamado_similar['data_criacao'],
+            'score_similaridade': chamado_similar['score_similaridade'],
+            'motivos': chamado_similar['motivos'],
+            'detalhes_scores': chamado_similar['detalhes_scores']
+        })
     
     return {
-        'palavras_significativas': palavras_significativas,
-        'termos_tecnicos': termos_tecnicos,
-        'codigos_erro': codigos_erro,
-        'mensagens_erro': mensagens_erro,
-        'tamanho_texto': len(texto),
-        'num_palavras': len(palavras)
+        "id_chamado": chamado_id,
+        "chamado_principal": {
+            "numero_wex": chamado_principal.numero_wex,
+            "cliente": chamado_principal.cliente_solicitante,
+            "descricao": chamado_principal.descricao[:200] + "..." if len(chamado_principal.descricao) > 200 else chamado_principal.descricao,
+            "status": chamado_principal.status.value if hasattr(chamado_principal.status, 'value') else str(chamado_principal.status),
+            "criticidade": chamado_principal.criticidade.value if hasattr(chamado_principal.criticidade, 'value') else str(chamado_principal.criticidade)
+        },
+        "chamados_similares": chamados_similares,
+        "total_encontrados": resultado_ia.total_encontrados,
+        "padroes_identificados": resultado_ia.padroes_identificados,
+        "parametros_busca": {
+            "score_minimo": score_minimo,
+            "limite": limite
+        },
+        "metadados_ia": {
+            "modelo_usado": resultado_ia.modelo_usado,
+            "tempo_processamento": resultado_ia.tempo_processamento,
+            "confianca_analise": resultado_ia.confianca_analise
+        }
     }
 
-def calcular_similaridade_chamados(chamado1: Chamado, chamado2: Chamado) -> Dict[str, float]:
-    """Calcula similaridade entre dois chamados"""
-    
-    # Extrair features de ambos os chamados
-    features1 = extrair_features_textuais(chamado1.descricao)
-    features2 = extrair_features_textuais(chamado2.descricao)
-    
-    scores = {}
-    
-    # Similaridade de palavras significativas (Jaccard)
-    palavras1 = features1['palavras_significativas']
-    palavras2 = features2['palavras_significativas']
-    if palavras1 or palavras2:
-        intersecao = len(palavras1.intersection(palavras2))
-        uniao = len(palavras1.union(palavras2))
-        scores['palavras'] = intersecao / uniao if uniao > 0 else 0
-    else:
-        scores['palavras'] = 0
-    
-    # Similaridade de termos técnicos
-    tecnicos1 = features1['termos_tecnicos']
-    tecnicos2 = features2['termos_tecnicos']
-    if tecnicos1 or tecnicos2:
-        intersecao_tec = len(tecnicos1.intersection(tecnicos2))
-        uniao_tec = len(tecnicos1.union(tecnicos2))
-        scores['termos_tecnicos'] = intersecao_tec / uniao_tec if uniao_tec > 0 else 0
-    else:
-        scores['termos_tecnicos'] = 0
-    
-    # Similaridade de códigos de erro
-    erros1 = features1['codigos_erro']
-    erros2 = features2['codigos_erro']
-    scores['codigos_erro'] = 1.0 if erros1.intersection(erros2) else 0
-    
-    # Similaridade de mensagens de erro
-    msgs1 = features1['mensagens_erro']
-    msgs2 = features2['mensagens_erro']
-    scores['mensagens_erro'] = 1.0 if msgs1.intersection(msgs2) else 0
-    
-    # Similaridade de cliente
-    scores['cliente'] = 1.0 if chamado1.cliente_solicitante.lower() == chamado2.cliente_solicitante.lower() else 0
-    
-    # Similaridade de criticidade
-    scores['criticidade'] = 1.0 if chamado1.criticidade == chamado2.criticidade else 0
-    
-    # Score final ponderado
-    peso_palavras = 0.3
-    peso_tecnicos = 0.2
-    peso_erros = 0.2
-    peso_mensagens = 0.15
-    peso_cliente = 0.1
-    peso_criticidade = 0.05
-    
-    score_final = (
-        scores['palavras'] * peso_palavras +
-        scores['termos_tecnicos'] * peso_tecnicos +
-        scores['codigos_erro'] * peso_erros +
-        scores['mensagens_erro'] * peso_mensagens +
-        scores['cliente'] * peso_cliente +
-        scores['criticidade'] * peso_criticidade
-    )
-    
-    scores['score_final'] = score_final
-    
-    return scores
-
-def identificar_padroes_chamados(chamados_similares: List[Chamado]) -> List[str]:
-    """Identifica padrões comuns em um grupo de chamados similares"""
-    padroes = []
-    
-    if len(chamados_similares) < 2:
-        return padroes
-    
-    # Análise de clientes
-    clientes = [c.cliente_solicitante for c in chamados_similares]
-    cliente_counts = Counter(clientes)
-    cliente_mais_comum = cliente_counts.most_common(1)[0]
-    if cliente_mais_comum[1] > 1:
-        padroes.append(f"Múltiplos chamados do cliente: {cliente_mais_comum[0]}")
-    
-    # Análise de criticidade
-    criticidades = [c.criticidade for c in chamados_similares]
-    criticidade_counts = Counter(criticidades)
-    crit_mais_comum = criticidade_counts.most_common(1)[0]
-    if crit_mais_comum[1] / len(chamados_similares) > 0.6:
-        padroes.append(f"Padrão de criticidade: {crit_mais_comum[0].value}")
-    
-    # Análise temporal
-    datas = [c.data_criacao for c in chamados_similares]
-    datas_ordenadas = sorted(datas)
-    if len(datas_ordenadas) >= 3:
-        # Verificar se há concentração temporal
-        primeira = datas_ordenadas[0]
-        ultima = datas_ordenadas[-1]
-        diferenca_total = (ultima - primeira).days
-        
-        if diferenca_total <= 7:
-            padroes.append("Chamados concentrados em período de 7 dias")
-        elif diferenca_total <= 30:
-            padroes.append("Chamados concentrados em período de 30 dias")
-    
-    # Análise de termos técnicos comuns
-    todos_termos = []
-    for chamado in chamados_similares:
-        features = extrair_features_textuais(chamado.descricao)
-        todos_termos.extend(features['termos_tecnicos'])
-    
-    if todos_termos:
-        termo_counts = Counter(todos_termos)
-        termos_frequentes = [termo for termo, count in termo_counts.items() if count > 1]
-        if termos_frequentes:
-            padroes.append(f"Termos técnicos recorrentes: {', '.join(termos_frequentes[:3])}")
-    
-    # Análise de códigos de erro
-    todos_erros = []
-    for chamado in chamados_similares:
-        features = extrair_features_textuais(chamado.descricao)
-        todos_erros.extend(features['codigos_erro'])
-    
-    if todos_erros:
-        erro_counts = Counter(todos_erros)
-        erros_recorrentes = [erro for erro, count in erro_counts.items() if count > 1]
-        if erros_recorrentes:
-            padroes.append(f"Códigos de erro recorrentes: {', '.join(erros_recorrentes)}")
-    
-    return padroes
-
 @app.get("/api/chamados/{chamado_id}/relacionados", response_model=dict)
 async def buscar_chamados_relacionados(
     chamado_id: int, 
+    background_tasks: BackgroundTasks,
     limite: int = Query(default=10, le=50),
     score_minimo: float = Query(default=0.3, ge=0.0, le=1.0),
+    tempo_real: bool = Query(default=False, description="Ignorar vizinhos pré-calculados e calcular na hora"),
     db: Session = Depends(get_db)
 ):
     """Busca chamados relacionados/similares ao chamado especificado usando IA real"""
@@ -1213,58 +1330,11 @@ async def buscar_chamados_relacionados(
         if not chamado_principal:
             raise HTTPException(status_code=404, detail="Chamado não encontrado")
         
-        # Buscar todos os outros chamados (exceto o atual)
-        outros_chamados = db.query(Chamado).filter(
-            Chamado.id != chamado_id
-        ).all()
-        
-        # Usar IA real para encontrar chamados similares
-        resultado_ia = wex_ai.encontrar_chamados_similares(
-            chamado_principal=chamado_principal,
-            outros_chamados=outros_chamados,
-            limite=limite,
-            score_minimo=score_minimo
+        # Fora do event loop: consultas e similaridade podem ser custosas
+        return await run_in_threadpool(
+            montar_chamados_relacionados, db, chamado_principal, limite, score_minimo, tempo_real, background_tasks
         )
         
-        # Formatar resultados para o frontend
-        chamados_similares = []
-        for chamado_similar in resultado_ia.chamados_similares:
-            chamados_similares.append({
-                'id': chamado_similar['id'],
-                'numero_wex': chamado_similar['numero_wex'],
-                'cliente': chamado_similar['cliente'],
-                'descricao': chamado_similar['descricao'][:200] + "..." if len(chamado_similar['descricao']) > 200 else chamado_similar['descricao'],
-                'status': chamado_similar['status'],
-                'criticidade': chamado_similar['criticidade'],
-                'data_criacao': chamado_similar['data_criacao'],
-                'score_similaridade': chamado_similar['score_similaridade'],
-                'motivos': chamado_similar['motivos'],
-                'detalhes_scores': chamado_similar['detalhes_scores']
-            })
-        
-        return {
-            "id_chamado": chamado_id,
-            "chamado_principal": {
-                "numero_wex": chamado_principal.numero_wex,
-                "cliente": chamado_principal.cliente_solicitante,
-                "descricao": chamado_principal.descricao[:200] + "..." if len(chamado_principal.descricao) > 200 else chamado_principal.descricao,
-                "status": chamado_principal.status.value if hasattr(chamado_principal.status, 'value') else str(chamado_principal.status),
-                "criticidade": chamado_principal.criticidade.value if hasattr(chamado_principal.criticidade, 'value') else str(chamado_principal.criticidade)
-            },
-            "chamados_similares": chamados_similares,
-            "total_encontrados": resultado_ia.total_encontrados,
-            "padroes_identificados": resultado_ia.padroes_identificados,
-            "parametros_busca": {
-                "score_minimo": score_minimo,
-                "limite": limite
-            },
-            "metadados_ia": {
-                "modelo_usado": resultado_ia.modelo_usado,
-                "tempo_processamento": resultado_ia.tempo_processamento,
-                "confianca_analise": resultado_ia.confianca_analise
-            }
-        }
-        
     except Exception as e:
         logger.error(f"Erro na busca de chamados relacionados: {str(e)}")
         # Fallback para resposta com erro
@@ -1300,80 +1370,178 @@ async def buscar_chamados_relacionados(
             logger.error(f"Erro crítico no endpoint relacionados: {str(e2)}")
             raise HTTPException(status_code=500, detail=f"Erro interno: {str(e2)}")
 
-@app.get("/api/relatorios/padroes-ia")
-async def relatorio_padroes_ia(
-    dias: int = Query(default=30, ge=1, le=365),
+# ====== DETALHE COMPLETO DO CHAMADO ======
+
+SECOES_CHAMADO_COMPLETO = ("followups", "triagem", "relacionados", "sugestoes")
+
+def _executar_com_sessao(funcao: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """Executa uma seção do detalhe com sessão própria (Session não é compartilhável entre threads)"""
+    db = SessionLocal()
+    try:
+        return funcao(db, *args)
+    finally:
+        db.close()
+
+async def _calcular_secao(nome: str, funcao: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """Calcula uma seção em thread; uma falha vira {"erro": ...} sem derrubar as demais"""
+    try:
+        return await run_in_threadpool(funcao, *args)
+    except Exception as e:
+        logger.error(f"Erro na seção '{nome}' do detalhe completo: {str(e)}")
+        return {"erro": str(e)}
+
+@app.get("/chamados/{chamado_id}/completo", response_model=dict)
+async def obter_chamado_completo(
+    chamado_id: int,
+    background_tasks: BackgroundTasks,
+    include: str = Query("followups", description="Seções: followups,triagem,relacionados,sugestoes"),
+    limite_relacionados: int = Query(default=10, ge=1, le=50),
+    score_minimo: float = Query(default=0.3, ge=0.0, le=1.0),
     db: Session = Depends(get_db)
 ):
-    """Gera relatório de padrões identificados pela IA real"""
+    """
+    Chamado com as seções pedidas em uma única requisição
+    
+    O chamado é carregado uma vez; triagem, relacionados e sugestões são
+    calculados em paralelo, cada um em uma thread com sessão própria.
+    """
+    secoes = interpretar_campos([include])
+    invalidas = [secao for secao in secoes if secao not in SECOES_CHAMADO_COMPLETO]
+    if invalidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Seções inválidas: {', '.join(invalidas)}. Disponíveis: {', '.join(SECOES_CHAMADO_COMPLETO)}"
+        )
+    
+    chamado = db.query(Chamado).filter(Chamado.id == chamado_id).first()
+    if not chamado:
+        raise HTTPException(status_code=404, detail="Chamado não encontrado")
+    
+    # total_followups vem do resumo no próprio chamado; a seção followups carrega a lista
+    resposta = chamado.to_dict()
+    if "followups" in secoes:
+        followups = sorted(chamado.followups, key=lambda f: f.data_criacao or datetime.min, reverse=True)
+        resposta["followups"] = [followup.to_dict() for followup in followups]
+    
+    # Desanexado, o chamado é só leitura nas threads (sem lazy loads na sessão da requisição)
+    db.expunge(chamado)
+    
+    tarefas = {}
+    if "triagem" in secoes:
+        tarefas["triagem"] = _calcular_secao("triagem", _executar_com_sessao, montar_triagem_chamado, chamado)
+    if "relacionados" in secoes:
+        tarefas["relacionados"] = _calcular_secao(
+            "relacionados", _executar_com_sessao, montar_chamados_relacionados,
+            chamado, limite_relacionados, score_minimo, False, background_tasks
+        )
+    if "sugestoes" in secoes:
+        tarefas["sugestoes"] = _calcular_secao("sugestoes", _executar_com_sessao, montar_sugestoes_followup, chamado,
+                                               background_tasks)
+    
+    for nome, resultado in zip(tarefas, await asyncio.gather(*tarefas.values())):
+        resposta[nome] = resultado
+    
+    return resposta
+
+def _resposta_sem_dados(periodo_inicio: datetime) -> Dict[str, Any]:
+    """Resposta do relatório de padrões quando não há chamados no período"""
+    return {
+        "periodo_inicio": periodo_inicio,
+        "periodo_fim": datetime.now(),
+        "total_chamados": 0,
+        "padroes_globais": [],
+        "grupos_similares": [],
+        "distribuicao_criticidade": {},
+        "clientes_mais_ativos": [],
+        "insights_ia": [],
+        "resumo": "Nenhum chamado encontrado no período especificado",
+        "metadados_ia": {
+            "modelo_usado": "sem_dados",
+            "tempo_processamento": 0,
+            "confianca_analise": 0
+        }
+    }
+
+def _resposta_relatorio_padroes(periodo_inicio: datetime, total_chamados: int, dist_criticidade: Dict[str, int],
+                                clientes_ativos: List, resultado_ia) -> Dict[str, Any]:
+    """Formata a resposta do relatório de padrões"""
+    return {
+        "periodo_inicio": periodo_inicio,
+        "periodo_fim": datetime.now(),
+        "total_chamados": total_chamados,
+        "total_grupos_similares": resultado_ia.total_grupos_similares,
+        "padroes_globais": resultado_ia.padroes_globais,
+        "grupos_similares": resultado_ia.grupos_similares,
+        "distribuicao_criticidade": {crit: count for crit, count in dist_criticidade.items()},
+        "clientes_mais_ativos": [{"cliente": cliente, "total_chamados": count} for cliente, count in clientes_ativos],
+        "insights_ia": resultado_ia.insights_ia,
+        "tendencias": resultado_ia.tendencias,
+        "recomendacoes": resultado_ia.recomendacoes,
+        "resumo": resultado_ia.resumo,
+        "metadados_ia": {
+            "modelo_usado": resultado_ia.modelo_usado,
+            "tempo_processamento": resultado_ia.tempo_processamento,
+            "confianca_analise": resultado_ia.confianca_analise
+        }
+    }
+
+def _calcular_relatorio_padroes(db: Session, dias: int, modo: str,
+                                progresso: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+    """
+    Calcula o relatório de padrões do período (rotina síncrona, fora do event loop)
+    
+    modo=incremental soma os parciais diários mantidos a cada novo chamado;
+    modo=completo reagrupa todos os chamados do período.
+    """
     
     periodo_inicio = datetime.now() - timedelta(days=dias)
     
+    if modo == "incremental":
+        try:
+            incremental = montar_relatorio_incremental(db, dias, progresso)
+            if incremental is None:
+                return _resposta_sem_dados(periodo_inicio)
+            return _resposta_relatorio_padroes(
+                periodo_inicio,
+                incremental['total_chamados'],
+                incremental['distribuicao_criticidade'],
+                incremental['clientes_mais_ativos'],
+                incremental['relatorio']
+            )
+        except Exception as e:
+            # Estado incremental indisponível: recalcular o período completo
+            logger.warning(f"Relatório incremental indisponível, recalculando período: {e}")
+            db.rollback()
+    
     # Buscar chamados do período
     chamados_periodo = db.query(Chamado).filter(
         Chamado.data_criacao >= periodo_inicio
     ).all()
     
     if not chamados_periodo:
-        return {
-            "periodo_inicio": periodo_inicio,
-            "periodo_fim": datetime.now(),
-            "total_chamados": 0,
-            "padroes_globais": [],
-            "grupos_similares": [],
-            "distribuicao_criticidade": {},
-            "clientes_mais_ativos": [],
-            "insights_ia": [],
-            "resumo": "Nenhum chamado encontrado no período especificado",
-            "metadados_ia": {
-                "modelo_usado": "sem_dados",
-                "tempo_processamento": 0,
-                "confianca_analise": 0
-            }
-        }
+        return _resposta_sem_dados(periodo_inicio)
+    
+    # Estatísticas complementares
+    criticidades = [c.criticidade.value if hasattr(c.criticidade, 'value') else str(c.criticidade) for c in chamados_periodo]
+    dist_criticidade = Counter(criticidades)
+    
+    clientes = [c.cliente_solicitante for c in chamados_periodo]
+    clientes_ativos = Counter(clientes).most_common(5)
     
     try:
         # Usar IA real para gerar relatório de padrões
         resultado_ia = wex_ai.gerar_relatorio_padroes(
             chamados=chamados_periodo,
-            periodo_dias=dias
+            periodo_dias=dias,
+            progresso=progresso
         )
         
-        # Estatísticas complementares
-        criticidades = [c.criticidade.value if hasattr(c.criticidade, 'value') else str(c.criticidade) for c in chamados_periodo]
-        dist_criticidade = Counter(criticidades)
-        
-        clientes = [c.cliente_solicitante for c in chamados_periodo]
-        clientes_ativos = Counter(clientes).most_common(5)
-        
-        return {
-            "periodo_inicio": periodo_inicio,
-            "periodo_fim": datetime.now(),
-            "total_chamados": len(chamados_periodo),
-            "total_grupos_similares": resultado_ia.total_grupos_similares,
-            "padroes_globais": resultado_ia.padroes_globais,
-            "grupos_similares": resultado_ia.grupos_similares,
-            "distribuicao_criticidade": {crit: count for crit, count in dist_criticidade.items()},
-            "clientes_mais_ativos": [{"cliente": cliente, "total_chamados": count} for cliente, count in clientes_ativos],
-            "insights_ia": resultado_ia.insights_ia,
-            "tendencias": resultado_ia.tendencias,
-            "recomendacoes": resultado_ia.recomendacoes,
-            "resumo": resultado_ia.resumo,
-            "metadados_ia": {
-                "modelo_usado": resultado_ia.modelo_usado,
-                "tempo_processamento": resultado_ia.tempo_processamento,
-                "confianca_analise": resultado_ia.confianca_analise
-            }
-        }
+        return _resposta_relatorio_padroes(
+            periodo_inicio, len(chamados_periodo), dist_criticidade, clientes_ativos, resultado_ia
+        )
         
     except Exception as e:
         # Fallback para método tradicional em caso de erro
-        criticidades = [c.criticidade.value if hasattr(c.criticidade, 'value') else str(c.criticidade) for c in chamados_periodo]
-        dist_criticidade = Counter(criticidades)
-        
-        clientes = [c.cliente_solicitante for c in chamados_periodo]
-        clientes_ativos = Counter(clientes).most_common(5)
-        
         return {
             "periodo_inicio": periodo_inicio,
             "periodo_fim": datetime.now(),
@@ -1395,6 +1563,90 @@ async def relatorio_padroes_ia(
             }
         }
 
+def _chave_cache_relatorio_padroes(db: Session, dias: int, modo: str) -> tuple:
+    """
+    Chave do cache de resultados: período, versão da configuração e estado dos chamados
+    
+    O total de chamados cobre exclusões e o dia corrente cobre o deslizamento da janela.
+    """
+    ultima_atualizacao, total = db.query(func.max(Chamado.data_atualizacao), func.count(Chamado.id)).one()
+    return (
+        "padroes-ia", dias, modo, get_versao_config(),
+        ultima_atualizacao.isoformat() if ultima_atualizacao else None, total,
+        datetime.now().date().isoformat()
+    )
+
+def _relatorio_padroes_em_job(dias: int, modo: str, progresso: Callable[[float, str], None]) -> Dict[str, Any]:
+    """Executa o relatório de padrões dentro de um job, com sessão própria"""
+    db = SessionLocal()
+    try:
+        return jsonable_encoder(_calcular_relatorio_padroes(db, dias, modo, progresso))
+    finally:
+        db.close()
+
+@app.get("/api/relatorios/padroes-ia")
+async def relatorio_padroes_ia(
+    dias: int = Query(default=30, ge=1, le=365),
+    modo: str = Query(default="incremental", pattern="^(incremental|completo)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Gera relatório de padrões identificados pela IA real
+    
+    Resultados idênticos (mesmo período, configuração e chamados) vêm do cache.
+    Para períodos longos prefira POST /api/relatorios/padroes-ia/jobs.
+    """
+    chave = _chave_cache_relatorio_padroes(db, dias, modo)
+    resultado = gerenciador_jobs.obter_cache(chave)
+    if resultado is not None:
+        return resultado
+    
+    # CPU intensivo: fora do event loop
+    resultado = jsonable_encoder(await run_in_threadpool(_calcular_relatorio_padroes, db, dias, modo))
+    if "erro_ia" not in resultado:
+        gerenciador_jobs.guardar_cache(chave, resultado)
+    return resultado
+
+@app.post("/api/relatorios/padroes-ia/jobs", status_code=202)
+def criar_job_relatorio_padroes(
+    dias: int = Query(default=30, ge=1, le=365),
+    modo: str = Query(default="incremental", pattern="^(incremental|completo)$"),
+    db: Session = Depends(get_db)
+):
+    """Agenda o relatório de padrões em background e retorna o id do job"""
+    job = gerenciador_jobs.submeter(
+        tipo="padroes-ia",
+        parametros={"dias": dias, "modo": modo},
+        chave_cache=_chave_cache_relatorio_padroes(db, dias, modo),
+        funcao=lambda progresso: _relatorio_padroes_em_job(dias, modo, progresso)
+    )
+    return {
+        **job.to_dict(),
+        "status_url": f"/api/relatorios/padroes-ia/jobs/{job.id}",
+        "resultado_url": f"/api/relatorios/padroes-ia/jobs/{job.id}/resultado"
+    }
+
+@app.get("/api/relatorios/padroes-ia/jobs/{job_id}")
+def status_job_relatorio_padroes(job_id: str):
+    """Status e progresso de um job de relatório de padrões"""
+    job = gerenciador_jobs.obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+@app.get("/api/relatorios/padroes-ia/jobs/{job_id}/resultado")
+def resultado_job_relatorio_padroes(job_id: str, response: Response):
+    """Resultado de um job concluído (202 com o status enquanto ainda executa)"""
+    job = gerenciador_jobs.obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    if job.status == STATUS_ERRO:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório: {job.erro}")
+    if job.status != STATUS_CONCLUIDO:
+        response.status_code = 202
+        return job.to_dict()
+    return job.resultado
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
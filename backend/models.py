@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, Date, Boolean, ForeignKey, JSON, Float,
+    event, inspect, select, update, case, exists, or_
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from database import Base
+from database import Base, registrar_preenchimento
 from enum import Enum
 import json
 
@@ -24,6 +27,9 @@ class TipoFollowUp(str, Enum):
     ANALISE = "Análise"
     OUTROS = "Outros"
 
+# Bit de cada tipo em Chamado.tipos_followup
+BITS_TIPO_FOLLOWUP = {tipo.value: 1 << posicao for posicao, tipo in enumerate(TipoFollowUp)}
+
 class Chamado(Base):
     __tablename__ = "chamados"
     
@@ -33,14 +39,19 @@ class Chamado(Base):
     descricao = Column(Text, nullable=False)
     status = Column(String(20), default=StatusChamado.ABERTO.value, nullable=False)
     criticidade = Column(String(20), default=CriticidadeChamado.MEDIA.value, nullable=False)
-    data_criacao = Column(DateTime, default=func.now(), nullable=False)
-    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    sla_limite = Column(DateTime, nullable=True)
+    data_criacao = Column(DateTime, default=func.now(), nullable=False, index=True)
+    data_atualizacao = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False, index=True)
+    sla_limite = Column(DateTime, nullable=True, index=True)
     tags_automaticas = Column(Text, default="[]", nullable=True)  # JSON como string
     score_qualidade = Column(Integer, default=0, nullable=False)  # 0-100
     ambiente_informado = Column(Boolean, default=False, nullable=False)
     possui_anexos = Column(Boolean, default=False, nullable=False)
     
+    # Resumo dos follow-ups, mantido na mesma transação em que são criados ou removidos
+    total_followups = Column(Integer, default=0, server_default="0", nullable=False)
+    ultimo_followup_em = Column(DateTime, nullable=True, index=True)
+    tipos_followup = Column(Integer, default=0, server_default="0", nullable=False)  # Bits de BITS_TIPO_FOLLOWUP
+    
     # Relacionamento com follow-ups
     followups = relationship("FollowUp", back_populates="chamado", cascade="all, delete-orphan")
     
@@ -51,6 +62,10 @@ class Chamado(Base):
         except:
             return []
     
+    @property
+    def tipos_followup_list(self):
+        return [tipo for tipo, bit in BITS_TIPO_FOLLOWUP.items() if (self.tipos_followup or 0) & bit]
+    
     def to_dict(self):
         return {
             "id": self.id,
@@ -66,14 +81,14 @@ class Chamado(Base):
             "score_qualidade": self.score_qualidade,
             "ambiente_informado": self.ambiente_informado,
             "possui_anexos": self.possui_anexos,
-            "total_followups": len(self.followups) if self.followups else 0
+            "total_followups": self.total_followups or 0
         }
 
 class FollowUp(Base):
     __tablename__ = "followups"
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    chamado_id = Column(Integer, ForeignKey("chamados.id"), nullable=False)
+    chamado_id = Column(Integer, ForeignKey("chamados.id"), nullable=False, index=True)
     tipo = Column(String(20), default=TipoFollowUp.OUTROS.value, nullable=False)
     descricao = Column(Text, nullable=False)
     data_criacao = Column(DateTime, default=func.now(), nullable=False)
@@ -99,4 +114,184 @@ class FollowUp(Base):
             "data_criacao": self.data_criacao.isoformat() if self.data_criacao else None,
             "autor": self.autor,
             "anexos": self.anexos_list
-        }
\ No newline at end of file
+        }
+
+class ChamadoVizinho(Base):
+    """Top-K vizinhos (chamados similares) pré-calculados por chamado"""
+    __tablename__ = "chamado_vizinhos"
+    
+    chamado_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), primary_key=True)
+    vizinho_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), primary_key=True, index=True)
+    score = Column(Float, nullable=False)
+    motivos = Column(Text, default="[]", nullable=False)  # JSON como string
+    
+    @property
+    def motivos_list(self):
+        try:
+            return json.loads(self.motivos) if self.motivos else []
+        except:
+            return []
+
+class ChamadoVizinhancaEstado(Base):
+    """Hash da descrição usado no último cálculo da vizinhança de cada chamado"""
+    __tablename__ = "chamado_vizinhanca_estado"
+    
+    chamado_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), primary_key=True)
+    descricao_hash = Column(String(40), nullable=False)
+    data_calculo = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+class Triagem(Base):
+    """Resultado de cada execução da triagem por IA, reaproveitado enquanto o chamado e a configuração não mudam"""
+    __tablename__ = "triagens"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    chamado_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), nullable=False, index=True)
+    score_total = Column(Integer, default=0, nullable=False)
+    score_breakdown = Column(Text, default="{}", nullable=False)  # JSON como string
+    decisao = Column(String(20), nullable=False, index=True)
+    criticidade_sugerida = Column(String(20), nullable=False)
+    confianca = Column(Float, default=0.0, nullable=False)
+    tags_sugeridas = Column(Text, default="[]", nullable=False)  # JSON como string
+    motivos = Column(Text, default="[]", nullable=False)  # JSON como string
+    sugestoes = Column(Text, default="[]", nullable=False)  # JSON como string
+    observacoes = Column(Text, nullable=True)
+    tempo_processamento_ms = Column(Integer, default=0, nullable=False)
+    versao_config = Column(String(20), nullable=False)
+    descricao_hash = Column(String(40), nullable=False)
+    entrada_hash = Column(String(40), nullable=False)  # Hash de todos os campos enviados ao motor
+    aplicada = Column(Boolean, default=False, nullable=False)
+    data_criacao = Column(DateTime, default=func.now(), nullable=False, index=True)
+
+class ChamadoScoreCategorias(Base):
+    """Scores brutos por categoria de cada chamado, usados na simulação de configurações"""
+    __tablename__ = "chamado_scores_categorias"
+    
+    chamado_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), primary_key=True)
+    anexos = Column(Integer, default=0, nullable=False)
+    descricao = Column(Integer, default=0, nullable=False)
+    info_tecnicas = Column(Integer, default=0, nullable=False)
+    contexto = Column(Integer, default=0, nullable=False)
+    versao_criterios = Column(String(40), nullable=False)  # Hash das seções da config que afetam os scores brutos
+    data_atualizacao_chamado = Column(DateTime, nullable=True)  # data_atualizacao do chamado no cálculo
+
+class PadraoCluster(Base):
+    """Grupo de chamados similares mantido de forma incremental (agrupamento por líder)"""
+    __tablename__ = "padrao_clusters"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    representante_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    data_criacao = Column(DateTime, default=func.now(), nullable=False)
+
+class ChamadoPadrao(Base):
+    """Atribuição de cada chamado a um grupo e valores contabilizados nos histogramas diários"""
+    __tablename__ = "chamado_padroes"
+    
+    chamado_id = Column(Integer, ForeignKey("chamados.id", ondelete="CASCADE"), primary_key=True)
+    cluster_id = Column(Integer, ForeignKey("padrao_clusters.id"), nullable=True, index=True)
+    similaridade = Column(Float, nullable=True)  # Similaridade com o representante (nula para o próprio)
+    dia = Column(Date, nullable=False, index=True)
+    criticidade = Column(String(20), nullable=False)
+    cliente = Column(String(200), nullable=False)
+    descricao_hash = Column(String(40), nullable=False)
+
+class PadraoContagemDiaria(Base):
+    """Contagens parciais por dia (total, criticidade, cliente, grupo) usadas no relatório de padrões"""
+    __tablename__ = "padrao_contagens_diarias"
+    
+    dia = Column(Date, primary_key=True)
+    dimensao = Column(String(20), primary_key=True)
+    valor = Column(String(200), primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+
+class PadraoSincronizacao(Base):
+    """Marcador de chamados (versão, total, maior id, última atualização) na última sincronização dos padrões"""
+    __tablename__ = "padrao_sincronizacao"
+    
+    id = Column(Integer, primary_key=True)
+    versao_chamados = Column(Integer, nullable=False)
+    total_chamados = Column(Integer, nullable=False)
+    maior_id = Column(Integer, nullable=True)
+    ultima_atualizacao = Column(DateTime, nullable=True)
+
+class EstadoJobRelatorio(Base):
+    """Estado dos jobs de relatório, consultável a partir de qualquer worker do servidor"""
+    __tablename__ = "jobs_relatorios"
+    
+    id = Column(String(32), primary_key=True)
+    tipo = Column(String(50), nullable=False)
+    parametros = Column(Text, default="{}", nullable=False)  # JSON como string
+    status = Column(String(20), nullable=False, index=True)
+    progresso = Column(Float, default=0.0, nullable=False)
+    etapa = Column(String(100), nullable=False)
+    criado_em = Column(DateTime, nullable=False, index=True)
+    iniciado_em = Column(DateTime, nullable=True)
+    concluido_em = Column(DateTime, nullable=True)
+    resultado = Column(Text, nullable=True)  # JSON como string
+    erro = Column(Text, nullable=True)
+    do_cache = Column(Boolean, default=False, nullable=False)
+
+class VersaoRecurso(Base):
+    """Contador de alterações por recurso (chamados, followups), usado nos ETags"""
+    __tablename__ = "versoes_recursos"
+    
+    recurso = Column(String(50), primary_key=True)
+    versao = Column(Integer, default=0, nullable=False)
+
+
+# === Resumo de follow-ups em chamados ===
+
+_chamados = Chamado.__table__
+_followups = FollowUp.__table__
+
+
+def _valores_resumo_followups():
+    """Contagem, data do último e bits dos tipos de follow-up, calculados a partir da tabela followups"""
+    do_chamado = _followups.c.chamado_id == _chamados.c.id
+    tipos = sum(
+        case((exists().where(do_chamado, _followups.c.tipo == tipo), bit), else_=0)
+        for tipo, bit in BITS_TIPO_FOLLOWUP.items()
+    )
+    return {
+        "total_followups": select(func.count(_followups.c.id)).where(do_chamado).scalar_subquery(),
+        "ultimo_followup_em": select(func.max(_followups.c.data_criacao)).where(do_chamado).scalar_subquery(),
+        "tipos_followup": tipos,
+        "data_atualizacao": _chamados.c.data_atualizacao  # Não é uma alteração do chamado
+    }
+
+
+def recalcular_resumo_followups(conexao, chamado_ids=None) -> int:
+    """
+    Recalcula o resumo de follow-ups dos chamados (todos, sem chamado_ids)
+
+    Usado após cargas que não passam pelo ORM e ao adicionar as colunas a um banco existente.
+    """
+    comando = update(_chamados).values(**_valores_resumo_followups())
+    if chamado_ids is not None:
+        comando = comando.where(_chamados.c.id.in_(list(chamado_ids)))
+    return conexao.execute(comando).rowcount
+
+
+def _followup_inserido(mapper, connection, alvo):
+    data = select(_followups.c.data_criacao).where(_followups.c.id == alvo.id).scalar_subquery()
+    ultimo = _chamados.c.ultimo_followup_em
+    connection.execute(
+        update(_chamados).where(_chamados.c.id == alvo.chamado_id).values(
+            total_followups=_chamados.c.total_followups + 1,
+            ultimo_followup_em=case((or_(ultimo.is_(None), ultimo < data), data), else_=ultimo),
+            tipos_followup=_chamados.c.tipos_followup.op("|")(BITS_TIPO_FOLLOWUP.get(alvo.tipo, 0)),
+            data_atualizacao=_chamados.c.data_atualizacao
+        )
+    )
+
+
+def _followup_alterado(mapper, connection, alvo):
+    """Alteração ou remoção: recalcula o resumo do chamado (e do anterior, se o follow-up mudou de chamado)"""
+    ids = {alvo.chamado_id, *inspect(alvo).attrs.chamado_id.history.deleted}
+    recalcular_resumo_followups(connection, ids)
+
+
+event.listen(FollowUp, "after_insert", _followup_inserido)
+event.listen(FollowUp, "after_update", _followup_alterado)
+event.listen(FollowUp, "after_delete", _followup_alterado)
+registrar_preenchimento("chamados.total_followups", recalcular_resumo_followups)
@@ -0,0 +1,407 @@
+"""
+Estado incremental do relatório de padrões
+Mantém a atribuição de cada chamado a um grupo (agrupamento por líder),
+a contagem de cada grupo e histogramas diários de criticidade e cliente.
+O relatório de qualquer período é montado somando os parciais diários,
+então 365 dias custam praticamente o mesmo que 7.
+
+Uso pela linha de comando (reconstrução completa):
+    python padroes_incrementais.py
+"""
+
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Chamado, ChamadoPadrao, PadraoCluster, PadraoContagemDiaria, PadraoSincronizacao
+from cache_http import marcador_chamados
+from features_textuais import hash_descricao
+from wex_ai_engine import wex_ai, similaridade_tokens
+
+logger = logging.getLogger(__name__)
+
+LIMIAR_AGRUPAMENTO = 0.4  # Mesmo threshold do agrupamento do relatório completo
+TAMANHO_MINIMO_DESCRICAO = 20
+TAMANHO_LOTE_IN = 500  # Limite de parâmetros por cláusula IN no SQLite
+TAMANHO_RESUMO = 100
+
+# Dimensões dos parciais diários
+DIMENSAO_TOTAL = "total"
+DIMENSAO_VALIDOS = "validos"
+DIMENSAO_CRITICIDADE = "criticidade"
+DIMENSAO_CLIENTE = "cliente"
+DIMENSAO_GRUPO = "grupo"
+
+# Serializa as atualizações (atribuição de grupos e contadores)
+_lock_atualizacao = threading.RLock()
+
+# Representantes dos grupos em memória: cluster_id -> tokens (ordem de criação)
+_lideres: Dict[int, set] = {}
+_ultimo_cluster_carregado = 0
+
+
+def _tokens(descricao: str) -> set:
+    return set(descricao.lower().split())
+
+
+def _descricao_valida(descricao: Optional[str]) -> bool:
+    return bool(descricao) and len(descricao) > TAMANHO_MINIMO_DESCRICAO
+
+
+def _limpar_lideres():
+    global _ultimo_cluster_carregado
+    _lideres.clear()
+    _ultimo_cluster_carregado = 0
+
+
+def _carregar_novos_lideres(db: Session):
+    """Carrega os representantes criados desde a última leitura (inclusive por outros processos)"""
+    global _ultimo_cluster_carregado
+    novos = db.query(PadraoCluster.id, Chamado.descricao).join(
+        Chamado, Chamado.id == PadraoCluster.representante_id
+    ).filter(PadraoCluster.id > _ultimo_cluster_carregado).order_by(PadraoCluster.id).all()
+    for cluster_id, descricao in novos:
+        _lideres[cluster_id] = _tokens(descricao or "")
+        _ultimo_cluster_carregado = cluster_id
+
+
+def aquecer_lideres(db: Session) -> int:
+    """Carrega os representantes dos grupos em memória (pré-carga antes do fork dos workers)"""
+    with _lock_atualizacao:
+        _carregar_novos_lideres(db)
+        return len(_lideres)
+
+
+def _atribuir_grupo(db: Session, chamado_id: int, descricao: str) -> Tuple[Optional[int], Optional[float]]:
+    """
+    Atribui o chamado ao primeiro grupo cujo representante supera o threshold
+    ou cria um grupo novo com ele como representante (mesma regra gulosa do relatório completo)
+    """
+    if not _descricao_valida(descricao):
+        return None, None
+
+    tokens = _tokens(descricao)
+    for cluster_id, tokens_lider in _lideres.items():
+        similaridade = similaridade_tokens(tokens, tokens_lider)
+        if similaridade > LIMIAR_AGRUPAMENTO:
+            db.query(PadraoCluster).filter(PadraoCluster.id == cluster_id).update(
+                {PadraoCluster.total: PadraoCluster.total + 1}, synchronize_session=False
+            )
+            return cluster_id, similaridade
+
+    cluster = PadraoCluster(representante_id=chamado_id, total=1, data_criacao=datetime.now())
+    db.add(cluster)
+    db.flush()
+    _lideres[cluster.id] = tokens
+    return cluster.id, None
+
+
+def _acumular(deltas: Counter, registro: ChamadoPadrao, sinal: int):
+    """Soma (ou subtrai) a contribuição de um chamado aos parciais do seu dia"""
+    deltas[(registro.dia, DIMENSAO_TOTAL, "")] += sinal
+    deltas[(registro.dia, DIMENSAO_CRITICIDADE, registro.criticidade)] += sinal
+    deltas[(registro.dia, DIMENSAO_CLIENTE, registro.cliente)] += sinal
+    if registro.cluster_id is not None:
+        deltas[(registro.dia, DIMENSAO_VALIDOS, "")] += sinal
+        deltas[(registro.dia, DIMENSAO_GRUPO, str(registro.cluster_id))] += sinal
+
+
+def _aplicar_deltas(db: Session, deltas: Counter):
+    """Grava os deltas acumulados na tabela de parciais diários"""
+    deltas = {chave: delta for chave, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    dias = sorted({dia for dia, _, _ in deltas})
+    existentes = {}
+    for inicio in range(0, len(dias), TAMANHO_LOTE_IN):
+        for linha in db.query(PadraoContagemDiaria).filter(
+            PadraoContagemDiaria.dia.in_(dias[inicio:inicio + TAMANHO_LOTE_IN])
+        ).all():
+            existentes[(linha.dia, linha.dimensao, linha.valor)] = linha
+
+    for (dia, dimensao, valor), delta in deltas.items():
+        linha = existentes.get((dia, dimensao, valor))
+        if linha is None:
+            db.add(PadraoContagemDiaria(dia=dia, dimensao=dimensao, valor=valor, total=delta))
+        elif linha.total + delta <= 0:
+            db.delete(linha)
+        else:
+            linha.total += delta
+
+
+def _remover_registro(db: Session, registro: ChamadoPadrao, deltas: Counter, manter_grupo: bool = False):
+    _acumular(deltas, registro, -1)
+    if registro.cluster_id is not None and not manter_grupo:
+        db.query(PadraoCluster).filter(PadraoCluster.id == registro.cluster_id).update(
+            {PadraoCluster.total: PadraoCluster.total - 1}, synchronize_session=False
+        )
+
+
+def _registrar(db: Session, chamado: Chamado, registro: Optional[ChamadoPadrao], deltas: Counter) -> bool:
+    """Registra (ou atualiza) um chamado no estado incremental; retorna se algo mudou"""
+    descricao_hash = hash_descricao(chamado.descricao)
+    dia = (chamado.data_criacao or datetime.now()).date()
+    criticidade = getattr(chamado.criticidade, 'value', chamado.criticidade) or ""
+    cliente = chamado.cliente_solicitante or ""
+
+    if registro is not None:
+        if (registro.descricao_hash, registro.dia, registro.criticidade, registro.cliente) == \
+                (descricao_hash, dia, criticidade, cliente):
+            return False
+        # Sem mudança na descrição o chamado continua no mesmo grupo
+        manter_grupo = registro.descricao_hash == descricao_hash
+        _remover_registro(db, registro, deltas, manter_grupo=manter_grupo)
+        if not manter_grupo:
+            registro.cluster_id, registro.similaridade = _atribuir_grupo(db, chamado.id, chamado.descricao)
+    else:
+        cluster_id, similaridade = _atribuir_grupo(db, chamado.id, chamado.descricao)
+        registro = ChamadoPadrao(chamado_id=chamado.id, cluster_id=cluster_id, similaridade=similaridade)
+        db.add(registro)
+
+    registro.descricao_hash = descricao_hash
+    registro.dia = dia
+    registro.criticidade = criticidade
+    registro.cliente = cliente
+    _acumular(deltas, registro, 1)
+    return True
+
+
+def registrar_chamados(db: Session, chamados: List[Chamado],
+                       progresso: Optional[Callable[[float, str], None]] = None) -> int:
+    """
+    Registra chamados novos ou alterados no estado incremental (em ordem de criação)
+
+    Retorna quantos registros foram criados ou atualizados. progresso (opcional)
+    recebe a fração dos chamados já agrupados.
+    """
+    with _lock_atualizacao:
+        try:
+            _carregar_novos_lideres(db)
+            ids = [c.id for c in chamados]
+            registros = {}
+            for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+                registros.update({
+                    r.chamado_id: r for r in db.query(ChamadoPadrao).filter(
+                        ChamadoPadrao.chamado_id.in_(ids[inicio:inicio + TAMANHO_LOTE_IN])
+                    ).all()
+                })
+
+            deltas = Counter()
+            alterados = 0
+            passo_progresso = max(1, len(chamados) // 50)
+            for i, chamado in enumerate(sorted(chamados, key=lambda c: (c.data_criacao or datetime.max, c.id))):
+                if progresso and i % passo_progresso == 0:
+                    progresso(i / len(chamados), "agrupando")
+                if _registrar(db, chamado, registros.get(chamado.id), deltas):
+                    alterados += 1
+            _aplicar_deltas(db, deltas)
+            db.commit()
+            return alterados
+        except Exception:
+            db.rollback()
+            # Grupos criados na transação desfeita não existem mais
+            _limpar_lideres()
+            raise
+
+
+def registrar_padrao_em_background(chamado_id: int):
+    """Tarefa em background: registra o chamado com uma sessão própria"""
+    db = SessionLocal()
+    try:
+        chamado = db.get(Chamado, chamado_id)
+        if chamado is not None:
+            registrar_chamados(db, [chamado])
+    except Exception as e:
+        logger.error(f"Erro ao atualizar padrões do chamado {chamado_id}: {e}")
+    finally:
+        db.close()
+
+
+def _remover_orfaos(db: Session) -> int:
+    """Remove os registros de chamados excluídos (ex.: remoções em massa, que não disparam eventos)"""
+    orfaos = db.query(ChamadoPadrao).outerjoin(
+        Chamado, Chamado.id == ChamadoPadrao.chamado_id
+    ).filter(Chamado.id.is_(None)).all()
+    if orfaos:
+        deltas = Counter()
+        for registro in orfaos:
+            _remover_registro(db, registro, deltas)
+            db.delete(registro)
+        _aplicar_deltas(db, deltas)
+        db.commit()
+    return len(orfaos)
+
+
+def _gravar_marcador(db: Session, marcador: tuple):
+    versao, total, maior_id, ultima_atualizacao = marcador
+    db.merge(PadraoSincronizacao(id=1, versao_chamados=versao, total_chamados=total,
+                                 maior_id=maior_id, ultima_atualizacao=ultima_atualizacao))
+    db.commit()
+
+
+def sincronizar_padroes(db: Session, progresso: Optional[Callable[[float, str], None]] = None) -> int:
+    """
+    Registra chamados que ainda não constam no estado incremental ou que
+    mudaram desde a última sincronização (ex.: inseridos ou alterados por
+    scripts) e remove os de chamados excluídos
+
+    A mudança é detectada pelo marcador de chamados (contador de versão, total,
+    maior id e max(data_atualizacao)) gravado a cada sincronização: sem mudança,
+    nada é conferido. Remoções (inclusive em massa) mudam o total e o maior id,
+    então a limpeza de órfãos só roda quando o marcador difere. Sem marcador
+    gravado, todos os chamados são conferidos.
+    Retorna quantos registros foram removidos, criados ou atualizados.
+    """
+    with _lock_atualizacao:
+        marcador = marcador_chamados(db)
+        anterior = db.get(PadraoSincronizacao, 1)
+        if anterior is not None and marcador == (anterior.versao_chamados, anterior.total_chamados,
+                                                 anterior.maior_id, anterior.ultima_atualizacao):
+            return 0
+
+        removidos = _remover_orfaos(db)
+
+        pendentes = db.query(Chamado).outerjoin(
+            ChamadoPadrao, ChamadoPadrao.chamado_id == Chamado.id
+        ).filter(ChamadoPadrao.chamado_id.is_(None)).all()
+        alterados = db.query(Chamado).join(ChamadoPadrao, ChamadoPadrao.chamado_id == Chamado.id)
+        if anterior is not None and anterior.ultima_atualizacao is not None:
+            alterados = alterados.filter(Chamado.data_atualizacao >= anterior.ultima_atualizacao)
+        chamados = pendentes + alterados.all()
+        registrados = registrar_chamados(db, chamados, progresso) if chamados else 0
+        _gravar_marcador(db, marcador)
+        return removidos + registrados
+
+
+def reconstruir_padroes(db: Session) -> int:
+    """Reconstrói todo o estado incremental a partir da tabela de chamados"""
+    with _lock_atualizacao:
+        db.query(ChamadoPadrao).delete(synchronize_session=False)
+        db.query(PadraoContagemDiaria).delete(synchronize_session=False)
+        db.query(PadraoCluster).delete(synchronize_session=False)
+        db.query(PadraoSincronizacao).delete(synchronize_session=False)
+        db.commit()
+        _limpar_lideres()
+        marcador = marcador_chamados(db)
+        total = registrar_chamados(db, db.query(Chamado).all())
+        _gravar_marcador(db, marcador)
+        return total
+
+
+def _resumo_descricao(descricao: Optional[str]) -> str:
+    if descricao is None:
+        return "N/A"
+    return descricao[:TAMANHO_RESUMO] + "..." if len(descricao) > TAMANHO_RESUMO else descricao
+
+
+def _grupos_do_periodo(db: Session, contagens_grupo: Dict[int, int], periodo_inicio: datetime) -> List[Dict[str, Any]]:
+    """Membros (no período) dos grupos com mais de um chamado"""
+    ids = sorted(cluster_id for cluster_id, total in contagens_grupo.items() if total > 1)
+    membros = defaultdict(list)
+    for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+        linhas = db.query(
+            ChamadoPadrao.cluster_id, ChamadoPadrao.similaridade,
+            Chamado.id, Chamado.numero_wex, func.substr(Chamado.descricao, 1, TAMANHO_RESUMO + 1)
+        ).join(Chamado, Chamado.id == ChamadoPadrao.chamado_id).filter(
+            ChamadoPadrao.cluster_id.in_(ids[inicio:inicio + TAMANHO_LOTE_IN]),
+            ChamadoPadrao.dia >= periodo_inicio.date(),
+            Chamado.data_criacao >= periodo_inicio
+        ).order_by(Chamado.data_criacao, Chamado.id).all()
+        for cluster_id, similaridade, chamado_id, numero_wex, descricao in linhas:
+            membros[cluster_id].append((similaridade, chamado_id, numero_wex, descricao))
+
+    grupos = []
+    for cluster_id in ids:
+        chamados = membros.get(cluster_id, [])
+        if len(chamados) < 2:
+            continue
+        similaridades = [s for s, _, _, _ in chamados if s is not None]
+        grupos.append({
+            'tamanho': len(chamados),
+            'similaridade_media': sum(similaridades) / len(similaridades) if similaridades else 0.0,
+            'chamados': [
+                {'id': chamado_id, 'numero_wex': numero_wex, 'descricao_resumo': _resumo_descricao(descricao)}
+                for _, chamado_id, numero_wex, descricao in chamados
+            ]
+        })
+    return grupos
+
+
+def montar_relatorio_incremental(db: Session, dias: int,
+                                 progresso: Optional[Callable[[float, str], None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Monta o relatório de padrões do período somando os parciais diários
+
+    Retorna None quando não há chamados no período; caso contrário um dict com
+    total_chamados, distribuicao_criticidade, clientes_mais_ativos e relatorio (RelatorioPatroes).
+    """
+    tempo_inicio = datetime.now()
+    sincronizar_padroes(db, progresso)
+    if progresso:
+        progresso(0.9, "somando parciais diários")
+
+    periodo_inicio = tempo_inicio - timedelta(days=dias)
+    dia_inicio = periodo_inicio.date()
+    somas = db.query(
+        PadraoContagemDiaria.dimensao, PadraoContagemDiaria.valor, func.sum(PadraoContagemDiaria.total)
+    ).filter(PadraoContagemDiaria.dia > dia_inicio).group_by(
+        PadraoContagemDiaria.dimensao, PadraoContagemDiaria.valor
+    ).all()
+
+    por_dimensao: Dict[str, Counter] = defaultdict(Counter)
+    for dimensao, valor, total in somas:
+        if total:
+            por_dimensao[dimensao][valor] = int(total)
+
+    # O primeiro dia entra apenas com os chamados criados a partir do início exato do período
+    parciais = Counter()
+    for registro in db.query(ChamadoPadrao).join(Chamado, Chamado.id == ChamadoPadrao.chamado_id).filter(
+        ChamadoPadrao.dia == dia_inicio, Chamado.data_criacao >= periodo_inicio
+    ).all():
+        _acumular(parciais, registro, 1)
+    for (_, dimensao, valor), total in parciais.items():
+        por_dimensao[dimensao][valor] += total
+
+    total_chamados = por_dimensao[DIMENSAO_TOTAL].get("", 0)
+    if total_chamados == 0:
+        return None
+
+    total_validos = por_dimensao[DIMENSAO_VALIDOS].get("", 0)
+    distribuicao_criticidade = dict(por_dimensao[DIMENSAO_CRITICIDADE])
+
+    if total_validos < 2:
+        relatorio = wex_ai.relatorio_dados_insuficientes(total_chamados)
+    else:
+        contagens_grupo = {int(valor): total for valor, total in por_dimensao[DIMENSAO_GRUPO].items()}
+        grupos = _grupos_do_periodo(db, contagens_grupo, periodo_inicio)
+        relatorio = wex_ai.montar_relatorio_padroes(
+            grupos, total_validos, distribuicao_criticidade, dias, tempo_inicio,
+            modelo_usado="clustering-incremental"
+        )
+
+    return {
+        'total_chamados': total_chamados,
+        'distribuicao_criticidade': distribuicao_criticidade,
+        'clientes_mais_ativos': por_dimensao[DIMENSAO_CLIENTE].most_common(5),
+        'relatorio': relatorio
+    }
+
+
+if __name__ == "__main__":
+    print("📊 Reconstruindo estado incremental do relatório de padrões...")
+    from database import create_database
+    create_database()
+    sessao = SessionLocal()
+    try:
+        total = reconstruir_padroes(sessao)
+        grupos = sessao.query(func.count(PadraoCluster.id)).filter(PadraoCluster.total > 1).scalar()
+        print(f"✅ {total} chamados registrados em {grupos} grupos com mais de um chamado")
+    finally:
+        sessao.close()
@@ -0,0 +1,191 @@
+"""
+Execução paralela das rotinas de IA intensivas em CPU
+Mantém um pool de processos (opcional) e publica corpora somente leitura
+em memória compartilhada para que os workers não recebam objetos ORM.
+Cada versão do corpus (hash do conteúdo) é publicada uma vez e reaproveitada
+pelas chamadas seguintes, que assim não repetem a serialização nem a
+tokenização nos workers.
+"""
+
+import os
+import pickle
+import hashlib
+import atexit
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Iterator, List, Optional, Tuple
+
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+# Pool global (criado sob demanda)
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+MAX_INDICES_PUBLICADOS = 2  # Versões de corpus mantidas publicadas (ex.: busca de similares e relatório)
+
+# Blocos publicados pelo processo principal: versão -> índice (ordem de uso)
+_indices_publicados: "OrderedDict[str, IndiceCompartilhado]" = OrderedDict()
+_indices_lock = threading.Lock()
+
+# Cache do corpus anexado em cada processo worker: nome -> (itens, tokens)
+_indice_worker: "OrderedDict[str, Tuple[List[Tuple[int, str]], List[set]]]" = OrderedDict()
+
+
+def _get_config_paralelismo(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.processamento_paralelo"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('processamento_paralelo', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+def calcular_num_workers() -> int:
+    """Número de processos do pool (0 na configuração = número de núcleos)"""
+    max_workers = int(_get_config_paralelismo('max_workers', 0) or 0)
+    if max_workers > 0:
+        return max_workers
+    return os.cpu_count() or 1
+
+
+def paralelismo_habilitado(total_itens: int) -> bool:
+    """Indica se vale a pena despachar um lote com total_itens para o pool"""
+    if not _get_config_paralelismo('habilitado', False):
+        return False
+    if calcular_num_workers() < 2:
+        return False
+    return total_itens >= int(_get_config_paralelismo('min_itens_paralelo', 500))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos global, criando-o na primeira chamada
+
+    Usa o contexto "spawn" para não herdar locks das threads do servidor
+    """
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            num_workers = calcular_num_workers()
+            _process_pool = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Pool de processos da IA iniciado com {num_workers} workers")
+        return _process_pool
+
+
+def encerrar_process_pool():
+    """Encerra o pool de processos (chamado no shutdown da aplicação) e libera os corpora publicados"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+            logger.info("Pool de processos da IA encerrado")
+    with _indices_lock:
+        for indice in _indices_publicados.values():
+            indice.fechar()
+        _indices_publicados.clear()
+
+
+atexit.register(encerrar_process_pool)
+
+
+def dividir_em_faixas(total: int, partes: int) -> List[Tuple[int, int]]:
+    """Divide [0, total) em até `partes` faixas contíguas de tamanho parecido"""
+    partes = max(1, min(partes, total))
+    tamanho, resto = divmod(total, partes)
+    faixas = []
+    inicio = 0
+    for i in range(partes):
+        fim = inicio + tamanho + (1 if i < resto else 0)
+        if fim > inicio:
+            faixas.append((inicio, fim))
+        inicio = fim
+    return faixas
+
+
+def versao_corpus(itens: List[Tuple[int, str]]) -> str:
+    """Hash do conteúdo do corpus (ids e textos), usado para reaproveitar o bloco publicado"""
+    resumo = hashlib.blake2b(digest_size=16)
+    for item_id, texto in itens:
+        resumo.update(f"{item_id}\x1f{texto or ''}\x1e".encode('utf-8'))
+    return resumo.hexdigest()
+
+
+class IndiceCompartilhado:
+    """
+    Corpus somente leitura (id, descrição) publicado em memória compartilhada
+
+    Os workers recebem apenas o nome do bloco e o tamanho, anexam uma vez
+    e mantêm o corpus tokenizado em cache enquanto o mesmo bloco for usado.
+    """
+
+    def __init__(self, itens: List[Tuple[int, str]], versao: Optional[str] = None):
+        dados = pickle.dumps(itens, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(len(dados), 1))
+        self._shm.buf[:len(dados)] = dados
+        self.nome = self._shm.name
+        self.tamanho = len(dados)
+        self.total = len(itens)
+        self.versao = versao
+        self.em_uso = 0  # Chamadas usando o bloco (só é liberado quando zera)
+
+    def fechar(self):
+        """Libera o bloco de memória compartilhada"""
+        try:
+            self._shm.close()
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _descartar_excedentes():
+    """Libera os blocos mais antigos além de MAX_INDICES_PUBLICADOS que não estão em uso"""
+    excedente = len(_indices_publicados) - MAX_INDICES_PUBLICADOS
+    for versao in [v for v, indice in _indices_publicados.items() if not indice.em_uso][:max(excedente, 0)]:
+        _indices_publicados.pop(versao).fechar()
+
+
+@contextmanager
+def indice_compartilhado(itens: List[Tuple[int, str]]) -> Iterator[IndiceCompartilhado]:
+    """Bloco publicado para a versão do corpus (criado só na primeira vez), reservado durante o uso"""
+    versao = versao_corpus(itens)
+    with _indices_lock:
+        indice = _indices_publicados.get(versao)
+        if indice is None:
+            indice = _indices_publicados[versao] = IndiceCompartilhado(itens, versao)
+        _indices_publicados.move_to_end(versao)
+        indice.em_uso += 1
+        _descartar_excedentes()
+    try:
+        yield indice
+    finally:
+        with _indices_lock:
+            indice.em_uso -= 1
+            _descartar_excedentes()
+
+
+def carregar_indice_worker(nome: str, tamanho: int) -> Tuple[List[Tuple[int, str]], List[set]]:
+    """Anexa (no worker) o corpus publicado e devolve itens e conjuntos de tokens"""
+    if nome not in _indice_worker:
+        shm = shared_memory.SharedMemory(name=nome)
+        try:
+            itens = pickle.loads(bytes(shm.buf[:tamanho]))
+        finally:
+            shm.close()
+        tokens = [set(texto.lower().split()) if texto else set() for _, texto in itens]
+        _indice_worker[nome] = (itens, tokens)
+        # Mantém só os corpora mais recentes para limitar memória por worker
+        while len(_indice_worker) > MAX_INDICES_PUBLICADOS:
+            _indice_worker.popitem(last=False)
+    _indice_worker.move_to_end(nome)
+    return _indice_worker[nome]
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Reavaliação offline dos scores de triagem
+Lê os chamados em blocos (paginação por id, só as colunas usadas pela IA),
+pontua cada chamado uma única vez com o motor real (um motor por arquivo de
+configuração) e agrega as distribuições na mesma passagem. Com --comparar, o
+mesmo corpus é pontuado com duas configurações e o resumo traz a matriz de
+transição das decisões e a variação dos scores, para avaliar mudanças de
+thresholds e pesos antes de publicá-las.
+
+Os resultados por chamado vão para um arquivo CSV ou JSONL (pela extensão de
+--saida); o resumo é impresso e, com --resumo, gravado em JSON. A IA remota
+fica desativada por padrão (fallback local, resultado determinístico).
+
+Uso:
+    python reavaliar_scores.py --saida scores.csv
+    python reavaliar_scores.py --comparar triagem_config_nova.json --saida diff.jsonl --resumo resumo.json
+    python reavaliar_scores.py --bloco 5000 --workers 4 --limite 1000000
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+DIRETORIO_BACKEND = Path(__file__).resolve().parent
+TAMANHO_BLOCO_PADRAO = 2000
+LARGURA_FAIXA_SCORE = 10
+
+# Colunas lidas do banco (o suficiente para montar a entrada do motor)
+COLUNAS_LEITURA = (
+    "id", "numero_wex", "descricao", "cliente_solicitante",
+    "criticidade", "status", "data_criacao", "possui_anexos",
+)
+
+
+# === Leitura em blocos ===
+
+def ler_chamados_em_blocos(engine: Engine, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                           limite: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Blocos de chamados em ordem de id, por paginação (id > último)
+
+    Cada bloco abre sua própria consulta curta; a memória fica limitada ao
+    bloco atual, qualquer que seja o tamanho da tabela. As linhas vão para o
+    motor pelo mesmo chamado_para_ia da API (mesma entrada, mesmo entrada_hash).
+    """
+    from models import Chamado
+    from triagens import chamado_para_ia
+
+    tabela = Chamado.__table__
+    colunas = [tabela.c[nome] for nome in COLUNAS_LEITURA]
+    ultimo_id = 0
+    lidos = 0
+    while limite is None or lidos < limite:
+        quantidade = tamanho_bloco if limite is None else min(tamanho_bloco, limite - lidos)
+        consulta = select(*colunas).where(tabela.c.id > ultimo_id).order_by(tabela.c.id).limit(quantidade)
+        with engine.connect() as conexao:
+            linhas = conexao.execute(consulta).fetchall()
+        if not linhas:
+            return
+        ultimo_id = linhas[-1].id
+        lidos += len(linhas)
+        yield [chamado_para_ia(linha) for linha in linhas]
+
+
+# === Pontuação ===
+
+def criar_motor(caminho_config: Optional[str] = None, ia_remota: bool = False):
+    """Instância própria do motor apontada para o arquivo de configuração (a global não é alterada)"""
+    from config_manager import ConfigManager
+    from wex_ai_engine import WexIntelligenceAI, desativar_ia_remota
+
+    motor = WexIntelligenceAI()
+    if caminho_config:
+        motor.config_manager = ConfigManager(caminho_config)
+    if not ia_remota:
+        desativar_ia_remota(motor)
+    return motor
+
+
+def pontuar_bloco(motores: Sequence[Any], chamados: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pontua cada chamado uma vez por motor
+
+    As colunas do primeiro motor não têm sufixo; as do segundo (comparação)
+    terminam em _b.
+    """
+    linhas = []
+    for chamado in chamados:
+        linha = {"id": chamado["id"], "numero_wex": chamado["numero_wex"], "criticidade": chamado["criticidade"]}
+        for indice, motor in enumerate(motores):
+            sufixo = "_b" if indice else ""
+            resultado = motor.realizar_triagem(chamado, medir_estagios=False)
+            linha[f"score{sufixo}"] = resultado.score_total
+            linha[f"decisao{sufixo}"] = resultado.decisao
+            linha[f"criticidade_sugerida{sufixo}"] = resultado.criticidade_sugerida
+        linhas.append(linha)
+    return linhas
+
+
+# Motores de cada processo do pool (criados uma vez no initializer)
+_motores_worker: List[Any] = []
+
+
+def _inicializar_worker(caminhos_config: Sequence[Optional[str]], ia_remota: bool) -> None:
+    """Cria os motores do processo"""
+    global _motores_worker
+    logging.disable(logging.WARNING)
+    _motores_worker = [criar_motor(caminho, ia_remota) for caminho in caminhos_config]
+
+
+def _worker_pontuar_bloco(chamados: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Executado nos processos do pool"""
+    return pontuar_bloco(_motores_worker, chamados)
+
+
+def _blocos_pontuados(blocos: Iterator[List[Dict[str, Any]]], caminhos_config: Sequence[Optional[str]],
+                      ia_remota: bool, workers: int) -> Iterator[List[Dict[str, Any]]]:
+    """Blocos pontuados na ordem de leitura, com no máximo 2 blocos por worker em andamento"""
+    if workers <= 1:
+        motores = [criar_motor(caminho, ia_remota) for caminho in caminhos_config]
+        for bloco in blocos:
+            yield pontuar_bloco(motores, bloco)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker,
+                             initargs=(list(caminhos_config), ia_remota)) as pool:
+        pendentes = []
+        esgotado = False
+        while not esgotado or pendentes:
+            while not esgotado and len(pendentes) < workers * 2:
+                bloco = next(blocos, None)
+                if bloco is None:
+                    esgotado = True
+                else:
+                    pendentes.append(pool.submit(_worker_pontuar_bloco, bloco))
+            if pendentes:
+                yield pendentes.pop(0).result()
+
+
+# === Agregação (uma passagem) ===
+
+class AgregadorScores:
+    """Distribuição dos scores e decisões acumulada linha a linha"""
+
+    def __init__(self, comparar: bool = False):
+        self.comparar = comparar
+        self.total = 0
+        self.soma_scores = [0, 0]
+        self.decisoes = [Counter(), Counter()]
+        self.faixas = [Counter(), Counter()]
+        self.decisoes_por_criticidade = [Counter(), Counter()]
+        self.transicoes = Counter()
+        self.soma_variacao = 0
+        self.maior_aumento = 0
+        self.maior_queda = 0
+        self.criticidade_sugerida_alterada = 0
+
+    def adicionar(self, linha: Dict[str, Any]) -> None:
+        """Acumula uma linha de pontuar_bloco"""
+        self.total += 1
+        sufixos = ("", "_b") if self.comparar else ("",)
+        for indice, sufixo in enumerate(sufixos):
+            score = linha[f"score{sufixo}"]
+            decisao = linha[f"decisao{sufixo}"]
+            self.soma_scores[indice] += score
+            self.decisoes[indice][decisao] += 1
+            self.faixas[indice][min(score // LARGURA_FAIXA_SCORE, 100 // LARGURA_FAIXA_SCORE - 1)] += 1
+            self.decisoes_por_criticidade[indice][(linha["criticidade"], decisao)] += 1
+        if self.comparar:
+            self.transicoes[(linha["decisao"], linha["decisao_b"])] += 1
+            variacao = linha["score_b"] - linha["score"]
+            self.soma_variacao += variacao
+            self.maior_aumento = max(self.maior_aumento, variacao)
+            self.maior_queda = min(self.maior_queda, variacao)
+            if linha["criticidade_sugerida"] != linha["criticidade_sugerida_b"]:
+                self.criticidade_sugerida_alterada += 1
+
+    def _distribuicao(self, indice: int) -> Dict[str, Any]:
+        total = max(self.total, 1)
+        por_criticidade: Dict[str, Dict[str, int]] = {}
+        for (criticidade, decisao), quantidade in sorted(self.decisoes_por_criticidade[indice].items()):
+            por_criticidade.setdefault(criticidade, {})[decisao] = quantidade
+        return {
+            "score_medio": round(self.soma_scores[indice] / total, 2),
+            "decisoes": dict(self.decisoes[indice].most_common()),
+            "percentual_decisoes": {
+                decisao: round(100 * quantidade / total, 2)
+                for decisao, quantidade in self.decisoes[indice].most_common()
+            },
+            "histograma_scores": {
+                f"{faixa * LARGURA_FAIXA_SCORE}-{(faixa + 1) * LARGURA_FAIXA_SCORE - 1}": self.faixas[indice][faixa]
+                for faixa in range(100 // LARGURA_FAIXA_SCORE)
+            },
+            "decisoes_por_criticidade": por_criticidade,
+        }
+
+    def resumo(self) -> Dict[str, Any]:
+        """Resumo serializável em JSON"""
+        resumo: Dict[str, Any] = {"total": self.total, "config": self._distribuicao(0)}
+        if self.comparar:
+            mudaram = sum(q for (antes, depois), q in self.transicoes.items() if antes != depois)
+            resumo["config_b"] = self._distribuicao(1)
+            resumo["comparacao"] = {
+                "transicoes": {f"{antes}->{depois}": q for (antes, depois), q in sorted(self.transicoes.items())},
+                "decisoes_alteradas": mudaram,
+                "percentual_alterado": round(100 * mudaram / max(self.total, 1), 2),
+                "variacao_media_score": round(self.soma_variacao / max(self.total, 1), 2),
+                "maior_aumento_score": self.maior_aumento,
+                "maior_queda_score": self.maior_queda,
+                "criticidade_sugerida_alterada": self.criticidade_sugerida_alterada,
+            }
+        return resumo
+
+
+# === Saída ===
+
+class EscritorResultados:
+    """Grava as linhas em CSV ou JSONL conforme a extensão do arquivo"""
+
+    def __init__(self, caminho: str, comparar: bool = False):
+        self.caminho = Path(caminho)
+        self.formato_csv = self.caminho.suffix.lower() == ".csv"
+        campos = ["id", "numero_wex", "criticidade", "score", "decisao", "criticidade_sugerida"]
+        if comparar:
+            campos += ["score_b", "decisao_b", "criticidade_sugerida_b"]
+        self.campos = campos
+        self._arquivo = None
+        self._csv = None
+
+    def __enter__(self) -> "EscritorResultados":
+        self._arquivo = open(self.caminho, "w", encoding="utf-8", newline="")
+        if self.formato_csv:
+            self._csv = csv.DictWriter(self._arquivo, fieldnames=self.campos, extrasaction="ignore")
+            self._csv.writeheader()
+        return self
+
+    def escrever(self, linhas: Iterable[Dict[str, Any]]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(linhas)
+        else:
+            self._arquivo.writelines(json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+
+    def __exit__(self, *exc) -> None:
+        self._arquivo.close()
+
+
+def reavaliar(engine: Engine, config: Optional[str] = None, comparar: Optional[str] = None,
+              tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, workers: int = 1, limite: Optional[int] = None,
+              ia_remota: bool = False, saida: Optional[str] = None, progresso: bool = True) -> Dict[str, Any]:
+    """
+    Pontua o corpus uma vez por configuração e retorna o resumo agregado
+
+    Args:
+        config: Arquivo de configuração (padrão: triagem_config.json do backend)
+        comparar: Segundo arquivo de configuração, pontuado sobre os mesmos chamados
+        saida: Arquivo .csv ou .jsonl com o resultado por chamado (opcional)
+    """
+    caminhos = [config] + ([comparar] if comparar else [])
+    agregador = AgregadorScores(comparar=bool(comparar))
+    escritor = EscritorResultados(saida, comparar=bool(comparar)) if saida else None
+    inicio = time.perf_counter()
+
+    blocos = ler_chamados_em_blocos(engine, tamanho_bloco, limite)
+    with escritor if escritor else nullcontext():
+        for linhas in _blocos_pontuados(blocos, caminhos, ia_remota, workers):
+            for linha in linhas:
+                agregador.adicionar(linha)
+            if escritor:
+                escritor.escrever(linhas)
+            if progresso:
+                taxa = agregador.total / max(time.perf_counter() - inicio, 1e-9)
+                print(f"   {agregador.total} chamados pontuados ({taxa:,.0f}/s)")
+
+    resumo = agregador.resumo()
+    resumo["tempo_s"] = round(time.perf_counter() - inicio, 2)
+    return resumo
+
+
+def _imprimir_distribuicao(titulo: str, distribuicao: Dict[str, Any]) -> None:
+    print(f"\n{titulo}")
+    print(f"   Score médio: {distribuicao['score_medio']:.1f}")
+    icones = {"aprovado": "🟢", "revisao": "🟡", "recusado": "🔴"}
+    for decisao, quantidade in distribuicao["decisoes"].items():
+        print(f"   {icones.get(decisao, '⚪')} {decisao}: {quantidade} ({distribuicao['percentual_decisoes'][decisao]:.1f}%)")
+    maior = max(distribuicao["histograma_scores"].values()) or 1
+    for faixa, quantidade in distribuicao["histograma_scores"].items():
+        print(f"   {faixa:>6}: {'█' * round(30 * quantidade / maior):<30} {quantidade}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reavaliação offline dos scores de triagem")
+    parser.add_argument("--config", help="Arquivo de configuração (padrão: triagem_config.json)")
+    parser.add_argument("--comparar", help="Segunda configuração pontuada sobre o mesmo corpus")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="Chamados lidos por consulta")
+    parser.add_argument("--workers", type=int, default=1, help="Processos de pontuação")
+    parser.add_argument("--limite", type=int, help="Pontuar só os primeiros N chamados")
+    parser.add_argument("--ia-remota", action="store_true", help="Manter as chamadas à API remota")
+    parser.add_argument("--saida", help="Resultado por chamado (.csv ou .jsonl)")
+    parser.add_argument("--resumo", help="Grava o resumo em JSON")
+    args = parser.parse_args(argv)
+
+    # Caminhos relativos ao diretório de onde o script foi chamado
+    caminhos = {nome: os.path.abspath(getattr(args, nome)) if getattr(args, nome) else None
+                for nome in ("config", "comparar", "saida", "resumo")}
+    os.chdir(DIRETORIO_BACKEND)
+    sys.path.insert(0, str(DIRETORIO_BACKEND))
+    logging.disable(logging.WARNING)
+
+    from database import engine
+
+    print("🔁 REAVALIAÇÃO DOS SCORES DE TRIAGEM")
+    print("=" * 70)
+    resumo = reavaliar(
+        engine, config=caminhos["config"], comparar=caminhos["comparar"], tamanho_bloco=args.bloco,
+        workers=args.workers, limite=args.limite, ia_remota=args.ia_remota, saida=caminhos["saida"]
+    )
+
+    _imprimir_distribuicao("📊 Configuração atual" if not caminhos["comparar"] else "📊 Configuração A",
+                           resumo["config"])
+    if "comparacao" in resumo:
+        _imprimir_distribuicao("📊 Configuração B", resumo["config_b"])
+        comparacao = resumo["comparacao"]
+        print(f"\n🔀 Decisões alteradas: {comparacao['decisoes_alteradas']} ({comparacao['percentual_alterado']:.1f}%)")
+        for transicao, quantidade in comparacao["transicoes"].items():
+            print(f"   {transicao}: {quantidade}")
+        print(f"   Variação média do score: {comparacao['variacao_media_score']:+.2f} "
+              f"(de {comparacao['maior_queda_score']:+d} a {comparacao['maior_aumento_score']:+d})")
+
+    print(f"\n✅ {resumo['total']} chamados em {resumo['tempo_s']:.1f}s")
+    if caminhos["saida"]:
+        print(f"💾 Resultados por chamado: {caminhos['saida']}")
+    if caminhos["resumo"]:
+        with open(caminhos["resumo"], "w", encoding="utf-8") as arquivo:
+            json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+        print(f"💾 Resumo: {caminhos['resumo']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,7 @@ import random
 from datetime import datetime, timedelta
 from database import SessionLocal
 from models import Chamado, FollowUp, StatusChamado, CriticidadeChamado, TipoFollowUp
+from generate_mock_data import limpar_dados
 
 def load_triagem_config():
     """Carrega configurações de triagem"""
@@ -26,13 +27,11 @@ def load_triagem_config():
         return json.load(f)
 
 def limpar_banco():
-    """Remove todos os dados existentes"""
+    """Remove todos os dados existentes (chamados, follow-ups e tabelas derivadas)"""
     db = SessionLocal()
     try:
         print("🧹 Limpando dados existentes...")
-        db.query(FollowUp).delete()
-        db.query(Chamado).delete()
-        db.commit()
+        limpar_dados(db.get_bind())
         print("✅ Banco limpo com sucesso!")
         return db
     except Exception as e:
@@ -0,0 +1,209 @@
+"""
+Serialização rápida das respostas JSON
+Consulta apenas as colunas necessárias (tuplas, sem hidratar objetos ORM)
+e codifica com orjson, que trata datetimes nativamente.
+Sem orjson instalado, usa o módulo json da biblioteca padrão.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, func
+from sqlalchemy.orm import Query
+
+from models import Chamado, FollowUp
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+VISAO_COMPLETA = "full"
+VISAO_RESUMO = "summary"
+
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+    ORJSON_DISPONIVEL = False
+    logger.info("orjson não instalado: usando json da biblioteca padrão nas respostas")
+
+
+def _get_config_listagem(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.listagem"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('listagem', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+def _valor_padrao(valor: Any) -> Any:
+    """Tipos que nenhum dos codificadores trata diretamente"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    if hasattr(valor, 'value'):  # Enums
+        return valor.value
+    if hasattr(valor, 'tolist'):  # numpy
+        return valor.tolist()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def dumps(conteudo: Any) -> bytes:
+    """Codifica o conteúdo em JSON (bytes UTF-8)"""
+    if ORJSON_DISPONIVEL:
+        return orjson.dumps(
+            conteudo,
+            default=_valor_padrao,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(conteudo, default=_valor_padrao, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(texto: Any) -> Any:
+    return orjson.loads(texto) if ORJSON_DISPONIVEL else json.loads(texto)
+
+
+class RespostaJSONRapida(JSONResponse):
+    """Resposta JSON padrão da API (orjson quando disponível)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def resposta_json(conteudo: Any, response: Optional[Response] = None) -> RespostaJSONRapida:
+    """
+    Resposta pronta, sem passar por jsonable_encoder nem response_model
+
+    Copia os cabeçalhos já definidos na resposta injetada no endpoint (ex.: ETag).
+    """
+    cabecalhos = dict(response.headers) if response is not None else None
+    return RespostaJSONRapida(conteudo, headers=cabecalhos)
+
+
+# === Projeções por coluna ===
+
+def _lista_json(texto: Any) -> list:
+    """Campos JSON armazenados como texto (tags, anexos)"""
+    if not texto:
+        return []
+    try:
+        return loads(texto)
+    except ValueError:
+        return []
+
+
+# Colunas de Chamado.to_dict, na mesma ordem
+COLUNAS_CHAMADO: Dict[str, Any] = {
+    "id": Chamado.id,
+    "numero_wex": Chamado.numero_wex,
+    "cliente_solicitante": Chamado.cliente_solicitante,
+    "descricao": Chamado.descricao,
+    "status": Chamado.status,
+    "criticidade": Chamado.criticidade,
+    "data_criacao": Chamado.data_criacao,
+    "data_atualizacao": Chamado.data_atualizacao,
+    "sla_limite": Chamado.sla_limite,
+    "tags_automaticas": Chamado.tags_automaticas,
+    "score_qualidade": Chamado.score_qualidade,
+    "ambiente_informado": Chamado.ambiente_informado,
+    "possui_anexos": Chamado.possui_anexos,
+    "total_followups": Chamado.total_followups
+}
+
+# Colunas de FollowUp.to_dict, na mesma ordem
+COLUNAS_FOLLOWUP: Dict[str, Any] = {
+    "id": FollowUp.id,
+    "chamado_id": FollowUp.chamado_id,
+    "tipo": FollowUp.tipo,
+    "descricao": FollowUp.descricao,
+    "data_criacao": FollowUp.data_criacao,
+    "autor": FollowUp.autor,
+    "anexos": FollowUp.anexos
+}
+
+
+def colunas_resumo_chamado() -> Dict[str, Any]:
+    """
+    Colunas da visão resumida da listagem (view=summary)
+
+    A descrição é truncada no próprio SQL, então o texto completo não sai do banco.
+    """
+    tamanho = int(_get_config_listagem('tamanho_resumo_descricao', 120))
+    return {
+        "id": Chamado.id,
+        "numero_wex": Chamado.numero_wex,
+        "cliente_solicitante": Chamado.cliente_solicitante,
+        "descricao": func.substr(Chamado.descricao, 1, tamanho).label("descricao"),
+        "descricao_truncada": case((func.length(Chamado.descricao) > tamanho, True), else_=False).label("descricao_truncada"),
+        "status": Chamado.status,
+        "criticidade": Chamado.criticidade,
+        "data_criacao": Chamado.data_criacao,
+        "data_atualizacao": Chamado.data_atualizacao,
+        "score_qualidade": Chamado.score_qualidade
+    }
+
+
+def colunas_listagem_chamados(visao: str = VISAO_COMPLETA, campos: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Colunas selecionadas pela listagem de chamados
+
+    visao escolhe o conjunto base (completo ou resumido); campos restringe a um
+    subconjunto dele (o id é sempre incluído). Campos desconhecidos geram ValueError.
+    """
+    colunas = colunas_resumo_chamado() if visao == VISAO_RESUMO else COLUNAS_CHAMADO
+    if not campos:
+        return dict(colunas)
+    desconhecidos = [campo for campo in campos if campo not in colunas]
+    if desconhecidos:
+        raise ValueError(
+            f"Campos inválidos para a visão '{visao}': {', '.join(desconhecidos)}. "
+            f"Disponíveis: {', '.join(colunas)}"
+        )
+    selecionados = ["id"] + [nome for nome in colunas if nome in campos and nome != "id"]
+    return {nome: colunas[nome] for nome in selecionados}
+
+
+def interpretar_campos(fields: Optional[List[str]]) -> List[str]:
+    """Aceita fields=a,b e/ou fields=a&fields=b"""
+    campos: List[str] = []
+    for valor in fields or []:
+        campos.extend(parte.strip() for parte in valor.split(",") if parte.strip())
+    return campos
+
+
+# Colunas guardadas como texto JSON e devolvidas como lista
+CAMPOS_LISTA_JSON = {"tags_automaticas", "anexos"}
+
+
+def projetar(consulta: Query, colunas: Dict[str, Any]) -> Tuple[List[str], List[Sequence]]:
+    """Executa a consulta selecionando apenas as colunas informadas (tuplas)"""
+    nomes = list(colunas)
+    return nomes, consulta.with_entities(*colunas.values()).all()
+
+
+def linhas_para_dicts(nomes: List[str], linhas: List[Sequence]) -> List[Dict[str, Any]]:
+    """Converte as tuplas em dicts no formato de to_dict (datetimes ficam para o codificador)"""
+    campos_json = [i for i, nome in enumerate(nomes) if nome in CAMPOS_LISTA_JSON]
+    resultado = []
+    for linha in linhas:
+        item = dict(zip(nomes, linha))
+        if "descricao_truncada" in item:
+            item["descricao_truncada"] = bool(item["descricao_truncada"])
+        for i in campos_json:
+            item[nomes[i]] = _lista_json(linha[i])
+        resultado.append(item)
+    return resultado
+
+
+def consultar_dicts(consulta: Query, colunas: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Atalho: projeção por coluna já convertida em dicts"""
+    return linhas_para_dicts(*projetar(consulta, colunas))
@@ -0,0 +1,276 @@
+"""
+Servidor de arquivos estáticos do frontend
+Uma thread por conexão (um cliente lento não bloqueia os demais), conexões
+keep-alive (HTTP/1.1), conteúdo em memória invalidado pelo mtime, variantes
+pré-comprimidas (.br/.gz), ETag/304, requisições Range e sendfile para
+arquivos grandes
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from compressao import (
+    EXTENSOES_COMPRIMIVEIS, caminho_variante, codificacoes_disponiveis, comprimir, escolher_codificacao,
+    hash_conteudo
+)
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+# URLs versionadas (?v=<hash>) nunca mudam de conteúdo: cache longo no navegador
+CACHE_VERSIONADO = "public, max-age=31536000, immutable"
+# Demais URLs (ex.: index.html): sempre revalidar pelo ETag
+CACHE_REVALIDAR = "no-cache"
+
+
+def _get_config_servidor(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.servidor_frontend"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('servidor_frontend', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+@dataclass
+class EntradaArquivo:
+    """Arquivo estático em cache: conteúdo (se couber na memória), ETag e variantes comprimidas"""
+    caminho: Path
+    mtime: float
+    tamanho: int
+    etag: str
+    conteudo: Optional[bytes] = None  # None: servido do disco com sendfile
+    variantes: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def em_memoria(self) -> bool:
+        return self.conteudo is not None
+
+
+class CacheArquivos:
+    """Cache em memória dos arquivos servidos, revalidado pelo mtime a cada requisição"""
+
+    def __init__(self, max_arquivo_bytes: Optional[int] = None, max_total_bytes: Optional[int] = None):
+        self.max_arquivo_bytes = int(max_arquivo_bytes if max_arquivo_bytes is not None
+                                     else _get_config_servidor('max_arquivo_memoria_bytes', 2 * 1024 * 1024))
+        self.max_total_bytes = int(max_total_bytes if max_total_bytes is not None
+                                   else _get_config_servidor('max_cache_bytes', 64 * 1024 * 1024))
+        self._entradas: Dict[Path, EntradaArquivo] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def _tamanho_entrada(entrada: EntradaArquivo) -> int:
+        return len(entrada.conteudo or b"") + sum(len(v) for v in entrada.variantes.values())
+
+    def _carregar(self, caminho: Path, estado: os.stat_result) -> EntradaArquivo:
+        if estado.st_size > self.max_arquivo_bytes:
+            # Grande demais para a memória: ETag pelo tamanho/mtime, conteúdo via sendfile
+            etag = f"{int(estado.st_mtime_ns):x}-{estado.st_size:x}"
+            return EntradaArquivo(caminho, estado.st_mtime, estado.st_size, etag)
+
+        conteudo = caminho.read_bytes()
+        entrada = EntradaArquivo(caminho, estado.st_mtime, len(conteudo), hash_conteudo(conteudo), conteudo)
+        if caminho.suffix.lower() in EXTENSOES_COMPRIMIVEIS:
+            for codificacao in codificacoes_disponiveis():
+                variante = caminho_variante(caminho, codificacao)
+                try:
+                    if variante.stat().st_mtime >= estado.st_mtime:
+                        entrada.variantes[codificacao] = variante.read_bytes()
+                        continue
+                except OSError:
+                    pass
+                # Variante ausente ou mais antiga que o arquivo: comprime em memória
+                comprimido = comprimir(conteudo, codificacao)
+                if len(comprimido) < len(conteudo):
+                    entrada.variantes[codificacao] = comprimido
+        return entrada
+
+    def obter(self, caminho: Path) -> Optional[EntradaArquivo]:
+        """Entrada atual do arquivo (None se não existe ou não é arquivo)"""
+        try:
+            estado = caminho.stat()
+        except OSError:
+            return None
+        if not caminho.is_file():
+            return None
+
+        with self._lock:
+            entrada = self._entradas.get(caminho)
+            if entrada is not None and entrada.mtime == estado.st_mtime and entrada.tamanho == estado.st_size:
+                self.acertos += 1
+                return entrada
+            self.falhas += 1
+
+        entrada = self._carregar(caminho, estado)
+        tamanho = self._tamanho_entrada(entrada)
+        with self._lock:
+            anterior = self._entradas.pop(caminho, None)
+            if anterior is not None:
+                self._total_bytes -= self._tamanho_entrada(anterior)
+            if self._total_bytes + tamanho <= self.max_total_bytes:
+                self._entradas[caminho] = entrada
+                self._total_bytes += tamanho
+        return entrada
+
+
+def interpretar_range(cabecalho: str, tamanho: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo (início, fim inclusivo) de um cabeçalho Range de faixa única
+
+    Retorna None para Range inválido ou com várias faixas (servido completo)
+    e levanta ValueError quando a faixa não é satisfazível (416).
+    """
+    unidade, _, faixas = cabecalho.partition("=")
+    if unidade.strip().lower() != "bytes" or "," in faixas:
+        return None
+    inicio_txt, separador, fim_txt = (parte.strip() for parte in faixas.strip().partition("-"))
+    if not separador or not (inicio_txt or fim_txt) or not all(t.isdigit() for t in (inicio_txt, fim_txt) if t):
+        return None
+    inicio = int(inicio_txt) if inicio_txt else None
+    fim = int(fim_txt) if fim_txt else None
+    if inicio is None:
+        # bytes=-N: os últimos N bytes
+        if fim == 0 or tamanho == 0:
+            raise ValueError("faixa vazia")
+        return max(tamanho - fim, 0), tamanho - 1
+    if fim is not None and fim < inicio:
+        return None
+    if inicio >= tamanho:
+        raise ValueError("faixa fora do arquivo")
+    return inicio, tamanho - 1 if fim is None else min(fim, tamanho - 1)
+
+
+class ManipuladorEstatico(SimpleHTTPRequestHandler):
+    """GET/HEAD de arquivos estáticos com cache, compressão, ETag/304 e Range"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    cache: CacheArquivos = None  # definido por criar_servidor
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _resolver(self) -> Tuple[Optional[Path], bool]:
+        """(arquivo pedido, versionado?); redireciona diretórios sem barra final"""
+        url = urlsplit(self.path)
+        caminho = Path(self.translate_path(url.path))
+        if caminho.is_dir():
+            if not url.path.endswith("/"):
+                return None, False
+            caminho = caminho / "index.html"
+        return caminho, "v" in parse_qs(url.query)
+
+    def _nao_modificado(self, etag: str, mtime: float) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            candidatos = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+            return "*" in candidatos or etag in candidatos
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _servir(self, com_corpo: bool):
+        caminho, versionado = self._resolver()
+        if caminho is None:
+            # Diretório sem barra final: comportamento padrão (301)
+            f = super().send_head()
+            if f:
+                f.close()
+            return
+        entrada = self.cache.obter(caminho)
+        if entrada is None:
+            self.send_error(404, "File not found")
+            return
+
+        # Range é atendido sobre a representação sem compressão
+        range_pedido = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_pedido and if_range and if_range.strip() != f'"{entrada.etag}"':
+            range_pedido = None
+        codificacao = None
+        if not range_pedido:
+            codificacao = escolher_codificacao(self.headers.get("Accept-Encoding"), list(entrada.variantes))
+        etag = f"{entrada.etag}-{codificacao}" if codificacao else entrada.etag
+
+        if self._nao_modificado(f'"{etag}"', entrada.mtime):
+            self.send_response(304)
+            self._cabecalhos_validacao(etag, entrada, versionado)
+            self.end_headers()
+            return
+
+        corpo = entrada.variantes[codificacao] if codificacao else entrada.conteudo
+        tamanho = len(corpo) if corpo is not None else entrada.tamanho
+        inicio, fim = 0, tamanho - 1
+        status = 200
+        if range_pedido:
+            try:
+                faixa = interpretar_range(range_pedido, tamanho)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{tamanho}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if faixa is not None:
+                (inicio, fim), status = faixa, 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", self.guess_type(str(caminho)))
+        self.send_header("Content-Length", str(fim - inicio + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{tamanho}")
+        if codificacao:
+            self.send_header("Content-Encoding", codificacao)
+        self._cabecalhos_validacao(etag, entrada, versionado)
+        self.end_headers()
+        if not com_corpo or tamanho == 0:
+            return
+
+        if corpo is not None:
+            self.wfile.write(memoryview(corpo)[inicio:fim + 1])
+        else:
+            # Fora do cache: sendfile direto do disco para o socket
+            with open(entrada.caminho, "rb") as arquivo:
+                self.connection.sendfile(arquivo, offset=inicio, count=fim - inicio + 1)
+
+    def _cabecalhos_validacao(self, etag: str, entrada: EntradaArquivo, versionado: bool):
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Last-Modified", self.date_time_string(int(entrada.mtime)))
+        self.send_header("Cache-Control", CACHE_VERSIONADO if versionado else CACHE_REVALIDAR)
+        self.send_header("Vary", "Accept-Encoding")
+
+    def do_GET(self):
+        self._servir(com_corpo=True)
+
+    def do_HEAD(self):
+        self._servir(com_corpo=False)
+
+
+class ServidorEstatico(ThreadingHTTPServer):
+    daemon_threads = True  # Conexões keep-alive ociosas não impedem o encerramento
+
+
+def criar_servidor(host: str, porta: int, diretorio: Path,
+                   cache: Optional[CacheArquivos] = None) -> ServidorEstatico:
+    """Cria o servidor de arquivos estáticos do diretório (cache compartilhado entre as threads)"""
+    manipulador = type("ManipuladorConfigurado", (ManipuladorEstatico,), {
+        "cache": cache or CacheArquivos(),
+        # Conexões keep-alive ociosas liberam a thread após o timeout
+        "timeout": float(_get_config_servidor('keepalive_timeout_s', 15))
+    })
+    return ServidorEstatico((host, porta), partial(manipulador, directory=str(diretorio)))
@@ -0,0 +1,150 @@
+"""
+Execução da API em produção com vários processos
+Com gunicorn (Linux/macOS): a aplicação e os caches de similaridade são
+carregados no processo mestre antes do fork (compartilhados por copy-on-write)
+e os workers podem ser reiniciados sem derrubar o serviço. Sem gunicorn
+(ex.: Windows), usa o modo multiprocesso do próprio uvicorn.
+"""
+
+import logging
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from config_manager import get_config_manager
+
+logger = logging.getLogger(__name__)
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_DISPONIVEL = True
+except ImportError:  # pragma: no cover - depende do ambiente
+    BaseApplication = None
+    GUNICORN_DISPONIVEL = False
+
+PIDFILE_PADRAO = Path(__file__).parent / "wex_api.pid"
+
+
+def _get_config_servidor_api(chave: str, padrao: Any) -> Any:
+    """Lê uma chave da seção configuracoes_avancadas.servidor_api"""
+    try:
+        valor = get_config_manager().get_configuracao_avancada('servidor_api', chave)
+    except Exception:
+        valor = None
+    return padrao if valor is None else valor
+
+
+def calcular_workers(workers: Optional[int] = None) -> int:
+    """
+    Número de processos da API (0 ou None = um por núcleo)
+
+    As rotinas de similaridade são intensivas em CPU, então mais processos que
+    núcleos só disputariam a CPU.
+    """
+    if workers is None:
+        workers = int(_get_config_servidor_api('workers', 0) or 0)
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def aquecer_caches(db: Session) -> Dict[str, int]:
+    """
+    Pré-carrega os dados de similaridade em memória
+
+    Representantes dos grupos do relatório de padrões.
+    """
+    from padroes_incrementais import aquecer_lideres
+
+    return {"lideres_padroes": aquecer_lideres(db)}
+
+
+def preparar_aplicacao():
+    """Importa a aplicação e aquece os caches no processo mestre"""
+    from database import SessionLocal, engine, create_database
+    from main import app
+
+    create_database()
+    db = SessionLocal()
+    try:
+        estatisticas = aquecer_caches(db)
+        logger.info(f"Caches pré-carregados: {estatisticas}")
+    except Exception as e:
+        logger.warning(f"Falha ao pré-carregar caches (seguem sob demanda): {e}")
+    finally:
+        db.close()
+    # Conexões abertas no mestre não podem ser herdadas pelos workers
+    engine.dispose()
+    return app
+
+
+def _post_fork(server, worker):
+    from database import engine
+    engine.dispose()
+
+
+def executar_gunicorn(host: str, porta: int, workers: int, pidfile: Path = PIDFILE_PADRAO):
+    """Inicia o gunicorn com workers uvicorn e a aplicação pré-carregada"""
+
+    class AplicacaoWex(BaseApplication):
+        def __init__(self, opcoes: Dict[str, Any]):
+            self.opcoes = opcoes
+            super().__init__()
+
+        def load_config(self):
+            for chave, valor in self.opcoes.items():
+                self.cfg.set(chave, valor)
+
+        def load(self):
+            return preparar_aplicacao()
+
+    AplicacaoWex({
+        "bind": f"{host}:{porta}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "pidfile": str(pidfile),
+        "graceful_timeout": int(_get_config_servidor_api('graceful_timeout_s', 30)),
+        "timeout": int(_get_config_servidor_api('timeout_worker_s', 120)),
+        "keepalive": int(_get_config_servidor_api('keepalive_s', 5)),
+        # Reciclagem periódica dos workers (0 = desativada); jitter evita reinícios simultâneos
+        "max_requests": int(_get_config_servidor_api('max_requests', 0)),
+        "max_requests_jitter": int(_get_config_servidor_api('max_requests_jitter', 0)),
+        "post_fork": _post_fork,
+    }).run()
+
+
+def executar_uvicorn(host: str, porta: int, workers: int):
+    """Alternativa sem gunicorn: processos do uvicorn (sem pré-carga nem reinício gradual)"""
+    import uvicorn
+    uvicorn.run("main:app", host=host, port=porta, workers=workers, log_level="info")
+
+
+def recarregar_sem_interrupcao(pidfile: Path = PIDFILE_PADRAO, timeout_s: float = 60) -> int:
+    """
+    Troca a versão em execução sem derrubar conexões (gunicorn)
+
+    USR2 inicia um novo mestre com o código atual ao lado do antigo; quando ele
+    grava seu pidfile (<pidfile>.2 enquanto o antigo existir), o mestre antigo
+    recebe TERM e encerra seus workers após concluírem as requisições em
+    andamento. O novo mestre então assume o pidfile original. Retorna seu pid.
+    """
+    if not hasattr(signal, "SIGUSR2"):
+        raise OSError("recarga sem interrupção requer gunicorn (Linux/macOS); neste sistema reinicie o servidor")
+    pid_antigo = int(Path(pidfile).read_text().strip())
+    pidfile_novo = Path(f"{pidfile}.2")
+    os.kill(pid_antigo, signal.SIGUSR2)
+    limite = time.monotonic() + timeout_s
+    while time.monotonic() < limite:
+        time.sleep(0.5)
+        try:
+            pid_novo = int(pidfile_novo.read_text().strip())
+        except (OSError, ValueError):
+            continue
+        # Dá tempo aos workers do novo mestre de subirem antes de retirar os antigos
+        time.sleep(float(_get_config_servidor_api('espera_troca_s', 5)))
+        os.kill(pid_antigo, signal.SIGTERM)
+        return pid_novo
+    raise TimeoutError(f"Novo mestre não iniciou em {timeout_s}s; a versão anterior segue ativa")
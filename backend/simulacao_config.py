@@ -0,0 +1,414 @@
+"""
+Simulação de configurações de triagem sobre o histórico de chamados
+Mantém na tabela chamado_scores_categorias os scores brutos de cada categoria
+(anexos, descrição, info técnicas, contexto) e, em memória, a matriz N×4
+correspondente. Pesos e thresholds candidatos são reaplicados sobre a matriz
+com aritmética vetorial (numpy), sem repetir a análise de texto.
+
+Os scores brutos dependem só de pontuacao_criterios, limites_conteudo e
+palavras_chave; quando essas seções mudam, a matriz é recalculada. A análise
+de qualidade pela IA remota (bônus de até 2 pontos na descrição) não entra na
+matriz, para que o cálculo seja determinístico e viável em lote.
+
+Na API a matriz é construída e atualizada numa thread em background: a
+requisição usa a matriz já em memória (mesmo que algumas linhas estejam para
+ser recalculadas) e, sem matriz para os critérios atuais, recebe
+MatrizEmConstrucao (503) enquanto o cálculo roda.
+
+Uso pela linha de comando (cálculo inicial ou após mudar os critérios):
+    python simulacao_config.py
+"""
+
+import json
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import SessionLocal
+from models import Chamado, ChamadoScoreCategorias
+from config_manager import get_config_manager
+from cache_http import marcador_chamados
+from wex_ai_engine import WexIntelligenceAI, desativar_ia_remota
+
+logger = logging.getLogger(__name__)
+
+CATEGORIAS = ('anexos', 'descricao', 'info_tecnicas', 'contexto')
+MAXIMOS_PADRAO = {'anexos': 30, 'descricao': 25, 'info_tecnicas': 25, 'contexto': 20}
+PESOS_PADRAO = {'anexos': 0.30, 'descricao': 0.25, 'info_tecnicas': 0.25, 'contexto': 0.20}
+DECISOES = ('recusado', 'revisao', 'aprovado')  # Índice = código usado nos vetores
+SECOES_CRITERIOS = ('pontuacao_criterios', 'limites_conteudo', 'palavras_chave')
+TAMANHO_LOTE = 500  # Também o limite de parâmetros por cláusula IN no SQLite
+
+# Motor local (sem API remota) usado só para os scores por categoria
+_motor_local: Optional[WexIntelligenceAI] = None
+_lock = threading.Lock()  # Serializa a construção/atualização da matriz
+_lock_thread = threading.Lock()
+_atualizacao: Optional[threading.Thread] = None  # Thread de atualização em background
+
+
+class MatrizEmConstrucao(Exception):
+    """Ainda não há matriz para os critérios atuais; o cálculo está rodando em background"""
+
+
+def _motor() -> WexIntelligenceAI:
+    global _motor_local
+    if _motor_local is None:
+        _motor_local = WexIntelligenceAI()
+        desativar_ia_remota(_motor_local)
+    return _motor_local
+
+
+def versao_criterios(config) -> str:
+    """Hash das seções da configuração que afetam os scores brutos"""
+    secoes = {secao: getattr(config, secao) for secao in SECOES_CRITERIOS}
+    return hashlib.sha1(json.dumps(secoes, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def calcular_scores_categorias(chamado: Chamado) -> Dict[str, int]:
+    """Scores brutos das quatro categorias, como em realizar_triagem"""
+    motor = _motor()
+    dados = {
+        'id': chamado.id,
+        'numero_wex': chamado.numero_wex,
+        'titulo': f"Chamado {chamado.numero_wex}",
+        'cliente_solicitante': chamado.cliente_solicitante,
+        'criticidade': chamado.criticidade,
+        'data_criacao': chamado.data_criacao.isoformat() if chamado.data_criacao else None,
+        'anexos_count': 1 if chamado.possui_anexos else 0
+    }
+    descricao = chamado.descricao or ''
+    return {
+        'anexos': motor.calcular_score_anexos(dados),
+        'descricao': motor.calcular_score_descricao(descricao)[0],
+        'info_tecnicas': motor.calcular_score_info_tecnicas(dados)[0],
+        'contexto': motor.calcular_score_contexto(descricao)[0],
+    }
+
+
+def atualizar_scores_categorias(db: Session, tamanho_lote: int = TAMANHO_LOTE) -> List[Tuple[int, Tuple[int, ...]]]:
+    """
+    Calcula os scores dos chamados sem registro ou com registro desatualizado
+
+    Desatualizado: outra versão dos critérios ou chamado alterado depois do
+    cálculo (data_atualizacao diferente). Retorna (id, scores) dos recalculados.
+    """
+    versao = versao_criterios(get_config_manager().config)
+    colunas = (Chamado.id, Chamado.numero_wex, Chamado.descricao, Chamado.cliente_solicitante,
+               Chamado.criticidade, Chamado.data_criacao, Chamado.possui_anexos)
+    pendentes = (
+        db.query(*colunas)
+        .outerjoin(ChamadoScoreCategorias, ChamadoScoreCategorias.chamado_id == Chamado.id)
+        .filter(or_(
+            ChamadoScoreCategorias.chamado_id.is_(None),
+            ChamadoScoreCategorias.versao_criterios != versao,
+            ChamadoScoreCategorias.data_atualizacao_chamado.is_(None),
+            ChamadoScoreCategorias.data_atualizacao_chamado != Chamado.data_atualizacao,
+        ))
+        .order_by(Chamado.id)
+    )
+
+    recalculados = []
+    ultimo_id = 0
+    while True:
+        lote = pendentes.filter(Chamado.id > ultimo_id).limit(tamanho_lote).all()
+        if not lote:
+            break
+        ultimo_id = lote[-1].id
+        linhas = []
+        for chamado in lote:
+            scores = calcular_scores_categorias(chamado)
+            linhas.append({'chamado_id': chamado.id, **scores, 'versao_criterios': versao})
+            recalculados.append((chamado.id, tuple(scores[c] for c in CATEGORIAS)))
+        ids = [linha['chamado_id'] for linha in linhas]
+        db.query(ChamadoScoreCategorias).filter(
+            ChamadoScoreCategorias.chamado_id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(ChamadoScoreCategorias, linhas)
+        # Copiado pelo banco para a comparação não depender do formato da data gravada
+        db.query(ChamadoScoreCategorias).filter(ChamadoScoreCategorias.chamado_id.in_(ids)).update(
+            {ChamadoScoreCategorias.data_atualizacao_chamado: select(Chamado.data_atualizacao)
+                .where(Chamado.id == ChamadoScoreCategorias.chamado_id).scalar_subquery()},
+            synchronize_session=False
+        )
+        db.commit()
+    return recalculados
+
+
+@dataclass
+class MatrizScores:
+    """Scores brutos (N×4) em ordem de id, com a versão dos dados que representam"""
+    ids: np.ndarray
+    scores: np.ndarray
+    marcador_chamados: tuple  # marcador_chamados do banco quando a matriz foi montada
+    versao_criterios: str
+
+    def aplicar(self, recalculados: List[Tuple[int, Tuple[int, ...]]]) -> "MatrizScores":
+        """Nova matriz com as linhas recalculadas substituídas ou acrescentadas"""
+        if not recalculados:
+            return self
+        novos_ids = np.array([chamado_id for chamado_id, _ in recalculados], dtype=np.int64)
+        novos_scores = np.array([scores for _, scores in recalculados], dtype=np.float64)
+        posicoes = np.searchsorted(self.ids, novos_ids)
+        existentes = np.zeros(len(novos_ids), dtype=bool)
+        if len(self.ids):
+            existentes = (posicoes < len(self.ids)) & (self.ids[np.minimum(posicoes, len(self.ids) - 1)] == novos_ids)
+        scores = self.scores.copy()
+        scores[posicoes[existentes]] = novos_scores[existentes]
+        ids = np.concatenate([self.ids, novos_ids[~existentes]])
+        scores = np.concatenate([scores, novos_scores[~existentes]])
+        ordem = np.argsort(ids, kind='stable')
+        return MatrizScores(ids[ordem], scores[ordem], self.marcador_chamados, self.versao_criterios)
+
+
+_matriz: Optional[MatrizScores] = None
+
+
+def _carregar_matriz(db: Session, marcador: tuple, versao: str) -> MatrizScores:
+    """Matriz completa lida da tabela (Core + tuplas: bem mais rápido que linhas do ORM)"""
+    colunas = [ChamadoScoreCategorias.chamado_id, *[getattr(ChamadoScoreCategorias, c) for c in CATEGORIAS]]
+    consulta = (
+        select(*colunas)
+        .join(Chamado, Chamado.id == ChamadoScoreCategorias.chamado_id)
+        .order_by(ChamadoScoreCategorias.chamado_id)
+    )
+    linhas = [tuple(linha) for linha in db.execute(consulta)]
+    dados = np.array(linhas, dtype=np.float64).reshape(-1, 1 + len(CATEGORIAS))
+    return MatrizScores(dados[:, 0].astype(np.int64), dados[:, 1:], marcador, versao)
+
+
+def obter_matriz(db: Session) -> MatrizScores:
+    """
+    Matriz em memória, atualizada só quando os chamados ou os critérios mudam
+
+    Alterações nos chamados (marcador do banco, que cobre também cargas pelo
+    Core e remoções em massa) recalculam apenas as linhas afetadas; mudança de
+    critérios recalcula a tabela inteira e recarrega a matriz.
+    """
+    global _matriz
+    with _lock:
+        marcador = marcador_chamados(db)
+        versao = versao_criterios(get_config_manager().config)
+        matriz = _matriz
+        if matriz is not None and matriz.marcador_chamados == marcador and matriz.versao_criterios == versao:
+            return matriz
+
+        recalculados = atualizar_scores_categorias(db)
+        if matriz is not None and matriz.versao_criterios == versao:
+            matriz = matriz.aplicar(recalculados)
+            matriz.marcador_chamados = marcador
+            if len(matriz.ids) != marcador[1]:  # Chamados removidos
+                matriz = _carregar_matriz(db, marcador, versao)
+        else:
+            matriz = _carregar_matriz(db, marcador, versao)
+        _matriz = matriz
+        return matriz
+
+
+def _atualizar_matriz(abrir_sessao):
+    db = abrir_sessao()
+    try:
+        inicio = time.perf_counter()
+        matriz = obter_matriz(db)
+        logger.info(f"Matriz de simulação atualizada: {len(matriz.ids)} chamados em {time.perf_counter() - inicio:.1f}s")
+    except Exception as e:
+        logger.error(f"Erro ao atualizar a matriz de simulação: {e}")
+    finally:
+        db.close()
+
+
+def atualizar_matriz_em_background(abrir_sessao=SessionLocal) -> bool:
+    """Inicia a atualização da matriz numa thread, se nenhuma estiver rodando; retorna se iniciou"""
+    global _atualizacao
+    with _lock_thread:
+        if _atualizacao is not None and _atualizacao.is_alive():
+            return False
+        _atualizacao = threading.Thread(target=_atualizar_matriz, args=(abrir_sessao,),
+                                        name="matriz-simulacao", daemon=True)
+        _atualizacao.start()
+        return True
+
+
+def matriz_disponivel(db: Session) -> Tuple[MatrizScores, bool]:
+    """
+    Matriz em memória sem bloquear a requisição: (matriz, atualizada)
+
+    Se os chamados mudaram, devolve a matriz anterior e agenda a atualização;
+    sem matriz para os critérios atuais, agenda o cálculo e levanta MatrizEmConstrucao.
+    """
+    matriz = _matriz
+    abrir_sessao = sessionmaker(bind=db.get_bind())
+    if matriz is None or matriz.versao_criterios != versao_criterios(get_config_manager().config):
+        atualizar_matriz_em_background(abrir_sessao)
+        raise MatrizEmConstrucao("Matriz de scores da simulação em construção; tente novamente em instantes")
+    if matriz.marcador_chamados != marcador_chamados(db):
+        atualizar_matriz_em_background(abrir_sessao)
+        return matriz, False
+    return matriz, True
+
+
+def limpar_matriz():
+    """Descarta a matriz em memória (recarregada na próxima simulação)"""
+    global _matriz
+    with _lock:
+        _matriz = None
+
+
+# === Simulação ===
+
+def _parametros(config: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, float, float]:
+    """Máximos, pesos e thresholds (aprovação, revisão) no formato vetorial"""
+    pontuacao = config.get('pontuacao_criterios', {})
+    pesos = config.get('pesos_categorias', {})
+    thresholds = config.get('thresholds', {})
+    maximos = np.array([pontuacao.get(c, {}).get('total_maximo', MAXIMOS_PADRAO[c]) for c in CATEGORIAS], dtype=np.float64)
+    vetor_pesos = np.array([pesos.get(c, PESOS_PADRAO[c]) for c in CATEGORIAS], dtype=np.float64)
+    return maximos, vetor_pesos, thresholds.get('aprovacao_automatica', 70), thresholds.get('revisao_humana', 50)
+
+
+def calcular_decisoes(scores: np.ndarray, config: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score total e código da decisão (índice em DECISOES) de cada linha
+
+    Mesma fórmula e ordem de operações de realizar_triagem, para que o
+    arredondamento (int) coincida com o do motor.
+    """
+    maximos, pesos, aprovacao, revisao = _parametros(config)
+    total = np.zeros(len(scores), dtype=np.float64)
+    for indice in range(len(CATEGORIAS)):
+        total = total + (scores[:, indice] / maximos[indice]) * (pesos[indice] * 100)
+    total = np.trunc(total)
+    decisoes = np.where(total >= aprovacao, 2, np.where(total >= revisao, 1, 0))
+    return total, decisoes
+
+
+def _config_atual() -> Dict[str, Any]:
+    config = get_config_manager().config
+    return {
+        'thresholds': dict(config.thresholds),
+        'pesos_categorias': dict(config.pesos_categorias),
+        'pontuacao_criterios': config.pontuacao_criterios,
+        'limites_conteudo': config.limites_conteudo,
+        'palavras_chave': config.palavras_chave,
+    }
+
+
+def montar_config_candidata(candidata: Dict[str, Any], atual: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Config atual com os thresholds e pesos candidatos (chaves omitidas mantêm o valor atual)
+
+    Retorna a config, as seções alteradas que não podem ser simuladas pela
+    matriz e os avisos. Levanta ValueError para valores inválidos.
+    """
+    if not isinstance(candidata, dict):
+        raise ValueError("A configuração candidata deve ser um objeto JSON")
+
+    thresholds = {**atual['thresholds'], **(candidata.get('thresholds') or {})}
+    pesos = {**atual['pesos_categorias'], **(candidata.get('pesos_categorias') or {})}
+
+    for chave in ('aprovacao_automatica', 'revisao_humana'):
+        valor = thresholds.get(chave)
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool) or not 0 <= valor <= 100:
+            raise ValueError(f"Threshold inválido: {chave} deve ser um número entre 0 e 100")
+    if thresholds['revisao_humana'] > thresholds['aprovacao_automatica']:
+        raise ValueError("revisao_humana não pode ser maior que aprovacao_automatica")
+
+    desconhecidas = set(pesos) - set(CATEGORIAS)
+    if desconhecidas:
+        raise ValueError(f"Categorias de peso desconhecidas: {', '.join(sorted(desconhecidas))}")
+    for categoria, valor in pesos.items():
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool) or valor < 0:
+            raise ValueError(f"Peso inválido para {categoria}: deve ser um número não negativo")
+
+    avisos = []
+    total_pesos = sum(pesos.values())
+    if abs(total_pesos - 1.0) > 0.01:  # Mesma tolerância da validação do ConfigManager
+        avisos.append(f"Soma dos pesos não é 1.0: {total_pesos:.3f}")
+
+    nao_simuladas = [
+        secao for secao in SECOES_CRITERIOS
+        if secao in candidata and candidata[secao] != atual[secao]
+    ]
+    config = {**atual, 'thresholds': thresholds, 'pesos_categorias': pesos}
+    return config, nao_simuladas, avisos
+
+
+def _distribuicao(decisoes: np.ndarray) -> Dict[str, int]:
+    contagens = np.bincount(decisoes, minlength=len(DECISOES))
+    return {DECISOES[i]: int(contagens[i]) for i in reversed(range(len(DECISOES)))}
+
+
+def simular_config(db: Session, candidata: Dict[str, Any], limite_exemplos: int = 100,
+                   aguardar_matriz: bool = True) -> Dict[str, Any]:
+    """
+    Distribuição das decisões com a config atual e com a candidata, e os chamados que mudam de decisão
+
+    Os exemplos de mudança vêm ordenados pela maior variação de score. Com
+    aguardar_matriz=False (API), usa matriz_disponivel e pode levantar MatrizEmConstrucao.
+    """
+    inicio = time.perf_counter()
+    atual = _config_atual()
+    config, nao_simuladas, avisos = montar_config_candidata(candidata, atual)
+    if aguardar_matriz:
+        matriz, atualizada = obter_matriz(db), True
+    else:
+        matriz, atualizada = matriz_disponivel(db)
+    inicio_calculo = time.perf_counter()
+
+    score_atual, decisao_atual = calcular_decisoes(matriz.scores, atual)
+    score_novo, decisao_nova = calcular_decisoes(matriz.scores, config)
+
+    alterados = np.nonzero(decisao_atual != decisao_nova)[0]
+    transicoes = np.bincount(decisao_atual[alterados] * len(DECISOES) + decisao_nova[alterados],
+                             minlength=len(DECISOES) ** 2)
+    variacao = score_novo[alterados] - score_atual[alterados]
+    exemplos = alterados[np.argsort(-np.abs(variacao), kind='stable')[:limite_exemplos]]
+    total = len(matriz.ids)
+
+    return {
+        "total_chamados": total,
+        "distribuicao_atual": _distribuicao(decisao_atual),
+        "distribuicao_simulada": _distribuicao(decisao_nova),
+        "score_medio_atual": round(float(score_atual.mean()), 2) if total else 0.0,
+        "score_medio_simulado": round(float(score_novo.mean()), 2) if total else 0.0,
+        "decisoes_alteradas": int(len(alterados)),
+        "transicoes": {
+            f"{DECISOES[i // len(DECISOES)]}->{DECISOES[i % len(DECISOES)]}": int(quantidade)
+            for i, quantidade in enumerate(transicoes) if quantidade
+        },
+        "chamados_alterados": [
+            {
+                "chamado_id": int(matriz.ids[i]),
+                "score_atual": int(score_atual[i]),
+                "score_simulado": int(score_novo[i]),
+                "decisao_atual": DECISOES[decisao_atual[i]],
+                "decisao_simulada": DECISOES[decisao_nova[i]],
+            }
+            for i in exemplos
+        ],
+        "config_simulada": {"thresholds": config['thresholds'], "pesos_categorias": config['pesos_categorias']},
+        "secoes_nao_simuladas": nao_simuladas,
+        "avisos": avisos,
+        "matriz_atualizada": atualizada,
+        "tempo_calculo_ms": round((time.perf_counter() - inicio_calculo) * 1000, 2),
+        "tempo_total_ms": round((time.perf_counter() - inicio) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    print("🧮 Calculando scores por categoria para a simulação de configurações...")
+    from database import create_database
+    create_database()
+    sessao = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        recalculados = atualizar_scores_categorias(sessao)
+        print(f"✅ {len(recalculados)} chamados calculados em {time.perf_counter() - inicio:.1f}s")
+    finally:
+        sessao.close()
@@ -2,33 +2,73 @@
 """
 Script para iniciar o Backend API do WEX Intelligence
 Roda na porta 8000 servindo apenas as APIs
+
+Uso:
+    python start_backend_api.py                 # desenvolvimento (um processo, reload)
+    python start_backend_api.py --producao      # vários processos (gunicorn ou uvicorn)
+    python start_backend_api.py --recarregar    # nova versão sem interrupção (gunicorn)
 """
 
+import argparse
 import uvicorn
 import sys
 from pathlib import Path
 
+from servidor_producao import (
+    GUNICORN_DISPONIVEL, PIDFILE_PADRAO, calcular_workers, executar_gunicorn, executar_uvicorn,
+    recarregar_sem_interrupcao
+)
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Backend API do WEX Intelligence")
+    parser.add_argument("--producao", action="store_true", help="Vários processos, sem reload")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: servidor_api.workers ou núcleos)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--recarregar", action="store_true",
+                        help="Troca a versão em execução sem derrubar conexões (gunicorn)")
+    return parser.parse_args()
+
 def start_backend_api():
     """Iniciar servidor FastAPI para as APIs"""
-    
+    args = _argumentos()
+
+    if args.recarregar:
+        try:
+            pid = recarregar_sem_interrupcao(PIDFILE_PADRAO)
+            print(f"🔄 Nova versão em execução (mestre {pid}); a anterior encerra após as requisições em andamento")
+        except (OSError, ValueError, TimeoutError) as e:
+            print(f"❌ Não foi possível recarregar: {e}")
+            sys.exit(1)
+        return
+
     print("🚀 WEX Intelligence - Backend API")
     print("=" * 50)
-    print("📡 APIs serão executadas em: http://localhost:8000")
-    print("📚 Documentação: http://localhost:8000/docs")
+    print(f"📡 APIs serão executadas em: http://localhost:{args.porta}")
+    print(f"📚 Documentação: http://localhost:{args.porta}/docs")
     print("🌐 Interface Frontend: http://localhost:3000")
+    if args.producao:
+        workers = calcular_workers(args.workers)
+        servidor = "gunicorn + uvicorn (pré-carga)" if GUNICORN_DISPONIVEL else "uvicorn multiprocesso"
+        print(f"🏭 Modo produção: {workers} processos ({servidor})")
     print("=" * 50)
     print("📝 Pressione Ctrl+C para parar o servidor")
     print()
-    
+
     try:
-        # Iniciar servidor FastAPI
-        uvicorn.run(
-            "main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        if args.producao and GUNICORN_DISPONIVEL:
+            executar_gunicorn(args.host, args.porta, workers, PIDFILE_PADRAO)
+        elif args.producao:
+            executar_uvicorn(args.host, args.porta, workers)
+        else:
+            # Iniciar servidor FastAPI
+            uvicorn.run(
+                "main:app",
+                host=args.host,
+                port=args.porta,
+                reload=True,
+                log_level="info"
+            )
     except KeyboardInterrupt:
         print("\n⏹️  Servidor API parado pelo usuário")
     except Exception as e:
@@ -36,4 +76,4 @@ def start_backend_api():
         sys.exit(1)
 
 if __name__ == "__main__":
-    start_backend_api()
\ No newline at end of file
+    start_backend_api()
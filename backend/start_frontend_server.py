@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """
-Servidor HTTP simples para servir a Interface HTML do WEX Intelligence
+Servidor HTTP para servir a Interface HTML do WEX Intelligence
 Roda na porta 3000 para separar da API (porta 8000)
 """
 
-import http.server
-import socketserver
-import os
 import sys
 from pathlib import Path
 
+from compressao import codificacoes_disponiveis, gerar_variantes_comprimidas
+from servidor_estatico import criar_servidor
+
 def start_frontend_server():
     """Iniciar servidor HTTP para a Interface HTML"""
     
@@ -31,18 +31,17 @@ def start_frontend_server():
         print(f"❌ Erro: Arquivo {index_file} não encontrado!")
         sys.exit(1)
     
-    # Mudar para o diretório static
-    os.chdir(static_dir)
-    
-    # Configurar handler HTTP
-    Handler = http.server.SimpleHTTPRequestHandler
+    # Variantes .gz/.br geradas na inicialização (só as desatualizadas são refeitas)
+    variantes = gerar_variantes_comprimidas(static_dir)
     
     try:
-        with socketserver.TCPServer((HOST, PORT), Handler) as httpd:
+        # Uma thread por conexão, arquivos em cache na memória (ver servidor_estatico.py)
+        with criar_servidor(HOST, PORT, static_dir) as httpd:
             print("🌐 WEX Intelligence - Interface Frontend")
             print("=" * 50)
             print(f"🚀 Servidor HTTP iniciado em: http://{HOST}:{PORT}")
             print(f"📁 Servindo arquivos de: {static_dir}")
+            print(f"🗜️  Variantes comprimidas: {variantes['geradas']} geradas, {variantes['mantidas']} reaproveitadas ({', '.join(codificacoes_disponiveis())})")
             print(f"📡 APIs disponíveis em: http://localhost:8000")
             print("=" * 50)
             print("📝 Pressione Ctrl+C para parar o servidor")
@@ -0,0 +1,235 @@
+"""
+Testes da agenda de SLA
+Verifica a carga, a ordem dos próximos vencimentos, a sincronização com os
+commits e a detecção das violações pela tarefa assíncrona
+"""
+
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models import Chamado
+from eventos import barramento_eventos, EVENTO_SLA_VENCIDO
+from agenda_sla import AgendaSLA, agenda_sla, executar_agenda_sla
+
+AGORA = datetime(2025, 1, 10, 12, 0, 0)
+
+
+def _criar_sessao():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _chamado(numero: str, sla_limite, status: str = "Aberto", criticidade: str = "Alta") -> Chamado:
+    return Chamado(numero_wex=numero, cliente_solicitante="Cliente Teste", descricao="Teste de SLA",
+                   status=status, criticidade=criticidade, sla_limite=sla_limite)
+
+
+def _eventos_sla(desde_id: int):
+    return [e for e in list(barramento_eventos._historico) if e.tipo == EVENTO_SLA_VENCIDO and e.id > desde_id]
+
+
+def _ultimo_evento_id() -> int:
+    historico = list(barramento_eventos._historico)
+    return historico[-1].id if historico else 0
+
+
+def test_carga_e_vencimentos():
+    """Vencidos na carga não geram evento; prazos ultrapassados depois geram um evento cada"""
+    print("⏰ Testando carga e vencimentos...")
+    db = _criar_sessao()()
+    db.add_all([
+        _chamado("WEX-S1", AGORA - timedelta(hours=2)),
+        _chamado("WEX-S2", AGORA + timedelta(hours=3)),
+        _chamado("WEX-S3", AGORA + timedelta(hours=1), criticidade="Crítica"),
+        _chamado("WEX-S4", AGORA + timedelta(hours=2), status="Resolvido"),
+        _chamado("WEX-S5", None),
+        _chamado("WEX-S6", AGORA + timedelta(hours=5), status="Pendente"),
+    ])
+    db.commit()
+
+    agenda = AgendaSLA()
+    agenda.carregar(db, agora=AGORA)
+    assert agenda.total_vencidos == 1
+    assert [p.numero_wex for p in agenda.proximos_em_risco(10)] == ["WEX-S3", "WEX-S2", "WEX-S6"]
+    assert [p.numero_wex for p in agenda.proximos_em_risco(2)] == ["WEX-S3", "WEX-S2"]
+    assert agenda.proximo_vencimento() == AGORA + timedelta(hours=1)
+
+    desde = _ultimo_evento_id()
+    novos = agenda.processar_vencimentos(AGORA + timedelta(hours=3, minutes=1))
+    assert [p.numero_wex for p in novos] == ["WEX-S3", "WEX-S2"]
+    eventos = _eventos_sla(desde)
+    assert [e.dados["numero_wex"] for e in eventos] == ["WEX-S3", "WEX-S2"]
+    assert eventos[-1].dados["total_vencidos"] == 3
+    assert agenda.total_vencidos == 3
+    assert agenda.processar_vencimentos(AGORA + timedelta(hours=4)) == []
+    assert [p.numero_wex for p in agenda.vencidos(2)] == ["WEX-S1", "WEX-S3"]
+    db.close()
+    print("✅ Vencimentos detectados em ordem")
+
+
+def test_sincronizacao_commits():
+    """Criação, mudança de status e de prazo refletem na agenda só após o commit, sem invalidar o marcador"""
+    print("🔄 Testando sincronização com os commits...")
+    fabrica = _criar_sessao()
+    db = fabrica()
+    agora = datetime.now()
+    db.add_all([_chamado("WEX-C1", agora - timedelta(hours=1)), _chamado("WEX-C2", agora + timedelta(hours=4))])
+    db.commit()
+    try:
+        agenda_sla.carregar(db)
+        assert agenda_sla.total_vencidos == 1
+
+        novo = _chamado("WEX-C3", agora + timedelta(hours=1))
+        db.add(novo)
+        db.flush()
+        assert len(agenda_sla.proximos_em_risco(10)) == 1  # Ainda não comitado
+        db.commit()
+        assert [p.numero_wex for p in agenda_sla.proximos_em_risco(10)] == ["WEX-C3", "WEX-C2"]
+        assert agenda_sla.atualizada(db)  # Criação acompanhada: marcador avançado, sem recarga
+
+        vencido = db.query(Chamado).filter(Chamado.numero_wex == "WEX-C1").one()
+        vencido.criticidade = "Crítica"  # Continua vencido
+        db.commit()
+        assert agenda_sla.total_vencidos == 1
+        vencido.status = "Resolvido"
+        db.commit()
+        assert agenda_sla.total_vencidos == 0
+
+        novo.sla_limite = agora + timedelta(hours=8)
+        db.commit()
+        assert [p.numero_wex for p in agenda_sla.proximos_em_risco(10)] == ["WEX-C2", "WEX-C3"]
+
+        db.delete(vencido)
+        db.commit()
+        assert agenda_sla.atualizada(db) and not agenda_sla.garantir_atualizada(db)
+
+        novo.status = "Fechado"
+        db.rollback()
+        assert len(agenda_sla.proximos_em_risco(10)) == 2
+        print("✅ Agenda acompanha os commits")
+    finally:
+        agenda_sla.carregada = False
+        db.close()
+
+
+def test_tarefa_acorda_no_vencimento():
+    """A tarefa dorme só até o próximo prazo e publica a violação"""
+    print("⏳ Testando tarefa da agenda...")
+    fabrica = _criar_sessao()
+    db = fabrica()
+    db.add(_chamado("WEX-T1", datetime.now() + timedelta(seconds=0.3)))
+    db.commit()
+    db.close()
+
+    agenda = AgendaSLA()
+    desde = _ultimo_evento_id()
+
+    async def executar():
+        tarefa = asyncio.create_task(executar_agenda_sla(fabrica, agenda))
+        for _ in range(40):
+            await asyncio.sleep(0.05)
+            if agenda.total_vencidos:
+                break
+        tarefa.cancel()
+
+    asyncio.run(executar())
+    assert agenda.total_vencidos == 1
+    assert [e.dados["numero_wex"] for e in _eventos_sla(desde)] == ["WEX-T1"]
+    print("✅ Violação publicada no vencimento")
+
+
+def test_reconciliacao_com_banco():
+    """Escritas fora do ORM invalidam o marcador; a recarga gera evento só para o que venceu desde o processamento"""
+    print("🔁 Testando reconciliação da agenda...")
+    fabrica = _criar_sessao()
+    db = fabrica()
+    db.add_all([_chamado("WEX-R1", AGORA - timedelta(hours=1)), _chamado("WEX-R2", AGORA + timedelta(hours=2))])
+    db.commit()
+
+    agenda = AgendaSLA()
+    assert agenda.garantir_atualizada(db)
+    agenda.carregar(db, agora=AGORA)
+    assert agenda.atualizada(db) and not agenda.garantir_atualizada(db)
+
+    # Carga pelo Core (sem eventos do ORM): um prazo já vencido e um que vence depois do último processamento
+    db.execute(insert(Chamado.__table__), [
+        {"numero_wex": n, "cliente_solicitante": "Cliente", "descricao": "Carga", "status": "Aberto",
+         "criticidade": "Média", "data_criacao": AGORA, "data_atualizacao": AGORA, "sla_limite": prazo,
+         "score_qualidade": 0, "ambiente_informado": False, "possui_anexos": False}
+        for n, prazo in (("WEX-R3", AGORA - timedelta(hours=3)), ("WEX-R4", AGORA + timedelta(minutes=30)))
+    ])
+    db.commit()
+    assert not agenda.atualizada(db)
+
+    desde = _ultimo_evento_id()
+    assert agenda.garantir_atualizada(db)
+    assert agenda.total_vencidos == 2  # WEX-R1 e WEX-R3, sem evento
+    novos = agenda.processar_vencimentos(AGORA + timedelta(hours=1))
+    assert [p.numero_wex for p in novos] == ["WEX-R4"]
+    assert [e.dados["numero_wex"] for e in _eventos_sla(desde)] == ["WEX-R4"]
+
+    # Remoção em massa também é detectada
+    db.query(Chamado).filter(Chamado.numero_wex == "WEX-R1").delete(synchronize_session=False)
+    db.commit()
+    assert agenda.garantir_atualizada(db)
+    assert agenda.total_vencidos == 2 and agenda.atualizada(db)
+    db.close()
+    print("✅ Agenda reconciliada com o banco")
+
+
+def test_dashboard_sem_agenda_atualizada():
+    """Com a agenda desatualizada, o dashboard conta os vencidos no banco"""
+    print("📊 Testando fallback do dashboard...")
+    import main
+    db = _criar_sessao()()
+    agora = datetime.now()
+    db.add_all([_chamado("WEX-D1", agora - timedelta(hours=1)), _chamado("WEX-D2", agora + timedelta(hours=1))])
+    db.commit()
+    try:
+        agenda_sla.carregar(db)
+        assert main.calcular_metricas_dashboard(db)["chamados_vencidos"] == 1
+        db.execute(insert(Chamado.__table__), [{
+            "numero_wex": "WEX-D3", "cliente_solicitante": "Cliente", "descricao": "Carga", "status": "Aberto",
+            "criticidade": "Média", "data_criacao": agora, "data_atualizacao": agora,
+            "sla_limite": agora - timedelta(hours=2), "score_qualidade": 0, "ambiente_informado": False,
+            "possui_anexos": False}])
+        db.commit()
+        assert agenda_sla.total_vencidos == 1
+        assert main.calcular_metricas_dashboard(db)["chamados_vencidos"] == 2
+        print("✅ Dashboard conta no banco até a reconciliação")
+    finally:
+        agenda_sla.carregada = False
+        db.close()
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes da agenda de SLA")
+    print("=" * 50)
+    testes = [test_carga_e_vencimentos, test_sincronizacao_commits, test_tarefa_acorda_no_vencimento,
+              test_reconciliacao_com_banco, test_dashboard_sem_agenda_atualizada]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
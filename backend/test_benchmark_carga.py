@@ -0,0 +1,137 @@
+"""
+Testes do benchmark de carga
+Verifica o gerador com semente, os percentis e a execução dos cenários via ASGI
+"""
+
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from database import Base
+from generate_mock_data import gerar_dados_benchmark, gerar_dados_rapido, interpretar_pesos
+from benchmark_carga import Cenario, comparar_com_base, executar_cenarios, percentil
+
+
+def _gerar(semente: int):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    estatisticas = gerar_dados_benchmark(
+        engine, 300, semente=semente, data_referencia=datetime(2025, 1, 1), tamanho_lote=128, progresso=False
+    )
+    with engine.connect() as conexao:
+        chamados = conexao.execute(text("SELECT id, numero_wex, descricao, status, data_criacao FROM chamados ORDER BY id")).fetchall()
+        followups = conexao.execute(text("SELECT chamado_id, tipo, descricao FROM followups ORDER BY id")).fetchall()
+    return estatisticas, chamados, followups
+
+
+def test_gerador_reproduzivel():
+    """Mesma semente gera a mesma base; sementes diferentes geram bases diferentes"""
+    print("🌱 Testando gerador com semente...")
+    estatisticas, chamados, followups = _gerar(7)
+    _, chamados_repetidos, followups_repetidos = _gerar(7)
+    _, chamados_outros, _ = _gerar(8)
+
+    assert estatisticas["chamados"] == len(chamados) == 300
+    assert estatisticas["followups"] == len(followups) > 0
+    assert chamados == chamados_repetidos
+    assert followups == followups_repetidos
+    assert chamados != chamados_outros
+    assert {c.id for c in chamados} == set(range(1, 301))
+    assert len({c.status for c in chamados}) == 5
+    print(f"✅ {len(chamados)} chamados e {len(followups)} follow-ups reproduzíveis")
+
+
+def test_gerador_rapido():
+    """Mix de criticidade, período, limpeza e índices recriados após a carga"""
+    print("⚡ Testando gerador rápido...")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    pesos = interpretar_pesos("Alta=1,Crítica=3", ["Baixa", "Média", "Alta", "Crítica"])
+    for _ in range(2):  # a segunda carga limpa a primeira
+        estatisticas = gerar_dados_rapido(
+            engine, 250, semente=1, data_inicio=datetime(2024, 3, 1), data_fim=datetime(2024, 3, 31),
+            pesos_criticidade=pesos, workers=1, tamanho_lote=100, progresso=False
+        )
+    assert estatisticas["chamados"] == 250
+    with engine.connect() as conexao:
+        assert conexao.execute(text("SELECT COUNT(*) FROM chamados")).scalar() == 250
+        criticidades = dict(conexao.execute(text("SELECT criticidade, COUNT(*) FROM chamados GROUP BY criticidade")).fetchall())
+        inicio, fim = conexao.execute(text("SELECT MIN(data_criacao), MAX(data_criacao) FROM chamados")).fetchone()
+        indices = {linha[0] for linha in conexao.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert set(criticidades) == {"Alta", "Crítica"}
+    assert criticidades["Crítica"] > criticidades["Alta"]
+    assert "2024-03-01" <= inicio and fim <= "2024-03-31 00:00:00.000000"
+    assert {"ix_chamados_numero_wex", "ix_chamados_data_criacao", "ix_followups_chamado_id"} <= indices
+
+    try:
+        interpretar_pesos("Urgente=1", ["Baixa", "Alta"])
+        assert False, "peso inválido aceito"
+    except ValueError:
+        pass
+    print("✅ Gerador rápido respeita mix, período e índices")
+
+
+def test_percentis_e_comparacao():
+    """Percentis interpolados e variação contra a base"""
+    print("📐 Testando percentis...")
+    valores = [float(v) for v in range(1, 101)]
+    assert percentil(valores, 50) == 50.5
+    assert abs(percentil(valores, 99) - 99.01) < 1e-9
+    assert percentil([], 95) == 0.0
+
+    atual = {"cenarios": {"listagem": {"p50_ms": 12.0, "p95_ms": 20.0, "p99_ms": 30.0, "req_s": 90.0}}}
+    base = {"cenarios": {"listagem": {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 40.0, "req_s": 100.0}}}
+    comparacao = comparar_com_base(atual, base)
+    assert comparacao["listagem"] == {"p50_ms": 20.0, "p95_ms": 0.0, "p99_ms": -25.0, "req_s": -10.0}
+    print("✅ Percentis e comparação corretos")
+
+
+def test_execucao_cenarios():
+    """Cenários executados contra um app ASGI em processo, com contagem de erros"""
+    print("🏁 Testando execução dos cenários...")
+    app = FastAPI()
+
+    @app.get("/itens/{item_id}")
+    def obter_item(item_id: int):
+        return {"id": item_id}
+
+    cenarios = [
+        Cenario("item", "GET", lambda rng, ids: f"/itens/{rng.choice(ids)}"),
+        Cenario("inexistente", "GET", lambda rng, ids: "/nada"),
+    ]
+    resultados = asyncio.run(executar_cenarios(app, cenarios, [1, 2, 3], requisicoes=20, concorrencia=3,
+                                               aquecimento=2, progresso=False))
+    assert resultados["item"]["requisicoes"] == 20
+    assert resultados["item"]["erros"] == 0
+    assert resultados["item"]["req_s"] > 0
+    assert resultados["item"]["p50_ms"] <= resultados["item"]["p99_ms"]
+    assert resultados["inexistente"]["erros"] == 20
+    print("✅ Cenários executados")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do benchmark de carga")
+    print("=" * 50)
+    testes = [test_gerador_reproduzivel, test_gerador_rapido, test_percentis_e_comparacao, test_execucao_cenarios]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,76 @@
+"""
+Testes do micro-benchmark do motor de IA
+Verifica o corpus reproduzível, a medição por tamanho e a detecção de regressões
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_ia import (
+    OPERACOES, executar_benchmark, expoente_escala, gerar_corpus, verificar_regressoes
+)
+
+
+def test_corpus_reproduzivel():
+    """Mesma semente, mesmo corpus"""
+    print("🌱 Testando corpus...")
+    corpus = gerar_corpus(50, semente=3)
+    assert [c.descricao for c in corpus] == [c.descricao for c in gerar_corpus(50, semente=3)]
+    assert [c.id for c in corpus] == list(range(1, 51))
+    print("✅ Corpus reproduzível")
+
+
+def test_execucao_todas_operacoes():
+    """Todas as operações medidas em cada tamanho, com a IA remota desativada"""
+    print("⏱️ Testando execução do benchmark...")
+    resultado = executar_benchmark(OPERACOES, [10, 40], repeticoes=1, progresso=False)
+    assert set(resultado) == {o.nome for o in OPERACOES}
+    for nome, dados in resultado.items():
+        assert set(dados["tamanhos"]) == {"10", "40"}, nome
+        for medicao in dados["tamanhos"].values():
+            assert medicao["total_ms"] > 0
+            assert medicao["por_op_us"] > 0
+            assert medicao["pico_memoria_kb"] >= 0
+        assert dados["expoente_escala"] is not None
+    print("✅ Operações medidas")
+
+
+def test_escala_e_regressoes():
+    """Expoente log-log e regressões acima do limite"""
+    print("📉 Testando escala e regressões...")
+    assert expoente_escala({100: 1.0, 1000: 10.0}) == 1.0
+    assert expoente_escala({100: 1.0, 1000: 100.0}) == 2.0
+    assert expoente_escala({100: 1.0}) is None
+
+    base = {"operacoes": {"triagem": {"tamanhos": {"100": {"por_op_us": 10.0}, "400": {"por_op_us": 10.0}}}}}
+    atual = {"operacoes": {"triagem": {"tamanhos": {"100": {"por_op_us": 11.0}, "400": {"por_op_us": 14.0}}}}}
+    regressoes = verificar_regressoes(atual, base, limite_percentual=25.0)
+    assert len(regressoes) == 1
+    assert regressoes[0]["tamanho"] == 400
+    assert regressoes[0]["variacao_percentual"] == 40.0
+    assert verificar_regressoes(atual, base, limite_percentual=50.0) == []
+    print("✅ Escala e regressões corretas")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do micro-benchmark da IA")
+    print("=" * 50)
+    testes = [test_corpus_reproduzivel, test_execucao_todas_operacoes, test_escala_e_regressoes]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,116 @@
+"""
+Testes das requisições condicionais (ETag / If-Modified-Since)
+Verifica que os validadores mudam a cada escrita e a avaliação dos cabeçalhos
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from database import Base
+from models import Chamado, FollowUp
+from cache_http import (
+    resposta_condicional, validador_chamado, validador_followups, validador_lista_chamados, validador_metricas
+)
+
+
+def _criar_sessao():
+    """Cria um banco SQLite em memória com o schema completo"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def _request(cabecalhos: dict) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in cabecalhos.items()]
+    })
+
+
+def test_validadores_mudam_a_cada_escrita():
+    """Mesmo dentro do mesmo segundo, cada escrita gera um novo ETag"""
+    print("🏷️ Testando validadores...")
+    db = _criar_sessao()
+    chamado = Chamado(numero_wex="WEX1", cliente_solicitante="Cliente", descricao="Erro ao emitir nota fiscal")
+    db.add(chamado)
+    db.commit()
+
+    etag_chamado = validador_chamado(db, chamado.id).etag
+    etag_lista = validador_lista_chamados(db, db.query(Chamado), ()).etag
+    etag_followups = validador_followups(db, chamado.id).etag
+    etag_metricas = validador_metricas(db).etag
+    assert validador_chamado(db, chamado.id).etag == etag_chamado
+    assert validador_chamado(db, 999) is None
+
+    chamado.criticidade = "Alta"
+    db.commit()
+    assert validador_chamado(db, chamado.id).etag != etag_chamado
+    assert validador_lista_chamados(db, db.query(Chamado), ()).etag != etag_lista
+    assert validador_metricas(db).etag != etag_metricas
+
+    etag_lista = validador_lista_chamados(db, db.query(Chamado), ()).etag
+    db.add(FollowUp(chamado_id=chamado.id, descricao="Em análise", autor="Analista"))
+    db.commit()
+    assert validador_followups(db, chamado.id).etag != etag_followups
+    assert validador_lista_chamados(db, db.query(Chamado), ()).etag != etag_lista
+    assert validador_lista_chamados(db, db.query(Chamado), ()).total == 1
+    db.close()
+    print("✅ Validadores refletem as escritas")
+
+
+def test_avaliacao_cabecalhos():
+    """If-None-Match tem precedência e If-Modified-Since compara em segundos"""
+    print("📨 Testando avaliação dos cabeçalhos...")
+    db = _criar_sessao()
+    chamado = Chamado(numero_wex="WEX1", cliente_solicitante="Cliente", descricao="Erro ao emitir nota fiscal",
+                      data_atualizacao=datetime(2025, 1, 10, 12, 0, 0, 500000))
+    db.add(chamado)
+    db.commit()
+    validador = validador_followups(db, chamado.id)
+    validador.ultima_modificacao = datetime(2025, 1, 10, 12, 0, 0, 500000)
+
+    response = Response()
+    assert resposta_condicional(_request({}), response, validador) is None
+    assert response.headers["etag"] == validador.etag
+
+    assert resposta_condicional(_request({"If-None-Match": validador.etag}), Response(), validador).status_code == 304
+    assert resposta_condicional(_request({"If-None-Match": f'"outro", {validador.etag[2:]}'}), Response(), validador).status_code == 304
+    assert resposta_condicional(_request({"If-None-Match": '"outro"'}), Response(), validador) is None
+
+    last_modified = response.headers["last-modified"]
+    assert resposta_condicional(_request({"If-Modified-Since": last_modified}), Response(), validador).status_code == 304
+    validador.ultima_modificacao += timedelta(seconds=1)
+    assert resposta_condicional(_request({"If-Modified-Since": last_modified}), Response(), validador) is None
+    db.close()
+    print("✅ Cabeçalhos condicionais avaliados corretamente")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de requisições condicionais")
+    print("=" * 50)
+    testes = [test_validadores_mudam_a_cada_escrita, test_avaliacao_cabecalhos]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,118 @@
+"""
+Testes da compressão de respostas
+Verifica a negociação do Accept-Encoding, o middleware e as variantes pré-comprimidas
+"""
+
+import sys
+import os
+import gzip
+import tempfile
+import time
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compressao import (
+    CODIFICACAO_BROTLI, CODIFICACAO_GZIP, MiddlewareCompressao, caminho_variante, escolher_codificacao,
+    gerar_variantes_comprimidas
+)
+
+
+def _criar_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MiddlewareCompressao, tamanho_minimo=500)
+
+    @app.get("/grande")
+    def grande():
+        return PlainTextResponse("chamado " * 1000)
+
+    @app.get("/pequena")
+    def pequena():
+        return PlainTextResponse("ok")
+
+    @app.get("/eventos")
+    def eventos():
+        return StreamingResponse(iter(["data: x\n\n" * 200]), media_type="text/event-stream")
+
+    return app
+
+
+def test_negociacao():
+    """Escolhe a codificação de maior q, respeitando q=0 e a preferência do servidor"""
+    print("🤝 Testando negociação do Accept-Encoding...")
+    ambas = [CODIFICACAO_BROTLI, CODIFICACAO_GZIP]
+    assert escolher_codificacao("gzip, deflate, br", ambas) == CODIFICACAO_BROTLI
+    assert escolher_codificacao("gzip;q=1.0, br;q=0.5", ambas) == CODIFICACAO_GZIP
+    assert escolher_codificacao("br;q=0, *", ambas) == CODIFICACAO_GZIP
+    assert escolher_codificacao("br", [CODIFICACAO_GZIP]) is None
+    assert escolher_codificacao("identity", ambas) is None
+    assert escolher_codificacao(None, ambas) is None
+    print("✅ Negociação correta")
+
+
+def test_middleware():
+    """Comprime respostas grandes; pequenas e SSE passam inalteradas"""
+    print("🗜️ Testando middleware de compressão...")
+    cliente = TestClient(_criar_app())
+
+    resposta = cliente.get("/grande", headers={"Accept-Encoding": "gzip"})
+    assert resposta.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in resposta.headers["vary"].lower()
+    assert int(resposta.headers["content-length"]) < len("chamado " * 1000)
+    assert resposta.text == "chamado " * 1000  # httpx descomprime
+
+    assert "content-encoding" not in cliente.get("/pequena", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in cliente.get("/grande", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in cliente.get("/eventos", headers={"Accept-Encoding": "gzip"}).headers
+    print("✅ Middleware comprime apenas o que deve")
+
+
+def test_variantes_pre_comprimidas():
+    """Gera .gz ao lado dos arquivos de texto e só refaz as desatualizadas"""
+    print("📦 Testando variantes pré-comprimidas...")
+    with tempfile.TemporaryDirectory() as diretorio:
+        html = Path(diretorio) / "index.html"
+        html.write_text("<html>" + "x" * 5000 + "</html>", encoding="utf-8")
+        (Path(diretorio) / "logo.png").write_bytes(b"\x89PNG")
+
+        primeira = gerar_variantes_comprimidas(Path(diretorio))
+        variante = caminho_variante(html, CODIFICACAO_GZIP)
+        assert variante.exists() and not (Path(diretorio) / "logo.png.gz").exists()
+        assert gzip.decompress(variante.read_bytes()) == html.read_bytes()
+        assert primeira["geradas"] >= 1
+
+        assert gerar_variantes_comprimidas(Path(diretorio))["geradas"] == 0
+
+        time.sleep(0.01)
+        html.write_text("<html>novo</html>", encoding="utf-8")
+        os.utime(html, (time.time() + 5, time.time() + 5))
+        assert gerar_variantes_comprimidas(Path(diretorio))["geradas"] >= 1
+        assert gzip.decompress(variante.read_bytes()) == b"<html>novo</html>"
+    print("✅ Variantes geradas e atualizadas")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de compressão")
+    print("=" * 50)
+    testes = [test_negociacao, test_middleware, test_variantes_pre_comprimidas]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+"""
+Testes do canal de eventos (SSE)
+Verifica entrega entre threads, reenvio pelo Last-Event-ID, deltas de métricas e a
+detecção das escritas atendidas por outros processos
+"""
+
+import sys
+import os
+import asyncio
+import threading
+from datetime import datetime
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+from models import Chamado
+from cache_http import MonitorAlteracoesExternas, RECURSO_CHAMADOS, RECURSO_FOLLOWUPS
+from eventos import BarramentoEventos, calcular_delta_metricas, EVENTO_CHAMADO_CRIADO, EVENTO_FOLLOWUP_CRIADO
+
+
+def test_publicacao_entre_threads():
+    """Eventos publicados de outra thread chegam ao cliente e são formatados em SSE"""
+    print("📡 Testando publicação entre threads...")
+    barramento = BarramentoEventos()
+
+    async def cenario():
+        assinatura = barramento.assinar()
+        thread = threading.Thread(target=barramento.publicar, args=(EVENTO_CHAMADO_CRIADO, {"chamado_id": 7}))
+        thread.start()
+        thread.join()
+        evento = await asyncio.wait_for(assinatura.fila.get(), timeout=2)
+        barramento.cancelar(assinatura)
+        return evento
+
+    evento = asyncio.run(cenario())
+    texto = evento.formatar_sse()
+    assert texto.startswith(f"id: {evento.id}\nevent: chamado_criado\ndata: ")
+    assert '"chamado_id": 7' in texto and texto.endswith("\n\n")
+    assert barramento.total_assinantes == 0
+    print("✅ Evento entregue ao cliente")
+
+
+def test_reenvio_last_event_id():
+    """Cliente que reconecta recebe os eventos publicados depois do último visto"""
+    print("🔁 Testando reenvio pelo Last-Event-ID...")
+    barramento = BarramentoEventos()
+    primeiro = barramento.publicar(EVENTO_CHAMADO_CRIADO, {"chamado_id": 1})
+    barramento.publicar(EVENTO_FOLLOWUP_CRIADO, {"chamado_id": 1, "followup_id": 3})
+
+    async def cenario():
+        assinatura = barramento.assinar(primeiro.id)
+        eventos = [assinatura.fila.get_nowait() for _ in range(assinatura.fila.qsize())]
+        barramento.cancelar(assinatura)
+        return eventos
+
+    eventos = asyncio.run(cenario())
+    assert [e.tipo for e in eventos] == [EVENTO_FOLLOWUP_CRIADO]
+    print("✅ Eventos perdidos reenviados")
+
+
+def test_delta_metricas():
+    """Somente os campos alterados são enviados"""
+    print("📊 Testando deltas de métricas...")
+    anteriores = {"chamados_novos_hoje": 3, "chamados_vencidos": 1}
+    atuais = {"chamados_novos_hoje": 4, "chamados_vencidos": 1}
+    assert calcular_delta_metricas(anteriores, atuais) == {"chamados_novos_hoje": 4}
+    assert calcular_delta_metricas(atuais, atuais) == {}
+    assert calcular_delta_metricas(None, atuais) == atuais
+    print("✅ Deltas calculados corretamente")
+
+
+def test_alteracoes_de_outros_processos():
+    """Escritas deste processo não contam; contador de outro processo ou carga pelo Core, sim"""
+    print("🔀 Testando detecção de escritas de outros processos...")
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    monitor = MonitorAlteracoesExternas()
+    assert monitor.verificar(db) == []
+
+    db.add(Chamado(numero_wex="WEX-EV1", cliente_solicitante="Cliente", descricao="Erro no login"))
+    db.commit()
+    assert monitor.verificar(db) == []  # Escrita local: já publicada por este processo
+
+    # Outro worker gravando follow-ups pelo ORM: só o contador do banco muda
+    with engine.begin() as conexao:
+        conexao.execute(text("INSERT INTO versoes_recursos (recurso, versao) VALUES (:recurso, 1) "
+                             "ON CONFLICT(recurso) DO UPDATE SET versao = versao + 1"), {"recurso": RECURSO_FOLLOWUPS})
+    assert monitor.verificar(db) == [RECURSO_FOLLOWUPS]
+    assert monitor.verificar(db) == []
+
+    # Carga pelo Core: contadores iguais, total e maior id diferentes
+    agora = datetime.now()
+    db.execute(insert(Chamado.__table__), [{
+        "numero_wex": "WEX-EV2", "cliente_solicitante": "Cliente", "descricao": "Carga", "status": "Aberto",
+        "criticidade": "Média", "data_criacao": agora, "data_atualizacao": agora, "score_qualidade": 0,
+        "ambiente_informado": False, "possui_anexos": False}])
+    db.commit()
+    assert monitor.verificar(db) == [RECURSO_CHAMADOS]
+    db.close()
+    print("✅ Só escritas externas são sinalizadas")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do canal de eventos")
+    print("=" * 50)
+    testes = [test_publicacao_entre_threads, test_reenvio_last_event_id, test_delta_metricas,
+              test_alteracoes_de_outros_processos]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,55 @@
+"""
+Testes da extração de features textuais
+Verifica o formato das features e o hash estável da descrição
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from features_textuais import extrair_features_textuais, hash_descricao
+
+DESCRICAO = 'Erro 500 no Dashboard ao gerar relatório: "Falha na conexão" desde ontem'
+
+
+def test_extracao_features():
+    """Features extraídas mantêm o formato esperado pelas análises"""
+    print("🔍 Testando extração de features...")
+    features = extrair_features_textuais(DESCRICAO)
+    assert 'dashboard' in features['palavras_significativas']
+    assert 'Dashboard' in features['termos_tecnicos']
+    assert 'erro 500' in features['codigos_erro']
+    assert 'Falha na conexão' in features['mensagens_erro']
+    print("✅ Features extraídas corretamente")
+
+
+def test_hash_descricao():
+    """O hash muda só quando a descrição muda"""
+    print("🔑 Testando hash da descrição...")
+    assert hash_descricao(DESCRICAO) == hash_descricao(DESCRICAO)
+    assert hash_descricao(DESCRICAO) != hash_descricao(DESCRICAO + ".")
+    assert hash_descricao(None) == hash_descricao("")
+    print("✅ Hash estável")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de features textuais")
+    print("=" * 50)
+    testes = [test_extracao_features, test_hash_descricao]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,252 @@
+"""
+Testes da fila de trabalho por prioridade
+Verifica a ordem pelo prazo efetivo, a sincronização com os commits de
+chamados e follow-ups e o endpoint GET /fila
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, get_db
+from models import Chamado, FollowUp
+import fila_prioridade as modulo_fila
+from fila_prioridade import ItemFila, ParametrosFila, fila_prioridade
+
+PARAMETROS = ParametrosFila(
+    antecipacao_criticidade_h={"Crítica": 12, "Alta": 6, "Média": 2, "Baixa": 0},
+    antecipacao_score_h=4, intervalo_followup_h=24, sla_padrao_h=72
+)
+
+
+def _criar_sessao():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _chamado(numero: str, criacao: datetime, sla_limite, criticidade: str = "Média", score: int = 50,
+             status: str = "Aberto") -> Chamado:
+    return Chamado(numero_wex=numero, cliente_solicitante="Cliente Teste", descricao="Teste da fila",
+                   status=status, criticidade=criticidade, score_qualidade=score,
+                   data_criacao=criacao, sla_limite=sla_limite)
+
+
+def _followup(chamado_id: int, data: datetime) -> FollowUp:
+    return FollowUp(chamado_id=chamado_id, tipo="Análise", descricao="Contato com o cliente", autor="Analista",
+                    data_criacao=data)
+
+
+def test_prazo_efetivo():
+    """Criticidade e score antecipam o prazo; follow-up atrasado domina um SLA distante"""
+    print("🧮 Testando prazo efetivo...")
+    criacao = datetime(2025, 1, 10, 8, 0)
+    item = ItemFila(1, "WEX-P1", "Cliente", "Aberto", "Alta", 50, criacao, criacao + timedelta(hours=10), None)
+    item.calcular_prazo(PARAMETROS)
+    assert item.motivo == "sla"
+    assert item.prazo_efetivo == criacao + timedelta(hours=10 - 6 - 2)
+
+    item = ItemFila(2, "WEX-P2", "Cliente", "Aberto", "Baixa", 0, criacao, criacao + timedelta(days=5),
+                    criacao + timedelta(hours=2))
+    item.calcular_prazo(PARAMETROS)
+    assert item.motivo == "followup"
+    assert item.prazo_efetivo == criacao + timedelta(hours=26)
+
+    item = ItemFila(3, "WEX-P3", "Cliente", "Aberto", "Baixa", 0, criacao, None, criacao + timedelta(days=4))
+    item.calcular_prazo(PARAMETROS)
+    assert item.motivo == "sla" and item.prazo_efetivo == criacao + timedelta(hours=72)
+    print("✅ Prazo efetivo correto")
+
+
+def test_sincronizacao_commits():
+    """Fila carregada do banco acompanha criação, fechamento, mudança de criticidade e follow-ups"""
+    print("🔄 Testando sincronização da fila...")
+    db = _criar_sessao()()
+    base = datetime.now()
+    db.add_all([
+        _chamado("WEX-F1", base, base + timedelta(hours=20)),
+        _chamado("WEX-F2", base, base + timedelta(hours=10)),
+        _chamado("WEX-F3", base, base + timedelta(hours=30), criticidade="Crítica"),
+        _chamado("WEX-F4", base, base + timedelta(hours=1), status="Resolvido"),
+    ])
+    db.commit()
+    db.add(_followup(1, base + timedelta(hours=1)))
+    db.commit()
+    try:
+        fila_prioridade.carregar(db)
+        assert fila_prioridade.total == 3
+        assert [i.numero_wex for i in fila_prioridade.proximos(10)] == ["WEX-F2", "WEX-F3", "WEX-F1"]
+        assert fila_prioridade.proximos(10)[2].ultimo_followup is not None
+
+        novo = _chamado("WEX-F5", base, base + timedelta(hours=2), criticidade="Alta")
+        db.add(novo)
+        db.commit()
+        assert [i.numero_wex for i in fila_prioridade.proximos(2)] == ["WEX-F5", "WEX-F2"]
+
+        novo.status = "Fechado"
+        db.commit()
+        assert fila_prioridade.total == 3
+
+        chamado = db.query(Chamado).filter(Chamado.numero_wex == "WEX-F1").one()
+        chamado.criticidade = "Crítica"
+        db.commit()
+        assert fila_prioridade.proximos(1)[0].numero_wex == "WEX-F1"
+
+        # Follow-up sem contato por 24h passa a dominar o SLA distante do WEX-F3
+        f3 = db.query(Chamado).filter(Chamado.numero_wex == "WEX-F3").one()
+        f3.sla_limite = base + timedelta(days=10)
+        db.commit()
+        item_f3 = [i for i in fila_prioridade.proximos(10) if i.numero_wex == "WEX-F3"][0]
+        assert item_f3.motivo == "followup"
+        db.add(_followup(f3.id, base + timedelta(hours=5)))
+        db.commit()
+        item_f3 = [i for i in fila_prioridade.proximos(10) if i.numero_wex == "WEX-F3"][0]
+        assert item_f3.ultimo_followup == base + timedelta(hours=5)
+        assert item_f3.prazo_efetivo == base + timedelta(hours=5 + 24 - 12 - 2)
+
+        f3.criticidade = "Baixa"
+        db.rollback()
+        assert [i for i in fila_prioridade.proximos(10) if i.numero_wex == "WEX-F3"][0].criticidade == "Crítica"
+        print("✅ Fila acompanha os commits")
+    finally:
+        fila_prioridade.carregada = False
+        db.close()
+
+
+def test_endpoint_fila():
+    """GET /fila carrega a fila e recalcula as chaves quando a configuração muda"""
+    print("🌐 Testando GET /fila...")
+    import main
+    fabrica = _criar_sessao()
+
+    def sessao_teste():
+        db = fabrica()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    db = fabrica()
+    base = datetime.now()
+    db.add_all([_chamado("WEX-E1", base, base + timedelta(hours=8), criticidade="Baixa"),
+                _chamado("WEX-E2", base, base + timedelta(hours=12), criticidade="Crítica")])
+    db.commit()
+    db.close()
+
+    versao_original = modulo_fila.get_versao_config
+    config_original = modulo_fila._get_config_fila
+    main.app.dependency_overrides[get_db] = sessao_teste
+    try:
+        cliente = TestClient(main.app)
+        resposta = cliente.get("/fila?limite=5").json()
+        assert resposta["total"] == 2
+        assert [c["numero_wex"] for c in resposta["chamados"]] == ["WEX-E2", "WEX-E1"]
+        assert resposta["chamados"][0]["posicao"] == 1 and resposta["chamados"][0]["motivo"] == "sla"
+
+        # Sem antecipação por criticidade, o SLA mais próximo volta à frente
+        modulo_fila._get_config_fila = lambda chave, padrao: (
+            {} if chave == 'antecipacao_criticidade_h' else config_original(chave, padrao))
+        modulo_fila.get_versao_config = lambda: "outra-versao"
+        resposta = cliente.get("/fila").json()
+        assert [c["numero_wex"] for c in resposta["chamados"]] == ["WEX-E1", "WEX-E2"]
+        assert cliente.get("/fila?limite=0").status_code == 422
+        print("✅ Endpoint ordenado pela prioridade")
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        modulo_fila.get_versao_config = versao_original
+        modulo_fila._get_config_fila = config_original
+        fila_prioridade.carregada = False
+
+
+def test_recarga_por_marcador():
+    """Sem fila carregada os commits não capturam nada; escritas fora do ORM recarregam a fila no próximo acesso"""
+    print("🔁 Testando recarga da fila pelo marcador do banco...")
+    db = _criar_sessao()()
+    base = datetime.now()
+    db.add_all([_chamado("WEX-M1", base, base + timedelta(hours=5)), _chamado("WEX-M2", base, base + timedelta(hours=9))])
+    db.flush()
+    assert modulo_fila.CHAVE_PENDENTES not in db.info
+    db.commit()
+    try:
+        fila_prioridade.garantir_atualizada(db)
+        marcador = fila_prioridade.marcador
+        fila_prioridade.garantir_atualizada(db)
+        assert fila_prioridade.marcador is marcador  # Sem mudanças, sem recarga
+
+        # Atualização em massa (sem eventos do ORM) e remoção em massa
+        db.execute(update(Chamado).where(Chamado.numero_wex == "WEX-M2")
+                   .values(sla_limite=base + timedelta(hours=1), data_atualizacao=base + timedelta(seconds=1)))
+        db.commit()
+        fila_prioridade.garantir_atualizada(db)
+        assert [i.numero_wex for i in fila_prioridade.proximos(2)] == ["WEX-M2", "WEX-M1"]
+        db.query(Chamado).filter(Chamado.numero_wex == "WEX-M2").delete(synchronize_session=False)
+        db.commit()
+        fila_prioridade.garantir_atualizada(db)
+        assert [i.numero_wex for i in fila_prioridade.proximos(5)] == ["WEX-M1"]
+        print("✅ Fila recarregada quando o banco muda por fora")
+    finally:
+        fila_prioridade.carregada = False
+        db.close()
+
+
+def test_escrita_local_sem_recarga():
+    """Commits pelo ORM neste processo avançam o marcador esperado: a fila não é recarregada"""
+    print("⚡ Testando escritas locais sem recarga da fila...")
+    db = _criar_sessao()()
+    base = datetime.now()
+    db.add_all([_chamado("WEX-L1", base, base + timedelta(hours=5)), _chamado("WEX-L2", base, base + timedelta(hours=9))])
+    db.commit()
+    cargas = []
+    carregar_original = fila_prioridade.carregar
+    fila_prioridade.carregar = lambda sessao: cargas.append(1) or carregar_original(sessao)
+    try:
+        fila_prioridade.garantir_atualizada(db)
+        assert len(cargas) == 1
+
+        chamado = db.query(Chamado).filter(Chamado.numero_wex == "WEX-L2").one()
+        chamado.criticidade = "Crítica"
+        db.commit()
+        db.add(_chamado("WEX-L3", base, base + timedelta(hours=30)))
+        db.add(_followup(chamado.id, base + timedelta(hours=1)))
+        db.commit()
+        db.delete(db.query(Chamado).filter(Chamado.numero_wex == "WEX-L1").one())
+        db.commit()
+        fila_prioridade.garantir_atualizada(db)
+        assert len(cargas) == 1
+        assert fila_prioridade.marcador == modulo_fila.FilaPrioridade._marcador(db)
+        assert [i.numero_wex for i in fila_prioridade.proximos(5)] == ["WEX-L2", "WEX-L3"]
+        print("✅ Escritas locais aplicadas sem recarga")
+    finally:
+        fila_prioridade.carregar = carregar_original
+        fila_prioridade.carregada = False
+        db.close()
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes da fila de trabalho")
+    print("=" * 50)
+    testes = [test_prazo_efetivo, test_sincronizacao_commits, test_endpoint_fila, test_recarga_por_marcador,
+              test_escrita_local_sem_recarga]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
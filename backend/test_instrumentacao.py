@@ -0,0 +1,153 @@
+"""
+Testes da instrumentação (métricas Prometheus)
+Verifica a exposição em texto, a latência por rota, as consultas SQL por requisição
+e os estágios amostrados da triagem
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import instrumentacao
+from instrumentacao import (
+    CRONOMETRO_INATIVO, MiddlewareInstrumentacao, RegistroMetricas, consultas_por_requisicao,
+    definir_amostragem_estagios, iniciar_cronometro_triagem, latencia_estagios_triagem, latencia_requisicoes,
+    registro_metricas, requisicoes_total
+)
+
+
+def test_exposicao_texto():
+    """Contadores, medidores e histogramas no formato texto do Prometheus"""
+    print("📈 Testando exposição das métricas...")
+    registro = RegistroMetricas()
+    contador = registro.contador("teste_total", "Contador de teste", ("rota",))
+    contador.inc(rota="/a")
+    contador.inc(2, rota="/a")
+    histograma = registro.histograma("teste_segundos", "Histograma de teste", (), buckets=(0.1, 1.0))
+    histograma.observar(0.05)
+    histograma.observar(0.5)
+    histograma.observar(5)
+    medidor = registro.medidor("teste_taxa", "Medidor de teste")
+    registro.adicionar_coletor(lambda: medidor.definir(0.75))
+
+    texto = registro.exportar()
+    assert "# TYPE teste_total counter" in texto
+    assert 'teste_total{rota="/a"} 3' in texto
+    assert 'teste_segundos_bucket{le="0.1"} 1' in texto
+    assert 'teste_segundos_bucket{le="1"} 2' in texto
+    assert 'teste_segundos_bucket{le="+Inf"} 3' in texto
+    assert "teste_segundos_count 3" in texto
+    assert "teste_taxa 0.75" in texto
+
+    # A base abstrata exige exportar() em cada tipo de métrica
+    class SemExportar(instrumentacao._Metrica):
+        tipo = "gauge"
+    try:
+        SemExportar("teste_incompleta", "Métrica sem exportar")
+        assert False, "métrica sem exportar() instanciada"
+    except TypeError:
+        pass
+    print("✅ Formato de exposição correto")
+
+
+def test_middleware_por_rota():
+    """Latência e consultas SQL são atribuídas ao modelo da rota"""
+    print("⏱️ Testando middleware de instrumentação...")
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(MiddlewareInstrumentacao)
+
+    @app.get("/itens/{item_id}")
+    def obter_item(item_id: int):
+        with engine.connect() as conexao:
+            conexao.execute(text("SELECT 1"))
+            conexao.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    def metricas():
+        return Response(registro_metricas.exportar(), media_type="text/plain")
+
+    cliente = TestClient(app)
+    antes = latencia_requisicoes.total(metodo="GET", rota="/itens/{item_id}")
+    assert cliente.get("/itens/1").status_code == 200
+    assert cliente.get("/itens/2").status_code == 200
+    assert cliente.get("/inexistente").status_code == 404
+
+    assert latencia_requisicoes.total(metodo="GET", rota="/itens/{item_id}") == antes + 2
+    assert requisicoes_total.valor(metodo="GET", rota="nao_encontrada", status=404) >= 1
+    texto = cliente.get("/metrics").text
+    assert 'wex_db_consultas_por_requisicao_bucket{rota="/itens/{item_id}",le="2"}' in texto
+    serie = consultas_por_requisicao._series[("/itens/{item_id}",)]
+    assert serie[1] >= 4  # ao menos 2 consultas em cada uma das 2 requisições
+    print("✅ Métricas por rota registradas")
+
+
+def test_estagios_triagem():
+    """Estágios cronometrados só nas triagens amostradas"""
+    print("🔬 Testando estágios da triagem...")
+    from wex_ai_engine import wex_ai
+    chamado = {
+        'id': 1, 'numero_wex': 'WEX-1', 'descricao': 'Erro 500 ao gerar relatório no ambiente de produção',
+        'cliente_solicitante': 'Cliente', 'criticidade': 'Média', 'anexos_count': 0
+    }
+    definir_amostragem_estagios(0.0)
+    assert iniciar_cronometro_triagem() is CRONOMETRO_INATIVO
+    assert wex_ai.realizar_triagem(chamado).estagios_ms is None
+
+    antes = latencia_estagios_triagem.total(estagio="descricao")
+    resultado = wex_ai.realizar_triagem(chamado, medir_estagios=True)
+    assert set(resultado.estagios_ms) == {
+        "anexos", "descricao", "info_tecnicas", "contexto", "pontuacao", "sugestoes", "criticidade", "tags"
+    }
+    assert all(duracao >= 0 for duracao in resultado.estagios_ms.values())
+    assert latencia_estagios_triagem.total(estagio="descricao") == antes + 1
+
+    definir_amostragem_estagios(1.0)
+    try:
+        assert wex_ai.realizar_triagem(chamado).estagios_ms is not None
+    finally:
+        definir_amostragem_estagios(None)
+
+    # Sem valor fixado, a fração segue amostragem_estagios_triagem e é relida quando a configuração muda
+    config_original = instrumentacao._get_config_instrumentacao
+    versao_original = instrumentacao.get_versao_config
+    fracao = {"valor": 1.0}
+    instrumentacao._get_config_instrumentacao = lambda chave, padrao: (
+        fracao["valor"] if chave == 'amostragem_estagios_triagem' else padrao)
+    instrumentacao.get_versao_config = lambda: f"versao-{fracao['valor']}"
+    try:
+        assert iniciar_cronometro_triagem() is not CRONOMETRO_INATIVO
+        fracao["valor"] = 0.0
+        assert iniciar_cronometro_triagem() is CRONOMETRO_INATIVO
+    finally:
+        instrumentacao._get_config_instrumentacao = config_original
+        instrumentacao.get_versao_config = versao_original
+    print("✅ Estágios medidos conforme a amostragem")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de instrumentação")
+    print("=" * 50)
+    testes = [test_exposicao_texto, test_middleware_por_rota, test_estagios_triagem]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,191 @@
+"""
+Testes dos jobs assíncronos de relatório
+Verifica progresso, cache de resultados por chave, reaproveitamento de jobs em andamento
+e o estado gravado no banco, consultável por outro worker
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import EstadoJobRelatorio
+from jobs_relatorios import GerenciadorJobs, STATUS_CONCLUIDO, STATUS_ERRO, STATUS_EXECUTANDO
+
+
+def _criar_fabrica(diretorio: str):
+    """Banco em arquivo: cada sessão dos workers usa a própria conexão, como em produção"""
+    engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'jobs.db')}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _aguardar(job, timeout=5.0):
+    limite = time.time() + timeout
+    while not job.finalizado and time.time() < limite:
+        time.sleep(0.01)
+    assert job.finalizado, "job não finalizou a tempo"
+
+
+def test_job_e_cache():
+    """Job reporta progresso e o resultado passa a ser servido pelo cache"""
+    print("⏳ Testando execução e cache de jobs...")
+    gerenciador = GerenciadorJobs()
+    liberar = threading.Event()
+    progressos = []
+    execucoes = []
+
+    def relatorio(progresso):
+        execucoes.append(1)
+        progresso(0.5, "agrupando")
+        progressos.append(0.5)
+        liberar.wait(5)
+        return {"total_chamados": 10}
+
+    try:
+        job = gerenciador.submeter("padroes-ia", {"dias": 30}, ("padroes-ia", 30, "v1"), relatorio)
+        # Mesma chave em andamento: o job é reaproveitado
+        repetido = gerenciador.submeter("padroes-ia", {"dias": 30}, ("padroes-ia", 30, "v1"), relatorio)
+        assert repetido.id == job.id
+
+        liberar.set()
+        _aguardar(job)
+        assert job.status == STATUS_CONCLUIDO
+        assert job.progresso == 1.0 and progressos == [0.5]
+        assert job.resultado == {"total_chamados": 10}
+
+        do_cache = gerenciador.submeter("padroes-ia", {"dias": 30}, ("padroes-ia", 30, "v1"), relatorio)
+        assert do_cache.status == STATUS_CONCLUIDO and do_cache.do_cache
+        assert do_cache.resultado == job.resultado
+        assert len(execucoes) == 1
+
+        # Outra versão da configuração gera outra chave
+        novo = gerenciador.submeter("padroes-ia", {"dias": 30}, ("padroes-ia", 30, "v2"), relatorio)
+        _aguardar(novo)
+        assert not novo.do_cache and len(execucoes) == 2
+        assert gerenciador.obter(job.id) is job
+    finally:
+        gerenciador.encerrar()
+    print("✅ Jobs e cache funcionando")
+
+
+def test_job_com_erro():
+    """Erros ficam registrados no job e não são cacheados"""
+    print("💥 Testando job com erro...")
+    gerenciador = GerenciadorJobs()
+
+    def relatorio(progresso):
+        raise ValueError("falha simulada")
+
+    try:
+        job = gerenciador.submeter("padroes-ia", {"dias": 7}, ("padroes-ia", 7), relatorio)
+        _aguardar(job)
+        assert job.status == STATUS_ERRO and "falha simulada" in job.erro
+        assert gerenciador.obter_cache(("padroes-ia", 7)) is None
+    finally:
+        gerenciador.encerrar()
+    print("✅ Erro registrado no job")
+
+
+def test_estado_compartilhado_entre_workers():
+    """Outro processo consulta status e resultado pelo banco; resultado com erro_ia não é cacheado"""
+    print("🗄️ Testando estado dos jobs no banco...")
+    diretorio = tempfile.TemporaryDirectory()
+    fabrica = _criar_fabrica(diretorio.name)
+    worker_a, worker_b = GerenciadorJobs(fabrica), GerenciadorJobs(fabrica)
+    liberar = threading.Event()
+
+    def relatorio(progresso):
+        progresso(0.5, "agrupando")
+        liberar.wait(5)
+        return {"total_chamados": 3, "erro_ia": "IA indisponível"}
+
+    try:
+        job = worker_a.submeter("padroes-ia", {"dias": 30}, ("padroes-ia", 30), relatorio)
+        limite = time.time() + 5
+        while worker_b.obter(job.id).status != STATUS_EXECUTANDO and time.time() < limite:
+            time.sleep(0.01)
+        visto = worker_b.obter(job.id)
+        assert visto is not job and visto.status == STATUS_EXECUTANDO and visto.parametros == {"dias": 30}
+        assert worker_b.obter("inexistente") is None
+
+        liberar.set()
+        _aguardar(job)
+        visto = worker_b.obter(job.id)
+        assert visto.status == STATUS_CONCLUIDO and visto.progresso == 1.0
+        assert visto.resultado == {"total_chamados": 3, "erro_ia": "IA indisponível"}
+        assert worker_a.obter_cache(("padroes-ia", 30)) is None  # Fallback sem IA não fica em cache
+
+        # Job em andamento no encerramento do worker fica registrado como interrompido
+        liberar.clear()
+        pendente = worker_a.submeter("padroes-ia", {"dias": 7}, ("padroes-ia", 7), relatorio)
+        worker_a.encerrar()
+        interrompido = worker_b.obter(pendente.id)
+        assert interrompido.status == STATUS_ERRO and "interrompido" in interrompido.erro
+        liberar.set()
+    finally:
+        liberar.set()
+        worker_a.encerrar()
+        worker_b.encerrar()
+        fabrica.kw["bind"].dispose()
+        diretorio.cleanup()
+    print("✅ Estado dos jobs compartilhado pelo banco")
+
+
+def test_retencao_no_banco():
+    """Só os max_jobs_retidos finalizados mais recentes ficam na tabela"""
+    print("🧹 Testando retenção dos jobs no banco...")
+    import jobs_relatorios
+    diretorio = tempfile.TemporaryDirectory()
+    fabrica = _criar_fabrica(diretorio.name)
+    gerenciador = GerenciadorJobs(fabrica)
+    config_original = jobs_relatorios._get_config_jobs
+    jobs_relatorios._get_config_jobs = lambda chave, padrao: 2 if chave == 'max_jobs_retidos' else padrao
+    try:
+        jobs = [gerenciador.submeter("padroes-ia", {"dias": d}, ("padroes-ia", d), lambda p: {"ok": True})
+                for d in range(5)]
+        for job in jobs:
+            _aguardar(job)
+        db = fabrica()
+        limite = time.time() + 5  # A gravação final acontece logo depois de o job finalizar em memória
+        while any(db.query(EstadoJobRelatorio.status).filter(EstadoJobRelatorio.id == job.id).scalar()
+                  not in (STATUS_CONCLUIDO, None) for job in jobs) and time.time() < limite:
+            time.sleep(0.01)
+        gerenciador.submeter("padroes-ia", {"dias": 99}, ("padroes-ia", 0), lambda p: {})  # Do cache
+        assert db.query(EstadoJobRelatorio).count() == 2
+        db.close()
+    finally:
+        jobs_relatorios._get_config_jobs = config_original
+        gerenciador.encerrar()
+        fabrica.kw["bind"].dispose()
+        diretorio.cleanup()
+    print("✅ Retenção aplicada na tabela")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes dos jobs de relatório")
+    print("=" * 50)
+    testes = [test_job_e_cache, test_job_com_erro, test_estado_compartilhado_entre_workers, test_retencao_no_banco]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,168 @@
+"""
+Testes do relatório de padrões incremental
+Verifica que os grupos mantidos a cada chamado coincidem com o agrupamento completo
+e que o período é respeitado ao somar os parciais diários
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado
+import padroes_incrementais
+from padroes_incrementais import registrar_chamados, montar_relatorio_incremental, reconstruir_padroes
+from wex_ai_engine import wex_ai
+
+DESCRICOES = [
+    ("Cliente A", "Alta", "Erro ao gerar relatório financeiro no módulo de faturamento do sistema"),
+    ("Cliente B", "Média", "Sistema lento ao consultar notas fiscais no módulo de estoque"),
+    ("Cliente A", "Alta", "Erro ao gerar relatório financeiro no módulo de faturamento mensal"),
+    ("Cliente C", "Baixa", "Sistema lento ao consultar notas fiscais no módulo de compras"),
+    ("Cliente A", "Alta", "Erro ao gerar relatório financeiro no módulo de faturamento anual"),
+    ("Cliente D", "Média", "Usuário sem acesso ao portal após troca de senha corporativa"),
+    ("Cliente B", "Baixa", "curto"),
+]
+
+
+def _criar_sessao():
+    """Cria um banco SQLite em memória com o schema completo"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    padroes_incrementais._limpar_lideres()
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def _criar_chamados(db, dias_atras):
+    agora = datetime.now()
+    chamados = []
+    for i, ((cliente, criticidade, descricao), dias) in enumerate(zip(DESCRICOES, dias_atras)):
+        chamado = Chamado(
+            numero_wex=f"WEX{i:06d}", cliente_solicitante=cliente, descricao=descricao,
+            criticidade=criticidade, data_criacao=agora - timedelta(days=dias, minutes=len(DESCRICOES) - i)
+        )
+        db.add(chamado)
+        chamados.append(chamado)
+    db.commit()
+    return chamados
+
+
+def _membros(grupos):
+    return sorted(sorted(c['id'] for c in g['chamados']) for g in grupos)
+
+
+def test_incremental_igual_ao_completo():
+    """Chamados registrados um a um geram os mesmos grupos do agrupamento completo"""
+    print("📊 Testando grupos incrementais x relatório completo...")
+    db = _criar_sessao()
+    chamados = _criar_chamados(db, [0] * len(DESCRICOES))
+    for chamado in chamados:
+        registrar_chamados(db, [chamado])
+
+    incremental = montar_relatorio_incremental(db, 30)
+    completo = wex_ai.gerar_relatorio_padroes(chamados, 30)
+
+    assert incremental['total_chamados'] == len(DESCRICOES)
+    assert _membros(incremental['relatorio'].grupos_similares) == _membros(completo.grupos_similares)
+    assert incremental['relatorio'].insights_ia == completo.insights_ia
+    assert incremental['distribuicao_criticidade'] == {'Alta': 3, 'Média': 2, 'Baixa': 2}
+    assert incremental['clientes_mais_ativos'][0] == ('Cliente A', 3)
+
+    # Reconstrução completa chega ao mesmo estado
+    reconstruir_padroes(db)
+    reconstruido = montar_relatorio_incremental(db, 30)
+    assert _membros(reconstruido['relatorio'].grupos_similares) == _membros(incremental['relatorio'].grupos_similares)
+    db.close()
+    print("✅ Grupos incrementais coincidem com o agrupamento completo")
+
+
+def test_periodo_e_atualizacao():
+    """Parciais fora do período são ignorados e alterações de criticidade são refletidas"""
+    print("🗓️ Testando período e atualização de criticidade...")
+    db = _criar_sessao()
+    chamados = _criar_chamados(db, [40, 40, 2, 2, 1, 1, 0])
+
+    # Chamados sem registro são sincronizados na montagem do relatório
+    relatorio = montar_relatorio_incremental(db, 7)
+    assert relatorio['total_chamados'] == 5
+    grupos = relatorio['relatorio'].grupos_similares
+    assert _membros(grupos) == [[chamados[2].id, chamados[4].id]]
+    assert montar_relatorio_incremental(db, 60)['total_chamados'] == len(DESCRICOES)
+
+    chamados[4].criticidade = "Crítica"
+    db.commit()
+    assert registrar_chamados(db, [chamados[4]]) == 1
+    assert registrar_chamados(db, [chamados[4]]) == 0
+    relatorio = montar_relatorio_incremental(db, 7)
+    assert relatorio['distribuicao_criticidade'] == {'Alta': 1, 'Baixa': 2, 'Crítica': 1, 'Média': 1}
+    assert _membros(relatorio['relatorio'].grupos_similares) == [[chamados[2].id, chamados[4].id]]
+    db.close()
+    print("✅ Período e atualizações refletidos nos parciais")
+
+
+def test_sincronizacao_por_marcador():
+    """Escritas fora do ORM com o mesmo total de chamados ainda são sincronizadas (e os órfãos removidos)"""
+    print("🔁 Testando sincronização pelo marcador de chamados...")
+    db = _criar_sessao()
+    chamados = _criar_chamados(db, [1] * len(DESCRICOES))
+    assert montar_relatorio_incremental(db, 7)['distribuicao_criticidade'] == {'Alta': 3, 'Média': 2, 'Baixa': 2}
+
+    # Sem mudanças no banco o relatório não confere órfãos nem chamados
+    limpezas = []
+    remover_original = padroes_incrementais._remover_orfaos
+    padroes_incrementais._remover_orfaos = lambda sessao: limpezas.append(1) or remover_original(sessao)
+    try:
+        montar_relatorio_incremental(db, 365)
+        assert limpezas == []
+    finally:
+        padroes_incrementais._remover_orfaos = remover_original
+
+    # Atualização em massa: mesmo total, nova data_atualizacao
+    db.execute(update(Chamado).where(Chamado.id == chamados[5].id).values(
+        criticidade="Crítica", data_atualizacao=datetime.now() + timedelta(seconds=1)))
+    db.commit()
+    assert montar_relatorio_incremental(db, 7)['distribuicao_criticidade'] == {
+        'Alta': 3, 'Média': 1, 'Baixa': 2, 'Crítica': 1}
+
+    # Remoção em massa seguida de carga pelo Core: total igual, um órfão e um chamado novo
+    db.query(Chamado).filter(Chamado.id == chamados[0].id).delete(synchronize_session=False)
+    agora = datetime.now()
+    db.execute(insert(Chamado.__table__).values(
+        numero_wex="WEX999999", cliente_solicitante="Cliente E", descricao=DESCRICOES[0][2], status="Aberto",
+        criticidade="Baixa", data_criacao=agora, data_atualizacao=agora - timedelta(days=3), score_qualidade=0,
+        ambiente_informado=False, possui_anexos=False))
+    db.commit()
+    relatorio = montar_relatorio_incremental(db, 7)
+    assert relatorio['total_chamados'] == len(DESCRICOES)
+    assert relatorio['distribuicao_criticidade'] == {'Alta': 2, 'Média': 1, 'Baixa': 3, 'Crítica': 1}
+    assert ('Cliente E', 1) in relatorio['clientes_mais_ativos']
+    db.close()
+    print("✅ Marcador detecta escritas fora do ORM")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do relatório de padrões incremental")
+    print("=" * 50)
+    testes = [test_incremental_igual_ao_completo, test_periodo_e_atualizacao, test_sincronizacao_por_marcador]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+"""
+Testes do processamento paralelo
+Verifica a divisão em faixas, o número de workers, o reaproveitamento do
+corpus publicado em memória compartilhada e que o pool de processos chega
+aos mesmos resultados da execução em série
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import processamento_paralelo
+from processamento_paralelo import (
+    dividir_em_faixas, calcular_num_workers, indice_compartilhado, encerrar_process_pool, MAX_INDICES_PUBLICADOS
+)
+from wex_ai_engine import wex_ai, similaridade_tokens
+
+TEXTOS = [
+    "Erro ao gerar relatório financeiro no módulo de faturamento",
+    "Erro ao gerar relatório financeiro no módulo de faturamento mensal",
+    "Sistema lento ao consultar notas fiscais no módulo de estoque",
+    "Sistema lento ao consultar notas fiscais no módulo de compras",
+    "Usuário sem acesso ao portal após troca de senha",
+    "Usuário sem acesso ao portal após troca de senha corporativa",
+    "Falha na integração com o banco ao processar pagamentos",
+    "",
+]
+
+
+def _com_config(valores):
+    """Substitui a leitura de configuracoes_avancadas.processamento_paralelo; retorna a função original"""
+    original = processamento_paralelo._get_config_paralelismo
+    processamento_paralelo._get_config_paralelismo = lambda chave, padrao: valores.get(chave, padrao)
+    return original
+
+
+def test_dividir_em_faixas():
+    """Faixas contíguas, sem sobreposição, cobrindo todo o intervalo"""
+    print("📏 Testando divisão em faixas...")
+    assert dividir_em_faixas(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert dividir_em_faixas(3, 8) == [(0, 1), (1, 2), (2, 3)]
+    assert dividir_em_faixas(5, 0) == [(0, 5)]
+    assert dividir_em_faixas(0, 4) == []
+    for total, partes in ((1000, 7), (17, 4), (1, 1)):
+        faixas = dividir_em_faixas(total, partes)
+        assert faixas[0][0] == 0 and faixas[-1][1] == total
+        assert all(fim == proximo for (_, fim), (proximo, _) in zip(faixas, faixas[1:]))
+        tamanhos = [fim - inicio for inicio, fim in faixas]
+        assert max(tamanhos) - min(tamanhos) <= 1
+    print("✅ Faixas corretas")
+
+
+def test_calcular_num_workers():
+    """max_workers positivo é respeitado; 0 ou ausente usa o número de núcleos"""
+    print("🔢 Testando número de workers...")
+    original = _com_config({"max_workers": 3})
+    try:
+        assert calcular_num_workers() == 3
+        processamento_paralelo._get_config_paralelismo = lambda chave, padrao: 0 if chave == "max_workers" else padrao
+        assert calcular_num_workers() == (os.cpu_count() or 1)
+        processamento_paralelo._get_config_paralelismo = lambda chave, padrao: None if chave == "max_workers" else padrao
+        assert calcular_num_workers() == (os.cpu_count() or 1)
+    finally:
+        processamento_paralelo._get_config_paralelismo = original
+    print("✅ Número de workers correto")
+
+
+def test_indice_reaproveitado_por_versao():
+    """O mesmo corpus reutiliza o bloco publicado; versões antigas fora de uso são liberadas"""
+    print("🧠 Testando reaproveitamento do corpus compartilhado...")
+    itens = list(enumerate(TEXTOS))
+    try:
+        with indice_compartilhado(itens) as primeiro:
+            nome = primeiro.nome
+        with indice_compartilhado(list(itens)) as repetido:
+            assert repetido is primeiro and repetido.nome == nome
+
+        # Bloco em uso não é liberado mesmo passando do limite
+        with indice_compartilhado(itens) as em_uso:
+            for versao in range(MAX_INDICES_PUBLICADOS + 1):
+                with indice_compartilhado([(versao, f"corpus {versao}")]):
+                    pass
+            assert em_uso.versao in processamento_paralelo._indices_publicados
+        assert len(processamento_paralelo._indices_publicados) == MAX_INDICES_PUBLICADOS
+
+        with indice_compartilhado([(1, "outro texto")]) as outro:
+            assert outro.nome != nome
+    finally:
+        encerrar_process_pool()
+    assert not processamento_paralelo._indices_publicados
+    print("✅ Um bloco por versão do corpus")
+
+
+def test_paralelo_igual_serial():
+    """Similaridade e adjacências do clustering calculadas no pool coincidem com a execução em série"""
+    print("⚙️ Testando pool de processos x execução em série...")
+    itens = [(i, texto) for i, texto in enumerate(TEXTOS * 3)]
+    base = "Erro ao gerar relatório financeiro no faturamento"
+
+    original = _com_config({"habilitado": False})
+    try:
+        serial = wex_ai._pontuar_contra_base(base, itens)
+        assert wex_ai._calcular_adjacencias_cluster(itens, 0.4) is None
+    finally:
+        processamento_paralelo._get_config_paralelismo = original
+
+    tokens = [set(texto.lower().split()) for _, texto in itens]
+    adjacencias_serial = {}
+    for i in range(len(tokens)):
+        vizinhos = [(j, similaridade_tokens(tokens[i], tokens[j]))
+                    for j in range(i + 1, len(tokens)) if similaridade_tokens(tokens[i], tokens[j]) > 0.4]
+        if vizinhos:
+            adjacencias_serial[i] = vizinhos
+
+    original = _com_config({"habilitado": True, "max_workers": 2, "min_itens_paralelo": 1})
+    try:
+        paralelo = wex_ai._pontuar_contra_base(base, itens)
+        adjacencias = wex_ai._calcular_adjacencias_cluster(itens, 0.4)
+        assert len(processamento_paralelo._indices_publicados) == 1  # Mesmo corpus nas duas chamadas
+    finally:
+        processamento_paralelo._get_config_paralelismo = original
+        encerrar_process_pool()
+
+    assert sorted(paralelo) == sorted(serial) and serial
+    assert adjacencias == adjacencias_serial
+    print("✅ Resultados do pool iguais aos da execução em série")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do processamento paralelo")
+    print("=" * 50)
+    testes = [test_dividir_em_faixas, test_calcular_num_workers, test_indice_reaproveitado_por_versao,
+              test_paralelo_igual_serial]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
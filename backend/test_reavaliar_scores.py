@@ -0,0 +1,147 @@
+"""
+Testes da reavaliação offline dos scores
+Verifica a leitura em blocos, a pontuação única pelo motor real, a agregação e a comparação de configurações
+"""
+
+import sys
+import os
+import csv
+import json
+import tempfile
+from datetime import datetime
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado
+from triagens import chamado_para_ia, hash_entrada
+from generate_mock_data import gerar_dados_rapido
+from reavaliar_scores import AgregadorScores, criar_motor, ler_chamados_em_blocos, reavaliar
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _base(total: int = 120):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    gerar_dados_rapido(engine, total, semente=5, data_inicio=datetime(2024, 1, 1), data_fim=datetime(2024, 6, 30),
+                       workers=1, tamanho_lote=50, progresso=False)
+    return engine
+
+
+def _config_com_thresholds(diretorio: str, aprovacao: int, revisao: int) -> str:
+    with open(os.path.join(DIRETORIO, "triagem_config.json"), encoding="utf-8") as arquivo:
+        config = json.load(arquivo)
+    config["thresholds"]["aprovacao_automatica"] = aprovacao
+    config["thresholds"]["revisao_humana"] = revisao
+    caminho = os.path.join(diretorio, f"config_{aprovacao}_{revisao}.json")
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(config, arquivo)
+    return caminho
+
+
+def test_leitura_em_blocos():
+    """Paginação por id cobre todos os chamados uma vez, respeitando o limite, com a mesma entrada da API"""
+    print("📦 Testando leitura em blocos...")
+    engine = _base()
+    blocos = list(ler_chamados_em_blocos(engine, tamanho_bloco=50))
+    assert [len(b) for b in blocos] == [50, 50, 20]
+    ids = [c["id"] for b in blocos for c in b]
+    assert ids == list(range(1, 121))
+    assert {"descricao", "criticidade", "anexos_count", "data_criacao"} <= set(blocos[0][0])
+    db = sessionmaker(bind=engine)()
+    assert all(hash_entrada(c) == hash_entrada(chamado_para_ia(db.get(Chamado, c["id"]))) for c in blocos[0])
+    db.close()
+    assert sum(len(b) for b in ler_chamados_em_blocos(engine, tamanho_bloco=50, limite=70)) == 70
+    print("✅ Blocos completos e sem repetição")
+
+
+def test_agregacao_igual_ao_motor():
+    """Uma passagem produz as mesmas contagens que pontuar chamado a chamado"""
+    print("📊 Testando agregação...")
+    engine = _base()
+    with tempfile.TemporaryDirectory() as diretorio:
+        saida = os.path.join(diretorio, "scores.csv")
+        resumo = reavaliar(engine, tamanho_bloco=40, saida=saida, progresso=False)
+        with open(saida, encoding="utf-8") as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+
+    motor = criar_motor()
+    esperado = {}
+    for bloco in ler_chamados_em_blocos(engine):
+        for chamado in bloco:
+            decisao = motor.realizar_triagem(chamado).decisao
+            esperado[decisao] = esperado.get(decisao, 0) + 1
+
+    assert resumo["total"] == len(linhas) == 120
+    assert resumo["config"]["decisoes"] == esperado
+    assert sum(resumo["config"]["histograma_scores"].values()) == 120
+    assert [int(l["id"]) for l in linhas] == list(range(1, 121))
+    assert "comparacao" not in resumo
+    print(f"✅ Distribuição {esperado}")
+
+
+def test_comparacao_configs():
+    """Thresholds mais rígidos só movem decisões para baixo; a matriz soma o total"""
+    print("🔀 Testando comparação de configurações...")
+    engine = _base()
+    with tempfile.TemporaryDirectory() as diretorio:
+        frouxa = _config_com_thresholds(diretorio, 60, 40)
+        rigida = _config_com_thresholds(diretorio, 90, 75)
+        saida = os.path.join(diretorio, "diff.jsonl")
+        resumo = reavaliar(engine, config=frouxa, comparar=rigida, tamanho_bloco=30, saida=saida, progresso=False)
+        with open(saida, encoding="utf-8") as arquivo:
+            linhas = [json.loads(linha) for linha in arquivo]
+
+    comparacao = resumo["comparacao"]
+    assert sum(comparacao["transicoes"].values()) == resumo["total"] == len(linhas) == 120
+    ordem = {"recusado": 0, "revisao": 1, "aprovado": 2}
+    for transicao in comparacao["transicoes"]:
+        antes, depois = transicao.split("->")
+        assert ordem[depois] <= ordem[antes], transicao
+    assert comparacao["decisoes_alteradas"] > 0
+    # Só os thresholds mudaram: o score é o mesmo nas duas configurações
+    assert comparacao["variacao_media_score"] == 0
+    assert all(l["score"] == l["score_b"] for l in linhas)
+    assert resumo["config"]["decisoes"].get("aprovado", 0) >= resumo["config_b"]["decisoes"].get("aprovado", 0)
+    print(f"✅ {comparacao['decisoes_alteradas']} decisões alteradas")
+
+
+def test_agregador_faixas():
+    """Score 100 cai na última faixa do histograma"""
+    print("📐 Testando faixas do histograma...")
+    agregador = AgregadorScores()
+    for score, decisao in ((0, "recusado"), (55, "revisao"), (100, "aprovado")):
+        agregador.adicionar({"score": score, "decisao": decisao, "criticidade": "Alta"})
+    resumo = agregador.resumo()["config"]
+    assert resumo["histograma_scores"]["0-9"] == 1
+    assert resumo["histograma_scores"]["50-59"] == 1
+    assert resumo["histograma_scores"]["90-99"] == 1
+    assert resumo["decisoes_por_criticidade"] == {"Alta": {"aprovado": 1, "recusado": 1, "revisao": 1}}
+    assert resumo["score_medio"] == 51.67
+    print("✅ Faixas corretas")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes da reavaliação de scores")
+    print("=" * 50)
+    testes = [test_leitura_em_blocos, test_agregacao_igual_ao_motor, test_comparacao_configs, test_agregador_faixas]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,186 @@
+"""
+Testes do resumo de follow-ups nos chamados
+Verifica total_followups, ultimo_followup_em e tipos_followup mantidos na
+transação, o preenchimento de bancos existentes e o filtro sem_followup_horas
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database
+from database import Base, get_db
+from models import Chamado, FollowUp, BITS_TIPO_FOLLOWUP
+from generate_mock_data import gerar_dados_rapido
+
+
+def _criar_sessao():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _followup(chamado_id: int, tipo: str, data: datetime) -> FollowUp:
+    return FollowUp(chamado_id=chamado_id, tipo=tipo, descricao="Acompanhamento", autor="Analista", data_criacao=data)
+
+
+def _resumo(db, chamado_id: int):
+    db.expire_all()
+    chamado = db.get(Chamado, chamado_id)
+    return chamado.total_followups, chamado.ultimo_followup_em, sorted(chamado.tipos_followup_list)
+
+
+def test_resumo_na_transacao():
+    """Criação, alteração e remoção de follow-ups atualizam o resumo sem mexer em data_atualizacao"""
+    print("🧾 Testando resumo de follow-ups...")
+    db = _criar_sessao()()
+    base = datetime(2025, 3, 1, 9, 0)
+    chamado = Chamado(numero_wex="WEX-R1", cliente_solicitante="Cliente", descricao="Erro no login")
+    outro = Chamado(numero_wex="WEX-R2", cliente_solicitante="Cliente", descricao="Lentidão")
+    db.add_all([chamado, outro])
+    db.commit()
+    atualizacao = chamado.data_atualizacao
+    assert _resumo(db, chamado.id) == (0, None, [])
+
+    db.add_all([_followup(chamado.id, "Análise", base + timedelta(hours=2)),
+                _followup(chamado.id, "Análise", base),
+                _followup(chamado.id, "Publicação", base + timedelta(hours=1))])
+    db.commit()
+    assert _resumo(db, chamado.id) == (3, base + timedelta(hours=2), ["Análise", "Publicação"])
+    assert chamado.tipos_followup == BITS_TIPO_FOLLOWUP["Análise"] | BITS_TIPO_FOLLOWUP["Publicação"]
+    assert chamado.to_dict()["total_followups"] == 3
+    assert chamado.data_atualizacao == atualizacao
+
+    mais_recente = db.query(FollowUp).filter(FollowUp.data_criacao == base + timedelta(hours=2)).one()
+    db.delete(mais_recente)
+    db.commit()
+    assert _resumo(db, chamado.id) == (2, base + timedelta(hours=1), ["Análise", "Publicação"])
+
+    publicacao = db.query(FollowUp).filter(FollowUp.tipo == "Publicação").one()
+    publicacao.chamado_id = outro.id  # Muda de chamado: os dois resumos são recalculados
+    db.commit()
+    assert _resumo(db, chamado.id) == (1, base, ["Análise"])
+    assert _resumo(db, outro.id) == (1, base + timedelta(hours=1), ["Publicação"])
+
+    db.add(_followup(outro.id, "Outros", base + timedelta(days=1)))
+    db.rollback()
+    assert _resumo(db, outro.id) == (1, base + timedelta(hours=1), ["Publicação"])
+    db.close()
+    print("✅ Resumo atualizado na mesma transação")
+
+
+def test_preenchimento_banco_existente():
+    """Banco sem as colunas recebe as colunas e o resumo calculado ao subir"""
+    print("🗄️ Testando preenchimento de banco existente...")
+    engine_original = database.engine
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'antigo.db')}")
+        with engine.begin() as conexao:
+            conexao.exec_driver_sql(
+                "CREATE TABLE chamados (id INTEGER PRIMARY KEY, numero_wex VARCHAR(50) NOT NULL, "
+                "cliente_solicitante VARCHAR(200) NOT NULL, descricao TEXT NOT NULL, status VARCHAR(20) NOT NULL, "
+                "criticidade VARCHAR(20) NOT NULL, data_criacao DATETIME NOT NULL, data_atualizacao DATETIME NOT NULL, "
+                "sla_limite DATETIME, tags_automaticas TEXT, score_qualidade INTEGER NOT NULL, "
+                "ambiente_informado BOOLEAN NOT NULL, possui_anexos BOOLEAN NOT NULL)"
+            )
+            conexao.exec_driver_sql(
+                "CREATE TABLE followups (id INTEGER PRIMARY KEY, chamado_id INTEGER NOT NULL, tipo VARCHAR(20) NOT NULL, "
+                "descricao TEXT NOT NULL, data_criacao DATETIME NOT NULL, autor VARCHAR(100) NOT NULL, anexos TEXT)"
+            )
+            conexao.exec_driver_sql(
+                "INSERT INTO chamados VALUES (1, 'WEX-A1', 'Cliente', 'Erro', 'Aberto', 'Alta', "
+                "'2025-01-01 10:00:00', '2025-01-01 10:00:00', NULL, '[]', 50, 0, 0)"
+            )
+            conexao.exec_driver_sql(
+                "INSERT INTO followups VALUES (1, 1, 'Desenvolvimento', 'Correção', '2025-01-02 08:00:00', 'Dev', '[]'), "
+                "(2, 1, 'Outros', 'Contato', '2025-01-01 12:00:00', 'Analista', '[]')"
+            )
+        database.engine = engine
+        try:
+            database.create_database()
+            with engine.connect() as conexao:
+                linha = conexao.execute(text(
+                    "SELECT total_followups, ultimo_followup_em, tipos_followup, data_atualizacao FROM chamados"
+                )).one()
+                indices = {i[1] for i in conexao.exec_driver_sql("PRAGMA index_list(chamados)")}
+            assert linha == (2, "2025-01-02 08:00:00",
+                             BITS_TIPO_FOLLOWUP["Desenvolvimento"] | BITS_TIPO_FOLLOWUP["Outros"], "2025-01-01 10:00:00")
+            assert "ix_chamados_ultimo_followup_em" in indices
+            database.create_database()  # Idempotente
+        finally:
+            database.engine = engine_original
+            engine.dispose()
+    print("✅ Colunas adicionadas e preenchidas")
+
+
+def test_carga_rapida_e_filtro():
+    """Carga sem ORM deixa o resumo consistente; sem_followup_horas filtra pelo último contato"""
+    print("⏱️ Testando carga rápida e filtro sem_followup_horas...")
+    import main
+    fabrica = _criar_sessao()
+    engine = fabrica.kw["bind"]
+    gerar_dados_rapido(engine, 80, semente=3, workers=1, tamanho_lote=40, progresso=False)
+
+    db = fabrica()
+    esperado = dict(db.query(FollowUp.chamado_id, func.count(FollowUp.id)).group_by(FollowUp.chamado_id).all())
+    assert {c.id: c.total_followups for c in db.query(Chamado) if c.total_followups} == esperado
+    agora = datetime.now()
+    recente = Chamado(numero_wex="WEX-N1", cliente_solicitante="Cliente", descricao="Novo", data_criacao=agora)
+    antigo = Chamado(numero_wex="WEX-N2", cliente_solicitante="Cliente", descricao="Antigo",
+                     data_criacao=agora - timedelta(days=3))
+    db.add_all([recente, antigo])
+    db.commit()
+    db.add(_followup(antigo.id, "Análise", agora - timedelta(hours=30)))
+    db.commit()
+    ids_esperados = {
+        c.id for c in db.query(Chamado)
+        if (c.ultimo_followup_em or c.data_criacao) < agora - timedelta(hours=24)
+    }
+    db.close()
+
+    def sessao_teste():
+        sessao = fabrica()
+        try:
+            yield sessao
+        finally:
+            sessao.close()
+
+    main.app.dependency_overrides[get_db] = sessao_teste
+    try:
+        resposta = TestClient(main.app).get("/chamados?sem_followup_horas=24&limit=100&fields=id").json()
+        assert resposta["total"] == len(ids_esperados)
+        ids = {c["id"] for c in resposta["chamados"]}
+        assert antigo.id in ids and recente.id not in ids
+        print(f"✅ {resposta['total']} chamados sem follow-up há 24h")
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do resumo de follow-ups")
+    print("=" * 50)
+    testes = [test_resumo_na_transacao, test_preenchimento_banco_existente, test_carga_rapida_e_filtro]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
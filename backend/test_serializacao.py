@@ -0,0 +1,127 @@
+"""
+Testes da serialização rápida
+Verifica que a projeção por colunas produz o mesmo JSON que to_dict
+"""
+
+import sys
+import os
+import json
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado, FollowUp
+from serializacao import (
+    COLUNAS_CHAMADO, COLUNAS_FOLLOWUP, VISAO_RESUMO, colunas_listagem_chamados, consultar_dicts, dumps,
+    interpretar_campos, resposta_json
+)
+
+
+def _criar_sessao():
+    """Cria um banco SQLite em memória com o schema completo"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def _popular(db):
+    com_followups = Chamado(
+        numero_wex="WEX1", cliente_solicitante="Cliente A", descricao="Erro ao emitir nota fiscal",
+        data_criacao=datetime(2025, 1, 10, 12, 0, 0, 500000), sla_limite=datetime(2025, 1, 12, 12, 0),
+        tags_automaticas='["fiscal", "nfe"]', score_qualidade=0.75
+    )
+    sem_followups = Chamado(numero_wex="WEX2", cliente_solicitante="Cliente B", descricao="Lentidão no login")
+    db.add_all([com_followups, sem_followups])
+    db.commit()
+    db.add_all([
+        FollowUp(chamado_id=com_followups.id, descricao="Em análise", autor="Analista", anexos='["log.txt"]'),
+        FollowUp(chamado_id=com_followups.id, descricao="Aguardando cliente", autor="Analista")
+    ])
+    db.commit()
+
+
+def test_projecao_equivale_to_dict():
+    """Chamados e follow-ups projetados geram o mesmo JSON que to_dict"""
+    print("⚡ Testando projeção por colunas...")
+    db = _criar_sessao()
+    _popular(db)
+
+    consulta = db.query(Chamado).order_by(Chamado.id)
+    esperado = [c.to_dict() for c in consulta.all()]
+    projetado = consultar_dicts(consulta, COLUNAS_CHAMADO)
+    assert json.loads(dumps(projetado)) == esperado
+    assert projetado[0]["total_followups"] == 2 and projetado[1]["total_followups"] == 0
+    assert projetado[0]["tags_automaticas"] == ["fiscal", "nfe"]
+
+    consulta = db.query(FollowUp).order_by(FollowUp.id)
+    esperado = [f.to_dict() for f in consulta.all()]
+    assert json.loads(dumps(consultar_dicts(consulta, COLUNAS_FOLLOWUP))) == esperado
+    db.close()
+    print("✅ Projeção idêntica a to_dict")
+
+
+def test_visao_resumo_e_campos():
+    """view=summary trunca a descrição no SQL e fields restringe as colunas"""
+    print("✂️ Testando visão resumida e fields...")
+    db = _criar_sessao()
+    _popular(db)
+    longa = Chamado(numero_wex="WEX3", cliente_solicitante="Cliente C", descricao="x" * 500)
+    db.add(longa)
+    db.commit()
+
+    colunas = colunas_listagem_chamados(VISAO_RESUMO)
+    resumo = {c["numero_wex"]: c for c in consultar_dicts(db.query(Chamado), colunas)}
+    assert "tags_automaticas" not in resumo["WEX1"] and "total_followups" not in resumo["WEX1"]
+    assert len(resumo["WEX3"]["descricao"]) == 120 and resumo["WEX3"]["descricao_truncada"] is True
+    assert resumo["WEX2"]["descricao"] == "Lentidão no login" and resumo["WEX2"]["descricao_truncada"] is False
+
+    campos = interpretar_campos(["status,criticidade", "numero_wex"])
+    parciais = consultar_dicts(db.query(Chamado).order_by(Chamado.id), colunas_listagem_chamados("full", campos))
+    assert list(parciais[0]) == ["id", "numero_wex", "status", "criticidade"]
+
+    try:
+        colunas_listagem_chamados(VISAO_RESUMO, ["tags_automaticas"])
+        assert False, "campo fora da visão deveria ser rejeitado"
+    except ValueError:
+        pass
+    db.close()
+    print("✅ Visão resumida e fields aplicados no SQL")
+
+
+def test_resposta_preserva_cabecalhos():
+    """Cabeçalhos definidos na resposta injetada (ETag) são mantidos"""
+    print("📦 Testando resposta pronta...")
+    response = Response()
+    response.headers["ETag"] = 'W/"abc"'
+    resposta = resposta_json({"data": datetime(2025, 1, 10, 12, 0)}, response)
+    assert resposta.headers["etag"] == 'W/"abc"'
+    assert json.loads(resposta.body) == {"data": "2025-01-10T12:00:00"}
+    print("✅ Cabeçalhos preservados")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de serialização")
+    print("=" * 50)
+    testes = [test_projecao_equivale_to_dict, test_visao_resumo_e_campos, test_resposta_preserva_cabecalhos]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,135 @@
+"""
+Testes do servidor de arquivos estáticos do frontend
+Verifica cache por mtime, keep-alive, compressão, ETag/304 e Range
+"""
+
+import sys
+import os
+import gzip
+import http.client
+import tempfile
+import threading
+import time
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pathlib import Path
+
+from servidor_estatico import CacheArquivos, criar_servidor, interpretar_range
+
+CONTEUDO_HTML = ("<html><body>" + "Chamado WEX " * 500 + "</body></html>").encode("utf-8")
+
+
+def _iniciar(diretorio: Path, cache: CacheArquivos):
+    servidor = criar_servidor("127.0.0.1", 0, diretorio, cache)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, http.client.HTTPConnection("127.0.0.1", servidor.server_address[1], timeout=5)
+
+
+def _get(conexao, caminho: str, cabecalhos: dict = None):
+    conexao.request("GET", caminho, headers=cabecalhos or {})
+    resposta = conexao.getresponse()
+    return resposta, resposta.read()
+
+
+def test_interpretar_range():
+    """Faixas válidas, sufixo, inválidas (ignoradas) e não satisfazíveis"""
+    print("📏 Testando interpretação de Range...")
+    assert interpretar_range("bytes=0-99", 1000) == (0, 99)
+    assert interpretar_range("bytes=900-", 1000) == (900, 999)
+    assert interpretar_range("bytes=-100", 1000) == (900, 999)
+    assert interpretar_range("bytes=950-2000", 1000) == (950, 999)
+    assert interpretar_range("bytes=0-1,5-9", 1000) is None
+    assert interpretar_range("bytes=abc", 1000) is None
+    assert interpretar_range("items=0-1", 1000) is None
+    try:
+        interpretar_range("bytes=1000-", 1000)
+        assert False, "faixa fora do arquivo deveria ser rejeitada"
+    except ValueError:
+        pass
+    print("✅ Range interpretado corretamente")
+
+
+def test_servidor():
+    """Mesma conexão atende várias requisições com compressão, 304, Range e invalidação por mtime"""
+    print("🌐 Testando servidor estático...")
+    with tempfile.TemporaryDirectory() as diretorio:
+        html = Path(diretorio) / "index.html"
+        html.write_bytes(CONTEUDO_HTML)
+        cache = CacheArquivos(max_arquivo_bytes=len(CONTEUDO_HTML) + 1)
+        servidor, conexao = _iniciar(Path(diretorio), cache)
+        try:
+            resposta, corpo = _get(conexao, "/", {"Accept-Encoding": "gzip"})
+            assert resposta.status == 200 and resposta.getheader("Content-Encoding") == "gzip"
+            assert gzip.decompress(corpo) == CONTEUDO_HTML
+            etag = resposta.getheader("ETag")
+
+            # Keep-alive: mesma conexão
+            resposta, corpo = _get(conexao, "/index.html", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+            assert resposta.status == 304 and corpo == b""
+
+            resposta, corpo = _get(conexao, "/index.html", {"Range": "bytes=0-11"})
+            assert resposta.status == 206 and corpo == CONTEUDO_HTML[:12]
+            assert resposta.getheader("Content-Range") == f"bytes 0-11/{len(CONTEUDO_HTML)}"
+
+            resposta, _ = _get(conexao, "/index.html", {"Range": f"bytes={len(CONTEUDO_HTML)}-"})
+            assert resposta.status == 416
+
+            resposta, _ = _get(conexao, "/inexistente.html")
+            assert resposta.status == 404
+            assert cache.acertos >= 3
+
+            # Arquivo alterado: novo conteúdo e novo ETag
+            novo = b"<html>novo</html>"
+            html.write_bytes(novo)
+            os.utime(html, (time.time() + 5, time.time() + 5))
+            resposta, corpo = _get(conexao, "/index.html", {"If-None-Match": etag})
+            assert resposta.status == 200 and corpo == novo
+        finally:
+            conexao.close()
+            servidor.shutdown()
+            servidor.server_close()
+    print("✅ Servidor atende com cache, 304 e Range")
+
+
+def test_arquivo_grande_via_sendfile():
+    """Arquivos acima do limite de memória são servidos do disco (inclusive faixas)"""
+    print("📤 Testando arquivo fora do cache...")
+    with tempfile.TemporaryDirectory() as diretorio:
+        dados = bytes(range(256)) * 64
+        (Path(diretorio) / "dados.bin").write_bytes(dados)
+        cache = CacheArquivos(max_arquivo_bytes=1024)
+        servidor, conexao = _iniciar(Path(diretorio), cache)
+        try:
+            resposta, corpo = _get(conexao, "/dados.bin")
+            assert resposta.status == 200 and corpo == dados
+            resposta, corpo = _get(conexao, "/dados.bin", {"Range": "bytes=1000-1999"})
+            assert resposta.status == 206 and corpo == dados[1000:2000]
+            assert not cache.obter(Path(diretorio) / "dados.bin").em_memoria
+        finally:
+            conexao.close()
+            servidor.shutdown()
+            servidor.server_close()
+    print("✅ Arquivo grande enviado do disco")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do servidor estático")
+    print("=" * 50)
+    testes = [test_interpretar_range, test_servidor, test_arquivo_grande_via_sendfile]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,74 @@
+"""
+Testes do modo de produção da API
+Verifica o dimensionamento dos workers e a pré-carga dos caches antes do fork
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado
+from padroes_incrementais import registrar_chamados, _limpar_lideres
+from servidor_producao import aquecer_caches, calcular_workers
+
+
+def _criar_sessao():
+    """Cria um banco SQLite em memória com o schema completo"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def test_calcular_workers():
+    """Valor explícito é respeitado; 0 usa um processo por núcleo"""
+    print("🏭 Testando dimensionamento dos workers...")
+    assert calcular_workers(3) == 3
+    assert calcular_workers(0) == (os.cpu_count() or 1)
+    print("✅ Workers dimensionados")
+
+
+def test_aquecer_caches():
+    """Representantes dos grupos ficam em memória após a pré-carga"""
+    print("🔥 Testando pré-carga dos caches...")
+    db = _criar_sessao()
+    chamados = [
+        Chamado(numero_wex=f"WEX{i}", cliente_solicitante="Cliente",
+                descricao=f"Erro ao emitir nota fiscal número {i} no módulo de faturamento")
+        for i in range(5)
+    ]
+    db.add_all(chamados)
+    db.commit()
+    registrar_chamados(db, chamados)
+    _limpar_lideres()
+
+    estatisticas = aquecer_caches(db)
+    assert estatisticas["lideres_padroes"] >= 1
+    db.close()
+    print("✅ Caches pré-carregados")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do modo de produção")
+    print("=" * 50)
+    testes = [test_calcular_workers, test_aquecer_caches]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
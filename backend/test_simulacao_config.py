@@ -0,0 +1,238 @@
+"""
+Testes da simulação de configurações
+Verifica que a matriz de scores por categoria reproduz o motor, que a simulação
+acerta as decisões de uma config candidata e que a atualização é incremental
+"""
+
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado
+from generate_mock_data import gerar_dados_rapido
+from reavaliar_scores import criar_motor, ler_chamados_em_blocos
+import simulacao_config
+from simulacao_config import (
+    atualizar_scores_categorias, calcular_decisoes, limpar_matriz, montar_config_candidata,
+    obter_matriz, simular_config, _config_atual
+)
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def _criar_sessao(total: int = 150):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    gerar_dados_rapido(engine, total, semente=11, data_inicio=datetime(2024, 1, 1), data_fim=datetime(2024, 3, 31),
+                       workers=1, tamanho_lote=100, progresso=False)
+    limpar_matriz()
+    return engine, sessionmaker(bind=engine)()
+
+
+def _scores_motor(engine, caminho_config=None):
+    motor = criar_motor(caminho_config)
+    return {
+        chamado["id"]: motor.realizar_triagem(chamado)
+        for bloco in ler_chamados_em_blocos(engine) for chamado in bloco
+    }
+
+
+def test_matriz_reproduz_motor():
+    """Score e decisão vetoriais com a config atual iguais aos do motor"""
+    print("🧮 Testando matriz de scores por categoria...")
+    engine, db = _criar_sessao()
+    try:
+        matriz = obter_matriz(db)
+        assert len(matriz.ids) == 150
+        scores, decisoes = calcular_decisoes(matriz.scores, _config_atual())
+        esperados = _scores_motor(engine)
+        for chamado_id, score, decisao in zip(matriz.ids, scores, decisoes):
+            resultado = esperados[int(chamado_id)]
+            assert int(score) == resultado.score_total, chamado_id
+            assert simulacao_config.DECISOES[decisao] == resultado.decisao, chamado_id
+        print("✅ Matriz idêntica ao motor")
+    finally:
+        db.close()
+
+
+def test_simulacao_igual_config_candidata():
+    """Distribuição simulada igual à do motor com a config candidata gravada em arquivo"""
+    print("🎚️ Testando simulação de thresholds e pesos...")
+    engine, db = _criar_sessao()
+    candidata = {
+        "thresholds": {"aprovacao_automatica": 80, "revisao_humana": 60},
+        "pesos_categorias": {"anexos": 0.2, "descricao": 0.35, "info_tecnicas": 0.25, "contexto": 0.2}
+    }
+    try:
+        resultado = simular_config(db, candidata, limite_exemplos=5)
+        with open(os.path.join(DIRETORIO, "triagem_config.json"), encoding="utf-8") as arquivo:
+            config = json.load(arquivo)
+        config["thresholds"].update(candidata["thresholds"])
+        config["pesos_categorias"].update(candidata["pesos_categorias"])
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "candidata.json")
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                json.dump(config, arquivo)
+            esperados = _scores_motor(engine, caminho)
+
+        contagem = {}
+        for r in esperados.values():
+            contagem[r.decisao] = contagem.get(r.decisao, 0) + 1
+        simulada = {decisao: q for decisao, q in resultado["distribuicao_simulada"].items() if q}
+        assert simulada == contagem
+        assert resultado["total_chamados"] == 150
+        assert resultado["decisoes_alteradas"] == sum(resultado["transicoes"].values()) > 0
+        assert len(resultado["chamados_alterados"]) == 5
+        for item in resultado["chamados_alterados"]:
+            assert item["decisao_simulada"] == esperados[item["chamado_id"]].decisao
+            assert item["decisao_atual"] != item["decisao_simulada"]
+        assert resultado["secoes_nao_simuladas"] == []
+        print(f"✅ {resultado['decisoes_alteradas']} decisões alteradas em {resultado['tempo_calculo_ms']}ms")
+    finally:
+        db.close()
+
+
+def test_validacao_candidata():
+    """Valores inválidos geram ValueError; critérios alterados são sinalizados"""
+    print("🛡️ Testando validação da config candidata...")
+    atual = _config_atual()
+    for invalida in ({"thresholds": {"aprovacao_automatica": 120}},
+                     {"thresholds": {"aprovacao_automatica": 40, "revisao_humana": 60}},
+                     {"pesos_categorias": {"urgencia": 0.1}},
+                     {"pesos_categorias": {"anexos": -1}},
+                     ["não é objeto"]):
+        try:
+            montar_config_candidata(invalida, atual)
+            assert False, f"candidata inválida aceita: {invalida}"
+        except ValueError:
+            pass
+    config, nao_simuladas, avisos = montar_config_candidata(
+        {"pesos_categorias": {"anexos": 0.5}, "limites_conteudo": {"min_descricao_chars": 1}}, atual
+    )
+    assert config["pesos_categorias"]["anexos"] == 0.5
+    assert config["thresholds"] == atual["thresholds"]
+    assert nao_simuladas == ["limites_conteudo"]
+    assert avisos and "Soma dos pesos" in avisos[0]
+    print("✅ Validação correta")
+
+
+def test_atualizacao_incremental():
+    """Só chamados criados ou alterados são recalculados; a matriz acompanha inclusive escritas fora do ORM"""
+    print("🔄 Testando atualização incremental...")
+    engine, db = _criar_sessao(60)
+    try:
+        obter_matriz(db)
+        assert atualizar_scores_categorias(db) == []
+
+        chamado = db.get(Chamado, 7)
+        chamado.descricao = "Erro"
+        chamado.data_atualizacao = datetime(2030, 1, 1)
+        db.add(Chamado(numero_wex="WEX-NOVO-1", cliente_solicitante="Cliente Teste",
+                       descricao="Erro 500 no módulo de faturamento ao gerar nota fiscal. Ambiente produção."))
+        db.commit()
+
+        matriz = obter_matriz(db)
+        assert len(matriz.ids) == 61
+        assert list(matriz.ids) == sorted(matriz.ids)
+        linha = list(matriz.ids).index(7)
+        assert matriz.scores[linha][1] == simulacao_config.calcular_scores_categorias(chamado)["descricao"]
+        assert atualizar_scores_categorias(db) == []
+        assert obter_matriz(db) is matriz  # Sem alterações: mesma matriz em memória
+
+        # Carga pelo Core e remoção em massa não passam pelo contador de versão
+        db.execute(insert(Chamado.__table__), [{
+            "numero_wex": "WEX-CORE-1", "cliente_solicitante": "Cliente", "descricao": "Erro ao emitir nota fiscal",
+            "status": "Aberto", "criticidade": "Média", "data_criacao": datetime(2025, 1, 1),
+            "data_atualizacao": datetime(2025, 1, 1), "score_qualidade": 0, "ambiente_informado": False,
+            "possui_anexos": False}])
+        db.commit()
+        assert len(obter_matriz(db).ids) == 62
+        db.query(Chamado).filter(Chamado.id == 7).delete(synchronize_session=False)
+        db.commit()
+        matriz = obter_matriz(db)
+        assert len(matriz.ids) == 61 and 7 not in matriz.ids
+        print("✅ Atualização incremental correta")
+    finally:
+        db.close()
+
+
+def test_endpoint_constroi_em_background():
+    """Sem matriz o endpoint responde 503 e agenda o cálculo; depois simula sem recalcular na requisição"""
+    print("🌐 Testando POST /api/config/simular com a matriz em background...")
+    import main
+    from fastapi.testclient import TestClient
+    from database import get_db
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'simulacao.db')}",
+                               connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        gerar_dados_rapido(engine, 40, semente=5, workers=1, tamanho_lote=40, progresso=False)
+        limpar_matriz()
+        fabrica = sessionmaker(bind=engine)
+
+        def sessao_teste():
+            db = fabrica()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        main.app.dependency_overrides[get_db] = sessao_teste
+        candidata = {"thresholds": {"aprovacao_automatica": 85}}
+        try:
+            cliente = TestClient(main.app)
+            resposta = cliente.post("/api/config/simular", json=candidata)
+            assert resposta.status_code == 503 and resposta.headers["retry-after"] == "30"
+            simulacao_config._atualizacao.join(30)
+
+            resposta = cliente.post("/api/config/simular", json=candidata)
+            assert resposta.status_code == 200
+            assert resposta.json()["total_chamados"] == 40 and resposta.json()["matriz_atualizada"]
+
+            # Chamado novo: responde com a matriz anterior e atualiza em background
+            db = fabrica()
+            db.add(Chamado(numero_wex="WEX-SIM-1", cliente_solicitante="Cliente", descricao="Erro ao emitir nota"))
+            db.commit()
+            db.close()
+            resposta = cliente.post("/api/config/simular", json=candidata).json()
+            assert resposta["total_chamados"] == 40 and not resposta["matriz_atualizada"]
+            simulacao_config._atualizacao.join(30)
+            resposta = cliente.post("/api/config/simular", json=candidata).json()
+            assert resposta["total_chamados"] == 41 and resposta["matriz_atualizada"]
+            print("✅ Matriz construída fora da requisição")
+        finally:
+            main.app.dependency_overrides.pop(get_db, None)
+            limpar_matriz()
+            engine.dispose()
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes da simulação de configurações")
+    print("=" * 50)
+    testes = [test_matriz_reproduz_motor, test_simulacao_igual_config_candidata,
+              test_validacao_candidata, test_atualizacao_incremental, test_endpoint_constroi_em_background]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,165 @@
+"""
+Testes do histórico de triagens
+Verifica o reaproveitamento da última triagem (mesma entrada e configuração),
+o recálculo quando algo muda e a aplicação da triagem reaproveitada
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base, get_db
+from models import Chamado, Triagem
+import triagens
+from triagens import obter_triagem
+from wex_ai_engine import wex_ai
+
+DESCRICAO = ("Erro 500 ao gerar relatório financeiro no ambiente de produção. "
+             "Versão 2.3.1, navegador Chrome. Impacto: equipe financeira parada.")
+
+
+def _criar_sessao():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _contar_triagens():
+    """Envolve wex_ai.realizar_triagem (sem IA remota) contando as chamadas"""
+    chamadas = []
+    original = wex_ai.realizar_triagem
+    chamada_remota = wex_ai._chamar_huggingface_api
+
+    def contar(chamado, medir_estagios=None):
+        chamadas.append(chamado['id'])
+        return original(chamado, medir_estagios)
+
+    wex_ai.realizar_triagem = contar
+    wex_ai._chamar_huggingface_api = lambda model_name, payload: {"error": "IA remota desativada"}
+
+    def restaurar():
+        wex_ai.realizar_triagem = original
+        wex_ai._chamar_huggingface_api = chamada_remota
+    return chamadas, restaurar
+
+
+def test_reaproveitamento():
+    """Segunda triagem sem mudanças vem do banco; descrição ou configuração nova recalculam"""
+    print("♻️ Testando reaproveitamento de triagens...")
+    db = _criar_sessao()()
+    chamadas, restaurar = _contar_triagens()
+    versao_original = triagens.get_versao_config
+    try:
+        chamado = Chamado(numero_wex="WEX-T1", cliente_solicitante="Cliente Teste", descricao=DESCRICAO, possui_anexos=True)
+        db.add(chamado)
+        db.commit()
+
+        primeiro, registro, reaproveitada = obter_triagem(db, chamado)
+        assert not reaproveitada and registro is not None
+        segundo, registro_repetido, reaproveitada = obter_triagem(db, chamado)
+        assert reaproveitada and registro_repetido.id == registro.id
+        assert len(chamadas) == 1
+        assert segundo.score_total == primeiro.score_total
+        assert segundo.score_breakdown == primeiro.score_breakdown
+        assert segundo.tags_sugeridas == primeiro.tags_sugeridas
+        assert segundo.sugestoes == primeiro.sugestoes
+
+        chamado.descricao = DESCRICAO + " Logs em anexo."
+        db.commit()
+        _, _, reaproveitada = obter_triagem(db, chamado)
+        assert not reaproveitada and len(chamadas) == 2
+
+        triagens.get_versao_config = lambda: "outra-versao"
+        _, _, reaproveitada = obter_triagem(db, chamado)
+        assert not reaproveitada and len(chamadas) == 3
+
+        historico = db.query(Triagem).filter(Triagem.chamado_id == chamado.id).order_by(Triagem.id).all()
+        assert len(historico) == 3
+        assert historico[0].descricao_hash != historico[1].descricao_hash
+        assert historico[1].entrada_hash == historico[2].entrada_hash
+        assert historico[2].versao_config == "outra-versao"
+        print("✅ Triagem reaproveitada só com entrada e configuração iguais")
+    finally:
+        triagens.get_versao_config = versao_original
+        restaurar()
+        db.close()
+
+
+def test_aplicar_reaproveita_triagem():
+    """Triagem seguida de aplicação executa a IA uma vez e grava tags como JSON"""
+    print("✅ Testando aplicação da triagem reaproveitada...")
+    import main
+    fabrica = _criar_sessao()
+
+    def sessao_teste():
+        db = fabrica()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    chamadas, restaurar = _contar_triagens()
+    registrar_original = main.registrar_padrao_em_background
+    main.app.dependency_overrides[get_db] = sessao_teste
+    main.registrar_padrao_em_background = lambda chamado_id: None
+    try:
+        db = fabrica()
+        chamado = Chamado(numero_wex="WEX-T2", cliente_solicitante="Cliente Teste", descricao=DESCRICAO,
+                          possui_anexos=True, criticidade="Baixa")
+        db.add(chamado)
+        db.commit()
+        chamado_id = chamado.id
+        db.close()
+
+        cliente = TestClient(main.app)
+        triagem = cliente.post(f"/api/chamados/{chamado_id}/triagem").json()
+        assert triagem["metadados_ia"]["reaproveitada"] is False
+        aplicacao = cliente.post(f"/api/triagem/aplicar/{chamado_id}").json()
+        assert len(chamadas) == 1
+        assert aplicacao["triagem_reaproveitada"] is True
+        assert aplicacao["triagem_id"] == triagem["triagem_id"]
+        assert aplicacao["success"] is True
+
+        db = fabrica()
+        chamado = db.get(Chamado, chamado_id)
+        assert chamado.criticidade == triagem["criticidade_sugerida"]
+        assert chamado.tags_automaticas_list == triagem["tags_sugeridas"]
+        assert chamado.score_qualidade == triagem["score_total"]
+        assert db.get(Triagem, triagem["triagem_id"]).aplicada is True
+        db.close()
+
+        # A criticidade aplicada muda a entrada: a próxima triagem é recalculada
+        assert cliente.post(f"/api/chamados/{chamado_id}/triagem").json()["metadados_ia"]["reaproveitada"] is False
+        print("✅ Aplicação usou a triagem gravada")
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        main.registrar_padrao_em_background = registrar_original
+        restaurar()
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes do histórico de triagens")
+    print("=" * 50)
+    testes = [test_reaproveitamento, test_aplicar_reaproveita_triagem]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
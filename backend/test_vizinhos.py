@@ -0,0 +1,174 @@
+"""
+Testes da tabela de vizinhos pré-calculados (chamados relacionados)
+Verifica que a atualização incremental produz o mesmo top-K da reconstrução completa
+"""
+
+import sys
+import os
+
+# Adicionar o diretório backend ao path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+from fastapi import BackgroundTasks
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Chamado, ChamadoVizinho, FollowUp
+from wex_ai_engine import desativar_ia_remota
+import vizinhos
+from vizinhos import (
+    reconstruir_vizinhos, atualizar_vizinhanca_chamado,
+    vizinhanca_atualizada, buscar_vizinhos_precomputados, selecionar_similares
+)
+
+DESCRICOES = [
+    "Sistema apresentando lentidão no módulo de relatórios",
+    "Sistema apresentando lentidão no módulo de dashboard",
+    "Sistema apresentando lentidão no módulo de cadastro",
+    "Erro 500 ao tentar acessar dashboard do sistema",
+    "Erro 404 ao tentar acessar relatórios do sistema",
+    "Erro timeout ao tentar acessar configurações",
+    "Problema de integração com API externa - falha na comunicação",
+    "Problema de integração com banco de dados - timeout nas requisições",
+    "Solicitação de melhoria para dashboard gerencial",
+    "Falha na gravação de pedidos - dados não salvos",
+]
+
+
+def _criar_sessao():
+    """Cria um banco SQLite em memória com o schema completo"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _popular(db, descricoes):
+    for i, descricao in enumerate(descricoes, 1):
+        db.add(Chamado(numero_wex=f"WEX{i:06d}", cliente_solicitante="Cliente Teste", descricao=descricao))
+    db.commit()
+
+
+def _tabela(db):
+    return sorted(
+        (v.chamado_id, v.vizinho_id, round(v.score, 6))
+        for v in db.query(ChamadoVizinho).all()
+    )
+
+
+def test_incremental_igual_reconstrucao():
+    """Criar e editar chamados incrementalmente mantém o mesmo top-K da reconstrução"""
+    print("🔗 Testando atualização incremental de vizinhos...")
+    original_top_k = vizinhos.get_top_k
+    vizinhos.get_top_k = lambda: 3
+    db = _criar_sessao()
+    try:
+        _popular(db, DESCRICOES[:-2])
+        reconstruir_vizinhos(db)
+
+        # Novos chamados entram nas vizinhanças afetadas
+        for i, descricao in enumerate(DESCRICOES[-2:], len(DESCRICOES) - 1):
+            chamado = Chamado(numero_wex=f"WEX{i:06d}", cliente_solicitante="Cliente Teste", descricao=descricao)
+            db.add(chamado)
+            db.commit()
+            atualizar_vizinhanca_chamado(db, chamado.id)
+
+        # Edição de descrição invalida a vizinhança até ser recalculada
+        editado = db.get(Chamado, 1)
+        editado.descricao = "Erro 500 ao tentar acessar relatórios do sistema"
+        db.commit()
+        assert not vizinhanca_atualizada(db, editado)
+        atualizar_vizinhanca_chamado(db, editado.id)
+        assert vizinhanca_atualizada(db, editado)
+
+        incremental = _tabela(db)
+        reconstruir_vizinhos(db)
+        assert incremental == _tabela(db)
+
+        resultado = buscar_vizinhos_precomputados(db, editado.id, limite=2, score_minimo=0.0)
+        assert len(resultado.chamados_similares) == 2
+        scores = [r['score_similaridade'] for r in resultado.chamados_similares]
+        assert scores == sorted(scores, reverse=True)
+    finally:
+        vizinhos.get_top_k = original_top_k
+        db.close()
+    print("✅ Vizinhos incrementais consistentes com a reconstrução")
+
+
+def test_exemplos_sugestoes_followup():
+    """Sugestões usam os similares reais, agendam a vizinhança desatualizada e carregam os exemplos em uma consulta"""
+    print("💡 Testando exemplos das sugestões de follow-up...")
+    import main
+    db = _criar_sessao()
+    base = datetime(2025, 2, 1, 9, 0)
+    chamada_remota = main.wex_ai._chamar_huggingface_api
+    desativar_ia_remota(main.wex_ai)
+    try:
+        _popular(db, DESCRICOES)
+        for chamado_id in (2, 3, 4, 5):
+            db.add_all([
+                FollowUp(chamado_id=chamado_id, tipo="Análise", descricao=f"Passo {n} do chamado {chamado_id}",
+                         autor="Analista", data_criacao=base + timedelta(hours=n))
+                for n in (3, 1, 2)
+            ])
+        db.commit()
+        principal = db.get(Chamado, 1)
+
+        tempo_real = selecionar_similares(db, principal, 5)
+        tarefas = BackgroundTasks()
+        main.montar_sugestoes_followup(db, principal, tarefas)  # Vizinhança ausente: agenda o recálculo
+        assert [(t.func, t.args) for t in tarefas.tasks] == [(main.atualizar_vizinhanca_em_background, (1,))]
+        reconstruir_vizinhos(db)
+        assert selecionar_similares(db, principal, 5) == tempo_real
+        tarefas = BackgroundTasks()
+        main.montar_sugestoes_followup(db, principal, tarefas)
+        assert not tarefas.tasks
+        assert [score for _, score in tempo_real] == sorted((score for _, score in tempo_real), reverse=True)
+        assert 1 not in dict(tempo_real)
+
+        exemplos = main.carregar_followups_por_chamado(db, [2, 3, 6], por_chamado=2)
+        assert sorted(exemplos) == [2, 3]
+        assert [f["descricao"] for f in exemplos[2]] == ["Passo 1 do chamado 2", "Passo 2 do chamado 2"]
+
+        consultas = []
+        registrar = lambda conn, cursor, sql, *args: consultas.append(sql)
+        event.listen(db.get_bind(), "before_cursor_execute", registrar)
+        try:
+            resposta = main.montar_sugestoes_followup(db, principal)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", registrar)
+        assert sum("FROM followups" in sql for sql in consultas) == 1
+        scores = dict(tempo_real)
+        esperados = [db.get(Chamado, i).numero_wex for i, _ in tempo_real if i in (2, 3, 4, 5)][:3]
+        assert [e["chamado_numero"] for e in resposta["exemplos_historico"]] == esperados
+        for exemplo in resposta["exemplos_historico"]:
+            chamado_id = int(exemplo["chamado_numero"][3:])
+            assert exemplo["similaridade"] == round(scores[chamado_id], 3)
+            assert len(exemplo["followups"]) == 2
+    finally:
+        main.wex_ai._chamar_huggingface_api = chamada_remota
+        db.close()
+    print("✅ Exemplos com similaridade real e uma consulta de follow-ups")
+
+
+def run_all_tests():
+    """Executa todos os testes"""
+    print("🧪 Testes de vizinhos pré-calculados")
+    print("=" * 50)
+    testes = [test_incremental_igual_reconstrucao, test_exemplos_sugestoes_followup]
+    passaram = 0
+    for teste in testes:
+        try:
+            teste()
+            passaram += 1
+        except AssertionError as e:
+            print(f"❌ {teste.__name__} falhou: {e}")
+    print(f"\n📊 {passaram}/{len(testes)} testes passaram")
+    return passaram == len(testes)
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
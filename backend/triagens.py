@@ -0,0 +1,124 @@
+"""
+Histórico e reaproveitamento das triagens por IA
+Cada triagem calculada é gravada na tabela triagens. Enquanto os campos enviados
+ao motor (hash da entrada) e a versão da configuração não mudam, a última
+triagem gravada do chamado é devolvida sem executar a IA de novo.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import Chamado, Triagem
+from config_manager import get_versao_config
+from features_textuais import hash_descricao
+from wex_ai_engine import wex_ai, TriagemResult
+
+logger = logging.getLogger(__name__)
+
+# Triagens reaproveitadas (acertos) e calculadas (falhas), expostas em /metrics
+_lock_estatisticas = threading.Lock()
+estatisticas_triagens = {"reaproveitadas": 0, "calculadas": 0}
+
+
+def chamado_para_ia(chamado: Chamado) -> Dict[str, Any]:
+    """Dict do chamado (objeto do ORM ou linha com as mesmas colunas) no formato esperado pelo motor de IA"""
+    return {
+        'id': chamado.id,
+        'numero_wex': chamado.numero_wex,
+        'titulo': f"Chamado {chamado.numero_wex}",  # Usar número WEX como título
+        'descricao': chamado.descricao,
+        'cliente_solicitante': chamado.cliente_solicitante,
+        'criticidade': chamado.criticidade.value if hasattr(chamado.criticidade, 'value') else str(chamado.criticidade),
+        'status': chamado.status.value if hasattr(chamado.status, 'value') else str(chamado.status),
+        'data_criacao': chamado.data_criacao.isoformat() if chamado.data_criacao else None,
+        'anexos_count': 1 if chamado.possui_anexos else 0  # Usar valor real do banco
+    }
+
+
+def hash_entrada(dados: Dict[str, Any]) -> str:
+    """Hash estável de todos os campos enviados ao motor"""
+    return hashlib.sha1(json.dumps(dados, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def resultado_de_registro(registro: Triagem) -> TriagemResult:
+    """TriagemResult reconstruído a partir de uma triagem gravada"""
+    return TriagemResult(
+        chamado_id=registro.chamado_id,
+        score_total=registro.score_total,
+        score_breakdown=json.loads(registro.score_breakdown or "{}"),
+        decisao=registro.decisao,
+        motivos=json.loads(registro.motivos or "[]"),
+        sugestoes=json.loads(registro.sugestoes or "[]"),
+        tags_sugeridas=json.loads(registro.tags_sugeridas or "[]"),
+        criticidade_sugerida=registro.criticidade_sugerida,
+        confianca=registro.confianca,
+        tempo_processamento_ms=registro.tempo_processamento_ms,
+        observacoes=registro.observacoes or ""
+    )
+
+
+def _novo_registro(chamado: Chamado, resultado: TriagemResult, versao: str, entrada: str) -> Triagem:
+    return Triagem(
+        chamado_id=chamado.id,
+        score_total=resultado.score_total,
+        score_breakdown=json.dumps(resultado.score_breakdown, ensure_ascii=False),
+        decisao=resultado.decisao,
+        criticidade_sugerida=resultado.criticidade_sugerida,
+        confianca=resultado.confianca,
+        tags_sugeridas=json.dumps(resultado.tags_sugeridas, ensure_ascii=False),
+        motivos=json.dumps(resultado.motivos, ensure_ascii=False),
+        sugestoes=json.dumps(resultado.sugestoes, ensure_ascii=False),
+        observacoes=resultado.observacoes,
+        tempo_processamento_ms=resultado.tempo_processamento_ms,
+        versao_config=versao,
+        descricao_hash=hash_descricao(chamado.descricao),
+        entrada_hash=entrada
+    )
+
+
+def buscar_triagem_reaproveitavel(db: Session, chamado_id: int, entrada: str, versao: str) -> Optional[Triagem]:
+    """Última triagem do chamado, se foi feita com a mesma entrada e a mesma configuração"""
+    ultima = (
+        db.query(Triagem)
+        .filter(Triagem.chamado_id == chamado_id)
+        .order_by(Triagem.id.desc())
+        .first()
+    )
+    if ultima is not None and ultima.entrada_hash == entrada and ultima.versao_config == versao:
+        return ultima
+    return None
+
+
+def obter_triagem(db: Session, chamado: Chamado) -> Tuple[TriagemResult, Optional[Triagem], bool]:
+    """
+    Triagem do chamado: a gravada, se ainda válida, ou uma nova (gravada no histórico)
+
+    Returns:
+        (resultado, registro, reaproveitada); triagens com erro não são
+        gravadas e voltam com registro None
+    """
+    dados = chamado_para_ia(chamado)
+    entrada = hash_entrada(dados)
+    versao = get_versao_config()
+
+    registro = buscar_triagem_reaproveitavel(db, chamado.id, entrada, versao)
+    if registro is not None:
+        with _lock_estatisticas:
+            estatisticas_triagens["reaproveitadas"] += 1
+        return resultado_de_registro(registro), registro, True
+
+    resultado = wex_ai.realizar_triagem(dados)
+    with _lock_estatisticas:
+        estatisticas_triagens["calculadas"] += 1
+    if resultado.decisao == "erro":
+        return resultado, None, False
+
+    registro = _novo_registro(chamado, resultado, versao, entrada)
+    db.add(registro)
+    db.commit()
+    return resultado, registro, False
@@ -1,9 +1,13 @@
 """
 Script para validar os scores dos chamados criados
 e demonstrar como estão alinhados com os critérios de triagem
+
+Para reavaliar bases grandes com o motor real (e comparar configurações),
+use reavaliar_scores.py.
 """
 
 import json
+from collections import Counter
 from database import SessionLocal
 from models import Chamado, FollowUp
 
@@ -232,10 +236,15 @@ def main():
     db = SessionLocal()
     
     try:
-        chamados = db.query(Chamado).order_by(Chamado.id).all()
+        # Lido em lotes; cada chamado é analisado uma vez e contado no mesmo laço
+        chamados = db.query(Chamado).order_by(Chamado.id).yield_per(500)
+        decisoes = Counter()
+        total = 0
         
         for i, chamado in enumerate(chamados, 1):
             analise = analisar_chamado(chamado, config)
+            decisoes[analise['decisao']] += 1
+            total = i
             
             print(f"\n📋 CHAMADO {i}: {chamado.numero_wex}")
             print(f"🏢 Cliente: {chamado.cliente_solicitante}")
@@ -261,15 +270,11 @@ def main():
             print("-" * 70)
         
         print(f"\n📊 RESUMO FINAL:")
-        print(f"Total de chamados analisados: {len(chamados)}")
-        
-        aprovados = sum(1 for c in chamados if analisar_chamado(c, config)['score_final'] >= 70)
-        revisao = sum(1 for c in chamados if 50 <= analisar_chamado(c, config)['score_final'] < 70)
-        recusados = sum(1 for c in chamados if analisar_chamado(c, config)['score_final'] < 50)
+        print(f"Total de chamados analisados: {total}")
         
-        print(f"🟢 Aprovação automática: {aprovados}")
-        print(f"🟡 Revisão humana: {revisao}")  
-        print(f"🔴 Recusa automática: {recusados}")
+        print(f"🟢 Aprovação automática: {decisoes['🟢 APROVAÇÃO AUTOMÁTICA']}")
+        print(f"🟡 Revisão humana: {decisoes['🟡 REVISÃO HUMANA']}")  
+        print(f"🔴 Recusa automática: {decisoes['🔴 RECUSA AUTOMÁTICA']}")
         
     finally:
         db.close()
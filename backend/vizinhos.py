@@ -0,0 +1,276 @@
+"""
+Vizinhos pré-calculados para a busca de chamados relacionados
+Mantém na tabela chamado_vizinhos o top-K de chamados similares de cada chamado,
+atualizado de forma incremental quando um chamado é criado ou tem a descrição alterada
+
+Uso pela linha de comando (reconstrução completa):
+    python vizinhos.py
+"""
+
+import json
+import heapq
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Chamado, ChamadoVizinho, ChamadoVizinhancaEstado
+from config_manager import get_config_manager
+from features_textuais import hash_descricao
+from wex_ai_engine import (
+    wex_ai, ChamadosSimilares, similaridade_tokens, motivos_similaridade,
+    formatar_chamado_similar, identificar_padroes_similares
+)
+
+logger = logging.getLogger(__name__)
+
+TOP_K_PADRAO = 50
+SCORE_MINIMO_ARMAZENADO = 0.1  # Mesmo threshold mínimo da busca em tempo real
+TAMANHO_MINIMO_DESCRICAO = 20
+TAMANHO_LOTE_IN = 500  # Limite de parâmetros por cláusula IN no SQLite
+
+# Serializa as atualizações feitas pelas tarefas em background
+_lock_atualizacao = threading.Lock()
+
+
+def get_top_k() -> int:
+    """Quantidade de vizinhos mantidos por chamado"""
+    valor = get_config_manager().get_configuracao_avancada('deteccao_similaridade', 'max_vizinhos_precomputados')
+    return int(valor or TOP_K_PADRAO)
+
+
+def _carregar_corpus(db: Session) -> List[Tuple[int, str]]:
+    """Corpus compacto (id, texto) no mesmo formato usado pela busca em tempo real"""
+    return [
+        (chamado_id, f" {descricao}")
+        for chamado_id, descricao in db.query(Chamado.id, Chamado.descricao).order_by(Chamado.id).all()
+        if descricao and len(descricao) > TAMANHO_MINIMO_DESCRICAO
+    ]
+
+
+def calcular_pontuacoes(descricao: str, chamado_id: int, corpus: List[Tuple[int, str]]) -> Dict[int, float]:
+    """Scores de similaridade (acima do mínimo armazenado) do chamado contra o corpus"""
+    if not descricao or len(descricao) < TAMANHO_MINIMO_DESCRICAO:
+        return {}
+    itens = [item for item in corpus if item[0] != chamado_id]
+    return {itens[idx][0]: score for idx, score in wex_ai._pontuar_contra_base(descricao, itens)}
+
+
+def _novo_vizinho(chamado_id: int, vizinho_id: int, score: float) -> ChamadoVizinho:
+    return ChamadoVizinho(
+        chamado_id=chamado_id,
+        vizinho_id=vizinho_id,
+        score=score,
+        motivos=json.dumps(motivos_similaridade(score), ensure_ascii=False)
+    )
+
+
+def _gravar_vizinhanca(db: Session, chamado_id: int, descricao: str, pontuacoes: Dict[int, float], k: int):
+    """Substitui a vizinhança do chamado pelo top-K das pontuações"""
+    db.query(ChamadoVizinho).filter(ChamadoVizinho.chamado_id == chamado_id).delete(synchronize_session=False)
+    for vizinho_id, score in heapq.nlargest(k, pontuacoes.items(), key=lambda item: item[1]):
+        db.add(_novo_vizinho(chamado_id, vizinho_id, score))
+
+    estado = db.get(ChamadoVizinhancaEstado, chamado_id)
+    if estado is None:
+        estado = ChamadoVizinhancaEstado(chamado_id=chamado_id)
+        db.add(estado)
+    estado.descricao_hash = hash_descricao(descricao)
+    estado.data_calculo = datetime.now()
+
+
+def atualizar_vizinhanca_chamado(db: Session, chamado_id: int):
+    """
+    Atualiza a tabela de vizinhos após a criação/edição (ou remoção) de um chamado
+
+    Recalcula apenas a vizinhança do próprio chamado, insere-o no top-K dos
+    chamados em que passou a figurar e recalcula as vizinhanças que o perderam.
+    """
+    k = get_top_k()
+    chamado = db.get(Chamado, chamado_id)
+
+    # Vizinhanças que continham o chamado antes da atualização
+    afetados = {
+        vizinho_de for (vizinho_de,) in
+        db.query(ChamadoVizinho.chamado_id).filter(ChamadoVizinho.vizinho_id == chamado_id).all()
+    }
+    db.query(ChamadoVizinho).filter(
+        or_(ChamadoVizinho.chamado_id == chamado_id, ChamadoVizinho.vizinho_id == chamado_id)
+    ).delete(synchronize_session=False)
+
+    corpus = _carregar_corpus(db)
+    descricoes = {item_id: texto[1:] for item_id, texto in corpus}
+
+    if chamado is None:
+        db.query(ChamadoVizinhancaEstado).filter(
+            ChamadoVizinhancaEstado.chamado_id == chamado_id
+        ).delete(synchronize_session=False)
+    else:
+        pontuacoes = calcular_pontuacoes(chamado.descricao, chamado_id, corpus)
+        _gravar_vizinhanca(db, chamado_id, chamado.descricao, pontuacoes, k)
+
+        # Inserir o chamado no top-K dos vizinhos em que ele passou a se qualificar
+        ids = list(pontuacoes)
+        estatisticas = {}
+        for inicio in range(0, len(ids), TAMANHO_LOTE_IN):
+            lote = ids[inicio:inicio + TAMANHO_LOTE_IN]
+            estatisticas.update({
+                vizinho_de: (total, minimo) for vizinho_de, total, minimo in db.query(
+                    ChamadoVizinho.chamado_id, func.count(ChamadoVizinho.vizinho_id), func.min(ChamadoVizinho.score)
+                ).filter(ChamadoVizinho.chamado_id.in_(lote)).group_by(ChamadoVizinho.chamado_id).all()
+            })
+
+        for vizinho_de, score in pontuacoes.items():
+            total, minimo = estatisticas.get(vizinho_de, (0, None))
+            if total >= k:
+                if score <= minimo:
+                    continue
+                pior = db.query(ChamadoVizinho).filter(
+                    ChamadoVizinho.chamado_id == vizinho_de
+                ).order_by(ChamadoVizinho.score.asc()).first()
+                db.delete(pior)
+            db.add(_novo_vizinho(vizinho_de, chamado_id, score))
+            afetados.discard(vizinho_de)
+
+    # Vizinhanças que perderam o chamado podem ter espaço para outro vizinho
+    for vizinho_de in afetados:
+        descricao = descricoes.get(vizinho_de, "")
+        _gravar_vizinhanca(db, vizinho_de, descricao, calcular_pontuacoes(descricao, vizinho_de, corpus), k)
+
+    db.commit()
+
+
+def atualizar_vizinhanca_em_background(chamado_id: int):
+    """
+    Tarefa em background: atualiza a vizinhança com uma sessão própria
+
+    Várias leituras podem agendar o mesmo chamado; se uma tarefa anterior já
+    deixou a vizinhança em dia com a descrição atual, não há o que refazer.
+    """
+    with _lock_atualizacao:
+        db = SessionLocal()
+        try:
+            chamado = db.get(Chamado, chamado_id)
+            if chamado is not None and vizinhanca_atualizada(db, chamado):
+                return
+            atualizar_vizinhanca_chamado(db, chamado_id)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar vizinhos do chamado {chamado_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def reconstruir_vizinhos(db: Session) -> int:
+    """Reconstrói toda a tabela de vizinhos (retorna o total de pares gravados)"""
+    k = get_top_k()
+    corpus = _carregar_corpus(db)
+
+    # Pares acima do mínimo: pool de processos quando habilitado, senão em série
+    adjacencias = wex_ai._calcular_adjacencias_cluster(corpus, SCORE_MINIMO_ARMAZENADO)
+    if adjacencias is None:
+        tokens = [set(texto.lower().split()) for _, texto in corpus]
+        adjacencias = {}
+        for i in range(len(corpus)):
+            vizinhos = []
+            for j in range(i + 1, len(corpus)):
+                score = similaridade_tokens(tokens[i], tokens[j])
+                if score > SCORE_MINIMO_ARMAZENADO:
+                    vizinhos.append((j, score))
+            if vizinhos:
+                adjacencias[i] = vizinhos
+
+    pontuacoes: Dict[int, Dict[int, float]] = {chamado_id: {} for chamado_id, _ in corpus}
+    for i, vizinhos in adjacencias.items():
+        for j, score in vizinhos:
+            pontuacoes[corpus[i][0]][corpus[j][0]] = score
+            pontuacoes[corpus[j][0]][corpus[i][0]] = score
+
+    db.query(ChamadoVizinho).delete(synchronize_session=False)
+    db.query(ChamadoVizinhancaEstado).delete(synchronize_session=False)
+
+    linhas = []
+    for chamado_id, candidatos in pontuacoes.items():
+        for vizinho_id, score in heapq.nlargest(k, candidatos.items(), key=lambda item: item[1]):
+            linhas.append({
+                'chamado_id': chamado_id,
+                'vizinho_id': vizinho_id,
+                'score': score,
+                'motivos': json.dumps(motivos_similaridade(score), ensure_ascii=False)
+            })
+    db.bulk_insert_mappings(ChamadoVizinho, linhas)
+    agora = datetime.now()
+    db.bulk_insert_mappings(ChamadoVizinhancaEstado, [
+        {'chamado_id': chamado_id, 'descricao_hash': hash_descricao(texto[1:]), 'data_calculo': agora}
+        for chamado_id, texto in corpus
+    ])
+    db.commit()
+    return len(linhas)
+
+
+def vizinhanca_atualizada(db: Session, chamado: Chamado) -> bool:
+    """Indica se a vizinhança gravada corresponde à descrição atual do chamado"""
+    estado = db.get(ChamadoVizinhancaEstado, chamado.id)
+    return estado is not None and estado.descricao_hash == hash_descricao(chamado.descricao)
+
+
+def selecionar_similares(db: Session, chamado: Chamado, limite: int) -> List[Tuple[int, float]]:
+    """
+    (id, score) dos chamados mais similares, do maior score
+
+    Lê os vizinhos pré-calculados quando a vizinhança está atualizada;
+    senão pontua o chamado contra o corpus, como a busca em tempo real.
+    """
+    if vizinhanca_atualizada(db, chamado):
+        return db.query(ChamadoVizinho.vizinho_id, ChamadoVizinho.score).filter(
+            ChamadoVizinho.chamado_id == chamado.id
+        ).order_by(ChamadoVizinho.score.desc()).limit(limite).all()
+    pontuacoes = calcular_pontuacoes(chamado.descricao, chamado.id, _carregar_corpus(db))
+    return heapq.nlargest(limite, pontuacoes.items(), key=lambda item: item[1])
+
+
+def buscar_vizinhos_precomputados(db: Session, chamado_id: int, limite: int,
+                                  score_minimo: float) -> ChamadosSimilares:
+    """Lê os vizinhos pré-calculados (uma leitura indexada) no formato da busca em tempo real"""
+    inicio = datetime.now()
+    linhas = db.query(ChamadoVizinho, Chamado).join(
+        Chamado, Chamado.id == ChamadoVizinho.vizinho_id
+    ).filter(
+        ChamadoVizinho.chamado_id == chamado_id,
+        ChamadoVizinho.score >= score_minimo
+    ).order_by(ChamadoVizinho.score.desc()).limit(limite).all()
+
+    resultados = [formatar_chamado_similar(chamado, vizinho.score, vizinho.motivos_list) for vizinho, chamado in linhas]
+
+    total = len(resultados)
+    if total == limite:
+        total = db.query(func.count(ChamadoVizinho.vizinho_id)).filter(
+            ChamadoVizinho.chamado_id == chamado_id,
+            ChamadoVizinho.score >= score_minimo
+        ).scalar()
+
+    return ChamadosSimilares(
+        chamados_similares=resultados,
+        total_encontrados=total,
+        padroes_identificados=identificar_padroes_similares(resultados),
+        modelo_usado="vizinhos-precomputados",
+        tempo_processamento=(datetime.now() - inicio).total_seconds(),
+        confianca_analise=float(np.mean([r['score_similaridade'] for r in resultados])) if resultados else 0.0
+    )
+
+
+if __name__ == "__main__":
+    print("🔗 Reconstruindo tabela de vizinhos pré-calculados...")
+    from database import create_database
+    create_database()
+    sessao = SessionLocal()
+    try:
+        total_pares = reconstruir_vizinhos(sessao)
+        print(f"✅ {total_pares} pares de vizinhos gravados (top-{get_top_k()} por chamado)")
+    finally:
+        sessao.close()